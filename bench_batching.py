@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+消息分批微基准
+
+用一份合成的大报告（默认 2000 条新闻）比较 main.py split_content_into_batches
+的两种字节计算方式：
+
+- 原方式：每追加一行都把整个批次拼接成新字符串并重新编码，批次越大越慢
+- 增量方式（MessageBatcher）：每个片段只编码一次，逐段累计字节数，批次完成时一次拼接
+
+先校验两者的分批结果完全相同，再分别计时。
+
+用法:
+    python bench_batching.py [--titles N] [--groups N] [--repeat N]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import sys
+import time
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import main
+
+FORMATS = ("feishu", "dingtalk", "wework", "telegram", "ntfy")
+
+
+class LegacyBatcher(main.MessageBatcher):
+    """原实现的字节计算方式：每次检查都拼接字符串并重新编码整个批次"""
+
+    def __init__(self, base_header: str, base_footer: str, max_bytes: int):
+        super().__init__(base_header, base_footer, max_bytes)
+        self.max_bytes = max_bytes
+        self.current = base_header
+
+    def _fits(self, text: str) -> bool:
+        return (
+            len((self.current + text).encode("utf-8"))
+            + len(self.base_footer.encode("utf-8"))
+            < self.max_bytes
+        )
+
+    def append(self, text: str) -> None:
+        self.current += text
+
+    def add_if_fits(self, text: str) -> None:
+        if self._fits(text):
+            self.current += text
+
+    def add(self, text: str, *continuation: str) -> None:
+        if self._fits(text):
+            self.current += text
+        else:
+            self.flush()
+            self.current = self.base_header + "".join(continuation) + text
+        self.has_content = True
+
+    def flush(self) -> None:
+        if self.has_content:
+            self.batches.append(self.current + self.base_footer)
+
+
+def build_report(total_titles: int, groups: int, seed: int = 0) -> dict:
+    """合成报告：标题为中英文混合，带排名、时间、链接，部分为新增"""
+    rng = random.Random(seed)
+    words = "人工智能 芯片 新能源 汽车 发布会 市场 政策 数据 比赛 电影 手机 股市 OpenAI GPT".split()
+    sources = ["微博", "知乎", "百度热搜", "今日头条", "抖音", "哔哩哔哩", "澎湃新闻", "财联社"]
+
+    def make_title(index: int) -> dict:
+        first, last = sorted(rng.sample(range(8, 23), 2))
+        return {
+            "title": "".join(rng.choice(words) for _ in range(rng.randint(3, 8))) + f" #{index}",
+            "source_name": rng.choice(sources),
+            "time_display": f"[{first:02d}:00 ~ {last:02d}:30]",
+            "count": rng.randint(1, 12),
+            "ranks": sorted(rng.sample(range(1, 51), rng.randint(1, 4))),
+            "rank_threshold": 5,
+            "url": f"https://example.com/news/{index}",
+            "mobile_url": f"https://m.example.com/news/{index}",
+            "is_new": rng.random() < 0.2,
+        }
+
+    per_group = total_titles // groups
+    stats = []
+    for group in range(groups):
+        titles = [make_title(group * per_group + i) for i in range(per_group)]
+        stats.append({"word": f"{words[group % len(words)]} {group}", "count": len(titles), "titles": titles})
+
+    new_titles = [
+        {"source_id": f"s{i}", "source_name": source, "titles": [make_title(100000 + i * 10 + j) for j in range(10)]}
+        for i, source in enumerate(sources[:4])
+    ]
+    return {
+        "stats": stats,
+        "new_titles": new_titles,
+        "failed_ids": ["toutiao", "douyin"],
+        "total_new_count": sum(len(source["titles"]) for source in new_titles),
+    }
+
+
+def split_all(report_data: dict) -> list:
+    return [main.split_content_into_batches(report_data, format_type) for format_type in FORMATS]
+
+
+def best_of(report_data: dict, batcher_class, repeat: int) -> float:
+    main.MessageBatcher = batcher_class
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        split_all(report_data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main_entry():
+    parser = argparse.ArgumentParser(description="消息分批微基准")
+    parser.add_argument("--titles", type=int, default=2000, help="新闻条数")
+    parser.add_argument("--groups", type=int, default=40, help="词组数")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数，取最快一次")
+    args = parser.parse_args()
+
+    report_data = build_report(args.titles, args.groups)
+    # 批次头尾包含当前时间，固定下来以便比较两种方式的结果
+    now = main.get_beijing_time()
+    main.get_beijing_time = lambda: now
+    incremental_class = main.MessageBatcher
+    try:
+        main.MessageBatcher = LegacyBatcher
+        legacy_batches = split_all(report_data)
+        main.MessageBatcher = incremental_class
+        if split_all(report_data) != legacy_batches:
+            print("分批结果不一致")
+            return 1
+
+        legacy = best_of(report_data, LegacyBatcher, args.repeat)
+        current = best_of(report_data, incremental_class, args.repeat)
+    finally:
+        main.MessageBatcher = incremental_class
+
+    counts = ", ".join(
+        f"{format_type} {len(batches)}" for format_type, batches in zip(FORMATS, legacy_batches)
+    )
+    print(f"报告: {args.titles} 条新闻，{args.groups} 个词组；批次数: {counts}，结果一致")
+    print(f"原方式:   {legacy * 1000:.1f} ms（{len(FORMATS)} 种格式合计）")
+    print(f"增量方式: {current * 1000:.1f} ms")
+    print(f"加速:     {legacy / current:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_entry())
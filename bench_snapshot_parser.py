@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+快照解析微基准
+
+用 output/ 下的真实 txt 快照比较 trendradar.snapshot.parse_titles 与原来逐行
+split / rsplit / 正则替换的解析方式：先校验两者结果完全相同，再分别计时。
+
+用法:
+    python bench_snapshot_parser.py [快照文件或目录 ...] [--repeat N]
+
+不指定路径时使用 output/*/txt/ 下的全部完整快照。
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+from trendradar.snapshot import get_delta_base, get_repeat_base, parse_titles
+
+
+def legacy_clean_title(title: str) -> str:
+    return re.sub(r"\s+", " ", title).strip()
+
+
+def legacy_parse_titles(content: str):
+    """原 main.py parse_file_titles / ParserService.parse_txt_file 的解析方式"""
+    titles_by_id = {}
+    id_to_name = {}
+
+    for section in content.split("\n\n"):
+        if not section.strip() or "==== 以下ID请求失败 ====" in section:
+            continue
+
+        lines = section.strip().split("\n")
+        if len(lines) < 2:
+            continue
+
+        header_line = lines[0].strip()
+        if " | " in header_line:
+            parts = header_line.split(" | ", 1)
+            source_id = parts[0].strip()
+            id_to_name[source_id] = parts[1].strip()
+        else:
+            source_id = header_line
+            id_to_name[source_id] = source_id
+
+        titles_by_id[source_id] = {}
+
+        for line in lines[1:]:
+            if line.strip():
+                try:
+                    title_part = line.strip()
+                    rank = None
+
+                    if ". " in title_part and title_part.split(". ")[0].isdigit():
+                        rank_str, title_part = title_part.split(". ", 1)
+                        rank = int(rank_str)
+
+                    mobile_url = ""
+                    if " [MOBILE:" in title_part:
+                        title_part, mobile_part = title_part.rsplit(" [MOBILE:", 1)
+                        if mobile_part.endswith("]"):
+                            mobile_url = mobile_part[:-1]
+
+                    url = ""
+                    if " [URL:" in title_part:
+                        title_part, url_part = title_part.rsplit(" [URL:", 1)
+                        if url_part.endswith("]"):
+                            url = url_part[:-1]
+
+                    title = legacy_clean_title(title_part.strip())
+                    titles_by_id[source_id][title] = {
+                        "ranks": [rank] if rank is not None else [1],
+                        "url": url,
+                        "mobileUrl": mobile_url,
+                    }
+                except Exception:
+                    continue
+
+    return titles_by_id, id_to_name
+
+
+def collect_files(paths):
+    files = []
+    for path in paths or sorted(Path("output").glob("*/txt")):
+        path = Path(path)
+        files.extend(sorted(path.glob("*.txt")) if path.is_dir() else [path])
+    return files
+
+
+def best_of(func, contents, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in contents:
+            func(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="快照解析微基准")
+    parser.add_argument("paths", nargs="*", help="快照文件或目录，默认 output/*/txt")
+    parser.add_argument("--repeat", type=int, default=20, help="重复次数，取最快一次")
+    args = parser.parse_args()
+
+    contents = []
+    for file_path in collect_files(args.paths):
+        content = file_path.read_text(encoding="utf-8")
+        # 标记文件和增量快照不经过逐行解析
+        if get_repeat_base(content) or get_delta_base(content):
+            continue
+        contents.append(content)
+
+    if not contents:
+        print("没有找到完整快照文件")
+        return 1
+
+    for content in contents:
+        if parse_titles(content) != legacy_parse_titles(content):
+            print("解析结果不一致")
+            return 1
+
+    total_bytes = sum(len(content.encode("utf-8")) for content in contents)
+    legacy = best_of(legacy_parse_titles, contents, args.repeat)
+    current = best_of(parse_titles, contents, args.repeat)
+
+    print(f"快照文件: {len(contents)} 个，平均 {total_bytes / len(contents) / 1024:.1f} KB，结果一致")
+    print(f"原解析:   {legacy / len(contents) * 1000:.3f} ms/文件")
+    print(f"单遍解析: {current / len(contents) * 1000:.3f} ms/文件")
+    print(f"加速:     {legacy / current:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -38,6 +38,12 @@ case "${RUN_MODE:-cron}" in
     
     exec /usr/local/bin/supercronic -passthrough-logs /tmp/crontab
     ;;
+"daemon")
+    # 常驻进程，内部按 CRON_SCHEDULE 和平台独立间隔调度，配置文件修改后自动重新加载
+    echo "🔁 常驻调度模式: ${CRON_SCHEDULE:-*/30 * * * *}"
+    echo "🎯 main.py 将作为 PID 1 运行"
+    exec /usr/local/bin/python main.py --daemon
+    ;;
 *)
     exec "$@"
     ;;
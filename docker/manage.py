@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-新闻爬虫容器管理工具 - supercronic
+新闻爬虫容器管理工具 - supercronic / 常驻调度
 """
 
+import json
 import os
 import sys
 import subprocess
@@ -11,6 +12,9 @@ import time
 from pathlib import Path
 
 
+DAEMON_DIR = Path("/app/output/.daemon")
+
+
 def run_command(cmd, shell=True, capture_output=True):
     """执行系统命令"""
     try:
@@ -37,6 +41,35 @@ def manual_run():
         print(f"❌ 执行出错: {e}")
 
 
+def backfill_sqlite():
+    """将已有的 txt 快照导入 SQLite 存储"""
+    args = ["python", "main.py", "--backfill-sqlite"]
+    if "--force" in sys.argv[2:]:
+        args.append("--force")
+    print("🗄️ 导入 txt 快照到 SQLite...")
+    try:
+        result = subprocess.run(args, cwd="/app", capture_output=False, text=True)
+        if result.returncode == 0:
+            print("✅ 导入完成")
+        else:
+            print(f"❌ 导入失败，退出码: {result.returncode}")
+    except Exception as e:
+        print(f"❌ 执行出错: {e}")
+
+
+def archive_date_folders():
+    """把已结束的日期文件夹打包归档"""
+    print("📦 归档已结束的日期文件夹...")
+    try:
+        result = subprocess.run(
+            ["python", "main.py", "--archive"], cwd="/app", capture_output=False, text=True
+        )
+        if result.returncode != 0:
+            print(f"❌ 归档失败，退出码: {result.returncode}")
+    except Exception as e:
+        print(f"❌ 执行出错: {e}")
+
+
 def parse_cron_schedule(cron_expr):
     """解析cron表达式并返回人类可读的描述"""
     if not cron_expr or cron_expr == "未设置":
@@ -122,6 +155,11 @@ def show_status():
     """显示容器状态"""
     print("📊 容器状态:")
 
+    # 常驻调度模式下 PID 1 是 main.py
+    if os.environ.get("RUN_MODE") == "daemon":
+        show_daemon_status()
+        return
+
     # 检查 PID 1 状态
     supercronic_is_pid1 = False
     pid1_cmdline = ""
@@ -394,6 +432,84 @@ def restart_supercronic():
         print("  💡 建议重启容器: docker restart trend-radar")
 
 
+def show_daemon_status():
+    """显示常驻调度进程状态"""
+    print("🔁 常驻调度状态:")
+
+    status_file = DAEMON_DIR / "status.json"
+    if not status_file.exists():
+        print("  ❌ 未找到状态文件，常驻调度进程可能未启动")
+        print("  💡 确认 RUN_MODE=daemon 后重启容器: docker restart trend-radar")
+        return
+
+    try:
+        with open(status_file, "r", encoding="utf-8") as f:
+            status = json.load(f)
+    except Exception as e:
+        print(f"  ❌ 读取状态文件失败: {e}")
+        return
+
+    pid = status.get("pid")
+    is_alive = bool(pid) and Path(f"/proc/{pid}").exists()
+    if status.get("state") == "running" and is_alive:
+        print(f"  ✅ 运行中 (PID {pid})")
+    else:
+        print(f"  ❌ 未运行 (记录的 PID {pid}，状态 {status.get('state')})")
+
+    print(f"  🕐 启动时间: {status.get('started_at')}")
+    print(f"  ⚙️ 配置加载时间: {status.get('config_loaded_at')}")
+    print(f"  📋 报告模式: {status.get('report_mode')}")
+    print(f"  ⏰ 调度计划: {status.get('schedule')} ({parse_cron_schedule(status.get('schedule'))})")
+    print(f"  ⏭️ 下次执行: {status.get('next_run')}")
+    print(f"  🔢 已执行轮次: {status.get('run_count')}")
+    print(f"  ⏮️ 上次执行: {status.get('last_run')} (耗时 {status.get('last_duration')} 秒)")
+    if status.get("last_error"):
+        print(f"  ⚠️ 最近错误: {status['last_error']}")
+
+    platforms = status.get("platforms", {})
+    if platforms:
+        print("  📡 平台:")
+        for platform_id, info in platforms.items():
+            interval = info.get("interval")
+            adaptive_interval = info.get("adaptive_interval")
+            if interval:
+                schedule = f"每{interval}分钟"
+            elif adaptive_interval:
+                schedule = f"自适应，当前每{adaptive_interval:g}分钟"
+            else:
+                schedule = "跟随调度计划"
+            print(
+                f"    • {info.get('name', platform_id)} ({platform_id}): "
+                f"{schedule}，上次爬取 {info.get('last_run') or '尚未执行'}"
+            )
+
+
+def send_daemon_command(command):
+    """向常驻调度进程写入控制命令"""
+    control_dir = DAEMON_DIR / "control"
+    try:
+        control_dir.mkdir(parents=True, exist_ok=True)
+        (control_dir / command).write_text(str(time.time()))
+        return True
+    except Exception as e:
+        print(f"❌ 写入控制命令失败: {e}")
+        return False
+
+
+def trigger_daemon_run():
+    """让常驻调度进程立即执行一轮爬取"""
+    if send_daemon_command("run"):
+        print("▶️ 已发送立即执行命令，常驻调度进程将在几秒内开始爬取")
+        print("💡 查看进度: docker logs -f trend-radar")
+
+
+def reload_daemon_config():
+    """让常驻调度进程重新加载配置"""
+    if send_daemon_command("reload"):
+        print("🔄 已发送重新加载配置命令")
+        print("💡 config.yaml 修改后会自动重新加载，frequency_words.txt 每轮重新读取")
+
+
 def show_help():
     """显示帮助信息"""
     help_text = """
@@ -406,6 +522,11 @@ def show_help():
   files       - 显示输出文件
   logs        - 实时查看日志
   restart     - 重启说明
+  daemon      - 显示常驻调度进程状态 (RUN_MODE=daemon)
+  trigger     - 让常驻调度进程立即执行一轮爬取
+  reload      - 让常驻调度进程重新加载配置
+  backfill    - 将已有 txt 快照导入 SQLite (加 --force 重新导入全部)
+  archive     - 将超过保留天数的日期文件夹打包为 output/archive/日期.tar.xz
   help        - 显示此帮助
 
 📖 使用示例:
@@ -436,6 +557,11 @@ def show_help():
   4. 重启服务: restart
      - 由于 supercronic 是 PID 1，需要重启整个容器
      - 使用: docker restart trend-radar
+
+  5. 常驻调度模式: daemon / trigger / reload
+     - RUN_MODE=daemon 时 main.py 常驻运行，不再每次冷启动
+     - 平台可在 config.yaml 中设置 interval(分钟) 独立调度
+     - 修改配置文件无需重启容器
 """
     print(help_text)
 
@@ -453,6 +579,11 @@ def main():
         "files": show_files,
         "logs": show_logs,
         "restart": restart_supercronic,
+        "daemon": show_daemon_status,
+        "trigger": trigger_daemon_run,
+        "reload": reload_daemon_config,
+        "backfill": backfill_sqlite,
+        "archive": archive_date_folders,
         "help": show_help,
     }
 
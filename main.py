@@ -1,23 +1,65 @@
 # coding=utf-8
 
+import hashlib
 import json
+import math
 import os
 import random
 import re
+import signal
+import sys
 import time
+import threading
 import webbrowser
 import smtplib
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.header import Header
 from email.utils import formataddr, formatdate, make_msgid
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Union
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Optional, Union
+from urllib.parse import urlparse
 
 import pytz
 import requests
 import yaml
+from requests.adapters import HTTPAdapter
+
+from trendradar.archive import archive_date_folder, get_archive_path
+from trendradar.parallel import DEFAULT_MIN_FILES, SnapshotPartial, parse_snapshots
+from trendradar.ratelimit import RateLimiterRegistry, TokenBucket, parse_retry_after
+from trendradar.records import TitleRecord, intern_titles
+from trendradar.matcher import RuleSetMatcher, SharedMatches
+from trendradar.rules import get_combined_matcher, get_matcher, load_rules
+from trendradar.seen import SeenTitleFilter
+from trendradar.snapshot import (
+    Snapshot,
+    format_repeat_marker,
+    get_repeat_base,
+    load_snapshot,
+    read_titles,
+    remember_snapshot,
+)
+from trendradar.storage import SnapshotStore, date_folder_to_iso
+from trendradar.weights import WeightScorer
+
+
+def _detect_accept_encoding() -> str:
+    """根据已安装的解码库协商压缩格式（urllib3 需要 brotli 才能解码 br）"""
+    for module_name in ("brotli", "brotlicffi"):
+        try:
+            __import__(module_name)
+            return "gzip, deflate, br"
+        except ImportError:
+            continue
+    return "gzip, deflate"
+
+
+ACCEPT_ENCODING = _detect_accept_encoding()
 
 
 VERSION = "3.0.4"
@@ -51,7 +93,88 @@ SMTP_CONFIGS = {
 }
 
 
+# 通知渠道配置项与 notification.webhooks 中键名的对应关系
+CHANNEL_CONFIG_KEYS = {
+    "FEISHU_WEBHOOK_URL": "feishu_url",
+    "DINGTALK_WEBHOOK_URL": "dingtalk_url",
+    "WEWORK_WEBHOOK_URL": "wework_url",
+    "TELEGRAM_BOT_TOKEN": "telegram_bot_token",
+    "TELEGRAM_CHAT_ID": "telegram_chat_id",
+    "EMAIL_FROM": "email_from",
+    "EMAIL_PASSWORD": "email_password",
+    "EMAIL_TO": "email_to",
+    "EMAIL_SMTP_SERVER": "email_smtp_server",
+    "EMAIL_SMTP_PORT": "email_smtp_port",
+    "NTFY_SERVER_URL": "ntfy_server_url",
+    "NTFY_TOPIC": "ntfy_topic",
+    "NTFY_TOKEN": "ntfy_token",
+}
+
+
+# 各通知渠道的默认限速（按平台文档的频率限制换算为令牌桶参数）
+# rate: 每秒补充的令牌数；burst: 令牌桶容量；cooldown: 被限流但响应中没有 Retry-After 时的等待秒数
+DEFAULT_RATE_LIMITS = {
+    # 飞书自定义机器人：100 次/分钟，5 次/秒
+    "feishu": {"rate": 1.5, "burst": 3, "cooldown": 10},
+    # 钉钉自定义机器人：20 次/分钟，超出后限流 10 分钟
+    "dingtalk": {"rate": 0.3, "burst": 2, "cooldown": 600},
+    # 企业微信群机器人：20 次/分钟
+    "wework": {"rate": 0.3, "burst": 2, "cooldown": 60},
+    # Telegram Bot：同一聊天约 1 条/秒，群组 20 条/分钟（超出时 429 响应带 retry_after）
+    "telegram": {"rate": 1, "burst": 1, "cooldown": 30},
+    # ntfy.sh 默认：突发 60 次，之后每 5 秒恢复 1 次
+    "ntfy": {"rate": 0.2, "burst": 60, "cooldown": 10},
+}
+
+
 # === 配置管理 ===
+def load_rate_limits(rate_limits_data: Optional[Dict]) -> Dict[str, Dict]:
+    """加载各通知渠道的限速配置，未配置的项使用 DEFAULT_RATE_LIMITS"""
+    rate_limits_data = rate_limits_data or {}
+    rate_limits = {}
+    for channel, defaults in DEFAULT_RATE_LIMITS.items():
+        channel_data = rate_limits_data.get(channel) or {}
+        rate_limits[channel] = {
+            "RATE": float(channel_data.get("rate", defaults["rate"])),
+            "BURST": float(channel_data.get("burst", defaults["burst"])),
+            "COOLDOWN": float(channel_data.get("cooldown", defaults["cooldown"])),
+        }
+    return rate_limits
+
+
+def load_profile_configs(profiles_data: Optional[List[Dict]], default_mode: str) -> List[Dict]:
+    """加载附加订阅配置，通知渠道可用环境变量 PROFILE_<订阅名>_<渠道配置项> 覆盖"""
+    profiles = []
+    names = set()
+    for profile_data in profiles_data or []:
+        name = str(profile_data.get("name", "")).strip()
+        if not re.fullmatch(r"[\w-]+", name):
+            raise ValueError(f"订阅名称无效: '{name}'（只能包含文字、数字、下划线和连字符）")
+        if name in names:
+            raise ValueError(f"订阅名称重复: {name}")
+        names.add(name)
+
+        webhooks = profile_data.get("webhooks") or {}
+        env_prefix = f"PROFILE_{name.upper().replace('-', '_')}_"
+        channels = {
+            key: os.environ.get(env_prefix + key, "").strip()
+            or str(webhooks.get(webhook_key) or "")
+            for key, webhook_key in CHANNEL_CONFIG_KEYS.items()
+        }
+        channels["NTFY_SERVER_URL"] = channels["NTFY_SERVER_URL"] or "https://ntfy.sh"
+
+        profiles.append(
+            {
+                "NAME": name,
+                "FREQUENCY_WORDS": profile_data.get("frequency_words")
+                or f"config/frequency_words_{name}.txt",
+                "REPORT_MODE": profile_data.get("report_mode") or default_mode,
+                "CHANNELS": channels,
+            }
+        )
+    return profiles
+
+
 def load_config():
     """加载配置文件"""
     config_path = os.environ.get("CONFIG_PATH", "config/config.yaml")
@@ -71,16 +194,74 @@ def load_config():
         "REQUEST_INTERVAL": config_data["crawler"]["request_interval"],
         "REPORT_MODE": config_data["report"]["mode"],
         "RANK_THRESHOLD": config_data["report"]["rank_threshold"],
+        "MAX_TITLES_PER_KEYWORD": config_data["report"].get("max_titles_per_keyword", 0),
         "USE_PROXY": config_data["crawler"]["use_proxy"],
         "DEFAULT_PROXY": config_data["crawler"]["default_proxy"],
         "ENABLE_CRAWLER": config_data["crawler"]["enable_crawler"],
+        "CONCURRENT_CRAWL": config_data["crawler"].get("concurrent_crawl", False),
+        "MAX_CRAWL_WORKERS": config_data["crawler"].get("max_workers", 8),
+        "PER_HOST_CONCURRENCY": config_data["crawler"].get("per_host_concurrency", 4),
+        "HTTP_CACHE": config_data["crawler"].get("http_cache", True),
+        "CRAWL_RETRY_BUDGET": config_data["crawler"].get("retry_budget", 6),
+        "SKIP_UNCHANGED_SNAPSHOT": config_data["crawler"].get(
+            "skip_unchanged_snapshot", False
+        ),
+        "ADAPTIVE_POLLING": {
+            "ENABLED": config_data["crawler"]
+            .get("adaptive_polling", {})
+            .get("enabled", False),
+            "MIN_INTERVAL": config_data["crawler"]
+            .get("adaptive_polling", {})
+            .get("min_interval", 5),
+            "MAX_INTERVAL": config_data["crawler"]
+            .get("adaptive_polling", {})
+            .get("max_interval", 120),
+            "LOW_CHURN": config_data["crawler"]
+            .get("adaptive_polling", {})
+            .get("low_churn", 0.1),
+            "HIGH_CHURN": config_data["crawler"]
+            .get("adaptive_polling", {})
+            .get("high_churn", 0.3),
+        },
+        "CIRCUIT_BREAKER": {
+            "ENABLED": config_data["crawler"]
+            .get("circuit_breaker", {})
+            .get("enabled", True),
+            "WINDOW": config_data["crawler"].get("circuit_breaker", {}).get("window", 20),
+            "FAILURE_THRESHOLD": config_data["crawler"]
+            .get("circuit_breaker", {})
+            .get("failure_threshold", 3),
+            "FAILURE_RATE": config_data["crawler"]
+            .get("circuit_breaker", {})
+            .get("failure_rate", 0.8),
+            "COOLDOWN_MINUTES": config_data["crawler"]
+            .get("circuit_breaker", {})
+            .get("cooldown_minutes", 30),
+            "MAX_COOLDOWN_MINUTES": config_data["crawler"]
+            .get("circuit_breaker", {})
+            .get("max_cooldown_minutes", 360),
+        },
         "ENABLE_NOTIFICATION": config_data["notification"]["enable_notification"],
         "MESSAGE_BATCH_SIZE": config_data["notification"]["message_batch_size"],
         "DINGTALK_BATCH_SIZE": config_data["notification"].get(
             "dingtalk_batch_size", 20000
         ),
         "FEISHU_BATCH_SIZE": config_data["notification"].get("feishu_batch_size", 29000),
-        "BATCH_SEND_INTERVAL": config_data["notification"]["batch_send_interval"],
+        "RATE_LIMITS": load_rate_limits(config_data["notification"].get("rate_limits")),
+        "RATE_LIMIT_MAX_WAIT": config_data["notification"].get("rate_limit_max_wait", 120),
+        "RATE_LIMIT_RETRIES": config_data["notification"].get("rate_limit_retries", 2),
+        "CONCURRENT_SEND": config_data["notification"].get("concurrent_send", True),
+        "OUTBOX": {
+            "ENABLED": config_data["notification"].get("outbox", {}).get("enabled", False),
+            "BASE_DELAY": config_data["notification"].get("outbox", {}).get("base_delay", 60),
+            "MAX_DELAY": config_data["notification"].get("outbox", {}).get("max_delay", 3600),
+            "MAX_ATTEMPTS": config_data["notification"]
+            .get("outbox", {})
+            .get("max_attempts", 8),
+            "MAX_AGE_HOURS": config_data["notification"]
+            .get("outbox", {})
+            .get("max_age_hours", 24),
+        },
         "FEISHU_MESSAGE_SEPARATOR": config_data["notification"][
             "feishu_message_separator"
         ],
@@ -111,6 +292,54 @@ def load_config():
             "HOTNESS_WEIGHT": config_data["weight"]["hotness_weight"],
         },
         "PLATFORMS": config_data["platforms"],
+        "SQLITE_STORE": {
+            "ENABLED": config_data.get("storage", {})
+            .get("sqlite", {})
+            .get("enabled", False),
+            "PATH": config_data.get("storage", {})
+            .get("sqlite", {})
+            .get("path", "output/trendradar.db"),
+        },
+        "DELTA_SNAPSHOTS": {
+            "ENABLED": config_data.get("storage", {})
+            .get("delta_snapshots", {})
+            .get("enabled", False),
+            "KEYFRAME_INTERVAL": config_data.get("storage", {})
+            .get("delta_snapshots", {})
+            .get("keyframe_interval", 12),
+        },
+        "ARCHIVE": {
+            "ENABLED": config_data.get("storage", {})
+            .get("archive", {})
+            .get("enabled", False),
+            "KEEP_DAYS": config_data.get("storage", {})
+            .get("archive", {})
+            .get("keep_days", 7),
+        },
+        "SEEN_TITLES": {
+            "ENABLED": config_data.get("storage", {})
+            .get("seen_titles", {})
+            .get("enabled", False),
+            "DAYS": config_data.get("storage", {})
+            .get("seen_titles", {})
+            .get("days", 7),
+            "HIDE_RETURNING": config_data.get("storage", {})
+            .get("seen_titles", {})
+            .get("hide_returning", False),
+        },
+        "PARALLEL_PARSE": {
+            "WORKERS": config_data.get("storage", {})
+            .get("parallel_parse", {})
+            .get("workers", 0),
+            "MIN_FILES": config_data.get("storage", {})
+            .get("parallel_parse", {})
+            .get("min_files", DEFAULT_MIN_FILES),
+        },
+        "DAEMON": {
+            "SCHEDULE": os.environ.get("CRON_SCHEDULE", "").strip()
+            or config_data.get("daemon", {}).get("schedule", "*/30 * * * *"),
+            "POLL_SECONDS": config_data.get("daemon", {}).get("poll_seconds", 5),
+        },
     }
 
     # 通知渠道配置（环境变量优先）
@@ -191,6 +420,12 @@ def load_config():
     else:
         print("未配置任何通知渠道")
 
+    config["PROFILES"] = load_profile_configs(
+        config_data.get("profiles"), config["REPORT_MODE"]
+    )
+    if config["PROFILES"]:
+        print(f"附加订阅: {', '.join(profile['NAME'] for profile in config['PROFILES'])}")
+
     return config
 
 
@@ -313,8 +548,10 @@ def html_escape(text: str) -> str:
 class PushRecordManager:
     """推送记录管理器"""
 
-    def __init__(self):
+    def __init__(self, profile_name: str = ""):
         self.record_dir = Path("output") / ".push_records"
+        # 附加订阅各自记录推送，默认订阅沿用原来的文件名
+        self.record_prefix = f"push_record_{profile_name}_" if profile_name else "push_record_"
         self.ensure_record_dir()
         self.cleanup_old_records()
 
@@ -325,7 +562,7 @@ class PushRecordManager:
     def get_today_record_file(self) -> Path:
         """获取今天的记录文件路径"""
         today = get_beijing_time().strftime("%Y%m%d")
-        return self.record_dir / f"push_record_{today}.json"
+        return self.record_dir / f"{self.record_prefix}{today}.json"
 
     def cleanup_old_records(self):
         """清理过期的推送记录"""
@@ -334,7 +571,7 @@ class PushRecordManager:
 
         for record_file in self.record_dir.glob("push_record_*.json"):
             try:
-                date_str = record_file.stem.replace("push_record_", "")
+                date_str = record_file.stem.rsplit("_", 1)[-1]
                 file_date = datetime.strptime(date_str, "%Y%m%d")
                 file_date = pytz.timezone("Asia/Shanghai").localize(file_date)
 
@@ -413,11 +650,306 @@ class PushRecordManager:
 
 
 # === 数据获取 ===
+class ResponseCache:
+    """平台响应缓存：按平台ID保存 ETag/Last-Modified 校验信息、上次的响应内容和解析结果
+
+    解析结果与响应内容保存在同一个文件中，定时任务每次都是新进程，
+    收到 304 或内容相同的响应时也能直接复用上次的解析结果。
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = cache_dir or Path("output") / ".crawler_state" / "http_cache"
+        self._entries = {}
+        self._parsed = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """计算响应内容指纹"""
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _entry_file(self, platform_id: str) -> Path:
+        safe_id = re.sub(r"[^\w.-]", "_", platform_id)
+        return self.cache_dir / f"{safe_id}.json"
+
+    def get(self, platform_id: str) -> Optional[Dict]:
+        """获取平台的缓存条目，内存中没有时从磁盘加载"""
+        with self._lock:
+            if platform_id in self._entries:
+                return self._entries[platform_id]
+
+        entry = None
+        entry_file = self._entry_file(platform_id)
+        if entry_file.exists():
+            try:
+                with open(entry_file, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except Exception as e:
+                print(f"读取 {platform_id} 响应缓存失败: {e}")
+
+        with self._lock:
+            self._entries[platform_id] = entry
+        return entry
+
+    def get_validators(self, platform_id: str) -> Dict[str, str]:
+        """构造条件请求头"""
+        entry = self.get(platform_id)
+        headers = {}
+        if entry and entry.get("body"):
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def update(
+        self,
+        platform_id: str,
+        body: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        content_hash: Optional[str] = None,
+    ) -> None:
+        """保存最新的响应内容和校验信息，内容和校验信息都未变化时不写盘"""
+        content_hash = content_hash or self.content_hash(body)
+        previous = self.get(platform_id)
+        entry = {
+            "etag": etag or "",
+            "last_modified": last_modified or "",
+            "content_hash": content_hash,
+            "body": body,
+        }
+        if previous and previous.get("content_hash") == content_hash and "parsed" in previous:
+            # 内容未变，保留已保存的解析结果
+            entry["parsed"] = previous["parsed"]
+        with self._lock:
+            self._entries[platform_id] = entry
+
+        if previous and all(
+            previous.get(key) == entry[key]
+            for key in ("etag", "last_modified", "content_hash")
+        ):
+            return
+
+        self._write(platform_id, entry)
+
+    def _write(self, platform_id: str, entry: Dict) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._entry_file(platform_id), "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"保存 {platform_id} 响应缓存失败: {e}")
+
+    def get_parsed(self, platform_id: str, content_hash: str) -> Optional[Dict]:
+        """内容指纹一致时返回上次解析好的标题数据（内存中没有时取自磁盘上的缓存条目）"""
+        with self._lock:
+            cached = self._parsed.get(platform_id)
+        if cached and cached[0] == content_hash:
+            return cached[1]
+
+        entry = self.get(platform_id)
+        if entry and entry.get("content_hash") == content_hash and entry.get("parsed") is not None:
+            parsed = entry["parsed"]
+            with self._lock:
+                self._parsed[platform_id] = (content_hash, parsed)
+            return parsed
+        return None
+
+    def set_parsed(self, platform_id: str, content_hash: str, parsed: Dict) -> None:
+        """记录解析结果，并与内容相同的缓存条目一起写盘"""
+        with self._lock:
+            self._parsed[platform_id] = (content_hash, parsed)
+            entry = self._entries.get(platform_id)
+        if not entry or entry.get("content_hash") != content_hash or entry.get("parsed") == parsed:
+            return
+
+        entry = dict(entry, parsed=parsed)
+        with self._lock:
+            self._entries[platform_id] = entry
+        self._write(platform_id, entry)
+
+
+class PlatformHealthManager:
+    """平台健康状态管理：记录近期成功率和延迟，对持续失败的平台熔断"""
+
+    def __init__(self, state_file: Optional[Path] = None):
+        breaker_config = CONFIG["CIRCUIT_BREAKER"]
+        self.state_file = state_file or Path("output") / ".crawler_state" / "health.json"
+        self.window = max(1, int(breaker_config["WINDOW"]))
+        self.failure_threshold = max(1, int(breaker_config["FAILURE_THRESHOLD"]))
+        self.failure_rate_threshold = float(breaker_config["FAILURE_RATE"])
+        self.cooldown = breaker_config["COOLDOWN_MINUTES"] * 60
+        self.max_cooldown = breaker_config["MAX_COOLDOWN_MINUTES"] * 60
+        self._lock = threading.Lock()
+        self._states = self._load()
+
+    def _load(self) -> Dict:
+        """加载持久化的健康状态"""
+        if not self.state_file.exists():
+            return {}
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"读取平台健康状态失败: {e}")
+            return {}
+
+    def save(self) -> None:
+        """保存健康状态"""
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                content = json.dumps(self._states, ensure_ascii=False, indent=2)
+            with open(self.state_file, "w", encoding="utf-8") as f:
+                f.write(content)
+        except Exception as e:
+            print(f"保存平台健康状态失败: {e}")
+
+    def _get(self, platform_id: str) -> Dict:
+        return self._states.setdefault(
+            platform_id,
+            {
+                "state": "closed",
+                "history": [],
+                "consecutive_failures": 0,
+                "open_until": 0,
+                "cooldown": self.cooldown,
+            },
+        )
+
+    def check(self, platform_id: str) -> str:
+        """返回本次请求前的熔断状态：closed / open / half_open"""
+        with self._lock:
+            state = self._get(platform_id)
+            if state["state"] == "open" and time.time() >= state["open_until"]:
+                state["state"] = "half_open"
+            return state["state"]
+
+    def record(self, platform_id: str, success: bool, latency: float) -> None:
+        """记录一次请求结果，必要时打开或关闭熔断"""
+        with self._lock:
+            state = self._get(platform_id)
+            state["history"].append([int(time.time()), success, round(latency, 3)])
+            state["history"] = state["history"][-self.window :]
+
+            if success:
+                state["state"] = "closed"
+                state["consecutive_failures"] = 0
+                state["cooldown"] = self.cooldown
+                return
+
+            state["consecutive_failures"] += 1
+            if state["state"] == "half_open":
+                # 试探失败，冷却时间翻倍
+                state["cooldown"] = min(state["cooldown"] * 2, self.max_cooldown)
+                self._open(platform_id, state)
+            elif state["consecutive_failures"] >= self.failure_threshold or (
+                len(state["history"]) >= self.window
+                and self._failure_rate(state) >= self.failure_rate_threshold
+            ):
+                self._open(platform_id, state)
+
+    def _open(self, platform_id: str, state: Dict) -> None:
+        state["state"] = "open"
+        state["open_until"] = int(time.time() + state["cooldown"])
+        print(f"{platform_id} 持续失败，熔断 {state['cooldown'] // 60} 分钟")
+
+    @staticmethod
+    def _failure_rate(state: Dict) -> float:
+        history = state["history"]
+        if not history:
+            return 0.0
+        return sum(1 for _, success, _ in history if not success) / len(history)
+
+    def failure_rate(self, platform_id: str) -> float:
+        """近期失败率"""
+        with self._lock:
+            return self._failure_rate(self._get(platform_id))
+
+    def p95_latency(self, platform_id: str) -> Optional[float]:
+        """近期成功请求的 p95 延迟（秒）"""
+        with self._lock:
+            latencies = sorted(
+                latency
+                for _, success, latency in self._get(platform_id)["history"]
+                if success
+            )
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def suggest_retries(self, platform_id: str, max_retries: int) -> int:
+        """近期失败率高的平台减少重试次数"""
+        if self.failure_rate(platform_id) >= 0.5:
+            return min(max_retries, 1)
+        return max_retries
+
+    def suggest_timeout(self, platform_id: str, default: float = 10) -> float:
+        """根据 p95 延迟收紧超时时间，避免慢平台拖住整轮爬取"""
+        p95 = self.p95_latency(platform_id)
+        if p95 is None:
+            return default
+        return min(default, max(5.0, p95 * 3))
+
+
+class RetryBudget:
+    """单次运行所有平台共享的重试预算"""
+
+    def __init__(self, total: int):
+        self.remaining = max(0, int(total))
+        self._lock = threading.Lock()
+
+    def consume(self) -> bool:
+        """消耗一次重试机会，预算用完返回 False"""
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
 class DataFetcher:
     """数据获取器"""
 
-    def __init__(self, proxy_url: Optional[str] = None):
+    def __init__(
+        self,
+        proxy_url: Optional[str] = None,
+        max_workers: int = CONFIG["MAX_CRAWL_WORKERS"],
+        per_host_concurrency: int = CONFIG["PER_HOST_CONCURRENCY"],
+    ):
         self.proxy_url = proxy_url
+        self.max_workers = max(1, int(max_workers))
+        self.per_host_concurrency = max(1, int(per_host_concurrency))
+        self._host_semaphores = {}
+        self._host_lock = threading.Lock()
+        self.response_cache = ResponseCache() if CONFIG["HTTP_CACHE"] else None
+        self.health_manager = (
+            PlatformHealthManager() if CONFIG["CIRCUIT_BREAKER"]["ENABLED"] else None
+        )
+        self.retry_budget = None
+        self.circuit_skipped_ids = []
+        self.session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        """创建共享的连接池会话，复用 TCP/TLS 连接"""
+        session = requests.Session()
+        pool_size = max(self.max_workers, self.per_host_concurrency)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _get_host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        """获取目标主机的并发信号量，限制同一主机的同时请求数"""
+        host = urlparse(url).netloc
+        with self._host_lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.per_host_concurrency)
+                self._host_semaphores[host] = semaphore
+        return semaphore
 
     def fetch_data(
         self,
@@ -443,87 +975,137 @@ class DataFetcher:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
             "Accept": "application/json, text/plain, */*",
             "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+            "Accept-Encoding": ACCEPT_ENCODING,
             "Connection": "keep-alive",
             "Cache-Control": "no-cache",
         }
 
+        timeout = 10
+        if self.health_manager:
+            breaker_state = self.health_manager.check(id_value)
+            if breaker_state == "open":
+                print(f"{id_value} 处于熔断状态，跳过请求")
+                self.circuit_skipped_ids.append(id_value)
+                return None, id_value, alias
+            if breaker_state == "half_open":
+                print(f"{id_value} 熔断冷却结束，发送试探请求")
+                max_retries = 0
+            else:
+                max_retries = self.health_manager.suggest_retries(id_value, max_retries)
+            timeout = self.health_manager.suggest_timeout(id_value, timeout)
+
+        cached_entry = None
+        if self.response_cache:
+            cached_entry = self.response_cache.get(id_value)
+            headers.update(self.response_cache.get_validators(id_value))
+
         retries = 0
         while retries <= max_retries:
+            start_time = time.time()
             try:
-                response = requests.get(
-                    url, proxies=proxies, headers=headers, timeout=10
-                )
+                # 只在请求期间占用主机名额，重试等待时释放给其他平台
+                with self._get_host_semaphore(url):
+                    start_time = time.time()
+                    response = self.session.get(
+                        url, proxies=proxies, headers=headers, timeout=timeout
+                    )
+
+                if response.status_code == 304 and cached_entry:
+                    self._record_health(id_value, True, time.time() - start_time)
+                    print(f"获取 {id_value} 成功（未变化，复用上次数据）")
+                    return cached_entry["body"], id_value, alias
+
                 response.raise_for_status()
 
                 data_text = response.text
-                data_json = json.loads(data_text)
+                content_hash = None
+                if self.response_cache:
+                    content_hash = self.response_cache.content_hash(data_text)
+
+                if cached_entry and content_hash == cached_entry.get("content_hash"):
+                    # 内容与上次完全一致（包括 cache 状态的重复响应），上次已校验过状态
+                    status_info = "内容未变化"
+                else:
+                    data_json = json.loads(data_text)
 
-                status = data_json.get("status", "未知")
-                if status not in ["success", "cache"]:
-                    raise ValueError(f"响应状态异常: {status}")
+                    status = data_json.get("status", "未知")
+                    if status not in ["success", "cache"]:
+                        raise ValueError(f"响应状态异常: {status}")
 
-                status_info = "最新数据" if status == "success" else "缓存数据"
+                    status_info = "最新数据" if status == "success" else "缓存数据"
+
+                if self.response_cache:
+                    self.response_cache.update(
+                        id_value,
+                        data_text,
+                        response.headers.get("ETag"),
+                        response.headers.get("Last-Modified"),
+                        content_hash,
+                    )
+
+                self._record_health(id_value, True, time.time() - start_time)
                 print(f"获取 {id_value} 成功（{status_info}）")
                 return data_text, id_value, alias
 
             except Exception as e:
                 retries += 1
-                if retries <= max_retries:
+                if retries <= max_retries and not (
+                    self.retry_budget and not self.retry_budget.consume()
+                ):
                     base_wait = random.uniform(min_retry_wait, max_retry_wait)
                     additional_wait = (retries - 1) * random.uniform(1, 2)
                     wait_time = base_wait + additional_wait
                     print(f"请求 {id_value} 失败: {e}. {wait_time:.2f}秒后重试...")
                     time.sleep(wait_time)
                 else:
-                    print(f"请求 {id_value} 失败: {e}")
+                    if retries <= max_retries:
+                        print(f"请求 {id_value} 失败: {e}，本次运行重试预算已用完")
+                    else:
+                        print(f"请求 {id_value} 失败: {e}")
+                    self._record_health(id_value, False, time.time() - start_time)
                     return None, id_value, alias
         return None, id_value, alias
 
+    def _record_health(self, id_value: str, success: bool, latency: float) -> None:
+        """记录请求结果到平台健康状态"""
+        if self.health_manager:
+            self.health_manager.record(id_value, success, latency)
+
     def crawl_websites(
         self,
         ids_list: List[Union[str, Tuple[str, str]]],
         request_interval: int = CONFIG["REQUEST_INTERVAL"],
     ) -> Tuple[Dict, Dict, List]:
         """爬取多个网站数据"""
+        self.retry_budget = RetryBudget(CONFIG["CRAWL_RETRY_BUDGET"])
+        self.circuit_skipped_ids = []
+
+        if CONFIG["CONCURRENT_CRAWL"] and self.max_workers > 1 and len(ids_list) > 1:
+            crawl_result = self._crawl_concurrently(ids_list)
+        else:
+            crawl_result = self._crawl_sequentially(ids_list, request_interval)
+
+        if self.circuit_skipped_ids:
+            print(f"熔断跳过: {self.circuit_skipped_ids}")
+        if self.health_manager:
+            self.health_manager.save()
+
+        return crawl_result
+
+    def _crawl_sequentially(
+        self,
+        ids_list: List[Union[str, Tuple[str, str]]],
+        request_interval: int,
+    ) -> Tuple[Dict, Dict, List]:
+        """按顺序逐个爬取，请求之间保持间隔"""
         results = {}
         id_to_name = {}
         failed_ids = []
 
         for i, id_info in enumerate(ids_list):
-            if isinstance(id_info, tuple):
-                id_value, name = id_info
-            else:
-                id_value = id_info
-                name = id_value
-
+            response, id_value, name = self.fetch_data(id_info)
             id_to_name[id_value] = name
-            response, _, _ = self.fetch_data(id_info)
-
-            if response:
-                try:
-                    data = json.loads(response)
-                    results[id_value] = {}
-                    for index, item in enumerate(data.get("items", []), 1):
-                        title = item["title"]
-                        url = item.get("url", "")
-                        mobile_url = item.get("mobileUrl", "")
-
-                        if title in results[id_value]:
-                            results[id_value][title]["ranks"].append(index)
-                        else:
-                            results[id_value][title] = {
-                                "ranks": [index],
-                                "url": url,
-                                "mobileUrl": mobile_url,
-                            }
-                except json.JSONDecodeError:
-                    print(f"解析 {id_value} 响应失败")
-                    failed_ids.append(id_value)
-                except Exception as e:
-                    print(f"处理 {id_value} 数据出错: {e}")
-                    failed_ids.append(id_value)
-            else:
-                failed_ids.append(id_value)
+            self._collect_response(id_value, response, results, failed_ids)
 
             if i < len(ids_list) - 1:
                 actual_interval = request_interval + random.randint(-10, 20)
@@ -533,433 +1115,1377 @@ class DataFetcher:
         print(f"成功: {list(results.keys())}, 失败: {failed_ids}")
         return results, id_to_name, failed_ids
 
+    def _crawl_concurrently(
+        self, ids_list: List[Union[str, Tuple[str, str]]]
+    ) -> Tuple[Dict, Dict, List]:
+        """并发爬取多个网站数据，总耗时取决于最慢的平台"""
+        workers = min(self.max_workers, len(ids_list))
+        print(
+            f"并发爬取 {len(ids_list)} 个平台，最大并发 {workers}，单主机并发上限 {self.per_host_concurrency}"
+        )
 
-# === 数据处理 ===
-def save_titles_to_file(results: Dict, id_to_name: Dict, failed_ids: List) -> str:
-    """保存标题到文件"""
-    file_path = get_output_path("txt", f"{format_time_filename()}.txt")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # map 按提交顺序返回结果，保证输出顺序与配置顺序一致
+            responses = list(executor.map(self.fetch_data, ids_list))
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        for id_value, title_data in results.items():
-            # id | name 或 id
-            name = id_to_name.get(id_value)
-            if name and name != id_value:
-                f.write(f"{id_value} | {name}\n")
-            else:
-                f.write(f"{id_value}\n")
-
-            # 按排名排序标题
-            sorted_titles = []
-            for title, info in title_data.items():
-                cleaned_title = clean_title(title)
-                if isinstance(info, dict):
-                    ranks = info.get("ranks", [])
-                    url = info.get("url", "")
-                    mobile_url = info.get("mobileUrl", "")
-                else:
-                    ranks = info if isinstance(info, list) else []
-                    url = ""
-                    mobile_url = ""
+        results = {}
+        id_to_name = {}
+        failed_ids = []
 
-                rank = ranks[0] if ranks else 1
-                sorted_titles.append((rank, cleaned_title, url, mobile_url))
+        for response, id_value, name in responses:
+            id_to_name[id_value] = name
+            self._collect_response(id_value, response, results, failed_ids)
 
-            sorted_titles.sort(key=lambda x: x[0])
+        print(f"成功: {list(results.keys())}, 失败: {failed_ids}")
+        return results, id_to_name, failed_ids
 
-            for rank, cleaned_title, url, mobile_url in sorted_titles:
-                line = f"{rank}. {cleaned_title}"
+    def _collect_response(
+        self,
+        id_value: str,
+        response: Optional[str],
+        results: Dict,
+        failed_ids: List,
+    ) -> None:
+        """解析单个平台的响应并写入结果"""
+        if not response:
+            failed_ids.append(id_value)
+            return
 
-                if url:
-                    line += f" [URL:{url}]"
-                if mobile_url:
-                    line += f" [MOBILE:{mobile_url}]"
-                f.write(line + "\n")
+        content_hash = None
+        if self.response_cache:
+            content_hash = self.response_cache.content_hash(response)
+            parsed = self.response_cache.get_parsed(id_value, content_hash)
+            if parsed is not None:
+                # 内容未变化，直接复用上次的解析结果（复制一份，避免下游修改影响缓存）
+                results[id_value] = {
+                    title: {
+                        "ranks": list(info["ranks"]),
+                        "url": info["url"],
+                        "mobileUrl": info["mobileUrl"],
+                    }
+                    for title, info in parsed.items()
+                }
+                return
 
-            f.write("\n")
+        try:
+            data = json.loads(response)
+            results[id_value] = {}
+            for index, item in enumerate(data.get("items", []), 1):
+                title = item["title"]
+                url = item.get("url", "")
+                mobile_url = item.get("mobileUrl", "")
+
+                if title in results[id_value]:
+                    results[id_value][title]["ranks"].append(index)
+                else:
+                    results[id_value][title] = {
+                        "ranks": [index],
+                        "url": url,
+                        "mobileUrl": mobile_url,
+                    }
 
-        if failed_ids:
-            f.write("==== 以下ID请求失败 ====\n")
-            for id_value in failed_ids:
-                f.write(f"{id_value}\n")
+            if self.response_cache:
+                self.response_cache.set_parsed(
+                    id_value,
+                    content_hash,
+                    {
+                        title: {
+                            "ranks": list(info["ranks"]),
+                            "url": info["url"],
+                            "mobileUrl": info["mobileUrl"],
+                        }
+                        for title, info in results[id_value].items()
+                    },
+                )
+        except json.JSONDecodeError:
+            print(f"解析 {id_value} 响应失败")
+            failed_ids.append(id_value)
+        except Exception as e:
+            print(f"处理 {id_value} 数据出错: {e}")
+            failed_ids.append(id_value)
 
-    return file_path
 
+# === 数据处理 ===
+def save_titles_to_file(results: Dict, id_to_name: Dict, failed_ids: List) -> str:
+    """保存标题到文件"""
+    file_path = get_output_path("txt", f"{format_time_filename()}.txt")
+    # 与 txt 解析结果结构相同的快照数据，用于写入 SQLite 存储
+    snapshot_titles = {}
+    snapshot_id_to_name = {}
+    content_parts = []
+
+    for id_value, title_data in results.items():
+        # id | name 或 id
+        name = id_to_name.get(id_value)
+        if name and name != id_value:
+            content_parts.append(f"{id_value} | {name}\n")
+        else:
+            content_parts.append(f"{id_value}\n")
+
+        # 按排名排序标题
+        sorted_titles = []
+        for title, info in title_data.items():
+            cleaned_title = clean_title(title)
+            if isinstance(info, dict):
+                ranks = info.get("ranks", [])
+                url = info.get("url", "")
+                mobile_url = info.get("mobileUrl", "")
+            else:
+                ranks = info if isinstance(info, list) else []
+                url = ""
+                mobile_url = ""
 
-def load_frequency_words(
-    frequency_file: Optional[str] = None,
-) -> Tuple[List[Dict], List[str]]:
-    """加载频率词配置"""
-    if frequency_file is None:
-        frequency_file = os.environ.get(
-            "FREQUENCY_WORDS_PATH", "config/frequency_words.txt"
-        )
+            rank = ranks[0] if ranks else 1
+            sorted_titles.append((rank, cleaned_title, url, mobile_url))
 
-    frequency_path = Path(frequency_file)
-    if not frequency_path.exists():
-        raise FileNotFoundError(f"频率词文件 {frequency_file} 不存在")
+        sorted_titles.sort(key=lambda x: x[0])
 
-    with open(frequency_path, "r", encoding="utf-8") as f:
-        content = f.read()
+        if sorted_titles:
+            snapshot_id_to_name[id_value] = name or id_value
+            snapshot_titles[id_value] = {}
 
-    word_groups = [group.strip() for group in content.split("\n\n") if group.strip()]
+        for rank, cleaned_title, url, mobile_url in sorted_titles:
+            snapshot_titles[id_value][cleaned_title] = {
+                "ranks": [rank],
+                "url": url,
+                "mobileUrl": mobile_url,
+            }
+            line = f"{rank}. {cleaned_title}"
 
-    processed_groups = []
-    filter_words = []
+            if url:
+                line += f" [URL:{url}]"
+            if mobile_url:
+                line += f" [MOBILE:{mobile_url}]"
+            content_parts.append(line + "\n")
 
-    for group in word_groups:
-        words = [word.strip() for word in group.split("\n") if word.strip()]
-
-        group_required_words = []
-        group_normal_words = []
-        group_filter_words = []
-
-        for word in words:
-            if word.startswith("!"):
-                filter_words.append(word[1:])
-                group_filter_words.append(word[1:])
-            elif word.startswith("+"):
-                group_required_words.append(word[1:])
-            else:
-                group_normal_words.append(word)
+        content_parts.append("\n")
 
-        if group_required_words or group_normal_words:
-            if group_normal_words:
-                group_key = " ".join(group_normal_words)
-            else:
-                group_key = " ".join(group_required_words)
+    failed_part = ""
+    if failed_ids:
+        failed_part = "==== 以下ID请求失败 ====\n" + "".join(
+            f"{id_value}\n" for id_value in failed_ids
+        )
 
-            processed_groups.append(
-                {
-                    "required": group_required_words,
-                    "normal": group_normal_words,
-                    "group_key": group_key,
-                }
-            )
+    content = "".join(content_parts) + failed_part
+    snapshot = None
+    if CONFIG["DELTA_SNAPSHOTS"]["ENABLED"]:
+        snapshot = Snapshot.parse(content)
+        delta_content = build_delta_snapshot(Path(file_path), snapshot)
+        if delta_content:
+            content = delta_content + failed_part
 
-    return processed_groups, filter_words
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(content)
 
+    if snapshot is not None:
+        remember_snapshot(Path(file_path), snapshot)
 
-def parse_file_titles(file_path: Path) -> Tuple[Dict, Dict]:
-    """解析单个txt文件的标题数据，返回(titles_by_id, id_to_name)"""
-    titles_by_id = {}
-    id_to_name = {}
+    store = get_snapshot_store()
+    if store:
+        try:
+            store.save_snapshot(
+                date_folder_to_iso(format_date_folder()),
+                Path(file_path).stem,
+                snapshot_titles,
+                snapshot_id_to_name,
+                failed_ids,
+            )
+        except Exception as e:
+            print(f"写入 SQLite 存储失败: {e}")
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
-        sections = content.split("\n\n")
+    record_saved_snapshot(Path(file_path), snapshot_titles, snapshot_id_to_name)
 
-        for section in sections:
-            if not section.strip() or "==== 以下ID请求失败 ====" in section:
-                continue
+    seen_filter = get_seen_title_filter()
+    if seen_filter:
+        try:
+            seen_filter.add_titles(format_date_folder(), snapshot_titles)
+        except Exception as e:
+            print(f"更新多日标题过滤器失败: {e}")
 
-            lines = section.strip().split("\n")
-            if len(lines) < 2:
-                continue
+    return file_path
 
-            # id | name 或 id
-            header_line = lines[0].strip()
-            if " | " in header_line:
-                parts = header_line.split(" | ", 1)
-                source_id = parts[0].strip()
-                name = parts[1].strip()
-                id_to_name[source_id] = name
-            else:
-                source_id = header_line
-                id_to_name[source_id] = source_id
-
-            titles_by_id[source_id] = {}
-
-            for line in lines[1:]:
-                if line.strip():
-                    try:
-                        title_part = line.strip()
-                        rank = None
-
-                        # 提取排名
-                        if ". " in title_part and title_part.split(". ")[0].isdigit():
-                            rank_str, title_part = title_part.split(". ", 1)
-                            rank = int(rank_str)
-
-                        # 提取 MOBILE URL
-                        mobile_url = ""
-                        if " [MOBILE:" in title_part:
-                            title_part, mobile_part = title_part.rsplit(" [MOBILE:", 1)
-                            if mobile_part.endswith("]"):
-                                mobile_url = mobile_part[:-1]
-
-                        # 提取 URL
-                        url = ""
-                        if " [URL:" in title_part:
-                            title_part, url_part = title_part.rsplit(" [URL:", 1)
-                            if url_part.endswith("]"):
-                                url = url_part[:-1]
-
-                        title = clean_title(title_part.strip())
-                        ranks = [rank] if rank is not None else [1]
-
-                        titles_by_id[source_id][title] = {
-                            "ranks": ranks,
-                            "url": url,
-                            "mobileUrl": mobile_url,
-                        }
 
-                    except Exception as e:
-                        print(f"解析标题行出错: {line}, 错误: {e}")
+def build_delta_snapshot(file_path: Path, snapshot: Snapshot) -> Optional[str]:
+    """以当天上一份快照为基准生成增量快照内容（同时更新 snapshot 的基准链深度），需要写入完整快照（关键帧）时返回 None"""
+    previous_files = sorted(
+        f for f in file_path.parent.glob("*.txt") if f.name < file_path.name
+    )
+    if not previous_files:
+        return None
 
-    return titles_by_id, id_to_name
+    base_file = previous_files[-1]
+    try:
+        base = load_snapshot(base_file)
+    except Exception as e:
+        print(f"读取基准快照 {base_file.name} 失败，写入完整快照: {e}")
+        return None
 
+    if base.depth + 1 >= CONFIG["DELTA_SNAPSHOTS"]["KEYFRAME_INTERVAL"]:
+        return None
 
-def read_all_today_titles(
-    current_platform_ids: Optional[List[str]] = None,
-) -> Tuple[Dict, Dict, Dict]:
-    """读取当天所有标题文件，支持按当前监控平台过滤"""
-    date_folder = format_date_folder()
-    txt_dir = Path("output") / date_folder / "txt"
+    delta_content = base.encode_delta(base_file.stem, snapshot)
+    if delta_content:
+        snapshot.depth = base.depth + 1
+    return delta_content
 
-    if not txt_dir.exists():
-        return {}, {}, {}
 
-    all_results = {}
-    final_id_to_name = {}
-    title_info = {}
+# 每个数据库路径一个快照存储实例，建表和 PRAGMA 设置每个进程只执行一次
+SNAPSHOT_STORES: Dict[str, SnapshotStore] = {}
 
-    files = sorted([f for f in txt_dir.iterdir() if f.suffix == ".txt"])
 
-    for file_path in files:
-        time_info = file_path.stem
+def open_snapshot_store() -> SnapshotStore:
+    """配置路径对应的快照存储（同一路径复用同一实例）"""
+    path = str(CONFIG["SQLITE_STORE"]["PATH"])
+    store = SNAPSHOT_STORES.get(path)
+    if store is None:
+        store = SNAPSHOT_STORES[path] = SnapshotStore(path)
+    return store
 
-        titles_by_id, file_id_to_name = parse_file_titles(file_path)
 
-        if current_platform_ids is not None:
-            filtered_titles_by_id = {}
-            filtered_id_to_name = {}
+def get_snapshot_store() -> Optional[SnapshotStore]:
+    """启用 SQLite 存储时返回快照存储"""
+    if not CONFIG["SQLITE_STORE"]["ENABLED"]:
+        return None
+    return open_snapshot_store()
 
-            for source_id, title_data in titles_by_id.items():
-                if source_id in current_platform_ids:
-                    filtered_titles_by_id[source_id] = title_data
-                    if source_id in file_id_to_name:
-                        filtered_id_to_name[source_id] = file_id_to_name[source_id]
 
-            titles_by_id = filtered_titles_by_id
-            file_id_to_name = filtered_id_to_name
+def get_seen_title_filter() -> Optional[SeenTitleFilter]:
+    """启用多日标题过滤器时返回过滤器"""
+    if not CONFIG["SEEN_TITLES"]["ENABLED"]:
+        return None
+    return SeenTitleFilter(
+        Path("output") / ".crawler_state" / "seen_titles",
+        days=CONFIG["SEEN_TITLES"]["DAYS"],
+    )
 
-        final_id_to_name.update(file_id_to_name)
 
-        for source_id, title_data in titles_by_id.items():
-            process_source_data(
-                source_id, title_data, time_info, all_results, title_info
-            )
+def save_repeat_snapshot(base_file: str) -> str:
+    """保存"与快照相同"标记文件，代替重复写入完整快照"""
+    file_path = get_output_path("txt", f"{format_time_filename()}.txt")
+    base_name = Path(base_file).stem
 
-    return all_results, final_id_to_name, title_info
+    # 同一分钟内重复运行时，文件名与基准快照相同，保留完整快照即可
+    if Path(file_path).stem == base_name:
+        return file_path
 
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(f"{format_repeat_marker(base_name)}\n")
 
-def process_source_data(
-    source_id: str,
-    title_data: Dict,
-    time_info: str,
-    all_results: Dict,
-    title_info: Dict,
-) -> None:
-    """处理来源数据，合并重复标题"""
-    if source_id not in all_results:
-        all_results[source_id] = title_data
-
-        if source_id not in title_info:
-            title_info[source_id] = {}
-
-        for title, data in title_data.items():
-            ranks = data.get("ranks", [])
-            url = data.get("url", "")
-            mobile_url = data.get("mobileUrl", "")
-
-            title_info[source_id][title] = {
-                "first_time": time_info,
-                "last_time": time_info,
-                "count": 1,
-                "ranks": ranks,
-                "url": url,
-                "mobileUrl": mobile_url,
-            }
-    else:
-        for title, data in title_data.items():
-            ranks = data.get("ranks", [])
-            url = data.get("url", "")
-            mobile_url = data.get("mobileUrl", "")
+    store = get_snapshot_store()
+    if store:
+        try:
+            date = date_folder_to_iso(format_date_folder())
+            if not store.save_repeat_snapshot(date, Path(file_path).stem, base_name):
+                print(f"SQLite 存储中没有快照 {base_name}，请运行 python main.py --backfill-sqlite")
+        except Exception as e:
+            print(f"写入 SQLite 存储失败: {e}")
 
-            if title not in all_results[source_id]:
-                all_results[source_id][title] = {
-                    "ranks": ranks,
-                    "url": url,
-                    "mobileUrl": mobile_url,
-                }
-                title_info[source_id][title] = {
-                    "first_time": time_info,
-                    "last_time": time_info,
-                    "count": 1,
-                    "ranks": ranks,
-                    "url": url,
-                    "mobileUrl": mobile_url,
-                }
-            else:
-                existing_data = all_results[source_id][title]
-                existing_ranks = existing_data.get("ranks", [])
-                existing_url = existing_data.get("url", "")
-                existing_mobile_url = existing_data.get("mobileUrl", "")
-
-                merged_ranks = existing_ranks.copy()
-                for rank in ranks:
-                    if rank not in merged_ranks:
-                        merged_ranks.append(rank)
-
-                all_results[source_id][title] = {
-                    "ranks": merged_ranks,
-                    "url": existing_url or url,
-                    "mobileUrl": existing_mobile_url or mobile_url,
-                }
+    return file_path
 
-                title_info[source_id][title]["last_time"] = time_info
-                title_info[source_id][title]["ranks"] = merged_ranks
-                title_info[source_id][title]["count"] += 1
-                if not title_info[source_id][title].get("url"):
-                    title_info[source_id][title]["url"] = url
-                if not title_info[source_id][title].get("mobileUrl"):
-                    title_info[source_id][title]["mobileUrl"] = mobile_url
 
+class SnapshotTracker:
+    """快照指纹跟踪：按平台和整次爬取计算内容指纹，识别与上次完全相同的结果"""
 
-def detect_latest_new_titles(current_platform_ids: Optional[List[str]] = None) -> Dict:
-    """检测当日最新批次的新增标题，支持按当前监控平台过滤"""
-    date_folder = format_date_folder()
-    txt_dir = Path("output") / date_folder / "txt"
+    def __init__(self, state_file: Optional[Path] = None):
+        self.state_file = (
+            state_file or Path("output") / ".crawler_state" / "snapshot_state.json"
+        )
+        self.state = self._load()
+        self.crawl_fingerprint = ""
+        self.platform_fingerprints = {}
+        self.changed_platforms = []
+
+    def _load(self) -> Dict:
+        if not self.state_file.exists():
+            return {}
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"读取快照状态失败: {e}")
+            return {}
+
+    @staticmethod
+    def compute_fingerprints(
+        results: Dict, id_to_name: Dict, failed_ids: List
+    ) -> Tuple[str, Dict[str, str]]:
+        """计算每个平台和整次爬取的内容指纹"""
+        platform_fingerprints = {}
+        for id_value, title_data in results.items():
+            content = json.dumps(title_data, ensure_ascii=False)
+            platform_fingerprints[id_value] = hashlib.sha1(
+                content.encode("utf-8")
+            ).hexdigest()
 
-    if not txt_dir.exists():
-        return {}
+        crawl_content = json.dumps(
+            [
+                list(platform_fingerprints.items()),
+                [id_to_name.get(id_value, id_value) for id_value in results],
+                sorted(failed_ids),
+            ],
+            ensure_ascii=False,
+        )
+        crawl_fingerprint = hashlib.sha1(crawl_content.encode("utf-8")).hexdigest()
+        return crawl_fingerprint, platform_fingerprints
 
-    files = sorted([f for f in txt_dir.iterdir() if f.suffix == ".txt"])
-    if len(files) < 2:
-        return {}
+    def get_base_file(self) -> Optional[Path]:
+        """当天最近一次完整快照的路径"""
+        if self.state.get("date") != format_date_folder():
+            return None
+        base_name = self.state.get("base_file")
+        if not base_name:
+            return None
+        base_file = Path("output") / format_date_folder() / "txt" / f"{base_name}.txt"
+        return base_file if base_file.exists() else None
 
-    # 解析最新文件
-    latest_file = files[-1]
-    latest_titles, _ = parse_file_titles(latest_file)
-
-    # 如果指定了当前平台列表，过滤最新文件数据
-    if current_platform_ids is not None:
-        filtered_latest_titles = {}
-        for source_id, title_data in latest_titles.items():
-            if source_id in current_platform_ids:
-                filtered_latest_titles[source_id] = title_data
-        latest_titles = filtered_latest_titles
-
-    # 汇总历史标题（按平台过滤）
-    historical_titles = {}
-    for file_path in files[:-1]:
-        historical_data, _ = parse_file_titles(file_path)
-
-        # 过滤历史数据
-        if current_platform_ids is not None:
-            filtered_historical_data = {}
-            for source_id, title_data in historical_data.items():
-                if source_id in current_platform_ids:
-                    filtered_historical_data[source_id] = title_data
-            historical_data = filtered_historical_data
-
-        for source_id, titles_data in historical_data.items():
-            if source_id not in historical_titles:
-                historical_titles[source_id] = set()
-            for title in titles_data.keys():
-                historical_titles[source_id].add(title)
-
-    # 找出新增标题
-    new_titles = {}
-    for source_id, latest_source_titles in latest_titles.items():
-        historical_set = historical_titles.get(source_id, set())
-        source_new_titles = {}
+    def is_unchanged(self, results: Dict, id_to_name: Dict, failed_ids: List) -> bool:
+        """判断本次爬取结果是否与当天上一次快照完全相同"""
+        self.crawl_fingerprint, self.platform_fingerprints = self.compute_fingerprints(
+            results, id_to_name, failed_ids
+        )
 
-        for title, title_data in latest_source_titles.items():
-            if title not in historical_set:
-                source_new_titles[title] = title_data
+        previous_platforms = (
+            self.state.get("platforms", {})
+            if self.state.get("date") == format_date_folder()
+            else {}
+        )
+        self.changed_platforms = [
+            id_value
+            for id_value, fingerprint in self.platform_fingerprints.items()
+            if previous_platforms.get(id_value) != fingerprint
+        ]
+
+        return (
+            self.get_base_file() is not None
+            and self.state.get("crawl_fingerprint") == self.crawl_fingerprint
+        )
 
-        if source_new_titles:
-            new_titles[source_id] = source_new_titles
+    def commit(self, file_path: str, is_full_snapshot: bool) -> None:
+        """记录本次快照的指纹（快照只包含部分平台时，保留其余平台上一次的指纹）"""
+        platforms = (
+            dict(self.state.get("platforms", {}))
+            if self.state.get("date") == format_date_folder()
+            else {}
+        )
+        platforms.update(self.platform_fingerprints)
+        state = {
+            "date": format_date_folder(),
+            "last_file": Path(file_path).stem,
+            "base_file": (
+                Path(file_path).stem
+                if is_full_snapshot
+                else self.state.get("base_file", Path(file_path).stem)
+            ),
+            "crawl_fingerprint": self.crawl_fingerprint,
+            "platforms": platforms,
+        }
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.state_file, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False, indent=2)
+            self.state = state
+        except Exception as e:
+            print(f"保存快照状态失败: {e}")
 
-    return new_titles
 
+class AdaptivePollingPlanner:
+    """自适应轮询：按平台相邻两次爬取的标题变化率，在上下限之间调整各平台的爬取间隔"""
 
-# === 统计和分析 ===
-def calculate_news_weight(
-    title_data: Dict, rank_threshold: int = CONFIG["RANK_THRESHOLD"]
-) -> float:
-    """计算新闻权重，用于排序"""
-    ranks = title_data.get("ranks", [])
-    if not ranks:
-        return 0.0
+    # cron 触发时刻与上次爬取完成时刻之间的误差容忍（秒）
+    DUE_TOLERANCE = 60
 
-    count = title_data.get("count", len(ranks))
-    weight_config = CONFIG["WEIGHT_CONFIG"]
+    def __init__(self, state_file: Optional[Path] = None):
+        polling_config = CONFIG["ADAPTIVE_POLLING"]
+        self.state_file = (
+            state_file or Path("output") / ".crawler_state" / "polling.json"
+        )
+        self.min_interval = float(polling_config["MIN_INTERVAL"])
+        self.max_interval = max(self.min_interval, float(polling_config["MAX_INTERVAL"]))
+        self.low_churn = float(polling_config["LOW_CHURN"])
+        self.high_churn = float(polling_config["HIGH_CHURN"])
+        self._states = self._load()
+
+    def _load(self) -> Dict:
+        if not self.state_file.exists():
+            return {}
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"读取自适应轮询状态失败: {e}")
+            return {}
 
-    # 排名权重：Σ(11 - min(rank, 10)) / 出现次数
-    rank_scores = []
-    for rank in ranks:
-        score = 11 - min(rank, 10)
-        rank_scores.append(score)
+    def save(self) -> None:
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.state_file, "w", encoding="utf-8") as f:
+                json.dump(self._states, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"保存自适应轮询状态失败: {e}")
 
-    rank_weight = sum(rank_scores) / len(ranks) if ranks else 0
+    def get_interval(self, platform_id: str) -> float:
+        """当前爬取间隔（分钟），新平台从下限开始"""
+        interval = self._states.get(platform_id, {}).get("interval", self.min_interval)
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def next_due(self, platform_id: str) -> Optional[float]:
+        """下次到期的时间戳，从未爬取过时返回 None"""
+        state = self._states.get(platform_id)
+        if not state or not state.get("last_crawl"):
+            return None
+        return state["last_crawl"] + self.get_interval(platform_id) * 60
+
+    def is_due(self, platform_id: str, now: Optional[float] = None) -> bool:
+        next_due = self.next_due(platform_id)
+        if next_due is None:
+            return True
+        return (now or time.time()) >= next_due - self.DUE_TOLERANCE
+
+    def select_due(self, platforms: List[Dict]) -> List[Dict]:
+        now = time.time()
+        return [platform for platform in platforms if self.is_due(platform["id"], now)]
+
+    def observe(self, platform_id: str, titles: List[str]) -> Optional[float]:
+        """记录一次成功爬取，返回与上次相比的标题变化率（新标题占比）"""
+        state = self._states.setdefault(platform_id, {"interval": self.min_interval})
+        previous_titles = set(state.get("titles", []))
+        interval = self.get_interval(platform_id)
+
+        churn = None
+        if previous_titles and titles:
+            churn = sum(1 for title in titles if title not in previous_titles) / len(
+                titles
+            )
+            # 变化快时间隔减半，变化慢时逐步延长
+            if churn >= self.high_churn:
+                interval = max(self.min_interval, interval / 2)
+            elif churn <= self.low_churn:
+                interval = min(self.max_interval, interval * 1.5)
+
+        state.update(
+            {
+                "interval": round(interval, 2),
+                "churn": round(churn, 3) if churn is not None else None,
+                "last_crawl": int(time.time()),
+                "titles": list(titles),
+            }
+        )
+        return churn
+
+    def record_failure(self, platform_id: str) -> None:
+        """爬取失败时不调整间隔，按下限间隔尽快重试"""
+        state = self._states.setdefault(platform_id, {"interval": self.min_interval})
+        retry_delay = self.min_interval - self.get_interval(platform_id)
+        state["last_crawl"] = int(time.time() + retry_delay * 60)
+
+    def update(self, results: Dict, failed_ids: List) -> None:
+        """根据本轮爬取结果更新各平台的间隔"""
+        for id_value, title_data in results.items():
+            churn = self.observe(id_value, list(title_data.keys()))
+            if churn is not None:
+                print(
+                    f"自适应轮询: {id_value} 标题变化率 {churn:.0%}，"
+                    f"下次间隔 {self.get_interval(id_value):g} 分钟"
+                )
+        for id_value in failed_ids:
+            if id_value not in results:
+                self.record_failure(id_value)
+        self.save()
+
+
+def load_frequency_words(
+    frequency_file: Optional[str] = None,
+) -> Tuple[List[Dict], List[str]]:
+    """加载频率词配置（编译结果按文件修改时间缓存，文件未变化时不会重复解析）"""
+    if frequency_file is None:
+        frequency_file = os.environ.get(
+            "FREQUENCY_WORDS_PATH", "config/frequency_words.txt"
+        )
+
+    rules = load_rules(frequency_file)
+    return rules.word_groups, rules.filter_words
 
-    # 频次权重：min(出现次数, 10) × 10
-    frequency_weight = min(count, 10) * 10
 
-    # 热度加成：高排名次数 / 总出现次数 × 100
-    high_rank_count = sum(1 for rank in ranks if rank <= rank_threshold)
-    hotness_ratio = high_rank_count / len(ranks) if ranks else 0
-    hotness_weight = hotness_ratio * 100
+# 频率词为空时使用的虚拟词组（匹配全部新闻，不过滤）
+ALL_NEWS_RULES = ([{"required": [], "normal": [], "group_key": "全部新闻"}], [])
 
-    total_weight = (
-        rank_weight * weight_config["RANK_WEIGHT"]
-        + frequency_weight * weight_config["FREQUENCY_WEIGHT"]
-        + hotness_weight * weight_config["HOTNESS_WEIGHT"]
+
+def parse_file_titles(file_path: Path) -> Tuple[Dict, Dict]:
+    """解析单个txt文件的标题数据，返回(titles_by_id, id_to_name)"""
+    return read_titles(
+        file_path, lambda line, e: print(f"解析标题行出错: {line}, 错误: {e}")
     )
 
-    return total_weight
 
+def read_snapshot_failed_ids(file_path: Path) -> List[str]:
+    """读取快照文件中请求失败的平台ID"""
+    with open(file_path, "r", encoding="utf-8") as f:
+        content = f.read()
 
-def matches_word_groups(
-    title: str, word_groups: List[Dict], filter_words: List[str]
-) -> bool:
-    """检查标题是否匹配词组规则"""
-    # 如果没有配置词组，则匹配所有标题（支持显示全部新闻）
-    if not word_groups:
-        return True
+    base_name = get_repeat_base(content)
+    if base_name and base_name != file_path.stem:
+        return read_snapshot_failed_ids(file_path.parent / f"{base_name}.txt")
+
+    if "==== 以下ID请求失败 ====" not in content:
+        return []
+    failed_section = content.split("==== 以下ID请求失败 ====", 1)[1]
+    return [line.strip() for line in failed_section.split("\n") if line.strip()]
+
+
+def backfill_snapshot_store(force: bool = False) -> None:
+    """把 output/ 下已有的 txt 快照导入 SQLite 存储，已导入的快照默认跳过"""
+    store = open_snapshot_store()
+    output_dir = Path("output")
+    if not output_dir.exists():
+        print("output 目录不存在，没有需要导入的快照")
+        return
+
+    if not CONFIG["SQLITE_STORE"]["ENABLED"]:
+        print("提示：storage.sqlite.enabled 未开启，导入后爬虫不会继续写入 SQLite 存储")
+
+    imported = 0
+    skipped = 0
+    for date_dir in sorted(output_dir.iterdir()):
+        date = date_folder_to_iso(date_dir.name)
+        txt_dir = date_dir / "txt"
+        if not date or not txt_dir.exists():
+            continue
 
-    title_lower = title.lower()
+        existing = {time_name for time_name, _ in store.list_snapshots(date)}
+        date_imported = 0
+        for file_path in sorted(txt_dir.glob("*.txt")):
+            if file_path.stem in existing and not force:
+                skipped += 1
+                continue
+            try:
+                titles_by_id, id_to_name = parse_file_titles(file_path)
+                store.save_snapshot(
+                    date,
+                    file_path.stem,
+                    titles_by_id,
+                    id_to_name,
+                    read_snapshot_failed_ids(file_path),
+                    crawled_at=file_path.stat().st_mtime,
+                )
+                date_imported += 1
+            except Exception as e:
+                print(f"导入快照 {file_path} 失败: {e}")
 
-    # 过滤词检查
-    if any(filter_word.lower() in title_lower for filter_word in filter_words):
-        return False
+        if date_imported:
+            print(f"{date_dir.name}: 导入 {date_imported} 个快照")
+        imported += date_imported
 
-    # 词组匹配检查
-    for group in word_groups:
-        required_words = group["required"]
-        normal_words = group["normal"]
+    print(
+        f"SQLite 存储导入完成：新增 {imported} 个快照，跳过 {skipped} 个已存在的快照，"
+        f"数据库: {store.db_path}"
+    )
+
+
+def archive_closed_date_folders(keep_days: int) -> int:
+    """把超过保留天数的日期文件夹打包为 output/archive/ 下的归档，返回归档的天数"""
+    output_dir = Path("output")
+    if not output_dir.exists():
+        return 0
 
-        # 必须词检查
-        if required_words:
-            all_required_present = all(
-                req_word.lower() in title_lower for req_word in required_words
+    cutoff = (get_beijing_time() - timedelta(days=max(keep_days, 0))).strftime("%Y-%m-%d")
+    archived = 0
+    for date_dir in sorted(output_dir.iterdir()):
+        date = date_folder_to_iso(date_dir.name)
+        if not date_dir.is_dir() or not date or date >= cutoff:
+            continue
+
+        if get_archive_path(output_dir, date_dir.name).exists():
+            print(f"{date_dir.name} 已有归档，跳过（请检查该日期文件夹是否需要手动合并）")
+            continue
+
+        try:
+            index = archive_date_folder(date_dir)
+            archive_size = get_archive_path(output_dir, date_dir.name).stat().st_size
+            print(
+                f"{date_dir.name}: 归档 {len(index['files'])} 个文件，"
+                f"{index['original_bytes'] / 1024:.0f} KB -> {archive_size / 1024:.0f} KB"
             )
-            if not all_required_present:
+            archived += 1
+        except Exception as e:
+            print(f"归档 {date_dir.name} 失败: {e}")
+
+    return archived
+
+
+class DayAggregate:
+    """当天快照的增量聚合：只解析新增的快照文件，供 read_all_today_titles 和 detect_latest_new_titles 共用
+
+    聚合结果持久化在 output/.crawler_state/day_aggregate.json，缺失、跨天或快照文件被修改时自动重建。
+    之后每份新快照只向 day_aggregate.journal 追加一行（快照内容和文件签名），加载时依次重放；
+    日志超过 JOURNAL_COMPACT_ENTRIES 条或重建后才重写完整的聚合文件并清空日志。
+    启用 SQLite 存储且其中包含当天全部快照时，新快照从数据库按索引读取，不再解析 txt 文件。
+    每个标题只保存一条 TitleRecord，all_results 和 title_info 引用同一条记录。
+    """
+
+    # 3：latest_titles 按平台保存各自最新一批标题
+    # 4：并行重建时 latest_titles 按各平台最近一次出现的顺序排列（与逐个快照处理相同）
+    # 5：记录最新一份快照包含的平台
+    # 6：新增快照写入增量日志，聚合文件记录日志的 generation
+    FORMAT_VERSION = 6
+    # 增量日志超过该条数时重写完整聚合文件
+    JOURNAL_COMPACT_ENTRIES = 48
+
+    def __init__(self, txt_dir: Path, state_file: Optional[Path] = None):
+        self.txt_dir = txt_dir
+        self.date_folder = txt_dir.parent.name
+        self.source = "txt"
+        self.state_file = (
+            state_file or Path("output") / ".crawler_state" / "day_aggregate.json"
+        )
+        self.journal_file = self.state_file.with_name(f"{self.state_file.stem}.journal")
+        self._reset()
+        self._load()
+
+    def _reset(self, source: str = "txt") -> None:
+        self.source = source
+        self.file_signatures = {}
+        self.all_results = {}
+        self.title_info = {}
+        self.id_to_name = {}
+        self.latest_titles = {}
+        self.historical_titles = {}
+        # 最新一份快照包含的平台（本轮失败或未轮到的平台不在其中）
+        self.latest_snapshot_ids = []
+        # 聚合文件的版本标识，日志中只有 generation 相同的条目属于该聚合文件
+        self.generation = None
+        # 尚未写入日志的条目和日志中已有的条目数
+        self._pending = []
+        self._journal_size = 0
+        # 需要重写完整聚合文件（重建后、日志损坏时）
+        self._dirty = True
+
+    def _load(self) -> None:
+        """加载持久化的聚合结果，不可用时保持为空（下次 refresh 会完整重建）"""
+        if not self.state_file.exists():
+            return
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"读取当天聚合数据失败，将重新解析快照: {e}")
+            return
+
+        if (
+            data.get("version") != self.FORMAT_VERSION
+            or data.get("date_folder") != self.date_folder
+        ):
+            return
+
+        self.source = data.get("source", "txt")
+        self.file_signatures = data["files"]
+        self.all_results = self._records_from_rows(data["titles"])
+        self.title_info = {
+            source_id: dict(records) for source_id, records in self.all_results.items()
+        }
+        self.id_to_name = data["id_to_name"]
+        self.latest_titles = self._records_from_rows(data["latest_titles"])
+        self.historical_titles = {
+            sys.intern(source_id): {sys.intern(title) for title in titles}
+            for source_id, titles in data["historical_titles"].items()
+        }
+        self.latest_snapshot_ids = data["latest_snapshot_ids"]
+        self.generation = data["generation"]
+        self._dirty = False
+        self._replay_journal()
+
+    def _replay_journal(self) -> None:
+        """依次重放增量日志中属于当前聚合文件的条目"""
+        if not self.journal_file.exists():
+            return
+        try:
+            with open(self.journal_file, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except Exception as e:
+            print(f"读取当天聚合日志失败，将重新解析快照: {e}")
+            self._reset()
+            return
+
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # 写入中断的最后一行，之前的条目仍然有效，下次保存时重写完整聚合文件
+                self._dirty = True
+                break
+            if entry.get("generation") != self.generation:
+                # 重写聚合文件后未能清空的旧日志
+                self._dirty = True
                 continue
+            try:
+                self._replay(entry)
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"当天聚合日志无法重放，将重新解析快照: {e}")
+                self._reset()
+                return
+            self._journal_size += 1
+
+    def _replay(self, entry: Dict) -> None:
+        if entry["op"] == "add":
+            self._apply_titles(entry["time"], entry["titles"], entry["id_to_name"])
+            self.file_signatures[entry["file"]] = entry["signature"]
+        elif entry["op"] == "touch":
+            self.file_signatures[entry["file"]]["mtime_ns"] = entry["mtime_ns"]
+
+    @staticmethod
+    def _records_from_rows(rows_by_id: Dict) -> Dict:
+        return {
+            sys.intern(source_id): {
+                sys.intern(title): TitleRecord.from_row(row) for title, row in rows.items()
+            }
+            for source_id, rows in rows_by_id.items()
+        }
+
+    @staticmethod
+    def _records_to_rows(records_by_id: Dict) -> Dict:
+        return {
+            source_id: {title: record.to_row() for title, record in records.items()}
+            for source_id, records in records_by_id.items()
+        }
+
+    def _journal(self, entry: Dict) -> None:
+        """记录一条待追加到日志的变更（需要重写完整聚合文件时不必记录）"""
+        if not self._dirty:
+            self._pending.append(entry)
+
+    def _record_snapshot(
+        self,
+        file_name: str,
+        time_info: str,
+        titles_by_id: Dict,
+        file_id_to_name: Dict,
+        signature: Dict,
+    ) -> None:
+        """并入一份快照并记入日志"""
+        self._apply_titles(time_info, titles_by_id, file_id_to_name)
+        self.file_signatures[file_name] = signature
+        self._journal(
+            {
+                "op": "add",
+                "file": file_name,
+                "time": time_info,
+                "titles": titles_by_id,
+                "id_to_name": file_id_to_name,
+                "signature": signature,
+            }
+        )
+
+    def save(self) -> None:
+        """持久化：新增的变更追加到日志，重建后或日志过长时重写完整聚合文件"""
+        try:
+            if self._dirty or (
+                self._journal_size + len(self._pending) > self.JOURNAL_COMPACT_ENTRIES
+            ):
+                self._write_state()
+            elif self._pending:
+                self._append_journal()
+        except Exception as e:
+            print(f"保存当天聚合数据失败: {e}")
+
+    def _append_journal(self) -> None:
+        lines = "".join(
+            json.dumps({"generation": self.generation, **entry}, ensure_ascii=False) + "\n"
+            for entry in self._pending
+        )
+        with open(self.journal_file, "a", encoding="utf-8") as f:
+            f.write(lines)
+        self._journal_size += len(self._pending)
+        self._pending = []
+
+    def _write_state(self) -> None:
+        generation = os.urandom(4).hex()
+        data = {
+            "version": self.FORMAT_VERSION,
+            "date_folder": self.date_folder,
+            "source": self.source,
+            "files": self.file_signatures,
+            "titles": self._records_to_rows(self.all_results),
+            "id_to_name": self.id_to_name,
+            "latest_titles": self._records_to_rows(self.latest_titles),
+            "historical_titles": {
+                source_id: list(titles)
+                for source_id, titles in self.historical_titles.items()
+            },
+            "latest_snapshot_ids": self.latest_snapshot_ids,
+            "generation": generation,
+        }
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.state_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        tmp_file.replace(self.state_file)
+        # 聚合文件已包含日志中的全部条目；清空失败时旧条目的 generation 不同，加载时会被忽略
+        self.journal_file.unlink(missing_ok=True)
+        self.generation = generation
+        self._pending = []
+        self._journal_size = 0
+        self._dirty = False
+
+    @staticmethod
+    def _content_hash(file_path: Path) -> str:
+        return hashlib.sha1(file_path.read_bytes()).hexdigest()
+
+    @classmethod
+    def _file_signature(cls, file_path: Path, stat: os.stat_result) -> Dict:
+        return {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha1": cls._content_hash(file_path),
+        }
+
+    def _is_unchanged(self, file_path: Path, stat: os.stat_result) -> bool:
+        """已处理的快照是否未被修改：大小和修改时间一致即认为未变，修改时间变化（如 git checkout）时按内容校验"""
+        signature = self.file_signatures[file_path.name]
+        if signature["size"] != stat.st_size:
+            return False
+        if signature["mtime_ns"] == stat.st_mtime_ns:
+            return True
+        if self._content_hash(file_path) != signature["sha1"]:
+            return False
+        signature["mtime_ns"] = stat.st_mtime_ns
+        self._journal({"op": "touch", "file": file_path.name, "mtime_ns": stat.st_mtime_ns})
+        return True
+
+    def refresh(self) -> int:
+        """同步当天的快照，返回本次处理的快照数"""
+        files = sorted([f for f in self.txt_dir.iterdir() if f.suffix == ".txt"])
+
+        store = get_snapshot_store()
+        if store:
+            date = date_folder_to_iso(self.date_folder)
+            snapshots = store.list_snapshots(date)
+            if {f.stem for f in files} <= {time_name for time_name, _ in snapshots}:
+                count = self._refresh_from_store(store, date, snapshots)
+                self.save()
+                return count
+
+        count = self._refresh_from_files(files)
+        self.save()
+        return count
+
+    def _refresh_from_store(
+        self, store: SnapshotStore, date: str, snapshots: List[Tuple[str, str]]
+    ) -> int:
+        hashes = dict(snapshots)
+        processed = sorted(self.file_signatures)
+        new_times = [
+            time_name
+            for time_name, _ in snapshots
+            if time_name not in self.file_signatures
+        ]
+        stale = (
+            self.source != "sqlite"
+            or any(
+                hashes.get(time_name) != signature.get("sha1")
+                for time_name, signature in self.file_signatures.items()
+            )
+            or (processed and new_times and new_times[0] < processed[-1])
+        )
+        if stale:
+            self._reset(source="sqlite")
+            after_time = None
+        elif not new_times:
+            return 0
+        else:
+            after_time = processed[-1] if processed else None
+
+        count = 0
+        for time_name, titles_by_id, id_to_name in store.iter_snapshots(date, after_time):
+            self._record_snapshot(
+                time_name,
+                time_name,
+                titles_by_id,
+                id_to_name,
+                {"sha1": hashes.get(time_name, "")},
+            )
+            count += 1
+        return count
+
+    def _refresh_from_files(self, files: List[Path]) -> int:
+        if self.source != "txt":
+            self._reset()
+        stats = {f.name: f.stat() for f in files}
+
+        # 已处理的文件被修改/删除，或新文件排在已处理文件之前时，整体重建
+        processed = list(self.file_signatures)
+        new_files = [f for f in files if f.name not in self.file_signatures]
+        stale = any(name not in stats for name in processed) or (
+            processed and new_files and new_files[0].name < max(processed)
+        )
+        if not stale:
+            stale = not all(
+                self._is_unchanged(f, stats[f.name])
+                for f in files
+                if f.name in self.file_signatures
+            )
+        if stale:
+            self._reset()
+            new_files = files
+
+        if self._dirty or len(new_files) > self.JOURNAL_COMPACT_ENTRIES:
+            if new_files:
+                # 冷启动时文件较多，在进程池中分段解析后合并，之后重写完整聚合文件
+                self._apply_partial(
+                    parse_snapshots(
+                        new_files,
+                        workers=CONFIG["PARALLEL_PARSE"]["WORKERS"],
+                        min_files=CONFIG["PARALLEL_PARSE"]["MIN_FILES"],
+                    )
+                )
+                for file_path in new_files:
+                    self.file_signatures[file_path.name] = self._file_signature(
+                        file_path, stats[file_path.name]
+                    )
+                self._dirty = True
+        else:
+            for file_path in new_files:
+                titles_by_id, file_id_to_name = read_titles(file_path)
+                self._record_snapshot(
+                    file_path.name,
+                    file_path.stem,
+                    titles_by_id,
+                    file_id_to_name,
+                    self._file_signature(file_path, stats[file_path.name]),
+                )
+        return len(new_files)
 
-        # 普通词检查
-        if normal_words:
-            any_normal_present = any(
-                normal_word.lower() in title_lower for normal_word in normal_words
+    def add_snapshot(
+        self, file_path: Path, titles_by_id: Dict, file_id_to_name: Dict
+    ) -> bool:
+        """并入刚写入的快照，不再从文件重新解析；聚合与磁盘不同步时不处理，交给 refresh 重建"""
+        if self.source != "txt" or file_path.name in self.file_signatures:
+            return False
+        if self.file_signatures and file_path.name < max(self.file_signatures):
+            return False
+
+        self._record_snapshot(
+            file_path.name,
+            file_path.stem,
+            titles_by_id,
+            file_id_to_name,
+            self._file_signature(file_path, file_path.stat()),
+        )
+        return True
+
+    def _apply_partial(self, partial: SnapshotPartial) -> None:
+        """并入按时间顺序紧接在已处理快照之后的一段聚合结果，与逐个调用 _apply_titles 相同"""
+        if not partial.files:
+            return
+        for source_id in partial.latest:
+            self._retire_latest(source_id)
+        for source_id, titles in partial.historical.items():
+            self.historical_titles.setdefault(sys.intern(source_id), set()).update(
+                sys.intern(title) for title in titles
+            )
+
+        self.id_to_name.update(partial.id_to_name)
+        for source_id, records in partial.titles.items():
+            source_id = sys.intern(source_id)
+            source_results = self.all_results.setdefault(source_id, {})
+            source_title_info = self.title_info.setdefault(source_id, {})
+            for title, record in records.items():
+                existing = source_results.get(title)
+                if existing is None:
+                    title = sys.intern(title)
+                    source_results[title] = record
+                    source_title_info[title] = record
+                else:
+                    existing.absorb(record)
+        self.latest_titles.update(intern_titles(partial.latest))
+        self.latest_snapshot_ids = list(partial.last_ids)
+
+    def _retire_latest(self, source_id: str) -> None:
+        """平台有了更新的一批标题，上一批转入历史标题集合"""
+        previous = self.latest_titles.pop(source_id, None)
+        if previous is not None:
+            self.historical_titles.setdefault(source_id, set()).update(previous)
+
+    def _apply_titles(self, time_info: str, titles_by_id: Dict, file_id_to_name: Dict) -> None:
+        # 快照中包含的平台，上一批标题转入历史标题集合；未包含的平台保留各自的最新一批
+        for source_id in titles_by_id:
+            self._retire_latest(source_id)
+
+        self.id_to_name.update(file_id_to_name)
+        for source_id, title_data in titles_by_id.items():
+            process_source_data(
+                source_id,
+                title_data,
+                time_info,
+                self.all_results,
+                self.title_info,
             )
-            if not any_normal_present:
+        self.latest_titles.update(intern_titles(titles_by_id))
+        self.latest_snapshot_ids = list(titles_by_id)
+
+    @property
+    def file_count(self) -> int:
+        return len(self.file_signatures)
+
+
+_day_aggregates: Dict[str, DayAggregate] = {}
+
+
+def get_day_aggregate(date_folder: Optional[str] = None) -> Optional[DayAggregate]:
+    """获取当天的快照聚合（进程内缓存并持久化，常驻模式下跨轮次复用）"""
+    date_folder = date_folder or format_date_folder()
+    txt_dir = Path("output") / date_folder / "txt"
+
+    if not txt_dir.exists():
+        _day_aggregates.pop(date_folder, None)
+        return None
+
+    aggregate = _day_aggregates.get(date_folder)
+    if aggregate is None:
+        # 只保留当天的聚合，跨天后释放旧数据
+        _day_aggregates.clear()
+        aggregate = DayAggregate(txt_dir)
+        _day_aggregates[date_folder] = aggregate
+
+    aggregate.refresh()
+    return aggregate
+
+
+def record_saved_snapshot(file_path: Path, titles_by_id: Dict, id_to_name: Dict) -> None:
+    """把本轮保存的快照直接并入当天聚合，后续读取时无需解析该文件"""
+    date_folder = file_path.parent.parent.name
+    aggregate = _day_aggregates.get(date_folder)
+    if aggregate is None:
+        _day_aggregates.clear()
+        aggregate = DayAggregate(file_path.parent)
+        _day_aggregates[date_folder] = aggregate
+    aggregate.add_snapshot(file_path, titles_by_id, id_to_name)
+
+
+def read_all_today_titles(
+    current_platform_ids: Optional[List[str]] = None,
+    aggregate: Optional[DayAggregate] = None,
+) -> Tuple[Dict, Dict, Dict]:
+    """读取当天所有标题文件，支持按当前监控平台过滤，aggregate 为已同步的当天聚合时直接使用"""
+    aggregate = aggregate or get_day_aggregate()
+    if aggregate is None:
+        return {}, {}, {}
+
+    if current_platform_ids is None:
+        return (
+            dict(aggregate.all_results),
+            dict(aggregate.id_to_name),
+            dict(aggregate.title_info),
+        )
+
+    all_results = {
+        source_id: title_data
+        for source_id, title_data in aggregate.all_results.items()
+        if source_id in current_platform_ids
+    }
+    final_id_to_name = {
+        source_id: name
+        for source_id, name in aggregate.id_to_name.items()
+        if source_id in current_platform_ids
+    }
+    title_info = {
+        source_id: titles
+        for source_id, titles in aggregate.title_info.items()
+        if source_id in current_platform_ids
+    }
+    return all_results, final_id_to_name, title_info
+
+
+def process_source_data(
+    source_id: str,
+    title_data: Dict,
+    time_info: str,
+    all_results: Dict,
+    title_info: Dict,
+) -> None:
+    """处理来源数据，合并重复标题（all_results 与 title_info 共用同一条记录）"""
+    source_id = sys.intern(source_id)
+    source_results = all_results.setdefault(source_id, {})
+    source_title_info = title_info.setdefault(source_id, {})
+
+    for title, data in title_data.items():
+        ranks = data.get("ranks", [])
+        url = data.get("url", "")
+        mobile_url = data.get("mobileUrl", "")
+
+        record = source_results.get(title)
+        if record is None:
+            title = sys.intern(title)
+            record = TitleRecord(ranks, url, mobile_url, time_info, time_info, 1)
+            source_results[title] = record
+            source_title_info[title] = record
+        else:
+            record.merge(ranks, url, mobile_url, time_info)
+
+
+def detect_latest_new_titles(
+    current_platform_ids: Optional[List[str]] = None,
+    aggregate: Optional[DayAggregate] = None,
+) -> Dict:
+    """检测各平台当日最新一批的新增标题，支持按当前监控平台过滤，aggregate 为已同步的当天聚合时直接使用
+
+    快照可能只包含部分平台（平台独立间隔、自适应轮询），每个平台的最新一批取自最近一份包含该平台的快照。
+    """
+    aggregate = aggregate or get_day_aggregate()
+    if aggregate is None or aggregate.file_count < 2:
+        return {}
+
+    # 找出新增标题（平台最新一批中出现、但该平台之前各批次中都未出现的标题）
+    new_titles = {}
+    for source_id, latest_source_titles in aggregate.latest_titles.items():
+        if current_platform_ids is not None and source_id not in current_platform_ids:
+            continue
+
+        historical_set = aggregate.historical_titles.get(source_id, set())
+        source_new_titles = {}
+
+        for title, title_data in latest_source_titles.items():
+            if title not in historical_set:
+                source_new_titles[title] = title_data
+
+        if source_new_titles:
+            new_titles[source_id] = source_new_titles
+
+    return new_titles
+
+
+class SubscriptionProfile:
+    """订阅：一套频率词、报告模式和通知渠道
+
+    默认订阅使用 frequency_words.txt、report.mode 和 notification.webhooks，
+    config.yaml 的 profiles 中每一项为一个附加订阅。所有订阅共用同一次爬取和当天数据。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        frequency_file: Optional[str],
+        report_mode: str,
+        channels: Dict,
+    ):
+        # 默认订阅的名称为空字符串
+        self.name = name
+        self.frequency_file = frequency_file
+        self.report_mode = report_mode
+        self.channels = channels
+        self.word_groups: List[Dict] = []
+        self.filter_words: List[str] = []
+        # 订阅共用的匹配结果中本订阅的视图，由 DayContext 设置
+        self.matcher: Optional[RuleSetMatcher] = None
+
+    @property
+    def is_default(self) -> bool:
+        return not self.name
+
+    @property
+    def label(self) -> str:
+        return self.name or "默认"
+
+    @property
+    def match_rules(self) -> Tuple[List[Dict], List[str]]:
+        """实际参与匹配的规则（频率词为空时匹配全部新闻）"""
+        if not self.word_groups:
+            return ALL_NEWS_RULES
+        return self.word_groups, self.filter_words
+
+    def load_rules(self) -> None:
+        self.word_groups, self.filter_words = load_frequency_words(self.frequency_file)
+
+    def has_channels(self) -> bool:
+        """是否配置了任何通知渠道"""
+        return bool(get_configured_channels(self.channels))
+
+
+def get_subscription_profiles() -> List[SubscriptionProfile]:
+    """默认订阅和 config.yaml 中配置的附加订阅"""
+    profiles = [
+        SubscriptionProfile(
+            "",
+            None,
+            CONFIG["REPORT_MODE"],
+            {key: CONFIG.get(key, "") for key in CHANNEL_CONFIG_KEYS},
+        )
+    ]
+    for profile_config in CONFIG["PROFILES"]:
+        profiles.append(
+            SubscriptionProfile(
+                profile_config["NAME"],
+                profile_config["FREQUENCY_WORDS"],
+                profile_config["REPORT_MODE"],
+                profile_config["CHANNELS"],
+            )
+        )
+    return profiles
+
+
+class DayContext:
+    """一次运行共享的当天数据
+
+    由本轮爬取结果和当天快照聚合构建一次，实时报告、汇总报告和推送各阶段共用，
+    当天每份快照只解析一次，本轮快照只写入一次。
+    """
+
+    def __init__(
+        self,
+        aggregate: Optional[DayAggregate],
+        platform_ids: List[str],
+        results: Optional[Dict] = None,
+        id_to_name: Optional[Dict] = None,
+        failed_ids: Optional[List] = None,
+        time_info: Optional[str] = None,
+        partial_snapshot: bool = False,
+    ):
+        self.platform_ids = platform_ids
+        # 最新快照是否只包含部分平台（平台独立间隔、自适应轮询）
+        self.partial_snapshot = partial_snapshot
+        # 本轮爬取结果，只基于已有快照生成汇总时为空
+        self.results = results or {}
+        self.id_to_name = id_to_name or {}
+        self.failed_ids = failed_ids or []
+        self.time_info = time_info
+
+        # 当天全部快照的聚合结果（已按当前监控平台过滤）
+        if aggregate is None:
+            self.all_results, self.all_id_to_name, self.title_info = {}, {}, {}
+            self.new_titles = {}
+        else:
+            self.all_results, self.all_id_to_name, self.title_info = (
+                read_all_today_titles(platform_ids, aggregate)
+            )
+            # 新增标题只包含本轮（没有本轮结果时为最新一份快照）成功爬取的平台，
+            # 未爬取或失败的平台的最新一批已在之前报告过
+            crawled_ids = results if results is not None else aggregate.latest_snapshot_ids
+            self.new_titles = {
+                source_id: titles
+                for source_id, titles in detect_latest_new_titles(
+                    platform_ids, aggregate
+                ).items()
+                if source_id in crawled_ids
+            }
+
+        # 新增标题中前几天出现过、今天重新上榜的标题
+        self.returning_titles = {}
+        seen_filter = get_seen_title_filter()
+        if seen_filter and self.new_titles:
+            self.returning_titles = seen_filter.returning_titles(
+                aggregate.date_folder, self.new_titles
+            )
+            returning_count = sum(len(titles) for titles in self.returning_titles.values())
+            if returning_count:
+                print(
+                    f"新增标题中有 {returning_count} 条在最近 {CONFIG['SEEN_TITLES']['DAYS']} 天内出现过"
+                )
+                if CONFIG["SEEN_TITLES"]["HIDE_RETURNING"]:
+                    self.new_titles = self._exclude_titles(
+                        self.new_titles, self.returning_titles
+                    )
+
+        # 各订阅的规则合并编译为一个匹配器，同一标题只扫描一次，结果在各订阅、各阶段共用
+        self.profiles = []
+        for profile in get_subscription_profiles():
+            try:
+                profile.load_rules()
+            except (FileNotFoundError, ValueError) as e:
+                if profile.is_default:
+                    raise
+                print(f"订阅 {profile.name} 的频率词加载失败，本轮跳过该订阅: {e}")
                 continue
+            self.profiles.append(profile)
+        self.shared_matches = SharedMatches(
+            get_combined_matcher([profile.match_rules for profile in self.profiles])
+        )
+        for index, profile in enumerate(self.profiles):
+            profile.matcher = self.shared_matches.for_rule_set(index)
+
+        default_profile = self.profiles[0]
+        self.word_groups = default_profile.word_groups
+        self.filter_words = default_profile.filter_words
+        self._current_title_info = None
+
+    @staticmethod
+    def _exclude_titles(titles_by_id: Dict, excluded: Dict) -> Dict:
+        remaining = {}
+        for source_id, titles in titles_by_id.items():
+            excluded_titles = excluded.get(source_id, {})
+            source_titles = {
+                title: title_data
+                for title, title_data in titles.items()
+                if title not in excluded_titles
+            }
+            if source_titles:
+                remaining[source_id] = source_titles
+        return remaining
+
+    @classmethod
+    def build(
+        cls,
+        results: Optional[Dict] = None,
+        id_to_name: Optional[Dict] = None,
+        failed_ids: Optional[List] = None,
+        title_file: Optional[str] = None,
+        partial_snapshot: bool = False,
+    ) -> "DayContext":
+        """同步当天快照聚合并构建上下文，title_file 为本轮已保存的快照文件，
+        partial_snapshot 表示最新快照只包含部分平台"""
+        platform_ids = [platform["id"] for platform in CONFIG["PLATFORMS"]]
+        return cls(
+            get_day_aggregate(),
+            platform_ids,
+            results,
+            id_to_name,
+            failed_ids,
+            Path(title_file).stem if title_file else None,
+            partial_snapshot,
+        )
+
+    @property
+    def current_title_info(self) -> Dict:
+        """从本轮爬取结果构建的标题信息"""
+        if self._current_title_info is None:
+            title_info = {}
+            for source_id, titles_data in self.results.items():
+                title_info[source_id] = {}
+                for title, title_data in titles_data.items():
+                    title_info[source_id][title] = {
+                        "first_time": self.time_info,
+                        "last_time": self.time_info,
+                        "count": 1,
+                        "ranks": title_data.get("ranks", []),
+                        "url": title_data.get("url", ""),
+                        "mobileUrl": title_data.get("mobileUrl", ""),
+                    }
+            self._current_title_info = title_info
+        return self._current_title_info
+
+
+# === 统计和分析 ===
+def calculate_news_weight(
+    title_data: Dict, rank_threshold: int = CONFIG["RANK_THRESHOLD"]
+) -> float:
+    """计算新闻权重，用于排序"""
+    return WeightScorer.from_config(CONFIG["WEIGHT_CONFIG"], rank_threshold).score(
+        title_data
+    )
 
+
+def matches_word_groups(
+    title: str,
+    word_groups: List[Dict],
+    filter_words: List[str],
+    platform_id: Optional[str] = None,
+) -> bool:
+    """检查标题是否匹配词组规则"""
+    # 如果没有配置词组，则匹配所有标题（支持显示全部新闻）
+    if not word_groups:
         return True
 
-    return False
+    group_index, filter_hits = get_matcher(word_groups, filter_words).match(
+        title, platform_id
+    )
+    return group_index is not None and not filter_hits
 
 
 def format_time_display(first_time: str, last_time: str) -> str:
@@ -972,44 +2498,33 @@ def format_time_display(first_time: str, last_time: str) -> str:
         return f"[{first_time} ~ {last_time}]"
 
 
+# 各格式的排名高亮标记，其他格式使用 DEFAULT_RANK_HIGHLIGHT
+RANK_HIGHLIGHTS = {
+    "html": ("<font color='red'><strong>", "</strong></font>"),
+    "feishu": ("<font color='red'>**", "**</font>"),
+    "telegram": ("<b>", "</b>"),
+}
+DEFAULT_RANK_HIGHLIGHT = ("**", "**")
+
+
 def format_rank_display(ranks: List[int], rank_threshold: int, format_type: str) -> str:
     """统一的排名格式化方法"""
     if not ranks:
         return ""
 
-    unique_ranks = sorted(set(ranks))
-    min_rank = unique_ranks[0]
-    max_rank = unique_ranks[-1]
-
-    if format_type == "html":
-        highlight_start = "<font color='red'><strong>"
-        highlight_end = "</strong></font>"
-    elif format_type == "feishu":
-        highlight_start = "<font color='red'>**"
-        highlight_end = "**</font>"
-    elif format_type == "dingtalk":
-        highlight_start = "**"
-        highlight_end = "**"
-    elif format_type == "wework":
-        highlight_start = "**"
-        highlight_end = "**"
-    elif format_type == "telegram":
-        highlight_start = "<b>"
-        highlight_end = "</b>"
+    min_rank = min(ranks)
+    max_rank = max(ranks)
+    if min_rank == max_rank:
+        rank_span = f"[{min_rank}]"
     else:
-        highlight_start = "**"
-        highlight_end = "**"
+        rank_span = f"[{min_rank} - {max_rank}]"
 
     if min_rank <= rank_threshold:
-        if min_rank == max_rank:
-            return f"{highlight_start}[{min_rank}]{highlight_end}"
-        else:
-            return f"{highlight_start}[{min_rank} - {max_rank}]{highlight_end}"
-    else:
-        if min_rank == max_rank:
-            return f"[{min_rank}]"
-        else:
-            return f"[{min_rank} - {max_rank}]"
+        highlight_start, highlight_end = RANK_HIGHLIGHTS.get(
+            format_type, DEFAULT_RANK_HIGHLIGHT
+        )
+        return f"{highlight_start}{rank_span}{highlight_end}"
+    return rank_span
 
 
 def count_word_frequency(
@@ -1021,14 +2536,16 @@ def count_word_frequency(
     rank_threshold: int = CONFIG["RANK_THRESHOLD"],
     new_titles: Optional[Dict] = None,
     mode: str = "daily",
+    matcher: Optional[RuleSetMatcher] = None,
+    partial_snapshot: bool = False,
 ) -> Tuple[List[Dict], int]:
-    """统计词频，支持必须词、频率词、过滤词，并标记新增标题"""
+    """统计词频，支持必须词、频率词、过滤词，并标记新增标题，matcher 为订阅共用的匹配结果，
+    partial_snapshot 为 True 表示最新快照只包含部分平台（current 模式下按平台分别取最新批次）"""
 
     # 如果没有配置词组，创建一个包含所有新闻的虚拟词组
     if not word_groups:
         print("频率词配置为空，将显示所有新闻")
-        word_groups = [{"required": [], "normal": [], "group_key": "全部新闻"}]
-        filter_words = []  # 清空过滤词，显示所有新闻
+        word_groups, filter_words = ALL_NEWS_RULES  # 清空过滤词，显示所有新闻
 
     is_first_today = is_first_crawl_today()
 
@@ -1045,15 +2562,21 @@ def count_word_frequency(
     elif mode == "current":
         # current 模式：只处理当前时间批次的新闻，但统计信息来自全部历史
         if title_info:
-            latest_time = None
-            for source_titles in title_info.values():
+            # 各平台的最新时间
+            latest_times = {}
+            for source_id, source_titles in title_info.items():
                 for title_data in source_titles.values():
                     last_time = title_data.get("last_time", "")
-                    if last_time:
-                        if latest_time is None or last_time > latest_time:
-                            latest_time = last_time
+                    if last_time and last_time > latest_times.get(source_id, ""):
+                        latest_times[source_id] = last_time
+            latest_time = max(latest_times.values()) if latest_times else None
 
-            # 只处理 last_time 等于最新时间的新闻
+            # 完整爬取时所有平台使用同一个最新时间，本轮失败的平台不会把旧榜单当作当前榜单；
+            # 快照只包含部分平台（平台独立间隔、自适应轮询）时，未爬取的平台沿用各自最近一次的榜单
+            if not partial_snapshot:
+                latest_times = dict.fromkeys(latest_times, latest_time)
+
+            # 只处理 last_time 等于该平台最新时间的新闻
             if latest_time:
                 results_to_process = {}
                 for source_id, source_titles in results.items():
@@ -1062,7 +2585,7 @@ def count_word_frequency(
                         for title, title_data in source_titles.items():
                             if title in title_info[source_id]:
                                 info = title_info[source_id][title]
-                                if info.get("last_time") == latest_time:
+                                if info.get("last_time") == latest_times.get(source_id):
                                     filtered_titles[title] = title_data
                         if filtered_titles:
                             results_to_process[source_id] = filtered_titles
@@ -1101,6 +2624,9 @@ def count_word_frequency(
         group_key = group["group_key"]
         word_stats[group_key] = {"count": 0, "titles": {}}
 
+    if matcher is None:
+        matcher = get_matcher(word_groups, filter_words)
+
     for source_id, titles_data in results_to_process.items():
         total_titles += len(titles_data)
 
@@ -1111,12 +2637,9 @@ def count_word_frequency(
             if title in processed_titles.get(source_id, {}):
                 continue
 
-            # 使用统一的匹配逻辑
-            matches_frequency_words = matches_word_groups(
-                title, word_groups, filter_words
-            )
-
-            if not matches_frequency_words:
+            # 一次扫描同时得到匹配的词组和命中的过滤词
+            group_index, filter_hits = matcher.match(title, source_id)
+            if group_index is None or filter_hits:
                 continue
 
             # 如果是增量模式或 current 模式第一次，统计匹配的新增新闻数量
@@ -1129,115 +2652,83 @@ def count_word_frequency(
             source_url = title_data.get("url", "")
             source_mobile_url = title_data.get("mobileUrl", "")
 
-            # 找到匹配的词组
-            title_lower = title.lower()
-            for group in word_groups:
-                required_words = group["required"]
-                normal_words = group["normal"]
-
-                # 如果是"全部新闻"模式，所有标题都匹配第一个（唯一的）词组
-                if len(word_groups) == 1 and word_groups[0]["group_key"] == "全部新闻":
-                    group_key = group["group_key"]
-                    word_stats[group_key]["count"] += 1
-                    if source_id not in word_stats[group_key]["titles"]:
-                        word_stats[group_key]["titles"][source_id] = []
-                else:
-                    # 原有的匹配逻辑
-                    if required_words:
-                        all_required_present = all(
-                            req_word.lower() in title_lower
-                            for req_word in required_words
-                        )
-                        if not all_required_present:
-                            continue
-
-                    if normal_words:
-                        any_normal_present = any(
-                            normal_word.lower() in title_lower
-                            for normal_word in normal_words
-                        )
-                        if not any_normal_present:
-                            continue
-
-                    group_key = group["group_key"]
-                    word_stats[group_key]["count"] += 1
-                    if source_id not in word_stats[group_key]["titles"]:
-                        word_stats[group_key]["titles"][source_id] = []
-
-                first_time = ""
-                last_time = ""
-                count_info = 1
-                ranks = source_ranks if source_ranks else []
-                url = source_url
-                mobile_url = source_mobile_url
-
-                # 对于 current 模式，从历史统计信息中获取完整数据
-                if (
-                    mode == "current"
-                    and title_info
-                    and source_id in title_info
-                    and title in title_info[source_id]
-                ):
-                    info = title_info[source_id][title]
-                    first_time = info.get("first_time", "")
-                    last_time = info.get("last_time", "")
-                    count_info = info.get("count", 1)
-                    if "ranks" in info and info["ranks"]:
-                        ranks = info["ranks"]
-                    url = info.get("url", source_url)
-                    mobile_url = info.get("mobileUrl", source_mobile_url)
-                elif (
-                    title_info
-                    and source_id in title_info
-                    and title in title_info[source_id]
-                ):
-                    info = title_info[source_id][title]
-                    first_time = info.get("first_time", "")
-                    last_time = info.get("last_time", "")
-                    count_info = info.get("count", 1)
-                    if "ranks" in info and info["ranks"]:
-                        ranks = info["ranks"]
-                    url = info.get("url", source_url)
-                    mobile_url = info.get("mobileUrl", source_mobile_url)
+            group_key = word_groups[group_index]["group_key"]
+            word_stats[group_key]["count"] += 1
+            if source_id not in word_stats[group_key]["titles"]:
+                word_stats[group_key]["titles"][source_id] = []
 
-                if not ranks:
-                    ranks = [99]
+            first_time = ""
+            last_time = ""
+            count_info = 1
+            ranks = source_ranks if source_ranks else []
+            url = source_url
+            mobile_url = source_mobile_url
 
-                time_display = format_time_display(first_time, last_time)
-
-                source_name = id_to_name.get(source_id, source_id)
-
-                # 判断是否为新增
-                is_new = False
-                if all_news_are_new:
-                    # 增量模式下所有处理的新闻都是新增，或者当天第一次的所有新闻都是新增
-                    is_new = True
-                elif new_titles and source_id in new_titles:
-                    # 检查是否在新增列表中
-                    new_titles_for_source = new_titles[source_id]
-                    is_new = title in new_titles_for_source
-
-                word_stats[group_key]["titles"][source_id].append(
-                    {
-                        "title": title,
-                        "source_name": source_name,
-                        "first_time": first_time,
-                        "last_time": last_time,
-                        "time_display": time_display,
-                        "count": count_info,
-                        "ranks": ranks,
-                        "rank_threshold": rank_threshold,
-                        "url": url,
-                        "mobileUrl": mobile_url,
-                        "is_new": is_new,
-                    }
-                )
-
-                if source_id not in processed_titles:
-                    processed_titles[source_id] = {}
-                processed_titles[source_id][title] = True
+            # 对于 current 模式，从历史统计信息中获取完整数据
+            if (
+                mode == "current"
+                and title_info
+                and source_id in title_info
+                and title in title_info[source_id]
+            ):
+                info = title_info[source_id][title]
+                first_time = info.get("first_time", "")
+                last_time = info.get("last_time", "")
+                count_info = info.get("count", 1)
+                if "ranks" in info and info["ranks"]:
+                    ranks = info["ranks"]
+                url = info.get("url", source_url)
+                mobile_url = info.get("mobileUrl", source_mobile_url)
+            elif (
+                title_info
+                and source_id in title_info
+                and title in title_info[source_id]
+            ):
+                info = title_info[source_id][title]
+                first_time = info.get("first_time", "")
+                last_time = info.get("last_time", "")
+                count_info = info.get("count", 1)
+                if "ranks" in info and info["ranks"]:
+                    ranks = info["ranks"]
+                url = info.get("url", source_url)
+                mobile_url = info.get("mobileUrl", source_mobile_url)
+
+            if not ranks:
+                ranks = [99]
+
+            time_display = format_time_display(first_time, last_time)
+
+            source_name = id_to_name.get(source_id, source_id)
+
+            # 判断是否为新增
+            is_new = False
+            if all_news_are_new:
+                # 增量模式下所有处理的新闻都是新增，或者当天第一次的所有新闻都是新增
+                is_new = True
+            elif new_titles and source_id in new_titles:
+                # 检查是否在新增列表中
+                new_titles_for_source = new_titles[source_id]
+                is_new = title in new_titles_for_source
+
+            word_stats[group_key]["titles"][source_id].append(
+                {
+                    "title": title,
+                    "source_name": source_name,
+                    "first_time": first_time,
+                    "last_time": last_time,
+                    "time_display": time_display,
+                    "count": count_info,
+                    "ranks": ranks,
+                    "rank_threshold": rank_threshold,
+                    "url": url,
+                    "mobileUrl": mobile_url,
+                    "is_new": is_new,
+                }
+            )
 
-                break
+            if source_id not in processed_titles:
+                processed_titles[source_id] = {}
+            processed_titles[source_id][title] = True
 
     # 最后统一打印汇总信息
     if mode == "incremental":
@@ -1290,20 +2781,15 @@ def count_word_frequency(
             )
 
     stats = []
+    scorer = WeightScorer.from_config(CONFIG["WEIGHT_CONFIG"], rank_threshold)
+    max_titles = CONFIG["MAX_TITLES_PER_KEYWORD"] or None
     for group_key, data in word_stats.items():
         all_titles = []
         for source_id, title_list in data["titles"].items():
             all_titles.extend(title_list)
 
-        # 按权重排序
-        sorted_titles = sorted(
-            all_titles,
-            key=lambda x: (
-                -calculate_news_weight(x, rank_threshold),
-                min(x["ranks"]) if x["ranks"] else 999,
-                -x["count"],
-            ),
-        )
+        # 按权重排序（权重相同时按最高排名、出现次数），设置了上限时只选出前 K 条
+        sorted_titles = scorer.sort(all_titles, top_k=max_titles)
 
         stats.append(
             {
@@ -1323,14 +2809,308 @@ def count_word_frequency(
 
 
 # === 报告生成 ===
+
+# 推送消息中标题行的来源、时间、次数模板
+TITLE_TEMPLATES = {
+    "feishu": (
+        "<font color='grey'>[{}]</font> ",
+        " <font color='grey'>- {}</font>",
+        " <font color='green'>({}次)</font>",
+    ),
+    "dingtalk": ("[{}] ", " - {}", " ({}次)"),
+    "wework": ("[{}] ", " - {}", " ({}次)"),
+    "telegram": ("[{}] ", " <code>- {}</code>", " <code>({}次)</code>"),
+    "ntfy": ("[{}] ", " `- {}`", " `({}次)`"),
+}
+
+_REPORT_TITLE_KEYS = (
+    "title",
+    "source_name",
+    "time_display",
+    "count",
+    "ranks",
+    "rank_threshold",
+    "url",
+    "mobile_url",
+    "is_new",
+)
+
+
+class ReportTitle(Mapping):
+    """报告中的一条新闻
+
+    构建时一次算好与渠道无关的部分：清理后的标题、链接、排名区间和 HTML 转义后的片段；
+    各格式渲染出的标题行缓存在对象上，HTML 报告和各推送渠道只拼接字符串。
+    映射协议与原来 prepare_report_data 生成的字典相同。
+    """
+
+    __slots__ = _REPORT_TITLE_KEYS + (
+        "cleaned_title",
+        "link_url",
+        "rank_span",
+        "rank_hot",
+        "rank_range",
+        "rank_level",
+        "escaped_title",
+        "escaped_cleaned_title",
+        "escaped_source_name",
+        "escaped_link_url",
+        "escaped_time_display",
+        "escaped_short_time",
+        "_rendered",
+    )
+
+    def __init__(
+        self,
+        title: str,
+        source_name: str,
+        time_display: str,
+        count: int,
+        ranks: Iterable[int],
+        rank_threshold: int,
+        url: str = "",
+        mobile_url: str = "",
+        is_new: bool = False,
+    ):
+        self.title = title
+        self.source_name = source_name
+        self.time_display = time_display
+        self.count = count
+        self.ranks = tuple(ranks)
+        self.rank_threshold = rank_threshold
+        self.url = url
+        self.mobile_url = mobile_url
+        self.is_new = is_new
+
+        self.cleaned_title = clean_title(title)
+        self.link_url = mobile_url or url
+        # 推送消息的排名区间 "[3]" / "[1 - 5]"，最高排名不低于阈值时高亮；
+        # HTML 报告的排名 "3" / "1-5" 及等级（top: 前三，high: 阈值内）
+        self.rank_span = ""
+        self.rank_hot = False
+        self.rank_range = ""
+        self.rank_level = ""
+        if self.ranks:
+            min_rank = min(self.ranks)
+            max_rank = max(self.ranks)
+            if min_rank == max_rank:
+                self.rank_span = f"[{min_rank}]"
+                self.rank_range = str(min_rank)
+            else:
+                self.rank_span = f"[{min_rank} - {max_rank}]"
+                self.rank_range = f"{min_rank}-{max_rank}"
+            self.rank_hot = min_rank <= rank_threshold
+            if min_rank <= 3:
+                self.rank_level = "top"
+            elif self.rank_hot:
+                self.rank_level = "high"
+
+        self.escaped_title = html_escape(title)
+        self.escaped_cleaned_title = html_escape(self.cleaned_title)
+        self.escaped_source_name = html_escape(source_name)
+        self.escaped_link_url = html_escape(self.link_url)
+        self.escaped_time_display = html_escape(time_display)
+        # HTML 报告中的简化时间 "08:00~10:30"
+        self.escaped_short_time = html_escape(
+            time_display.replace(" ~ ", "~").replace("[", "").replace("]", "")
+        )
+        self._rendered: Dict[Tuple, str] = {}
+
+    @staticmethod
+    def cache_key(title_data: Mapping) -> Tuple:
+        """内容相同的新闻共用一个对象"""
+        return (
+            title_data["title"],
+            title_data["source_name"],
+            title_data["time_display"],
+            title_data["count"],
+            tuple(title_data["ranks"]),
+            title_data["rank_threshold"],
+            title_data.get("url", ""),
+            title_data.get("mobile_url", ""),
+            title_data.get("is_new", False),
+        )
+
+    def rank_display(self, format_type: str) -> str:
+        """某个格式的排名显示"""
+        if not self.rank_hot:
+            return self.rank_span
+        highlight_start, highlight_end = RANK_HIGHLIGHTS.get(
+            format_type, DEFAULT_RANK_HIGHLIGHT
+        )
+        return f"{highlight_start}{self.rank_span}{highlight_end}"
+
+    def render(
+        self, platform: str, show_source: bool = True, is_new: Optional[bool] = None
+    ) -> str:
+        """按平台格式渲染标题行（结果缓存），is_new 不为 None 时覆盖是否显示新增标记"""
+        if is_new is None:
+            is_new = bool(self.is_new)
+        key = (platform, show_source, is_new)
+        result = self._rendered.get(key)
+        if result is None:
+            if platform == "html":
+                result = render_html_title(self, is_new)
+            elif platform in TITLE_TEMPLATES:
+                result = render_message_title(self, platform, show_source, is_new)
+            else:
+                result = self.cleaned_title
+            self._rendered[key] = result
+        return result
+
+    def copy(self) -> Dict:
+        return dict(self)
+
+    def __getitem__(self, key: str):
+        if key in _REPORT_TITLE_KEYS:
+            value = getattr(self, key)
+            return list(value) if key == "ranks" else value
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_REPORT_TITLE_KEYS)
+
+    def __len__(self) -> int:
+        return len(_REPORT_TITLE_KEYS)
+
+    def __repr__(self) -> str:
+        return f"ReportTitle({dict(self)!r})"
+
+
+class ReportGroup(dict):
+    """报告中的一个分组（词组或新增新闻来源），键与原来的字典相同，各格式渲染的分组内容缓存在 rendered 中"""
+
+    __slots__ = ("rendered",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rendered: Dict[Tuple, object] = {}
+
+
+def render_cached(group: Mapping, key: Tuple, render: Callable[[], object]):
+    """渲染分组内容，ReportGroup 的结果缓存复用，普通字典每次重新渲染"""
+    rendered = getattr(group, "rendered", None)
+    if rendered is None:
+        return render()
+    result = rendered.get(key)
+    if result is None:
+        result = rendered[key] = render()
+    return result
+
+
+class ReportModelCache:
+    """报告模型的进程内缓存
+
+    内容相同的新闻和分组在多次构建报告之间共用同一对象（多个订阅、实时与汇总报告、
+    常驻模式的各轮），已渲染的标题行和分组内容随之复用。按最近使用淘汰。
+    """
+
+    def __init__(self, max_titles: int = 20000, max_groups: int = 2000):
+        self.max_titles = max_titles
+        self.max_groups = max_groups
+        self._titles: "OrderedDict[Tuple, ReportTitle]" = OrderedDict()
+        self._groups: "OrderedDict[Tuple, ReportGroup]" = OrderedDict()
+
+    @staticmethod
+    def _lookup(store: OrderedDict, key: Tuple, factory: Callable, limit: int):
+        item = store.get(key)
+        if item is None:
+            item = store[key] = factory()
+            if len(store) > limit:
+                store.popitem(last=False)
+        else:
+            store.move_to_end(key)
+        return item
+
+    def title(self, title_data: Mapping) -> ReportTitle:
+        """取得与 title_data 内容相同的新闻对象"""
+        if isinstance(title_data, ReportTitle):
+            return title_data
+        key = ReportTitle.cache_key(title_data)
+        return self._lookup(
+            self._titles,
+            key,
+            lambda: ReportTitle(*key),
+            self.max_titles,
+        )
+
+    def group(self, fields: Dict, titles: List[ReportTitle]) -> ReportGroup:
+        """取得字段和新闻都相同的分组对象（titles 已经过 title() 去重，按对象比较）"""
+        key = (tuple(fields.items()), tuple(map(id, titles)))
+        return self._lookup(
+            self._groups,
+            key,
+            lambda: ReportGroup(fields, titles=titles),
+            self.max_groups,
+        )
+
+
+REPORT_MODEL_CACHE = ReportModelCache()
+
+
+def render_message_title(
+    item: ReportTitle, platform: str, show_source: bool, is_new: bool
+) -> str:
+    """推送消息中的标题行"""
+    source_template, time_template, count_template = TITLE_TEMPLATES[platform]
+
+    if not item.link_url:
+        formatted_title = item.cleaned_title
+    elif platform == "telegram":
+        formatted_title = f'<a href="{item.link_url}">{item.escaped_cleaned_title}</a>'
+    else:
+        formatted_title = f"[{item.cleaned_title}]({item.link_url})"
+
+    parts = []
+    if show_source:
+        parts.append(source_template.format(item.source_name))
+    if is_new:
+        parts.append("🆕 ")
+    parts.append(formatted_title)
+
+    rank_display = item.rank_display(platform)
+    if rank_display:
+        parts.append(f" {rank_display}")
+    if item.time_display:
+        parts.append(time_template.format(item.time_display))
+    if item.count > 1:
+        parts.append(count_template.format(item.count))
+    return "".join(parts)
+
+
+def render_html_title(item: ReportTitle, is_new: bool) -> str:
+    """HTML 格式的标题行（总是显示来源）"""
+    if item.link_url:
+        formatted_title = f'[{item.escaped_source_name}] <a href="{item.escaped_link_url}" target="_blank" class="news-link">{item.escaped_cleaned_title}</a>'
+    else:
+        formatted_title = f'[{item.escaped_source_name}] <span class="no-link">{item.escaped_cleaned_title}</span>'
+
+    rank_display = item.rank_display("html")
+    if rank_display:
+        formatted_title += f" {rank_display}"
+    if item.time_display:
+        formatted_title += f" <font color='grey'>- {item.escaped_time_display}</font>"
+    if item.count > 1:
+        formatted_title += f" <font color='green'>({item.count}次)</font>"
+
+    if is_new:
+        formatted_title = f"<div class='new-title'>🆕 {formatted_title}</div>"
+    return formatted_title
+
+
 def prepare_report_data(
     stats: List[Dict],
     failed_ids: Optional[List] = None,
     new_titles: Optional[Dict] = None,
     id_to_name: Optional[Dict] = None,
     mode: str = "daily",
+    matcher: Optional[RuleSetMatcher] = None,
 ) -> Dict:
-    """准备报告数据"""
+    """准备报告数据，matcher 为订阅共用的匹配结果（默认使用 frequency_words.txt）
+
+    每条新闻和每个分组取自 REPORT_MODEL_CACHE，HTML 报告和各推送渠道共用同一份报告数据，
+    内容未变的分组在多次生成报告之间直接复用已渲染的内容。
+    """
     processed_new_titles = []
 
     # 在增量模式下隐藏新增新闻区域
@@ -1340,11 +3120,19 @@ def prepare_report_data(
     if not hide_new_section:
         filtered_new_titles = {}
         if new_titles and id_to_name:
-            word_groups, filter_words = load_frequency_words()
+            if matcher is None:
+                word_groups, filter_words = load_frequency_words()
             for source_id, titles_data in new_titles.items():
                 filtered_titles = {}
                 for title, title_data in titles_data.items():
-                    if matches_word_groups(title, word_groups, filter_words):
+                    if matcher is not None:
+                        group_index, filter_hits = matcher.match(title, source_id)
+                        matched = group_index is not None and not filter_hits
+                    else:
+                        matched = matches_word_groups(
+                            title, word_groups, filter_words, source_id
+                        )
+                    if matched:
                         filtered_titles[title] = title_data
                 if filtered_titles:
                     filtered_new_titles[source_id] = filtered_titles
@@ -1359,26 +3147,27 @@ def prepare_report_data(
                     mobile_url = title_data.get("mobileUrl", "")
                     ranks = title_data.get("ranks", [])
 
-                    processed_title = {
-                        "title": title,
-                        "source_name": source_name,
-                        "time_display": "",
-                        "count": 1,
-                        "ranks": ranks,
-                        "rank_threshold": CONFIG["RANK_THRESHOLD"],
-                        "url": url,
-                        "mobile_url": mobile_url,
-                        "is_new": True,
-                    }
+                    processed_title = REPORT_MODEL_CACHE.title(
+                        {
+                            "title": title,
+                            "source_name": source_name,
+                            "time_display": "",
+                            "count": 1,
+                            "ranks": ranks,
+                            "rank_threshold": CONFIG["RANK_THRESHOLD"],
+                            "url": url,
+                            "mobile_url": mobile_url,
+                            "is_new": True,
+                        }
+                    )
                     source_titles.append(processed_title)
 
                 if source_titles:
                     processed_new_titles.append(
-                        {
-                            "source_id": source_id,
-                            "source_name": source_name,
-                            "titles": source_titles,
-                        }
+                        REPORT_MODEL_CACHE.group(
+                            {"source_id": source_id, "source_name": source_name},
+                            source_titles,
+                        )
                     )
 
     processed_stats = []
@@ -1388,26 +3177,30 @@ def prepare_report_data(
 
         processed_titles = []
         for title_data in stat["titles"]:
-            processed_title = {
-                "title": title_data["title"],
-                "source_name": title_data["source_name"],
-                "time_display": title_data["time_display"],
-                "count": title_data["count"],
-                "ranks": title_data["ranks"],
-                "rank_threshold": title_data["rank_threshold"],
-                "url": title_data.get("url", ""),
-                "mobile_url": title_data.get("mobileUrl", ""),
-                "is_new": title_data.get("is_new", False),
-            }
+            processed_title = REPORT_MODEL_CACHE.title(
+                {
+                    "title": title_data["title"],
+                    "source_name": title_data["source_name"],
+                    "time_display": title_data["time_display"],
+                    "count": title_data["count"],
+                    "ranks": title_data["ranks"],
+                    "rank_threshold": title_data["rank_threshold"],
+                    "url": title_data.get("url", ""),
+                    "mobile_url": title_data.get("mobileUrl", ""),
+                    "is_new": title_data.get("is_new", False),
+                }
+            )
             processed_titles.append(processed_title)
 
         processed_stats.append(
-            {
-                "word": stat["word"],
-                "count": stat["count"],
-                "percentage": stat.get("percentage", 0),
-                "titles": processed_titles,
-            }
+            REPORT_MODEL_CACHE.group(
+                {
+                    "word": stat["word"],
+                    "count": stat["count"],
+                    "percentage": stat.get("percentage", 0),
+                },
+                processed_titles,
+            )
         )
 
     return {
@@ -1421,160 +3214,10 @@ def prepare_report_data(
 
 
 def format_title_for_platform(
-    platform: str, title_data: Dict, show_source: bool = True
+    platform: str, title_data: Mapping, show_source: bool = True
 ) -> str:
     """统一的标题格式化方法"""
-    rank_display = format_rank_display(
-        title_data["ranks"], title_data["rank_threshold"], platform
-    )
-
-    link_url = title_data["mobile_url"] or title_data["url"]
-
-    cleaned_title = clean_title(title_data["title"])
-
-    if platform == "feishu":
-        if link_url:
-            formatted_title = f"[{cleaned_title}]({link_url})"
-        else:
-            formatted_title = cleaned_title
-
-        title_prefix = "🆕 " if title_data.get("is_new") else ""
-
-        if show_source:
-            result = f"<font color='grey'>[{title_data['source_name']}]</font> {title_prefix}{formatted_title}"
-        else:
-            result = f"{title_prefix}{formatted_title}"
-
-        if rank_display:
-            result += f" {rank_display}"
-        if title_data["time_display"]:
-            result += f" <font color='grey'>- {title_data['time_display']}</font>"
-        if title_data["count"] > 1:
-            result += f" <font color='green'>({title_data['count']}次)</font>"
-
-        return result
-
-    elif platform == "dingtalk":
-        if link_url:
-            formatted_title = f"[{cleaned_title}]({link_url})"
-        else:
-            formatted_title = cleaned_title
-
-        title_prefix = "🆕 " if title_data.get("is_new") else ""
-
-        if show_source:
-            result = f"[{title_data['source_name']}] {title_prefix}{formatted_title}"
-        else:
-            result = f"{title_prefix}{formatted_title}"
-
-        if rank_display:
-            result += f" {rank_display}"
-        if title_data["time_display"]:
-            result += f" - {title_data['time_display']}"
-        if title_data["count"] > 1:
-            result += f" ({title_data['count']}次)"
-
-        return result
-
-    elif platform == "wework":
-        if link_url:
-            formatted_title = f"[{cleaned_title}]({link_url})"
-        else:
-            formatted_title = cleaned_title
-
-        title_prefix = "🆕 " if title_data.get("is_new") else ""
-
-        if show_source:
-            result = f"[{title_data['source_name']}] {title_prefix}{formatted_title}"
-        else:
-            result = f"{title_prefix}{formatted_title}"
-
-        if rank_display:
-            result += f" {rank_display}"
-        if title_data["time_display"]:
-            result += f" - {title_data['time_display']}"
-        if title_data["count"] > 1:
-            result += f" ({title_data['count']}次)"
-
-        return result
-
-    elif platform == "telegram":
-        if link_url:
-            formatted_title = f'<a href="{link_url}">{html_escape(cleaned_title)}</a>'
-        else:
-            formatted_title = cleaned_title
-
-        title_prefix = "🆕 " if title_data.get("is_new") else ""
-
-        if show_source:
-            result = f"[{title_data['source_name']}] {title_prefix}{formatted_title}"
-        else:
-            result = f"{title_prefix}{formatted_title}"
-
-        if rank_display:
-            result += f" {rank_display}"
-        if title_data["time_display"]:
-            result += f" <code>- {title_data['time_display']}</code>"
-        if title_data["count"] > 1:
-            result += f" <code>({title_data['count']}次)</code>"
-
-        return result
-
-    elif platform == "ntfy":
-        if link_url:
-            formatted_title = f"[{cleaned_title}]({link_url})"
-        else:
-            formatted_title = cleaned_title
-
-        title_prefix = "🆕 " if title_data.get("is_new") else ""
-
-        if show_source:
-            result = f"[{title_data['source_name']}] {title_prefix}{formatted_title}"
-        else:
-            result = f"{title_prefix}{formatted_title}"
-
-        if rank_display:
-            result += f" {rank_display}"
-        if title_data["time_display"]:
-            result += f" `- {title_data['time_display']}`"
-        if title_data["count"] > 1:
-            result += f" `({title_data['count']}次)`"
-
-        return result
-
-    elif platform == "html":
-        rank_display = format_rank_display(
-            title_data["ranks"], title_data["rank_threshold"], "html"
-        )
-
-        link_url = title_data["mobile_url"] or title_data["url"]
-
-        escaped_title = html_escape(cleaned_title)
-        escaped_source_name = html_escape(title_data["source_name"])
-
-        if link_url:
-            escaped_url = html_escape(link_url)
-            formatted_title = f'[{escaped_source_name}] <a href="{escaped_url}" target="_blank" class="news-link">{escaped_title}</a>'
-        else:
-            formatted_title = (
-                f'[{escaped_source_name}] <span class="no-link">{escaped_title}</span>'
-            )
-
-        if rank_display:
-            formatted_title += f" {rank_display}"
-        if title_data["time_display"]:
-            escaped_time = html_escape(title_data["time_display"])
-            formatted_title += f" <font color='grey'>- {escaped_time}</font>"
-        if title_data["count"] > 1:
-            formatted_title += f" <font color='green'>({title_data['count']}次)</font>"
-
-        if title_data.get("is_new"):
-            formatted_title = f"<div class='new-title'>🆕 {formatted_title}</div>"
-
-        return formatted_title
-
-    else:
-        return cleaned_title
+    return REPORT_MODEL_CACHE.title(title_data).render(platform, show_source)
 
 
 def generate_html_report(
@@ -1586,8 +3229,11 @@ def generate_html_report(
     mode: str = "daily",
     is_daily_summary: bool = False,
     update_info: Optional[Dict] = None,
+    profile: Optional["SubscriptionProfile"] = None,
+    report_data: Optional[Dict] = None,
 ) -> str:
-    """生成HTML报告"""
+    """生成HTML报告，附加订阅的报告保存在 html/<订阅名>/ 下，不覆盖根目录 index.html；
+    report_data 为已准备好的报告数据时不再重新准备"""
     if is_daily_summary:
         if mode == "current":
             filename = "当前榜单汇总.html"
@@ -1598,9 +3244,19 @@ def generate_html_report(
     else:
         filename = f"{format_time_filename()}.html"
 
-    file_path = get_output_path("html", filename)
+    is_default_profile = profile is None or profile.is_default
+    subfolder = "html" if is_default_profile else str(Path("html") / profile.name)
+    file_path = get_output_path(subfolder, filename)
 
-    report_data = prepare_report_data(stats, failed_ids, new_titles, id_to_name, mode)
+    if report_data is None:
+        report_data = prepare_report_data(
+            stats,
+            failed_ids,
+            new_titles,
+            id_to_name,
+            mode,
+            matcher=profile.matcher if profile else None,
+        )
 
     html_content = render_html_content(
         report_data, total_titles, is_daily_summary, mode, update_info
@@ -1609,7 +3265,7 @@ def generate_html_report(
     with open(file_path, "w", encoding="utf-8") as f:
         f.write(html_content)
 
-    if is_daily_summary:
+    if is_daily_summary and is_default_profile:
         root_file_path = Path("index.html")
         with open(root_file_path, "w", encoding="utf-8") as f:
             f.write(html_content)
@@ -1617,6 +3273,122 @@ def generate_html_report(
     return file_path
 
 
+def render_html_news_item(item: ReportTitle, index: int) -> str:
+    """HTML 报告中词组下的一条新闻"""
+    new_class = "new" if item.is_new else ""
+    parts = [
+        f"""
+                    <div class="news-item {new_class}">
+                        <div class="news-number">{index}</div>
+                        <div class="news-content">
+                            <div class="news-header">
+                                <span class="source-name">{item.escaped_source_name}</span>"""
+    ]
+
+    if item.rank_range:
+        parts.append(
+            f'<span class="rank-num {item.rank_level}">{item.rank_range}</span>'
+        )
+    if item.time_display:
+        parts.append(f'<span class="time-info">{item.escaped_short_time}</span>')
+    if item.count > 1:
+        parts.append(f'<span class="count-info">{item.count}次</span>')
+
+    parts.append(
+        """
+                            </div>
+                            <div class="news-title">"""
+    )
+    if item.link_url:
+        parts.append(
+            f'<a href="{item.escaped_link_url}" target="_blank" class="news-link">{item.escaped_title}</a>'
+        )
+    else:
+        parts.append(item.escaped_title)
+    parts.append(
+        """
+                            </div>
+                        </div>
+                    </div>"""
+    )
+    return "".join(parts)
+
+
+def render_html_word_group(stat: Mapping, index: int, total_count: int) -> str:
+    """HTML 报告中的一个词组"""
+    count = stat["count"]
+
+    # 确定热度等级
+    if count >= 10:
+        count_class = "hot"
+    elif count >= 5:
+        count_class = "warm"
+    else:
+        count_class = ""
+
+    parts = [
+        f"""
+                <div class="word-group">
+                    <div class="word-header">
+                        <div class="word-info">
+                            <div class="word-name">{html_escape(stat["word"])}</div>
+                            <div class="word-count {count_class}">{count} 条</div>
+                        </div>
+                        <div class="word-index">{index}/{total_count}</div>
+                    </div>"""
+    ]
+    # 给每条新闻标上序号
+    for j, title_data in enumerate(stat["titles"], 1):
+        parts.append(render_html_news_item(REPORT_MODEL_CACHE.title(title_data), j))
+    parts.append(
+        """
+                </div>"""
+    )
+    return "".join(parts)
+
+
+def render_html_new_item(item: ReportTitle, index: int) -> str:
+    """HTML 报告中新增新闻区域的一条新闻"""
+    if not item.ranks:
+        rank_text = "?"
+    elif len(item.ranks) == 1:
+        rank_text = str(item.ranks[0])
+    else:
+        rank_text = f"{min(item.ranks)}-{max(item.ranks)}"
+
+    if item.link_url:
+        title_html = f'<a href="{item.escaped_link_url}" target="_blank" class="news-link">{item.escaped_title}</a>'
+    else:
+        title_html = item.escaped_title
+
+    return f"""
+                        <div class="new-item">
+                            <div class="new-item-number">{index}</div>
+                            <div class="new-item-rank {item.rank_level}">{rank_text}</div>
+                            <div class="new-item-content">
+                                <div class="new-item-title">{title_html}
+                                </div>
+                            </div>
+                        </div>"""
+
+
+def render_html_new_source_group(source_data: Mapping) -> str:
+    """HTML 报告中新增新闻区域的一个来源"""
+    parts = [
+        f"""
+                    <div class="new-source-group">
+                        <div class="new-source-title">{html_escape(source_data["source_name"])} · {len(source_data["titles"])}条</div>"""
+    ]
+    # 为新增新闻也添加序号
+    for idx, title_data in enumerate(source_data["titles"], 1):
+        parts.append(render_html_new_item(REPORT_MODEL_CACHE.title(title_data), idx))
+    parts.append(
+        """
+                    </div>"""
+    )
+    return "".join(parts)
+
+
 def render_html_content(
     report_data: Dict,
     total_titles: int,
@@ -2132,101 +3904,11 @@ def render_html_content(
         total_count = len(report_data["stats"])
 
         for i, stat in enumerate(report_data["stats"], 1):
-            count = stat["count"]
-
-            # 确定热度等级
-            if count >= 10:
-                count_class = "hot"
-            elif count >= 5:
-                count_class = "warm"
-            else:
-                count_class = ""
-
-            escaped_word = html_escape(stat["word"])
-
-            html += f"""
-                <div class="word-group">
-                    <div class="word-header">
-                        <div class="word-info">
-                            <div class="word-name">{escaped_word}</div>
-                            <div class="word-count {count_class}">{count} 条</div>
-                        </div>
-                        <div class="word-index">{i}/{total_count}</div>
-                    </div>"""
-
-            # 处理每个词组下的新闻标题，给每条新闻标上序号
-            for j, title_data in enumerate(stat["titles"], 1):
-                is_new = title_data.get("is_new", False)
-                new_class = "new" if is_new else ""
-
-                html += f"""
-                    <div class="news-item {new_class}">
-                        <div class="news-number">{j}</div>
-                        <div class="news-content">
-                            <div class="news-header">
-                                <span class="source-name">{html_escape(title_data["source_name"])}</span>"""
-
-                # 处理排名显示
-                ranks = title_data.get("ranks", [])
-                if ranks:
-                    min_rank = min(ranks)
-                    max_rank = max(ranks)
-                    rank_threshold = title_data.get("rank_threshold", 10)
-
-                    # 确定排名等级
-                    if min_rank <= 3:
-                        rank_class = "top"
-                    elif min_rank <= rank_threshold:
-                        rank_class = "high"
-                    else:
-                        rank_class = ""
-
-                    if min_rank == max_rank:
-                        rank_text = str(min_rank)
-                    else:
-                        rank_text = f"{min_rank}-{max_rank}"
-
-                    html += f'<span class="rank-num {rank_class}">{rank_text}</span>'
-
-                # 处理时间显示
-                time_display = title_data.get("time_display", "")
-                if time_display:
-                    # 简化时间显示格式，将波浪线替换为~
-                    simplified_time = (
-                        time_display.replace(" ~ ", "~")
-                        .replace("[", "")
-                        .replace("]", "")
-                    )
-                    html += (
-                        f'<span class="time-info">{html_escape(simplified_time)}</span>'
-                    )
-
-                # 处理出现次数
-                count_info = title_data.get("count", 1)
-                if count_info > 1:
-                    html += f'<span class="count-info">{count_info}次</span>'
-
-                html += """
-                            </div>
-                            <div class="news-title">"""
-
-                # 处理标题和链接
-                escaped_title = html_escape(title_data["title"])
-                link_url = title_data.get("mobile_url") or title_data.get("url", "")
-
-                if link_url:
-                    escaped_url = html_escape(link_url)
-                    html += f'<a href="{escaped_url}" target="_blank" class="news-link">{escaped_title}</a>'
-                else:
-                    html += escaped_title
-
-                html += """
-                            </div>
-                        </div>
-                    </div>"""
-
-            html += """
-                </div>"""
+            html += render_cached(
+                stat,
+                ("html", i, total_count),
+                lambda: render_html_word_group(stat, i, total_count),
+            )
 
     # 处理新增新闻区域
     if report_data["new_titles"]:
@@ -2235,57 +3917,11 @@ def render_html_content(
                     <div class="new-section-title">本次新增热点 (共 {report_data['total_new_count']} 条)</div>"""
 
         for source_data in report_data["new_titles"]:
-            escaped_source = html_escape(source_data["source_name"])
-            titles_count = len(source_data["titles"])
-
-            html += f"""
-                    <div class="new-source-group">
-                        <div class="new-source-title">{escaped_source} · {titles_count}条</div>"""
-
-            # 为新增新闻也添加序号
-            for idx, title_data in enumerate(source_data["titles"], 1):
-                ranks = title_data.get("ranks", [])
-
-                # 处理新增新闻的排名显示
-                rank_class = ""
-                if ranks:
-                    min_rank = min(ranks)
-                    if min_rank <= 3:
-                        rank_class = "top"
-                    elif min_rank <= title_data.get("rank_threshold", 10):
-                        rank_class = "high"
-
-                    if len(ranks) == 1:
-                        rank_text = str(ranks[0])
-                    else:
-                        rank_text = f"{min(ranks)}-{max(ranks)}"
-                else:
-                    rank_text = "?"
-
-                html += f"""
-                        <div class="new-item">
-                            <div class="new-item-number">{idx}</div>
-                            <div class="new-item-rank {rank_class}">{rank_text}</div>
-                            <div class="new-item-content">
-                                <div class="new-item-title">"""
-
-                # 处理新增新闻的链接
-                escaped_title = html_escape(title_data["title"])
-                link_url = title_data.get("mobile_url") or title_data.get("url", "")
-
-                if link_url:
-                    escaped_url = html_escape(link_url)
-                    html += f'<a href="{escaped_url}" target="_blank" class="news-link">{escaped_title}</a>'
-                else:
-                    html += escaped_title
-
-                html += """
-                                </div>
-                            </div>
-                        </div>"""
-
-            html += """
-                    </div>"""
+            html += render_cached(
+                source_data,
+                ("html",),
+                lambda: render_html_new_source_group(source_data),
+            )
 
         html += """
                 </div>"""
@@ -2806,6 +4442,93 @@ def render_dingtalk_content(
     return text_content
 
 
+# 分批消息中按平台格式渲染标题的渠道（其他格式只显示标题文本）
+BATCH_TITLE_FORMATS = frozenset(["wework", "telegram", "ntfy", "feishu", "dingtalk"])
+
+
+class MessageBatcher:
+    """按字节上限把消息片段装入批次
+
+    每个片段只编码一次，逐段累计 UTF-8 字节数，批次内容在完成时一次拼接，
+    装入 n 个片段的总开销与 n 成线性关系。批次放不下时在新批次开头重复 base_header
+    和调用方给出的延续标题（如统计标题、词组标题），保证标题至少带着一条新闻。
+    """
+
+    def __init__(self, base_header: str, base_footer: str, max_bytes: int):
+        self.base_header = base_header
+        self.base_footer = base_footer
+        # 批次内容加上 footer 必须小于该值
+        self.limit = max_bytes - len(base_footer.encode("utf-8"))
+        self.batches: List[str] = []
+        self.parts = [base_header]
+        self.size = len(base_header.encode("utf-8"))
+        self.has_content = False
+
+    def append(self, text: str) -> None:
+        """直接追加片段，不检查大小"""
+        self.parts.append(text)
+        self.size += len(text.encode("utf-8"))
+
+    def add_if_fits(self, text: str) -> None:
+        """放得下时追加片段，否则丢弃（用于分隔符）"""
+        text_size = len(text.encode("utf-8"))
+        if self.size + text_size < self.limit:
+            self.parts.append(text)
+            self.size += text_size
+
+    def add(self, text: str, *continuation: str) -> None:
+        """追加片段，当前批次放不下时开启以 base_header + continuation 开头的新批次"""
+        text_size = len(text.encode("utf-8"))
+        if self.size + text_size < self.limit:
+            self.parts.append(text)
+            self.size += text_size
+        else:
+            self.flush()
+            self.parts = [self.base_header, *continuation, text]
+            self.size = sum(len(part.encode("utf-8")) for part in self.parts)
+        self.has_content = True
+
+    def flush(self) -> None:
+        """完成当前批次"""
+        if self.has_content:
+            self.parts.append(self.base_footer)
+            self.batches.append("".join(self.parts))
+
+
+def render_batch_news_lines(titles: List[Mapping], format_type: str) -> List[str]:
+    """分批消息中一个词组的新闻行，新闻之间空一行"""
+    news_lines = []
+    for j, title_data in enumerate(titles):
+        if format_type in BATCH_TITLE_FORMATS:
+            formatted_title = format_title_for_platform(
+                format_type, title_data, show_source=True
+            )
+        else:
+            formatted_title = f"{title_data['title']}"
+
+        news_line = f"  {j + 1}. {formatted_title}\n"
+        if j < len(titles) - 1:
+            news_line += "\n"
+        news_lines.append(news_line)
+    return news_lines
+
+
+def render_batch_new_lines(titles: List[Mapping], format_type: str) -> List[str]:
+    """分批消息中一个来源的新增新闻行，不显示来源和新增标记"""
+    news_lines = []
+    for j, title_data in enumerate(titles):
+        # ntfy 的新增新闻只显示标题
+        if format_type in BATCH_TITLE_FORMATS and format_type != "ntfy":
+            formatted_title = REPORT_MODEL_CACHE.title(title_data).render(
+                format_type, show_source=False, is_new=False
+            )
+        else:
+            formatted_title = f"{title_data['title']}"
+
+        news_lines.append(f"  {j + 1}. {formatted_title}\n")
+    return news_lines
+
+
 def split_content_into_batches(
     report_data: Dict,
     format_type: str,
@@ -2881,9 +4604,6 @@ def split_content_into_batches(
         elif format_type == "dingtalk":
             stats_header = f"📊 **热点词汇统计**\n\n"
 
-    current_batch = base_header
-    current_batch_has_content = False
-
     if (
         not report_data["stats"]
         and not report_data["new_titles"]
@@ -2900,23 +4620,14 @@ def split_content_into_batches(
         batches.append(final_content)
         return batches
 
+    batcher = MessageBatcher(base_header, base_footer, max_bytes)
+
     # 处理热点词汇统计
     if report_data["stats"]:
         total_count = len(report_data["stats"])
 
         # 添加统计标题
-        test_content = current_batch + stats_header
-        if (
-            len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-            < max_bytes
-        ):
-            current_batch = test_content
-            current_batch_has_content = True
-        else:
-            if current_batch_has_content:
-                batches.append(current_batch + base_footer)
-            current_batch = base_header + stats_header
-            current_batch_has_content = True
+        batcher.add(stats_header)
 
         # 逐个处理词组（确保词组标题+第一条新闻的原子性）
         for i, stat in enumerate(report_data["stats"]):
@@ -2950,122 +4661,45 @@ def split_content_into_batches(
                         f"🔥 {sequence_display} **{word}** : **{count}** 条\n\n"
                     )
                 elif count >= 5:
-                    word_header = (
-                        f"📈 {sequence_display} **{word}** : **{count}** 条\n\n"
-                    )
-                else:
-                    word_header = f"📌 {sequence_display} **{word}** : {count} 条\n\n"
-            elif format_type == "feishu":
-                if count >= 10:
-                    word_header = f"🔥 <font color='grey'>{sequence_display}</font> **{word}** : <font color='red'>{count}</font> 条\n\n"
-                elif count >= 5:
-                    word_header = f"📈 <font color='grey'>{sequence_display}</font> **{word}** : <font color='orange'>{count}</font> 条\n\n"
-                else:
-                    word_header = f"📌 <font color='grey'>{sequence_display}</font> **{word}** : {count} 条\n\n"
-            elif format_type == "dingtalk":
-                if count >= 10:
-                    word_header = (
-                        f"🔥 {sequence_display} **{word}** : **{count}** 条\n\n"
-                    )
-                elif count >= 5:
-                    word_header = (
-                        f"📈 {sequence_display} **{word}** : **{count}** 条\n\n"
-                    )
-                else:
-                    word_header = f"📌 {sequence_display} **{word}** : {count} 条\n\n"
-
-            # 构建第一条新闻
-            first_news_line = ""
-            if stat["titles"]:
-                first_title_data = stat["titles"][0]
-                if format_type == "wework":
-                    formatted_title = format_title_for_platform(
-                        "wework", first_title_data, show_source=True
-                    )
-                elif format_type == "telegram":
-                    formatted_title = format_title_for_platform(
-                        "telegram", first_title_data, show_source=True
-                    )
-                elif format_type == "ntfy":
-                    formatted_title = format_title_for_platform(
-                        "ntfy", first_title_data, show_source=True
-                    )
-                elif format_type == "feishu":
-                    formatted_title = format_title_for_platform(
-                        "feishu", first_title_data, show_source=True
-                    )
-                elif format_type == "dingtalk":
-                    formatted_title = format_title_for_platform(
-                        "dingtalk", first_title_data, show_source=True
-                    )
-                else:
-                    formatted_title = f"{first_title_data['title']}"
-
-                first_news_line = f"  1. {formatted_title}\n"
-                if len(stat["titles"]) > 1:
-                    first_news_line += "\n"
-
-            # 原子性检查：词组标题+第一条新闻必须一起处理
-            word_with_first_news = word_header + first_news_line
-            test_content = current_batch + word_with_first_news
-
-            if (
-                len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-                >= max_bytes
-            ):
-                # 当前批次容纳不下，开启新批次
-                if current_batch_has_content:
-                    batches.append(current_batch + base_footer)
-                current_batch = base_header + stats_header + word_with_first_news
-                current_batch_has_content = True
-                start_index = 1
-            else:
-                current_batch = test_content
-                current_batch_has_content = True
-                start_index = 1
-
-            # 处理剩余新闻条目
-            for j in range(start_index, len(stat["titles"])):
-                title_data = stat["titles"][j]
-                if format_type == "wework":
-                    formatted_title = format_title_for_platform(
-                        "wework", title_data, show_source=True
-                    )
-                elif format_type == "telegram":
-                    formatted_title = format_title_for_platform(
-                        "telegram", title_data, show_source=True
-                    )
-                elif format_type == "ntfy":
-                    formatted_title = format_title_for_platform(
-                        "ntfy", title_data, show_source=True
+                    word_header = (
+                        f"📈 {sequence_display} **{word}** : **{count}** 条\n\n"
                     )
-                elif format_type == "feishu":
-                    formatted_title = format_title_for_platform(
-                        "feishu", title_data, show_source=True
+                else:
+                    word_header = f"📌 {sequence_display} **{word}** : {count} 条\n\n"
+            elif format_type == "feishu":
+                if count >= 10:
+                    word_header = f"🔥 <font color='grey'>{sequence_display}</font> **{word}** : <font color='red'>{count}</font> 条\n\n"
+                elif count >= 5:
+                    word_header = f"📈 <font color='grey'>{sequence_display}</font> **{word}** : <font color='orange'>{count}</font> 条\n\n"
+                else:
+                    word_header = f"📌 <font color='grey'>{sequence_display}</font> **{word}** : {count} 条\n\n"
+            elif format_type == "dingtalk":
+                if count >= 10:
+                    word_header = (
+                        f"🔥 {sequence_display} **{word}** : **{count}** 条\n\n"
                     )
-                elif format_type == "dingtalk":
-                    formatted_title = format_title_for_platform(
-                        "dingtalk", title_data, show_source=True
+                elif count >= 5:
+                    word_header = (
+                        f"📈 {sequence_display} **{word}** : **{count}** 条\n\n"
                     )
                 else:
-                    formatted_title = f"{title_data['title']}"
+                    word_header = f"📌 {sequence_display} **{word}** : {count} 条\n\n"
 
-                news_line = f"  {j + 1}. {formatted_title}\n"
-                if j < len(stat["titles"]) - 1:
-                    news_line += "\n"
+            # 每条新闻只渲染一次，内容未变的词组直接复用上次渲染的结果
+            news_lines = render_cached(
+                stat,
+                (format_type, "lines"),
+                lambda: render_batch_news_lines(stat["titles"], format_type),
+            )
 
-                test_content = current_batch + news_line
-                if (
-                    len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-                    >= max_bytes
-                ):
-                    if current_batch_has_content:
-                        batches.append(current_batch + base_footer)
-                    current_batch = base_header + stats_header + word_header + news_line
-                    current_batch_has_content = True
-                else:
-                    current_batch = test_content
-                    current_batch_has_content = True
+            # 原子性检查：词组标题+第一条新闻必须一起处理，放不下时开启新批次
+            batcher.add(
+                word_header + (news_lines[0] if news_lines else ""), stats_header
+            )
+
+            # 处理剩余新闻条目，换批次时在新批次开头重复统计标题和词组标题
+            for news_line in news_lines[1:]:
+                batcher.add(news_line, stats_header, word_header)
 
             # 词组间分隔符
             if i < len(report_data["stats"]) - 1:
@@ -3081,12 +4715,7 @@ def split_content_into_batches(
                 elif format_type == "dingtalk":
                     separator = f"\n---\n\n"
 
-                test_content = current_batch + separator
-                if (
-                    len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-                    < max_bytes
-                ):
-                    current_batch = test_content
+                batcher.add_if_fits(separator)
 
     # 处理新增新闻（同样确保来源标题+第一条新闻的原子性）
     if report_data["new_titles"]:
@@ -3104,18 +4733,7 @@ def split_content_into_batches(
         elif format_type == "dingtalk":
             new_header = f"\n---\n\n🆕 **本次新增热点新闻** (共 {report_data['total_new_count']} 条)\n\n"
 
-        test_content = current_batch + new_header
-        if (
-            len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-            >= max_bytes
-        ):
-            if current_batch_has_content:
-                batches.append(current_batch + base_footer)
-            current_batch = base_header + new_header
-            current_batch_has_content = True
-        else:
-            current_batch = test_content
-            current_batch_has_content = True
+        batcher.add(new_header)
 
         # 逐个处理新增新闻来源
         for source_data in report_data["new_titles"]:
@@ -3131,93 +4749,22 @@ def split_content_into_batches(
             elif format_type == "dingtalk":
                 source_header = f"**{source_data['source_name']}** ({len(source_data['titles'])} 条):\n\n"
 
-            # 构建第一条新增新闻
-            first_news_line = ""
-            if source_data["titles"]:
-                first_title_data = source_data["titles"][0]
-                title_data_copy = first_title_data.copy()
-                title_data_copy["is_new"] = False
-
-                if format_type == "wework":
-                    formatted_title = format_title_for_platform(
-                        "wework", title_data_copy, show_source=False
-                    )
-                elif format_type == "telegram":
-                    formatted_title = format_title_for_platform(
-                        "telegram", title_data_copy, show_source=False
-                    )
-                elif format_type == "feishu":
-                    formatted_title = format_title_for_platform(
-                        "feishu", title_data_copy, show_source=False
-                    )
-                elif format_type == "dingtalk":
-                    formatted_title = format_title_for_platform(
-                        "dingtalk", title_data_copy, show_source=False
-                    )
-                else:
-                    formatted_title = f"{title_data_copy['title']}"
-
-                first_news_line = f"  1. {formatted_title}\n"
+            news_lines = render_cached(
+                source_data,
+                (format_type, "new_lines"),
+                lambda: render_batch_new_lines(source_data["titles"], format_type),
+            )
 
             # 原子性检查：来源标题+第一条新闻
-            source_with_first_news = source_header + first_news_line
-            test_content = current_batch + source_with_first_news
-
-            if (
-                len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-                >= max_bytes
-            ):
-                if current_batch_has_content:
-                    batches.append(current_batch + base_footer)
-                current_batch = base_header + new_header + source_with_first_news
-                current_batch_has_content = True
-                start_index = 1
-            else:
-                current_batch = test_content
-                current_batch_has_content = True
-                start_index = 1
+            batcher.add(
+                source_header + (news_lines[0] if news_lines else ""), new_header
+            )
 
             # 处理剩余新增新闻
-            for j in range(start_index, len(source_data["titles"])):
-                title_data = source_data["titles"][j]
-                title_data_copy = title_data.copy()
-                title_data_copy["is_new"] = False
-
-                if format_type == "wework":
-                    formatted_title = format_title_for_platform(
-                        "wework", title_data_copy, show_source=False
-                    )
-                elif format_type == "telegram":
-                    formatted_title = format_title_for_platform(
-                        "telegram", title_data_copy, show_source=False
-                    )
-                elif format_type == "feishu":
-                    formatted_title = format_title_for_platform(
-                        "feishu", title_data_copy, show_source=False
-                    )
-                elif format_type == "dingtalk":
-                    formatted_title = format_title_for_platform(
-                        "dingtalk", title_data_copy, show_source=False
-                    )
-                else:
-                    formatted_title = f"{title_data_copy['title']}"
-
-                news_line = f"  {j + 1}. {formatted_title}\n"
-
-                test_content = current_batch + news_line
-                if (
-                    len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-                    >= max_bytes
-                ):
-                    if current_batch_has_content:
-                        batches.append(current_batch + base_footer)
-                    current_batch = base_header + new_header + source_header + news_line
-                    current_batch_has_content = True
-                else:
-                    current_batch = test_content
-                    current_batch_has_content = True
+            for news_line in news_lines[1:]:
+                batcher.add(news_line, new_header, source_header)
 
-            current_batch += "\n"
+            batcher.append("\n")
 
     if report_data["failed_ids"]:
         failed_header = ""
@@ -3232,18 +4779,7 @@ def split_content_into_batches(
         elif format_type == "dingtalk":
             failed_header = f"\n---\n\n⚠️ **数据获取失败的平台：**\n\n"
 
-        test_content = current_batch + failed_header
-        if (
-            len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-            >= max_bytes
-        ):
-            if current_batch_has_content:
-                batches.append(current_batch + base_footer)
-            current_batch = base_header + failed_header
-            current_batch_has_content = True
-        else:
-            current_batch = test_content
-            current_batch_has_content = True
+        batcher.add(failed_header)
 
         for i, id_value in enumerate(report_data["failed_ids"], 1):
             if format_type == "feishu":
@@ -3253,24 +4789,154 @@ def split_content_into_batches(
             else:
                 failed_line = f"  • {id_value}\n"
 
-            test_content = current_batch + failed_line
-            if (
-                len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
-                >= max_bytes
-            ):
-                if current_batch_has_content:
-                    batches.append(current_batch + base_footer)
-                current_batch = base_header + failed_header + failed_line
-                current_batch_has_content = True
-            else:
-                current_batch = test_content
-                current_batch_has_content = True
+            batcher.add(failed_line, failed_header)
 
     # 完成最后批次
-    if current_batch_has_content:
-        batches.append(current_batch + base_footer)
+    batcher.flush()
+
+    return batcher.batches
+
+
+def dispatch_notifications(
+    senders: List[Tuple[str, Callable[[], bool]]], concurrent: bool = True
+) -> Dict[str, bool]:
+    """执行各渠道的发送任务：渠道之间并行，同一渠道的批次仍在自己的任务中按顺序发送
+
+    返回 {渠道: 是否成功}，顺序与 senders 相同；某个渠道抛出异常时记为失败，不影响其他渠道。
+    """
+
+    def run_sender(name: str, send: Callable[[], bool]) -> bool:
+        try:
+            return send()
+        except Exception as e:
+            print(f"{name} 推送出错: {e}")
+            return False
+
+    if not concurrent or len(senders) <= 1:
+        return {name: run_sender(name, send) for name, send in senders}
+
+    print(f"并行推送到 {len(senders)} 个渠道: {', '.join(name for name, _ in senders)}")
+    with ThreadPoolExecutor(max_workers=len(senders)) as executor:
+        futures = [
+            (name, executor.submit(run_sender, name, send)) for name, send in senders
+        ]
+        return {name: future.result() for name, future in futures}
+
+
+# 各平台在 HTTP 200 响应中表示触发限流的错误码
+RATE_LIMIT_ERROR_CODES = {
+    "feishu": {9499, 11232},
+    "dingtalk": {130101},
+    "wework": {45009},
+}
+
+# 进程内各推送目标的令牌桶（常驻模式下跨轮次保留）
+NOTIFICATION_RATE_LIMITERS = RateLimiterRegistry()
+
+
+def get_channel_limiter(channel: str, destination: str) -> Optional[TokenBucket]:
+    """推送目标的令牌桶，渠道关闭限速（rate 为 0）时返回 None"""
+    limit = CONFIG["RATE_LIMITS"].get(channel)
+    if not limit or limit["RATE"] <= 0:
+        return None
+    return NOTIFICATION_RATE_LIMITERS.get(
+        (channel, destination), limit["RATE"], limit["BURST"]
+    )
+
+
+def get_channel_destination(channel: str, channels: Dict) -> Optional[str]:
+    """渠道的推送目标（与各 post_*_message 中的令牌桶键一致），邮件等不限速的渠道为 None"""
+    if channel == "feishu":
+        return channels["FEISHU_WEBHOOK_URL"]
+    if channel == "dingtalk":
+        return channels["DINGTALK_WEBHOOK_URL"]
+    if channel == "wework":
+        return channels["WEWORK_WEBHOOK_URL"]
+    if channel == "telegram":
+        return f"{channels['TELEGRAM_BOT_TOKEN']}:{channels['TELEGRAM_CHAT_ID']}"
+    if channel == "ntfy":
+        return get_ntfy_url(channels["NTFY_SERVER_URL"], channels["NTFY_TOPIC"])
+    return None
+
+
+def get_rate_limit_delay(channel: str, channels: Dict) -> float:
+    """推送目标还需等待的秒数（被限流暂停时为距恢复的时间）"""
+    destination = get_channel_destination(channel, channels)
+    if destination is None:
+        return 0.0
+    limiter = get_channel_limiter(channel, destination)
+    return limiter.delay() if limiter else 0.0
+
 
-    return batches
+def get_rate_limit_wait(channel: str, response: requests.Response) -> Optional[float]:
+    """响应表示被限流（429 或平台限流错误码）时返回应等待的秒数，否则返回 None"""
+    cooldown = CONFIG["RATE_LIMITS"].get(channel, {}).get("COOLDOWN", 10)
+
+    if response.status_code == 429:
+        wait = parse_retry_after(response.headers.get("Retry-After"))
+        if wait is None and channel == "telegram":
+            try:
+                wait = float(response.json()["parameters"]["retry_after"])
+            except (ValueError, KeyError, TypeError):
+                pass
+        return wait if wait is not None else cooldown
+
+    error_codes = RATE_LIMIT_ERROR_CODES.get(channel)
+    if error_codes and response.status_code == 200:
+        try:
+            result = response.json()
+        except ValueError:
+            return None
+        if isinstance(result, dict) and result.get("errcode", result.get("code")) in error_codes:
+            return cooldown
+    return None
+
+
+def post_notification_request(
+    channel: str, destination: str, description: str, url: str, **kwargs
+) -> requests.Response:
+    """
+    按推送目标限速发送通知请求
+
+    被限流时按 Retry-After 暂停该目标后重发同一批次；需要等待的时间超过 rate_limit_max_wait
+    或重试次数用完时同样暂停该目标，并返回最后一次的响应，由调用方按失败处理
+    （启用发件箱时在限流结束后重试）。
+
+    Args:
+        channel: 渠道名称
+        destination: 推送目标（webhook 地址、聊天等），同一目标共用一个令牌桶
+        description: 日志中的批次描述
+        url: 请求地址
+        **kwargs: 传给 requests.post 的参数
+
+    Returns:
+        响应
+    """
+    limiter = get_channel_limiter(channel, destination)
+    retries = max(0, CONFIG["RATE_LIMIT_RETRIES"])
+
+    for attempt in range(retries + 1):
+        if limiter:
+            limiter.acquire()
+        response = requests.post(url, **kwargs)
+
+        wait = get_rate_limit_wait(channel, response)
+        if wait is None:
+            return response
+        if attempt == retries or wait > CONFIG["RATE_LIMIT_MAX_WAIT"]:
+            if wait > CONFIG["RATE_LIMIT_MAX_WAIT"]:
+                print(f"{description}被限流，需要等待 {wait:.0f} 秒，超过单次等待上限")
+            # 限流期间不再向该目标发出请求，发件箱的重试时间也不会早于限流结束
+            if limiter:
+                limiter.pause(wait)
+            return response
+
+        print(f"{description}被限流，{wait:.0f} 秒后重试")
+        if limiter:
+            limiter.pause(wait)
+        else:
+            time.sleep(wait)
+    return response
 
 
 def send_to_notifications(
@@ -3283,12 +4949,17 @@ def send_to_notifications(
     proxy_url: Optional[str] = None,
     mode: str = "daily",
     html_file_path: Optional[str] = None,
+    profile: Optional["SubscriptionProfile"] = None,
+    report_data: Optional[Dict] = None,
 ) -> Dict[str, bool]:
-    """发送数据到多个通知平台"""
+    """发送数据到多个通知平台，profile 为附加订阅时使用其通知渠道和推送记录，
+    report_data 为生成 HTML 报告时准备好的报告数据（None 时重新准备）"""
     results = {}
+    channels = profile.channels if profile else CONFIG
+    profile_name = profile.name if profile else ""
 
     if CONFIG["PUSH_WINDOW"]["ENABLED"]:
-        push_manager = PushRecordManager()
+        push_manager = PushRecordManager(profile_name)
         time_range_start = CONFIG["PUSH_WINDOW"]["TIME_RANGE"]["START"]
         time_range_end = CONFIG["PUSH_WINDOW"]["TIME_RANGE"]["END"]
 
@@ -3306,108 +4977,85 @@ def send_to_notifications(
             else:
                 print(f"推送窗口控制：今天首次推送")
 
-    report_data = prepare_report_data(stats, failed_ids, new_titles, id_to_name, mode)
-
-    feishu_url = CONFIG["FEISHU_WEBHOOK_URL"]
-    dingtalk_url = CONFIG["DINGTALK_WEBHOOK_URL"]
-    wework_url = CONFIG["WEWORK_WEBHOOK_URL"]
-    telegram_token = CONFIG["TELEGRAM_BOT_TOKEN"]
-    telegram_chat_id = CONFIG["TELEGRAM_CHAT_ID"]
-    email_from = CONFIG["EMAIL_FROM"]
-    email_password = CONFIG["EMAIL_PASSWORD"]
-    email_to = CONFIG["EMAIL_TO"]
-    email_smtp_server = CONFIG.get("EMAIL_SMTP_SERVER", "")
-    email_smtp_port = CONFIG.get("EMAIL_SMTP_PORT", "")
-    ntfy_server_url = CONFIG["NTFY_SERVER_URL"]
-    ntfy_topic = CONFIG["NTFY_TOPIC"]
-    ntfy_token = CONFIG.get("NTFY_TOKEN", "")
-
-    update_info_to_send = update_info if CONFIG["SHOW_VERSION_UPDATE"] else None
-
-    # 发送到飞书
-    if feishu_url:
-        results["feishu"] = send_to_feishu(
-            feishu_url, report_data, report_type, update_info_to_send, proxy_url, mode
-        )
-
-    # 发送到钉钉
-    if dingtalk_url:
-        results["dingtalk"] = send_to_dingtalk(
-            dingtalk_url, report_data, report_type, update_info_to_send, proxy_url, mode
-        )
-
-    # 发送到企业微信
-    if wework_url:
-        results["wework"] = send_to_wework(
-            wework_url, report_data, report_type, update_info_to_send, proxy_url, mode
-        )
-
-    # 发送到 Telegram
-    if telegram_token and telegram_chat_id:
-        results["telegram"] = send_to_telegram(
-            telegram_token,
-            telegram_chat_id,
-            report_data,
-            report_type,
-            update_info_to_send,
-            proxy_url,
+    if report_data is None:
+        report_data = prepare_report_data(
+            stats,
+            failed_ids,
+            new_titles,
+            id_to_name,
             mode,
+            matcher=profile.matcher if profile else None,
         )
 
-    # 发送到 ntfy
-    if ntfy_server_url and ntfy_topic:
-        results["ntfy"] = send_to_ntfy(
-            ntfy_server_url,
-            ntfy_topic,
-            ntfy_token,
-            report_data,
-            report_type,
-            update_info_to_send,
-            proxy_url,
-            mode,
-        )
+    update_info_to_send = update_info if CONFIG["SHOW_VERSION_UPDATE"] else None
+    channel_names = get_configured_channels(channels)
+
+    # 各渠道的发送任务，按原来的渠道顺序排列
+    if CONFIG["OUTBOX"]["ENABLED"]:
+        # 先把渲染好的分批消息写入发件箱，失败的批次留待下次运行或常驻模式下重试
+        outbox = NotificationOutbox()
+        for channel in channel_names:
+            outbox.enqueue(
+                profile_name,
+                channel,
+                report_type,
+                mode,
+                build_channel_messages(
+                    channel, report_data, report_type, update_info_to_send, mode, html_file_path
+                ),
+            )
+        senders = [
+            (
+                channel,
+                lambda channel=channel: outbox.flush_channel(
+                    profile_name, channel, channels, proxy_url
+                ),
+            )
+            for channel in channel_names
+        ]
+    else:
+        senders = [
+            (
+                channel,
+                lambda channel=channel: send_to_channel(
+                    channel,
+                    channels,
+                    report_data,
+                    report_type,
+                    update_info_to_send,
+                    proxy_url,
+                    mode,
+                    html_file_path,
+                ),
+            )
+            for channel in channel_names
+        ]
 
-    # 发送邮件
-    if email_from and email_password and email_to:
-        results["email"] = send_to_email(
-            email_from,
-            email_password,
-            email_to,
-            report_type,
-            html_file_path,
-            email_smtp_server,
-            email_smtp_port,
-        )
+    results = dispatch_notifications(senders, CONFIG["CONCURRENT_SEND"])
 
     if not results:
         print("未配置任何通知渠道，跳过通知发送")
 
-    # 如果成功发送了任何通知，且启用了每天只推一次，则记录推送
+    # 如果成功发送了任何通知，且启用了每天只推一次，则记录推送（发件箱在任务发送完成时记录）
     if (
-        CONFIG["PUSH_WINDOW"]["ENABLED"]
+        not CONFIG["OUTBOX"]["ENABLED"]
+        and CONFIG["PUSH_WINDOW"]["ENABLED"]
         and CONFIG["PUSH_WINDOW"]["ONCE_PER_DAY"]
         and any(results.values())
     ):
-        push_manager = PushRecordManager()
+        push_manager = PushRecordManager(profile_name)
         push_manager.record_push(report_type)
 
     return results
 
 
-def send_to_feishu(
-    webhook_url: str,
+def build_feishu_messages(
     report_data: Dict,
     report_type: str,
     update_info: Optional[Dict] = None,
-    proxy_url: Optional[str] = None,
     mode: str = "daily",
-) -> bool:
-    """发送到飞书（支持分批发送）"""
-    headers = {"Content-Type": "application/json"}
-    proxies = None
-    if proxy_url:
-        proxies = {"http": proxy_url, "https": proxy_url}
-
+) -> List[Dict]:
+    """渲染飞书分批消息（请求体中不含 webhook 地址）"""
     # 获取分批内容，使用飞书专用的批次大小
     batches = split_content_into_batches(
         report_data,
@@ -3416,15 +5064,13 @@ def send_to_feishu(
         max_bytes=CONFIG.get("FEISHU_BATCH_SIZE", 29000),
         mode=mode,
     )
+    total_titles = sum(
+        len(stat["titles"]) for stat in report_data["stats"] if stat["count"] > 0
+    )
 
-    print(f"飞书消息分为 {len(batches)} 批次发送 [{report_type}]")
-
-    # 逐批发送
+    messages = []
     for i, batch_content in enumerate(batches, 1):
         batch_size = len(batch_content.encode("utf-8"))
-        print(
-            f"发送飞书第 {i}/{len(batches)} 批次，大小：{batch_size} 字节 [{report_type}]"
-        )
 
         # 添加批次标识
         if len(batches) > 1:
@@ -3438,53 +5084,69 @@ def send_to_feishu(
                 # 如果没有统计标题，直接在开头添加
                 batch_content = batch_header + batch_content
 
-        total_titles = sum(
-            len(stat["titles"]) for stat in report_data["stats"] if stat["count"] > 0
-        )
         now = get_beijing_time()
+        messages.append(
+            {
+                "label": f"{i}/{len(batches)}",
+                "size": batch_size,
+                "payload": {
+                    "msg_type": "text",
+                    "content": {
+                        "total_titles": total_titles,
+                        "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
+                        "report_type": report_type,
+                        "text": batch_content,
+                    },
+                },
+            }
+        )
+    return messages
 
-        payload = {
-            "msg_type": "text",
-            "content": {
-                "total_titles": total_titles,
-                "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
-                "report_type": report_type,
-                "text": batch_content,
-            },
-        }
 
-        try:
-            response = requests.post(
-                webhook_url, headers=headers, json=payload, proxies=proxies, timeout=30
-            )
-            if response.status_code == 200:
-                result = response.json()
-                # 检查飞书的响应状态
-                if result.get("StatusCode") == 0 or result.get("code") == 0:
-                    print(f"飞书第 {i}/{len(batches)} 批次发送成功 [{report_type}]")
-                    # 批次间间隔
-                    if i < len(batches):
-                        time.sleep(CONFIG["BATCH_SEND_INTERVAL"])
-                else:
-                    error_msg = result.get("msg") or result.get("StatusMessage", "未知错误")
-                    print(
-                        f"飞书第 {i}/{len(batches)} 批次发送失败 [{report_type}]，错误：{error_msg}"
-                    )
-                    return False
-            else:
-                print(
-                    f"飞书第 {i}/{len(batches)} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
-                )
-                return False
-        except Exception as e:
-            print(f"飞书第 {i}/{len(batches)} 批次发送出错 [{report_type}]：{e}")
-            return False
+def post_feishu_message(
+    webhook_url: str,
+    message: Dict,
+    report_type: str,
+    proxy_url: Optional[str] = None,
+) -> bool:
+    """发送一条飞书分批消息"""
+    headers = {"Content-Type": "application/json"}
+    proxies = None
+    if proxy_url:
+        proxies = {"http": proxy_url, "https": proxy_url}
 
-    print(f"飞书所有 {len(batches)} 批次发送完成 [{report_type}]")
-    return True
+    label = message["label"]
+    print(f"发送飞书第 {label} 批次，大小：{message['size']} 字节 [{report_type}]")
+
+    try:
+        response = post_notification_request(
+            "feishu",
+            webhook_url,
+            f"飞书第 {label} 批次",
+            webhook_url,
+            headers=headers,
+            json=message["payload"],
+            proxies=proxies,
+            timeout=30,
+        )
+        if response.status_code == 200:
+            result = response.json()
+            # 检查飞书的响应状态
+            if result.get("StatusCode") == 0 or result.get("code") == 0:
+                print(f"飞书第 {label} 批次发送成功 [{report_type}]")
+                return True
+            error_msg = result.get("msg") or result.get("StatusMessage", "未知错误")
+            print(f"飞书第 {label} 批次发送失败 [{report_type}]，错误：{error_msg}")
+        else:
+            print(
+                f"飞书第 {label} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
+            )
+    except Exception as e:
+        print(f"飞书第 {label} 批次发送出错 [{report_type}]：{e}")
+    return False
 
 
-def send_to_dingtalk(
+def send_to_feishu(
     webhook_url: str,
     report_data: Dict,
     report_type: str,
@@ -3492,12 +5154,26 @@ def send_to_dingtalk(
     proxy_url: Optional[str] = None,
     mode: str = "daily",
 ) -> bool:
-    """发送到钉钉（支持分批发送）"""
-    headers = {"Content-Type": "application/json"}
-    proxies = None
-    if proxy_url:
-        proxies = {"http": proxy_url, "https": proxy_url}
+    """发送到飞书（支持分批发送）"""
+    messages = build_feishu_messages(report_data, report_type, update_info, mode)
+    print(f"飞书消息分为 {len(messages)} 批次发送 [{report_type}]")
+
+    # 逐批发送（按飞书的频率限制限速）
+    for message in messages:
+        if not post_feishu_message(webhook_url, message, report_type, proxy_url):
+            return False
+
+    print(f"飞书所有 {len(messages)} 批次发送完成 [{report_type}]")
+    return True
+
 
+def build_dingtalk_messages(
+    report_data: Dict,
+    report_type: str,
+    update_info: Optional[Dict] = None,
+    mode: str = "daily",
+) -> List[Dict]:
+    """渲染钉钉分批消息（请求体中不含 webhook 地址）"""
     # 获取分批内容，使用钉钉专用的批次大小
     batches = split_content_into_batches(
         report_data,
@@ -3507,14 +5183,9 @@ def send_to_dingtalk(
         mode=mode,
     )
 
-    print(f"钉钉消息分为 {len(batches)} 批次发送 [{report_type}]")
-
-    # 逐批发送
+    messages = []
     for i, batch_content in enumerate(batches, 1):
         batch_size = len(batch_content.encode("utf-8"))
-        print(
-            f"发送钉钉第 {i}/{len(batches)} 批次，大小：{batch_size} 字节 [{report_type}]"
-        )
 
         # 添加批次标识
         if len(batches) > 1:
@@ -3528,174 +5199,280 @@ def send_to_dingtalk(
                 # 如果没有统计标题，直接在开头添加
                 batch_content = batch_header + batch_content
 
-        payload = {
-            "msgtype": "markdown",
-            "markdown": {
-                "title": f"TrendRadar 热点分析报告 - {report_type}",
-                "text": batch_content,
-            },
-        }
+        messages.append(
+            {
+                "label": f"{i}/{len(batches)}",
+                "size": batch_size,
+                "payload": {
+                    "msgtype": "markdown",
+                    "markdown": {
+                        "title": f"TrendRadar 热点分析报告 - {report_type}",
+                        "text": batch_content,
+                    },
+                },
+            }
+        )
+    return messages
 
-        try:
-            response = requests.post(
-                webhook_url, headers=headers, json=payload, proxies=proxies, timeout=30
+
+def post_dingtalk_message(
+    webhook_url: str,
+    message: Dict,
+    report_type: str,
+    proxy_url: Optional[str] = None,
+) -> bool:
+    """发送一条钉钉分批消息"""
+    headers = {"Content-Type": "application/json"}
+    proxies = None
+    if proxy_url:
+        proxies = {"http": proxy_url, "https": proxy_url}
+
+    label = message["label"]
+    print(f"发送钉钉第 {label} 批次，大小：{message['size']} 字节 [{report_type}]")
+
+    try:
+        response = post_notification_request(
+            "dingtalk",
+            webhook_url,
+            f"钉钉第 {label} 批次",
+            webhook_url,
+            headers=headers,
+            json=message["payload"],
+            proxies=proxies,
+            timeout=30,
+        )
+        if response.status_code == 200:
+            result = response.json()
+            if result.get("errcode") == 0:
+                print(f"钉钉第 {label} 批次发送成功 [{report_type}]")
+                return True
+            print(
+                f"钉钉第 {label} 批次发送失败 [{report_type}]，错误：{result.get('errmsg')}"
             )
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("errcode") == 0:
-                    print(f"钉钉第 {i}/{len(batches)} 批次发送成功 [{report_type}]")
-                    # 批次间间隔
-                    if i < len(batches):
-                        time.sleep(CONFIG["BATCH_SEND_INTERVAL"])
-                else:
-                    print(
-                        f"钉钉第 {i}/{len(batches)} 批次发送失败 [{report_type}]，错误：{result.get('errmsg')}"
-                    )
-                    return False
-            else:
-                print(
-                    f"钉钉第 {i}/{len(batches)} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
-                )
-                return False
-        except Exception as e:
-            print(f"钉钉第 {i}/{len(batches)} 批次发送出错 [{report_type}]：{e}")
+        else:
+            print(
+                f"钉钉第 {label} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
+            )
+    except Exception as e:
+        print(f"钉钉第 {label} 批次发送出错 [{report_type}]：{e}")
+    return False
+
+
+def send_to_dingtalk(
+    webhook_url: str,
+    report_data: Dict,
+    report_type: str,
+    update_info: Optional[Dict] = None,
+    proxy_url: Optional[str] = None,
+    mode: str = "daily",
+) -> bool:
+    """发送到钉钉（支持分批发送）"""
+    messages = build_dingtalk_messages(report_data, report_type, update_info, mode)
+    print(f"钉钉消息分为 {len(messages)} 批次发送 [{report_type}]")
+
+    # 逐批发送（按钉钉的频率限制限速）
+    for message in messages:
+        if not post_dingtalk_message(webhook_url, message, report_type, proxy_url):
             return False
 
-    print(f"钉钉所有 {len(batches)} 批次发送完成 [{report_type}]")
+    print(f"钉钉所有 {len(messages)} 批次发送完成 [{report_type}]")
     return True
 
 
-def send_to_wework(
-    webhook_url: str,
+def build_wework_messages(
     report_data: Dict,
     report_type: str,
     update_info: Optional[Dict] = None,
-    proxy_url: Optional[str] = None,
     mode: str = "daily",
-) -> bool:
-    """发送到企业微信（支持分批发送）"""
-    headers = {"Content-Type": "application/json"}
-    proxies = None
-    if proxy_url:
-        proxies = {"http": proxy_url, "https": proxy_url}
-
+) -> List[Dict]:
+    """渲染企业微信分批消息（请求体中不含 webhook 地址）"""
     # 获取分批内容
     batches = split_content_into_batches(report_data, "wework", update_info, mode=mode)
 
-    print(f"企业微信消息分为 {len(batches)} 批次发送 [{report_type}]")
-
-    # 逐批发送
+    messages = []
     for i, batch_content in enumerate(batches, 1):
         batch_size = len(batch_content.encode("utf-8"))
-        print(
-            f"发送企业微信第 {i}/{len(batches)} 批次，大小：{batch_size} 字节 [{report_type}]"
-        )
 
         # 添加批次标识
         if len(batches) > 1:
             batch_header = f"**[第 {i}/{len(batches)} 批次]**\n\n"
             batch_content = batch_header + batch_content
 
-        payload = {"msgtype": "markdown", "markdown": {"content": batch_content}}
+        messages.append(
+            {
+                "label": f"{i}/{len(batches)}",
+                "size": batch_size,
+                "payload": {"msgtype": "markdown", "markdown": {"content": batch_content}},
+            }
+        )
+    return messages
 
-        try:
-            response = requests.post(
-                webhook_url, headers=headers, json=payload, proxies=proxies, timeout=30
-            )
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("errcode") == 0:
-                    print(f"企业微信第 {i}/{len(batches)} 批次发送成功 [{report_type}]")
-                    # 批次间间隔
-                    if i < len(batches):
-                        time.sleep(CONFIG["BATCH_SEND_INTERVAL"])
-                else:
-                    print(
-                        f"企业微信第 {i}/{len(batches)} 批次发送失败 [{report_type}]，错误：{result.get('errmsg')}"
-                    )
-                    return False
-            else:
-                print(
-                    f"企业微信第 {i}/{len(batches)} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
-                )
-                return False
-        except Exception as e:
-            print(f"企业微信第 {i}/{len(batches)} 批次发送出错 [{report_type}]：{e}")
-            return False
 
-    print(f"企业微信所有 {len(batches)} 批次发送完成 [{report_type}]")
-    return True
+def post_wework_message(
+    webhook_url: str,
+    message: Dict,
+    report_type: str,
+    proxy_url: Optional[str] = None,
+) -> bool:
+    """发送一条企业微信分批消息"""
+    headers = {"Content-Type": "application/json"}
+    proxies = None
+    if proxy_url:
+        proxies = {"http": proxy_url, "https": proxy_url}
 
+    label = message["label"]
+    print(f"发送企业微信第 {label} 批次，大小：{message['size']} 字节 [{report_type}]")
 
-def send_to_telegram(
-    bot_token: str,
-    chat_id: str,
+    try:
+        response = post_notification_request(
+            "wework",
+            webhook_url,
+            f"企业微信第 {label} 批次",
+            webhook_url,
+            headers=headers,
+            json=message["payload"],
+            proxies=proxies,
+            timeout=30,
+        )
+        if response.status_code == 200:
+            result = response.json()
+            if result.get("errcode") == 0:
+                print(f"企业微信第 {label} 批次发送成功 [{report_type}]")
+                return True
+            print(
+                f"企业微信第 {label} 批次发送失败 [{report_type}]，错误：{result.get('errmsg')}"
+            )
+        else:
+            print(
+                f"企业微信第 {label} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
+            )
+    except Exception as e:
+        print(f"企业微信第 {label} 批次发送出错 [{report_type}]：{e}")
+    return False
+
+
+def send_to_wework(
+    webhook_url: str,
     report_data: Dict,
     report_type: str,
     update_info: Optional[Dict] = None,
     proxy_url: Optional[str] = None,
     mode: str = "daily",
 ) -> bool:
-    """发送到Telegram（支持分批发送）"""
-    headers = {"Content-Type": "application/json"}
-    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+    """发送到企业微信（支持分批发送）"""
+    messages = build_wework_messages(report_data, report_type, update_info, mode)
+    print(f"企业微信消息分为 {len(messages)} 批次发送 [{report_type}]")
 
-    proxies = None
-    if proxy_url:
-        proxies = {"http": proxy_url, "https": proxy_url}
+    # 逐批发送（按企业微信的频率限制限速）
+    for message in messages:
+        if not post_wework_message(webhook_url, message, report_type, proxy_url):
+            return False
+
+    print(f"企业微信所有 {len(messages)} 批次发送完成 [{report_type}]")
+    return True
 
+
+def build_telegram_messages(
+    report_data: Dict,
+    report_type: str,
+    update_info: Optional[Dict] = None,
+    mode: str = "daily",
+) -> List[Dict]:
+    """渲染 Telegram 分批消息（请求体中不含 chat_id，发送时补充）"""
     # 获取分批内容
     batches = split_content_into_batches(
         report_data, "telegram", update_info, mode=mode
     )
 
-    print(f"Telegram消息分为 {len(batches)} 批次发送 [{report_type}]")
-
-    # 逐批发送
+    messages = []
     for i, batch_content in enumerate(batches, 1):
         batch_size = len(batch_content.encode("utf-8"))
-        print(
-            f"发送Telegram第 {i}/{len(batches)} 批次，大小：{batch_size} 字节 [{report_type}]"
-        )
 
         # 添加批次标识
         if len(batches) > 1:
             batch_header = f"<b>[第 {i}/{len(batches)} 批次]</b>\n\n"
             batch_content = batch_header + batch_content
 
-        payload = {
-            "chat_id": chat_id,
-            "text": batch_content,
-            "parse_mode": "HTML",
-            "disable_web_page_preview": True,
-        }
+        messages.append(
+            {
+                "label": f"{i}/{len(batches)}",
+                "size": batch_size,
+                "payload": {
+                    "text": batch_content,
+                    "parse_mode": "HTML",
+                    "disable_web_page_preview": True,
+                },
+            }
+        )
+    return messages
 
-        try:
-            response = requests.post(
-                url, headers=headers, json=payload, proxies=proxies, timeout=30
+
+def post_telegram_message(
+    bot_token: str,
+    chat_id: str,
+    message: Dict,
+    report_type: str,
+    proxy_url: Optional[str] = None,
+) -> bool:
+    """发送一条 Telegram 分批消息"""
+    headers = {"Content-Type": "application/json"}
+    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+
+    proxies = None
+    if proxy_url:
+        proxies = {"http": proxy_url, "https": proxy_url}
+
+    label = message["label"]
+    print(f"发送Telegram第 {label} 批次，大小：{message['size']} 字节 [{report_type}]")
+
+    payload = {"chat_id": chat_id, **message["payload"]}
+    try:
+        response = post_notification_request(
+            "telegram",
+            f"{bot_token}:{chat_id}",
+            f"Telegram第 {label} 批次",
+            url,
+            headers=headers,
+            json=payload,
+            proxies=proxies,
+            timeout=30,
+        )
+        if response.status_code == 200:
+            result = response.json()
+            if result.get("ok"):
+                print(f"Telegram第 {label} 批次发送成功 [{report_type}]")
+                return True
+            print(
+                f"Telegram第 {label} 批次发送失败 [{report_type}]，错误：{result.get('description')}"
             )
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("ok"):
-                    print(f"Telegram第 {i}/{len(batches)} 批次发送成功 [{report_type}]")
-                    # 批次间间隔
-                    if i < len(batches):
-                        time.sleep(CONFIG["BATCH_SEND_INTERVAL"])
-                else:
-                    print(
-                        f"Telegram第 {i}/{len(batches)} 批次发送失败 [{report_type}]，错误：{result.get('description')}"
-                    )
-                    return False
-            else:
-                print(
-                    f"Telegram第 {i}/{len(batches)} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
-                )
-                return False
-        except Exception as e:
-            print(f"Telegram第 {i}/{len(batches)} 批次发送出错 [{report_type}]：{e}")
+        else:
+            print(
+                f"Telegram第 {label} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
+            )
+    except Exception as e:
+        print(f"Telegram第 {label} 批次发送出错 [{report_type}]：{e}")
+    return False
+
+
+def send_to_telegram(
+    bot_token: str,
+    chat_id: str,
+    report_data: Dict,
+    report_type: str,
+    update_info: Optional[Dict] = None,
+    proxy_url: Optional[str] = None,
+    mode: str = "daily",
+) -> bool:
+    """发送到Telegram（支持分批发送）"""
+    messages = build_telegram_messages(report_data, report_type, update_info, mode)
+    print(f"Telegram消息分为 {len(messages)} 批次发送 [{report_type}]")
+
+    # 逐批发送（按Telegram的频率限制限速）
+    for message in messages:
+        if not post_telegram_message(bot_token, chat_id, message, report_type, proxy_url):
             return False
 
-    print(f"Telegram所有 {len(batches)} 批次发送完成 [{report_type}]")
+    print(f"Telegram所有 {len(messages)} 批次发送完成 [{report_type}]")
     return True
 
 
@@ -3832,154 +5609,584 @@ TrendRadar 热点分析报告
         return False
 
 
-def send_to_ntfy(
-    server_url: str,
-    topic: str,
-    token: Optional[str],
+def build_ntfy_messages(
+    report_data: Dict,
+    report_type: str,
+    update_info: Optional[Dict] = None,
+    mode: str = "daily",
+) -> List[Dict]:
+    """渲染 ntfy 分批消息，按推送顺序排列（请求头中不含访问令牌）"""
+    # 避免 HTTP header 编码问题
+    report_type_en_map = {
+        "当日汇总": "Daily Summary",
+        "当前榜单汇总": "Current Ranking",
+        "增量更新": "Incremental Update",
+        "实时增量": "Realtime Incremental", 
+        "实时当前榜单": "Realtime Current Ranking",  
+    }
+    report_type_en = report_type_en_map.get(report_type, "News Report") 
+
+    headers = {
+        "Content-Type": "text/plain; charset=utf-8",
+        "Markdown": "yes",
+        "Title": report_type_en,
+        "Priority": "default",
+        "Tags": "news",
+    }
+
+    # 获取分批内容，使用ntfy专用的4KB限制
+    batches = split_content_into_batches(
+        report_data, "ntfy", update_info, max_bytes=3800, mode=mode
+    )
+    total_batches = len(batches)
+
+    # 反转批次顺序，使得在ntfy客户端显示时顺序正确
+    # ntfy显示最新消息在上面，所以我们从最后一批开始推送
+    messages = []
+    for idx, batch_content in enumerate(reversed(batches), 1):
+        # 计算正确的批次编号（用户视角的编号）
+        actual_batch_num = total_batches - idx + 1
+        batch_size = len(batch_content.encode("utf-8"))
+
+        # 添加批次标识（使用正确的批次编号）
+        current_headers = headers.copy()
+        if total_batches > 1:
+            batch_header = f"**[第 {actual_batch_num}/{total_batches} 批次]**\n\n"
+            batch_content = batch_header + batch_content
+            current_headers["Title"] = (
+                f"{report_type_en} ({actual_batch_num}/{total_batches})"
+            )
+
+        messages.append(
+            {
+                "label": f"{actual_batch_num}/{total_batches}",
+                "push_label": f"{idx}/{total_batches}",
+                "size": batch_size,
+                "headers": current_headers,
+                "body": batch_content,
+            }
+        )
+    return messages
+
+
+def get_ntfy_url(server_url: str, topic: str) -> str:
+    """构建完整的 ntfy 推送地址"""
+    base_url = server_url.rstrip("/")
+    if not base_url.startswith(("http://", "https://")):
+        base_url = f"https://{base_url}"
+    return f"{base_url}/{topic}"
+
+
+def post_ntfy_message(
+    server_url: str,
+    topic: str,
+    token: Optional[str],
+    message: Dict,
+    report_type: str,
+    proxy_url: Optional[str] = None,
+) -> bool:
+    """发送一条 ntfy 分批消息"""
+    url = get_ntfy_url(server_url, topic)
+    headers = dict(message["headers"])
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    proxies = None
+    if proxy_url:
+        proxies = {"http": proxy_url, "https": proxy_url}
+
+    label = message["label"]
+    batch_size = message["size"]
+    print(
+        f"发送ntfy第 {label} 批次（推送顺序: {message['push_label']}），大小：{batch_size} 字节 [{report_type}]"
+    )
+
+    # 检查消息大小，确保不超过4KB
+    if batch_size > 4096:
+        print(f"警告：ntfy第 {label.split('/')[0]} 批次消息过大（{batch_size} 字节），可能被拒绝")
+
+    data = message["body"].encode("utf-8")
+    try:
+        response = post_notification_request(
+            "ntfy",
+            url,
+            f"ntfy第 {label} 批次",
+            url,
+            headers=headers,
+            data=data,
+            proxies=proxies,
+            timeout=30,
+        )
+
+        if response.status_code == 200:
+            print(f"ntfy第 {label} 批次发送成功 [{report_type}]")
+            return True
+        elif response.status_code == 413:
+            print(
+                f"ntfy第 {label} 批次消息过大被拒绝 [{report_type}]，消息大小：{batch_size} 字节"
+            )
+        else:
+            print(
+                f"ntfy第 {label} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
+            )
+            try:
+                print(f"错误详情：{response.text}")
+            except:
+                pass
+
+    except requests.exceptions.ConnectTimeout:
+        print(f"ntfy第 {label} 批次连接超时 [{report_type}]")
+    except requests.exceptions.ReadTimeout:
+        print(f"ntfy第 {label} 批次读取超时 [{report_type}]")
+    except requests.exceptions.ConnectionError as e:
+        print(f"ntfy第 {label} 批次连接错误 [{report_type}]：{e}")
+    except Exception as e:
+        print(f"ntfy第 {label} 批次发送异常 [{report_type}]：{e}")
+    return False
+
+
+def send_to_ntfy(
+    server_url: str,
+    topic: str,
+    token: Optional[str],
+    report_data: Dict,
+    report_type: str,
+    update_info: Optional[Dict] = None,
+    proxy_url: Optional[str] = None,
+    mode: str = "daily",
+) -> bool:
+    """发送到ntfy（支持分批发送，严格遵守4KB限制）"""
+    messages = build_ntfy_messages(report_data, report_type, update_info, mode)
+    total_batches = len(messages)
+    print(f"ntfy消息分为 {total_batches} 批次发送 [{report_type}]")
+    print(f"ntfy将按反向顺序推送（最后批次先推送），确保客户端显示顺序正确")
+
+    # 逐批发送（反向顺序，按 ntfy 的频率限制限速）
+    success_count = 0
+    for message in messages:
+        if post_ntfy_message(server_url, topic, token, message, report_type, proxy_url):
+            success_count += 1
+
+    # 判断整体发送是否成功
+    if success_count == total_batches:
+        print(f"ntfy所有 {total_batches} 批次发送完成 [{report_type}]")
+        return True
+    elif success_count > 0:
+        print(f"ntfy部分发送成功：{success_count}/{total_batches} 批次 [{report_type}]")
+        return True  # 部分成功也视为成功
+    else:
+        print(f"ntfy发送完全失败 [{report_type}]")
+        return False
+
+
+# === 通知发件箱 ===
+def get_configured_channels(channels: Dict) -> List[str]:
+    """已配置的通知渠道（按推送顺序）"""
+    configured = []
+    if channels["FEISHU_WEBHOOK_URL"]:
+        configured.append("feishu")
+    if channels["DINGTALK_WEBHOOK_URL"]:
+        configured.append("dingtalk")
+    if channels["WEWORK_WEBHOOK_URL"]:
+        configured.append("wework")
+    if channels["TELEGRAM_BOT_TOKEN"] and channels["TELEGRAM_CHAT_ID"]:
+        configured.append("telegram")
+    if channels["NTFY_SERVER_URL"] and channels["NTFY_TOPIC"]:
+        configured.append("ntfy")
+    if channels["EMAIL_FROM"] and channels["EMAIL_PASSWORD"] and channels["EMAIL_TO"]:
+        configured.append("email")
+    return configured
+
+
+def get_profile_channels(profile_name: str) -> Optional[Dict]:
+    """订阅当前的通知渠道配置，订阅已不存在时返回 None"""
+    for profile in get_subscription_profiles():
+        if profile.name == profile_name:
+            return profile.channels
+    return None
+
+
+def send_to_channel(
+    channel: str,
+    channels: Dict,
+    report_data: Dict,
+    report_type: str,
+    update_info: Optional[Dict] = None,
+    proxy_url: Optional[str] = None,
+    mode: str = "daily",
+    html_file_path: Optional[str] = None,
+) -> bool:
+    """直接发送到某个渠道（不经过发件箱）"""
+    if channel == "feishu":
+        return send_to_feishu(
+            channels["FEISHU_WEBHOOK_URL"], report_data, report_type, update_info, proxy_url, mode
+        )
+    if channel == "dingtalk":
+        return send_to_dingtalk(
+            channels["DINGTALK_WEBHOOK_URL"], report_data, report_type, update_info, proxy_url, mode
+        )
+    if channel == "wework":
+        return send_to_wework(
+            channels["WEWORK_WEBHOOK_URL"], report_data, report_type, update_info, proxy_url, mode
+        )
+    if channel == "telegram":
+        return send_to_telegram(
+            channels["TELEGRAM_BOT_TOKEN"],
+            channels["TELEGRAM_CHAT_ID"],
+            report_data,
+            report_type,
+            update_info,
+            proxy_url,
+            mode,
+        )
+    if channel == "ntfy":
+        return send_to_ntfy(
+            channels["NTFY_SERVER_URL"],
+            channels["NTFY_TOPIC"],
+            channels.get("NTFY_TOKEN", ""),
+            report_data,
+            report_type,
+            update_info,
+            proxy_url,
+            mode,
+        )
+    if channel == "email":
+        return send_to_email(
+            channels["EMAIL_FROM"],
+            channels["EMAIL_PASSWORD"],
+            channels["EMAIL_TO"],
+            report_type,
+            html_file_path,
+            channels.get("EMAIL_SMTP_SERVER", ""),
+            channels.get("EMAIL_SMTP_PORT", ""),
+        )
+    raise ValueError(f"未知的通知渠道: {channel}")
+
+
+def build_channel_messages(
+    channel: str,
     report_data: Dict,
     report_type: str,
     update_info: Optional[Dict] = None,
-    proxy_url: Optional[str] = None,
     mode: str = "daily",
+    html_file_path: Optional[str] = None,
+) -> List[Dict]:
+    """渲染某个渠道的分批消息，消息中不含 webhook 地址、令牌等敏感信息"""
+    if channel == "feishu":
+        return build_feishu_messages(report_data, report_type, update_info, mode)
+    if channel == "dingtalk":
+        return build_dingtalk_messages(report_data, report_type, update_info, mode)
+    if channel == "wework":
+        return build_wework_messages(report_data, report_type, update_info, mode)
+    if channel == "telegram":
+        return build_telegram_messages(report_data, report_type, update_info, mode)
+    if channel == "ntfy":
+        return build_ntfy_messages(report_data, report_type, update_info, mode)
+    if channel == "email":
+        # 邮件发送时读取 HTML 报告文件
+        return [{"label": "1/1", "html_file_path": html_file_path}]
+    raise ValueError(f"未知的通知渠道: {channel}")
+
+
+def deliver_channel_message(
+    channel: str,
+    channels: Dict,
+    message: Dict,
+    report_type: str,
+    proxy_url: Optional[str] = None,
 ) -> bool:
-    """发送到ntfy（支持分批发送，严格遵守4KB限制）"""
-    # 避免 HTTP header 编码问题
-    report_type_en_map = {
-        "当日汇总": "Daily Summary",
-        "当前榜单汇总": "Current Ranking",
-        "增量更新": "Incremental Update",
-        "实时增量": "Realtime Incremental", 
-        "实时当前榜单": "Realtime Current Ranking",  
-    }
-    report_type_en = report_type_en_map.get(report_type, "News Report") 
+    """发送一条已渲染的分批消息，webhook 地址和令牌从当前配置中读取"""
+    if channel == "feishu":
+        return post_feishu_message(
+            channels["FEISHU_WEBHOOK_URL"], message, report_type, proxy_url
+        )
+    if channel == "dingtalk":
+        return post_dingtalk_message(
+            channels["DINGTALK_WEBHOOK_URL"], message, report_type, proxy_url
+        )
+    if channel == "wework":
+        return post_wework_message(
+            channels["WEWORK_WEBHOOK_URL"], message, report_type, proxy_url
+        )
+    if channel == "telegram":
+        return post_telegram_message(
+            channels["TELEGRAM_BOT_TOKEN"],
+            channels["TELEGRAM_CHAT_ID"],
+            message,
+            report_type,
+            proxy_url,
+        )
+    if channel == "ntfy":
+        return post_ntfy_message(
+            channels["NTFY_SERVER_URL"],
+            channels["NTFY_TOPIC"],
+            channels.get("NTFY_TOKEN", ""),
+            message,
+            report_type,
+            proxy_url,
+        )
+    if channel == "email":
+        return send_to_email(
+            channels["EMAIL_FROM"],
+            channels["EMAIL_PASSWORD"],
+            channels["EMAIL_TO"],
+            report_type,
+            message["html_file_path"],
+            channels.get("EMAIL_SMTP_SERVER", ""),
+            channels.get("EMAIL_SMTP_PORT", ""),
+        )
+    raise ValueError(f"未知的通知渠道: {channel}")
 
-    headers = {
-        "Content-Type": "text/plain; charset=utf-8",
-        "Markdown": "yes",
-        "Title": report_type_en,
-        "Priority": "default",
-        "Tags": "news",
-    }
 
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-    
-    # 构建完整URL，确保格式正确
-    base_url = server_url.rstrip("/")
-    if not base_url.startswith(("http://", "https://")):
-        base_url = f"https://{base_url}"
-    url = f"{base_url}/{topic}"
+class NotificationOutbox:
+    """通知发件箱
 
-    proxies = None
-    if proxy_url:
-        proxies = {"http": proxy_url, "https": proxy_url}
+    每个渠道的一次推送是 output/.outbox 下的一个任务文件，保存已渲染的分批消息、
+    下一个待发送的批次和重试状态；webhook 地址、令牌等只在发送时从配置中读取，不写入文件。
+    批次发送失败时任务按指数退避等待，之后从第一个未发送的批次继续。
+    同一订阅同一渠道的任务按创建顺序发送，某个渠道积压时不影响其他渠道。
+    """
 
-    # 获取分批内容，使用ntfy专用的4KB限制
-    batches = split_content_into_batches(
-        report_data, "ntfy", update_info, max_bytes=3800, mode=mode
-    )
+    def __init__(self, outbox_dir: Optional[Path] = None):
+        self.outbox_dir = outbox_dir or Path("output") / ".outbox"
+        self.base_delay = CONFIG["OUTBOX"]["BASE_DELAY"]
+        self.max_delay = CONFIG["OUTBOX"]["MAX_DELAY"]
+        self.max_attempts = CONFIG["OUTBOX"]["MAX_ATTEMPTS"]
+        self.max_age = CONFIG["OUTBOX"]["MAX_AGE_HOURS"] * 3600
+
+    @staticmethod
+    def _channel_label(profile_name: str, channel: str) -> str:
+        return f"{profile_name}/{channel}" if profile_name else channel
+
+    def _job_file(self, job: Dict) -> Path:
+        return self.outbox_dir / f"{job['id']}.json"
+
+    def _save(self, job: Dict) -> None:
+        self.outbox_dir.mkdir(parents=True, exist_ok=True)
+        job_file = self._job_file(job)
+        tmp_file = job_file.with_name(job_file.name + ".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(job, f, ensure_ascii=False)
+        tmp_file.replace(job_file)
+
+    def _remove(self, job: Dict) -> None:
+        self._job_file(job).unlink(missing_ok=True)
+
+    def _load_jobs(self) -> List[Dict]:
+        """全部任务，按创建顺序排列"""
+        if not self.outbox_dir.exists():
+            return []
+
+        jobs = []
+        for job_file in self.outbox_dir.glob("*.json"):
+            try:
+                with open(job_file, "r", encoding="utf-8") as f:
+                    jobs.append(json.load(f))
+            except FileNotFoundError:
+                # 其他渠道的发送线程刚刚完成并删除了任务
+                continue
+            except Exception as e:
+                print(f"推送任务文件 {job_file.name} 无法读取，已删除: {e}")
+                job_file.unlink(missing_ok=True)
+        jobs.sort(key=lambda job: (job["created_at"], job["id"]))
+        return jobs
+
+    def _channel_jobs(self, profile_name: str, channel: str) -> List[Dict]:
+        now = time.time()
+        jobs = []
+        for job in self._load_jobs():
+            if job["profile"] != profile_name or job["channel"] != channel:
+                continue
+            if now - job["created_at"] > self.max_age:
+                print(
+                    f"{self._channel_label(profile_name, channel)} 的{job['report_type']}推送超过 "
+                    f"{CONFIG['OUTBOX']['MAX_AGE_HOURS']} 小时仍未发完，已丢弃"
+                )
+                self._remove(job)
+                continue
+            jobs.append(job)
+        return jobs
 
-    total_batches = len(batches)
-    print(f"ntfy消息分为 {total_batches} 批次发送 [{report_type}]")
+    def enqueue(
+        self,
+        profile_name: str,
+        channel: str,
+        report_type: str,
+        mode: str,
+        messages: List[Dict],
+    ) -> Dict:
+        """
+        保存一个渠道的推送任务
 
-    # 反转批次顺序，使得在ntfy客户端显示时顺序正确
-    # ntfy显示最新消息在上面，所以我们从最后一批开始推送
-    reversed_batches = list(reversed(batches))
-    
-    print(f"ntfy将按反向顺序推送（最后批次先推送），确保客户端显示顺序正确")
+        Args:
+            profile_name: 订阅名称，默认订阅为空字符串
+            channel: 渠道名称
+            report_type: 报告类型
+            mode: 报告模式，汇总类报告（非 incremental）会取代同一渠道尚未开始发送的旧报告
+            messages: build_channel_messages 渲染的分批消息
 
-    # 逐批发送（反向顺序）
-    success_count = 0
-    for idx, batch_content in enumerate(reversed_batches, 1):
-        # 计算正确的批次编号（用户视角的编号）
-        actual_batch_num = total_batches - idx + 1
-        
-        batch_size = len(batch_content.encode("utf-8"))
-        print(
-            f"发送ntfy第 {actual_batch_num}/{total_batches} 批次（推送顺序: {idx}/{total_batches}），大小：{batch_size} 字节 [{report_type}]"
-        )
+        Returns:
+            任务
+        """
+        if mode != "incremental":
+            for job in self._channel_jobs(profile_name, channel):
+                if (
+                    job["report_type"] == report_type
+                    and job["mode"] != "incremental"
+                    and job["next_index"] == 0
+                ):
+                    print(
+                        f"{self._channel_label(profile_name, channel)} 尚未发送的{report_type}已被新报告取代"
+                    )
+                    self._remove(job)
 
-        # 检查消息大小，确保不超过4KB
-        if batch_size > 4096:
-            print(f"警告：ntfy第 {actual_batch_num} 批次消息过大（{batch_size} 字节），可能被拒绝")
+        now = time.time()
+        job = {
+            "id": f"{int(now * 1000)}_{channel}_{os.urandom(3).hex()}",
+            "profile": profile_name,
+            "channel": channel,
+            "report_type": report_type,
+            "mode": mode,
+            "created_at": now,
+            "messages": messages,
+            "next_index": 0,
+            "attempts": 0,
+            "next_attempt_at": 0,
+        }
+        self._save(job)
+        return job
 
-        # 添加批次标识（使用正确的批次编号）
-        current_headers = headers.copy()
-        if total_batches > 1:
-            batch_header = f"**[第 {actual_batch_num}/{total_batches} 批次]**\n\n"
-            batch_content = batch_header + batch_content
-            current_headers["Title"] = (
-                f"{report_type_en} ({actual_batch_num}/{total_batches})"
-            )
+    def flush_channel(
+        self,
+        profile_name: str,
+        channel: str,
+        channels: Dict,
+        proxy_url: Optional[str] = None,
+    ) -> bool:
+        """
+        按创建顺序发送某个订阅某个渠道的待发任务
 
-        try:
-            response = requests.post(
-                url,
-                headers=current_headers,
-                data=batch_content.encode("utf-8"),
-                proxies=proxies,
-                timeout=30,
-            )
+        Args:
+            profile_name: 订阅名称
+            channel: 渠道名称
+            channels: 该订阅当前的通知渠道配置
+            proxy_url: 代理地址
+
+        Returns:
+            所有任务都已发送完成时为 True；有批次失败（任务保留等待重试）、仍在退避等待
+            或因失败次数过多被放弃时为 False
+        """
+        label = self._channel_label(profile_name, channel)
+        delivered = True
+
+        for job in self._channel_jobs(profile_name, channel):
+            wait_seconds = job["next_attempt_at"] - time.time()
+            if wait_seconds > 0:
+                print(f"{label} 有待重试的推送，{int(wait_seconds)} 秒后再发送")
+                return False
 
-            if response.status_code == 200:
-                print(f"ntfy第 {actual_batch_num}/{total_batches} 批次发送成功 [{report_type}]")
-                success_count += 1
-                if idx < total_batches:
-                    # 公共服务器建议 2-3 秒，自托管可以更短
-                    interval = 2 if "ntfy.sh" in server_url else 1
-                    time.sleep(interval)
-            elif response.status_code == 429:
+            messages = job["messages"]
+            report_type = job["report_type"]
+            if job["next_index"]:
                 print(
-                    f"ntfy第 {actual_batch_num}/{total_batches} 批次速率限制 [{report_type}]，等待后重试"
-                )
-                time.sleep(10)  # 等待10秒后重试
-                # 重试一次
-                retry_response = requests.post(
-                    url,
-                    headers=current_headers,
-                    data=batch_content.encode("utf-8"),
-                    proxies=proxies,
-                    timeout=30,
+                    f"{label} 从第 {job['next_index'] + 1}/{len(messages)} 批次继续发送 [{report_type}]"
                 )
-                if retry_response.status_code == 200:
-                    print(f"ntfy第 {actual_batch_num}/{total_batches} 批次重试成功 [{report_type}]")
-                    success_count += 1
-                else:
+
+            while job["next_index"] < len(messages):
+                message = messages[job["next_index"]]
+                if not deliver_channel_message(channel, channels, message, report_type, proxy_url):
+                    job["attempts"] += 1
+                    if job["attempts"] >= self.max_attempts:
+                        print(
+                            f"{label} 第 {message['label']} 批次连续失败 {job['attempts']} 次，放弃该推送 [{report_type}]"
+                        )
+                        self._remove(job)
+                        delivered = False
+                        break
+
+                    delay = min(self.max_delay, self.base_delay * 2 ** (job["attempts"] - 1))
+                    # 被限流时等到限流结束再重试，避免在封禁期内重试而延长封禁
+                    delay = max(delay, math.ceil(get_rate_limit_delay(channel, channels)))
+                    job["next_attempt_at"] = time.time() + delay
+                    self._save(job)
                     print(
-                        f"ntfy第 {actual_batch_num}/{total_batches} 批次重试失败，状态码：{retry_response.status_code}"
+                        f"{label} 第 {message['label']} 批次发送失败，{delay} 秒后从该批次重试 [{report_type}]"
                     )
-            elif response.status_code == 413:
-                print(
-                    f"ntfy第 {actual_batch_num}/{total_batches} 批次消息过大被拒绝 [{report_type}]，消息大小：{batch_size} 字节"
-                )
+                    return False
+
+                job["next_index"] += 1
+                job["attempts"] = 0
+                if job["next_index"] < len(messages):
+                    self._save(job)
             else:
+                self._remove(job)
+                self._record_push(job)
+
+        return delivered
+
+    @staticmethod
+    def _record_push(job: Dict) -> None:
+        """任务发送完成（包括重试后才完成的任务）时记录推送，推送时间窗口每天只推一次时不再重复推送"""
+        if CONFIG["PUSH_WINDOW"]["ENABLED"] and CONFIG["PUSH_WINDOW"]["ONCE_PER_DAY"]:
+            PushRecordManager(job["profile"]).record_push(job["report_type"])
+
+    def due_channels(self) -> List[Tuple[str, str]]:
+        """最早的任务已到发送时间的 (订阅名称, 渠道)"""
+        now = time.time()
+        due = []
+        seen = set()
+        for job in self._load_jobs():
+            key = (job["profile"], job["channel"])
+            if key in seen:
+                continue
+            seen.add(key)
+            if job["next_attempt_at"] <= now:
+                due.append(key)
+        return due
+
+    def flush(self, proxy_url: Optional[str] = None) -> Dict[str, bool]:
+        """发送所有到期的待发任务（各渠道并行），返回 {订阅/渠道: 是否全部发送完成}"""
+        senders = []
+        for profile_name, channel in self.due_channels():
+            channels = get_profile_channels(profile_name)
+            if channels is None or channel not in get_configured_channels(channels):
                 print(
-                    f"ntfy第 {actual_batch_num}/{total_batches} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
+                    f"推送任务的订阅或渠道已不在配置中，丢弃: {self._channel_label(profile_name, channel)}"
                 )
-                try:
-                    print(f"错误详情：{response.text}")
-                except:
-                    pass
-
-        except requests.exceptions.ConnectTimeout:
-            print(f"ntfy第 {actual_batch_num}/{total_batches} 批次连接超时 [{report_type}]")
-        except requests.exceptions.ReadTimeout:
-            print(f"ntfy第 {actual_batch_num}/{total_batches} 批次读取超时 [{report_type}]")
-        except requests.exceptions.ConnectionError as e:
-            print(f"ntfy第 {actual_batch_num}/{total_batches} 批次连接错误 [{report_type}]：{e}")
-        except Exception as e:
-            print(f"ntfy第 {actual_batch_num}/{total_batches} 批次发送异常 [{report_type}]：{e}")
+                for job in self._channel_jobs(profile_name, channel):
+                    self._remove(job)
+                continue
 
-    # 判断整体发送是否成功
-    if success_count == total_batches:
-        print(f"ntfy所有 {total_batches} 批次发送完成 [{report_type}]")
-        return True
-    elif success_count > 0:
-        print(f"ntfy部分发送成功：{success_count}/{total_batches} 批次 [{report_type}]")
-        return True  # 部分成功也视为成功
-    else:
-        print(f"ntfy发送完全失败 [{report_type}]")
-        return False
+            senders.append(
+                (
+                    self._channel_label(profile_name, channel),
+                    lambda profile_name=profile_name, channel=channel, channels=channels: self.flush_channel(
+                        profile_name, channel, channels, proxy_url
+                    ),
+                )
+            )
+
+        if not senders:
+            return {}
+        print(f"补发发件箱中的推送: {', '.join(name for name, _ in senders)}")
+        return dispatch_notifications(senders, CONFIG["CONCURRENT_SEND"])
+
+
+def flush_notification_outbox(proxy_url: Optional[str] = None) -> Dict[str, bool]:
+    """补发发件箱中到期的推送任务（通知关闭或不在推送时间窗口内时不发送）"""
+    if not CONFIG["OUTBOX"]["ENABLED"] or not CONFIG["ENABLE_NOTIFICATION"]:
+        return {}
+
+    outbox = NotificationOutbox()
+    if not outbox.due_channels():
+        return {}
+
+    if CONFIG["PUSH_WINDOW"]["ENABLED"]:
+        time_range = CONFIG["PUSH_WINDOW"]["TIME_RANGE"]
+        if not PushRecordManager().is_in_time_range(time_range["START"], time_range["END"]):
+            return {}
+
+    return outbox.flush(proxy_url)
 
 
 # === 主分析器 ===
@@ -4026,7 +6233,18 @@ class NewsAnalyzer:
         self.update_info = None
         self.proxy_url = None
         self._setup_proxy()
-        self.data_fetcher = DataFetcher(self.proxy_url)
+        self.data_fetcher = DataFetcher(
+            self.proxy_url, CONFIG["MAX_CRAWL_WORKERS"], CONFIG["PER_HOST_CONCURRENCY"]
+        )
+        self.snapshot_unchanged = False
+        self.notify_enabled = True
+        # 本轮数据的最新快照是否只包含部分平台，由 _sync_profile 从 DayContext 同步
+        self.partial_snapshot = False
+        # 当前处理的订阅，各阶段的频率词、报告模式和通知渠道都来自它
+        self.profile = get_subscription_profiles()[0]
+        self.polling_planner = (
+            AdaptivePollingPlanner() if CONFIG["ADAPTIVE_POLLING"]["ENABLED"] else None
+        )
 
         if self.is_github_actions:
             self._check_version_update()
@@ -4081,21 +6299,21 @@ class NewsAnalyzer:
         return self.MODE_STRATEGIES.get(self.report_mode, self.MODE_STRATEGIES["daily"])
 
     def _has_notification_configured(self) -> bool:
-        """检查是否配置了任何通知渠道"""
-        return any(
-            [
-                CONFIG["FEISHU_WEBHOOK_URL"],
-                CONFIG["DINGTALK_WEBHOOK_URL"],
-                CONFIG["WEWORK_WEBHOOK_URL"],
-                (CONFIG["TELEGRAM_BOT_TOKEN"] and CONFIG["TELEGRAM_CHAT_ID"]),
-                (
-                    CONFIG["EMAIL_FROM"]
-                    and CONFIG["EMAIL_PASSWORD"]
-                    and CONFIG["EMAIL_TO"]
-                ),
-                (CONFIG["NTFY_SERVER_URL"] and CONFIG["NTFY_TOPIC"]),
-            ]
-        )
+        """检查当前订阅是否配置了任何通知渠道"""
+        return self.profile.has_channels()
+
+    def _use_profile(self, profile: SubscriptionProfile, profile_count: int) -> None:
+        """切换到指定订阅"""
+        self.profile = profile
+        self.report_mode = profile.report_mode
+        if profile_count > 1:
+            print(f"=== 订阅: {profile.label}（{self._get_mode_strategy()['mode_name']}）===")
+
+    def _sync_profile(self, context: DayContext) -> None:
+        """当前订阅不属于该上下文时（未经 run 调用）改用上下文中的默认订阅"""
+        if self.profile not in context.profiles:
+            self.profile = context.profiles[0]
+        self.partial_snapshot = context.partial_snapshot
 
     def _has_valid_content(
         self, stats: List[Dict], new_titles: Optional[Dict] = None
@@ -4113,63 +6331,35 @@ class NewsAnalyzer:
             return has_matched_news or has_new_news
 
     def _load_analysis_data(
-        self,
+        self, context: Optional[DayContext] = None
     ) -> Optional[Tuple[Dict, Dict, Dict, Dict, List, List]]:
-        """统一的数据加载和预处理，使用当前监控平台列表过滤历史数据"""
+        """统一的数据加载和预处理，使用当前监控平台列表过滤历史数据，context 为本轮已构建的当天数据"""
         try:
-            # 获取当前配置的监控平台ID列表
-            current_platform_ids = []
-            for platform in CONFIG["PLATFORMS"]:
-                current_platform_ids.append(platform["id"])
-
-            print(f"当前监控平台: {current_platform_ids}")
+            if context is None:
+                context = DayContext.build()
+            self._sync_profile(context)
 
-            all_results, id_to_name, title_info = read_all_today_titles(
-                current_platform_ids
-            )
+            print(f"当前监控平台: {context.platform_ids}")
 
-            if not all_results:
+            if not context.all_results:
                 print("没有找到当天的数据")
                 return None
 
-            total_titles = sum(len(titles) for titles in all_results.values())
+            total_titles = sum(len(titles) for titles in context.all_results.values())
             print(f"读取到 {total_titles} 个标题（已按当前监控平台过滤）")
 
-            new_titles = detect_latest_new_titles(current_platform_ids)
-            word_groups, filter_words = load_frequency_words()
-
             return (
-                all_results,
-                id_to_name,
-                title_info,
-                new_titles,
-                word_groups,
-                filter_words,
+                context.all_results,
+                context.all_id_to_name,
+                context.title_info,
+                context.new_titles,
+                self.profile.word_groups,
+                self.profile.filter_words,
             )
         except Exception as e:
             print(f"数据加载失败: {e}")
             return None
 
-    def _prepare_current_title_info(self, results: Dict, time_info: str) -> Dict:
-        """从当前抓取结果构建标题信息"""
-        title_info = {}
-        for source_id, titles_data in results.items():
-            title_info[source_id] = {}
-            for title, title_data in titles_data.items():
-                ranks = title_data.get("ranks", [])
-                url = title_data.get("url", "")
-                mobile_url = title_data.get("mobileUrl", "")
-
-                title_info[source_id][title] = {
-                    "first_time": time_info,
-                    "last_time": time_info,
-                    "count": 1,
-                    "ranks": ranks,
-                    "url": url,
-                    "mobileUrl": mobile_url,
-                }
-        return title_info
-
     def _run_analysis_pipeline(
         self,
         data_source: Dict,
@@ -4181,8 +6371,8 @@ class NewsAnalyzer:
         id_to_name: Dict,
         failed_ids: Optional[List] = None,
         is_daily_summary: bool = False,
-    ) -> Tuple[List[Dict], str]:
-        """统一的分析流水线：数据处理 → 统计计算 → HTML生成"""
+    ) -> Tuple[List[Dict], str, Dict]:
+        """统一的分析流水线：数据处理 → 统计计算 → 报告数据 → HTML生成，报告数据供通知复用"""
 
         # 统计计算
         stats, total_titles = count_word_frequency(
@@ -4194,6 +6384,18 @@ class NewsAnalyzer:
             self.rank_threshold,
             new_titles,
             mode=mode,
+            matcher=self.profile.matcher,
+            partial_snapshot=self.partial_snapshot,
+        )
+
+        # 报告数据只准备一次，HTML 和各通知渠道共用
+        report_data = prepare_report_data(
+            stats,
+            failed_ids,
+            new_titles,
+            id_to_name,
+            mode,
+            matcher=self.profile.matcher,
         )
 
         # HTML生成
@@ -4206,9 +6408,11 @@ class NewsAnalyzer:
             mode=mode,
             is_daily_summary=is_daily_summary,
             update_info=self.update_info if CONFIG["SHOW_VERSION_UPDATE"] else None,
+            profile=self.profile,
+            report_data=report_data,
         )
 
-        return stats, html_file
+        return stats, html_file, report_data
 
     def _send_notification_if_needed(
         self,
@@ -4219,8 +6423,13 @@ class NewsAnalyzer:
         new_titles: Optional[Dict] = None,
         id_to_name: Optional[Dict] = None,
         html_file_path: Optional[str] = None,
+        report_data: Optional[Dict] = None,
     ) -> bool:
         """统一的通知发送逻辑，包含所有判断条件"""
+        if not self.notify_enabled:
+            print(f"跳过{report_type}通知：本轮为平台独立间隔爬取，推送跟随定时计划")
+            return False
+
         has_notification = self._has_notification_configured()
 
         if (
@@ -4238,6 +6447,8 @@ class NewsAnalyzer:
                 self.proxy_url,
                 mode=mode,
                 html_file_path=html_file_path,
+                profile=self.profile,
+                report_data=report_data,
             )
             return True
         elif CONFIG["ENABLE_NOTIFICATION"] and not has_notification:
@@ -4261,7 +6472,9 @@ class NewsAnalyzer:
 
         return False
 
-    def _generate_summary_report(self, mode_strategy: Dict) -> Optional[str]:
+    def _generate_summary_report(
+        self, mode_strategy: Dict, context: Optional[DayContext] = None
+    ) -> Optional[str]:
         """生成汇总报告（带通知）"""
         summary_type = (
             "当前榜单汇总" if mode_strategy["summary_mode"] == "current" else "当日汇总"
@@ -4269,7 +6482,7 @@ class NewsAnalyzer:
         print(f"生成{summary_type}报告...")
 
         # 加载分析数据
-        analysis_data = self._load_analysis_data()
+        analysis_data = self._load_analysis_data(context)
         if not analysis_data:
             return None
 
@@ -4278,7 +6491,7 @@ class NewsAnalyzer:
         )
 
         # 运行分析流水线
-        stats, html_file = self._run_analysis_pipeline(
+        stats, html_file, report_data = self._run_analysis_pipeline(
             all_results,
             mode_strategy["summary_mode"],
             title_info,
@@ -4300,17 +6513,20 @@ class NewsAnalyzer:
             new_titles=new_titles,
             id_to_name=id_to_name,
             html_file_path=html_file,
+            report_data=report_data,
         )
 
         return html_file
 
-    def _generate_summary_html(self, mode: str = "daily") -> Optional[str]:
+    def _generate_summary_html(
+        self, mode: str = "daily", context: Optional[DayContext] = None
+    ) -> Optional[str]:
         """生成汇总HTML"""
         summary_type = "当前榜单汇总" if mode == "current" else "当日汇总"
         print(f"生成{summary_type}HTML...")
 
         # 加载分析数据
-        analysis_data = self._load_analysis_data()
+        analysis_data = self._load_analysis_data(context)
         if not analysis_data:
             return None
 
@@ -4319,7 +6535,7 @@ class NewsAnalyzer:
         )
 
         # 运行分析流水线
-        _, html_file = self._run_analysis_pipeline(
+        _, html_file, _ = self._run_analysis_pipeline(
             all_results,
             mode,
             title_info,
@@ -4354,18 +6570,21 @@ class NewsAnalyzer:
         print(f"报告模式: {self.report_mode}")
         print(f"运行模式: {mode_strategy['description']}")
 
-    def _crawl_data(self) -> Tuple[Dict, Dict, List]:
-        """执行数据爬取"""
+    def _crawl_data(
+        self, platforms: Optional[List[Dict]] = None
+    ) -> Tuple[Dict, Dict, List, str]:
+        """执行数据爬取并保存快照，platforms 为空时爬取全部配置的平台，返回值包含本轮快照文件"""
+        if platforms is None:
+            platforms = CONFIG["PLATFORMS"]
+
         ids = []
-        for platform in CONFIG["PLATFORMS"]:
+        for platform in platforms:
             if "name" in platform:
                 ids.append((platform["id"], platform["name"]))
             else:
                 ids.append(platform["id"])
 
-        print(
-            f"配置的监控平台: {[p.get('name', p['id']) for p in CONFIG['PLATFORMS']]}"
-        )
+        print(f"配置的监控平台: {[p.get('name', p['id']) for p in platforms]}")
         print(f"开始爬取数据，请求间隔 {self.request_interval} 毫秒")
         ensure_directory_exists("output")
 
@@ -4373,26 +6592,100 @@ class NewsAnalyzer:
             ids, self.request_interval
         )
 
-        title_file = save_titles_to_file(results, id_to_name, failed_ids)
-        print(f"标题已保存到: {title_file}")
+        if self.polling_planner:
+            self.polling_planner.update(results, failed_ids)
 
-        return results, id_to_name, failed_ids
+        self.snapshot_unchanged = False
+        if CONFIG["SKIP_UNCHANGED_SNAPSHOT"]:
+            tracker = SnapshotTracker()
+            self.snapshot_unchanged = tracker.is_unchanged(
+                results, id_to_name, failed_ids
+            )
+            if self.snapshot_unchanged:
+                title_file = save_repeat_snapshot(str(tracker.get_base_file()))
+                print(f"爬取结果与上次快照相同，已保存快照引用: {title_file}")
+            else:
+                title_file = save_titles_to_file(results, id_to_name, failed_ids)
+                print(f"内容有变化的平台: {tracker.changed_platforms}")
+                print(f"标题已保存到: {title_file}")
+            tracker.commit(title_file, is_full_snapshot=not self.snapshot_unchanged)
+        else:
+            title_file = save_titles_to_file(results, id_to_name, failed_ids)
+            print(f"标题已保存到: {title_file}")
+
+        return results, id_to_name, failed_ids, title_file
+
+    @staticmethod
+    def _is_partial_crawl(platforms: Optional[List[Dict]]) -> bool:
+        """本轮是否只爬取了部分配置的平台"""
+        if platforms is None:
+            return False
+        crawled_ids = {platform["id"] for platform in platforms}
+        return any(platform["id"] not in crawled_ids for platform in CONFIG["PLATFORMS"])
+
+    def _has_partial_crawls(self) -> bool:
+        """配置是否会产生只包含部分平台的快照（自适应轮询或平台独立间隔）"""
+        return bool(self.polling_planner) or any(
+            platform.get("interval") for platform in CONFIG["PLATFORMS"]
+        )
+
+    def _select_due_platforms(self) -> List[Dict]:
+        """自适应轮询下本轮到期的平台（设置了固定 interval 的平台每轮都爬取）"""
+        due_platforms = [
+            platform
+            for platform in CONFIG["PLATFORMS"]
+            if platform.get("interval")
+            or self.polling_planner.is_due(platform["id"])
+        ]
+        skipped = len(CONFIG["PLATFORMS"]) - len(due_platforms)
+        if skipped:
+            print(f"自适应轮询：{skipped} 个平台未到爬取间隔，本轮跳过")
+        return due_platforms
+
+    def run_summary(self) -> Optional[str]:
+        """不爬取，仅基于当天已有快照为各订阅生成汇总报告并推送，返回默认订阅的汇总报告"""
+        self.notify_enabled = True
+        # 启用平台独立间隔或自适应轮询时，当天最新的快照可能只包含部分平台
+        context = DayContext.build(partial_snapshot=self._has_partial_crawls())
+        summary_html = None
+        try:
+            for profile in context.profiles:
+                self._use_profile(profile, len(context.profiles))
+                if self.report_mode == "incremental":
+                    print("增量模式：本轮没有新爬取的数据，跳过推送")
+                    continue
+
+                html_file = self._generate_summary_report(self._get_mode_strategy(), context)
+                if profile.is_default:
+                    summary_html = html_file
+        finally:
+            self._use_profile(context.profiles[0], 1)
+        return summary_html
+
+    def _label_failed_ids(self, failed_ids: List) -> List:
+        """为报告中的失败平台标注熔断跳过的情况"""
+        skipped_ids = set(self.data_fetcher.circuit_skipped_ids)
+        return [
+            f"{id_value}（熔断跳过）" if id_value in skipped_ids else id_value
+            for id_value in failed_ids
+        ]
 
     def _execute_mode_strategy(
-        self, mode_strategy: Dict, results: Dict, id_to_name: Dict, failed_ids: List
+        self, mode_strategy: Dict, context: DayContext
     ) -> Optional[str]:
-        """执行模式特定逻辑"""
-        # 获取当前监控平台ID列表
-        current_platform_ids = [platform["id"] for platform in CONFIG["PLATFORMS"]]
-
-        new_titles = detect_latest_new_titles(current_platform_ids)
-        time_info = Path(save_titles_to_file(results, id_to_name, failed_ids)).stem
-        word_groups, filter_words = load_frequency_words()
+        """执行模式特定逻辑，各阶段共用本轮的当天数据"""
+        self._sync_profile(context)
+        results = context.results
+        id_to_name = context.id_to_name
+        new_titles = context.new_titles
+        word_groups = self.profile.word_groups
+        filter_words = self.profile.filter_words
+        failed_ids = self._label_failed_ids(context.failed_ids)
 
         # current模式下，实时推送需要使用完整的历史数据来保证统计信息的完整性
         if self.report_mode == "current":
-            # 加载完整的历史数据（已按当前平台过滤）
-            analysis_data = self._load_analysis_data()
+            # 完整的历史数据（已按当前平台过滤）
+            analysis_data = self._load_analysis_data(context)
             if analysis_data:
                 (
                     all_results,
@@ -4407,7 +6700,7 @@ class NewsAnalyzer:
                     f"current模式：使用过滤后的历史数据，包含平台：{list(all_results.keys())}"
                 )
 
-                stats, html_file = self._run_analysis_pipeline(
+                stats, html_file, report_data = self._run_analysis_pipeline(
                     all_results,
                     self.report_mode,
                     historical_title_info,
@@ -4433,16 +6726,21 @@ class NewsAnalyzer:
                         new_titles=historical_new_titles,
                         id_to_name=combined_id_to_name,
                         html_file_path=html_file,
+                        # 新增新闻的来源名称取自 id_to_name，与 HTML 报告一致时才复用报告数据
+                        report_data=(
+                            report_data
+                            if combined_id_to_name == historical_id_to_name
+                            else None
+                        ),
                     )
             else:
                 print("❌ 严重错误：无法读取刚保存的数据文件")
                 raise RuntimeError("数据一致性检查失败：保存后立即读取失败")
         else:
-            title_info = self._prepare_current_title_info(results, time_info)
-            stats, html_file = self._run_analysis_pipeline(
+            stats, html_file, report_data = self._run_analysis_pipeline(
                 results,
                 self.report_mode,
-                title_info,
+                context.current_title_info,
                 new_titles,
                 word_groups,
                 filter_words,
@@ -4462,6 +6760,7 @@ class NewsAnalyzer:
                     new_titles=new_titles,
                     id_to_name=id_to_name,
                     html_file_path=html_file,
+                    report_data=report_data,
                 )
 
         # 生成汇总报告（如果需要）
@@ -4470,14 +6769,17 @@ class NewsAnalyzer:
             if mode_strategy["should_send_realtime"]:
                 # 如果已经发送了实时通知，汇总只生成HTML不发送通知
                 summary_html = self._generate_summary_html(
-                    mode_strategy["summary_mode"]
+                    mode_strategy["summary_mode"], context
                 )
             else:
                 # daily模式：直接生成汇总报告并发送通知
-                summary_html = self._generate_summary_report(mode_strategy)
+                summary_html = self._generate_summary_report(mode_strategy, context)
 
+        # 附加订阅的报告不打开浏览器
+        if not self.profile.is_default:
+            print(f"订阅 {self.profile.name} 的报告已生成: {summary_html or html_file}")
         # 打开浏览器（仅在非容器环境）
-        if self._should_open_browser() and html_file:
+        elif self._should_open_browser() and html_file:
             if summary_html:
                 summary_url = "file://" + str(Path(summary_html).resolve())
                 print(f"正在打开汇总报告: {summary_url}")
@@ -4494,24 +6796,442 @@ class NewsAnalyzer:
 
         return summary_html
 
-    def run(self) -> None:
-        """执行分析流程"""
+    def run(self, platforms: Optional[List[Dict]] = None, notify: bool = True) -> None:
+        """执行分析流程，platforms 指定本轮爬取的平台，notify 为 False 时只有增量模式的订阅推送"""
         try:
             self._initialize_and_check_config()
+            # 先补发之前运行中未发完的推送，保证同一渠道的消息按时间顺序到达
+            flush_notification_outbox(self.proxy_url)
+
+            if platforms is None and self.polling_planner:
+                platforms = self._select_due_platforms()
+                if not platforms:
+                    print("自适应轮询：本轮没有到期的平台，跳过爬取、报告生成和推送")
+                    return
+
+            results, id_to_name, failed_ids, title_file = self._crawl_data(platforms)
+
+            # 数据未变化时增量模式没有可推送的新内容；当日汇总/当前榜单模式仍照常
+            # 分析和推送，保证定时推送和推送时间窗口（每天一次）不被跳过
+            if self.snapshot_unchanged and all(
+                profile.report_mode == "incremental"
+                for profile in get_subscription_profiles()
+            ):
+                print("数据与上次快照相同，增量模式下跳过分析、报告生成和推送")
+                return
 
-            mode_strategy = self._get_mode_strategy()
-
-            results, id_to_name, failed_ids = self._crawl_data()
-
-            self._execute_mode_strategy(mode_strategy, results, id_to_name, failed_ids)
+            # 本轮快照已在爬取时并入当天聚合，各订阅、各阶段共用同一份数据
+            context = DayContext.build(
+                results,
+                id_to_name,
+                failed_ids,
+                title_file,
+                partial_snapshot=self._is_partial_crawl(platforms),
+            )
+            try:
+                for profile in context.profiles:
+                    self._use_profile(profile, len(context.profiles))
+                    self.notify_enabled = notify or self.report_mode == "incremental"
+                    self._execute_mode_strategy(self._get_mode_strategy(), context)
+            finally:
+                self._use_profile(context.profiles[0], 1)
 
         except Exception as e:
             print(f"分析流程执行出错: {e}")
             raise
+        finally:
+            # 没有到期平台、快照未变化提前返回或分析出错时也归档已结束的日期
+            if CONFIG["ARCHIVE"]["ENABLED"]:
+                archive_closed_date_folders(CONFIG["ARCHIVE"]["KEEP_DAYS"])
+
+
+# === 常驻调度 ===
+class CronSchedule:
+    """五段式 cron 表达式（分 时 日 月 周），支持 *、*/n、a-b、a-b/n 和逗号列表"""
+
+    FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron 表达式需要 5 个字段: {expression}")
+
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            self._parse_field(part, low, high)
+            for part, (low, high) in zip(parts, self.FIELD_RANGES)
+        ]
+        # 周日可以写成 0 或 7
+        self.weekdays = {day % 7 for day in weekdays}
+        self.day_restricted = parts[2] != "*"
+        self.weekday_restricted = parts[4] != "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> set:
+        values = set()
+        for item in field.split(","):
+            step = 1
+            has_step = "/" in item
+            if has_step:
+                item, step_str = item.split("/", 1)
+                step = int(step_str)
+
+            if item == "*":
+                start, end = low, high
+            elif "-" in item:
+                start_str, end_str = item.split("-", 1)
+                start, end = int(start_str), int(end_str)
+            else:
+                start = int(item)
+                end = high if has_step else start
+
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"cron 字段超出范围: {field}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_match = moment.day in self.days
+        weekday_match = (moment.weekday() + 1) % 7 in self.weekdays
+        # 与标准 cron 一致：日和周同时有限制时，满足其一即可
+        if self.day_restricted and self.weekday_restricted:
+            return day_match or weekday_match
+        return day_match and weekday_match
+
+    def matches(self, moment: datetime) -> bool:
+        return (
+            moment.minute in self.minutes
+            and moment.hour in self.hours
+            and moment.month in self.months
+            and self._day_matches(moment)
+        )
+
+    def next_after(self, moment: datetime) -> datetime:
+        """返回 moment 之后第一个匹配的时间点（精确到分钟）"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+
+        while candidate < limit:
+            if candidate.month not in self.months:
+                next_month = candidate.replace(day=1, hour=0, minute=0) + timedelta(
+                    days=32
+                )
+                candidate = next_month.replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+
+        raise ValueError(f"cron 表达式没有可执行的时间点: {self.expression}")
+
+
+class DaemonScheduler:
+    """常驻调度器：单进程内按 cron 计划和平台独立间隔爬取，跨轮次复用会话、缓存和当天聚合数据"""
+
+    CONTROL_COMMANDS = ("run", "reload")
+    TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+    # 检查发件箱中到期重试任务的间隔（秒）
+    OUTBOX_CHECK_SECONDS = 60
+
+    def __init__(self, state_dir: Optional[Path] = None):
+        self.state_dir = state_dir or Path("output") / ".daemon"
+        self.status_file = self.state_dir / "status.json"
+        self.control_dir = self.state_dir / "control"
+        self.running = True
+        self.pending_commands = set()
+        self.started_at = get_beijing_time()
+        self.config_loaded_at = self.started_at
+        self.run_count = 0
+        self.last_run = None
+        self.last_duration = None
+        self.last_error = None
+        self.pending_report = False
+        self.next_outbox_check = 0.0
+        self.platform_last_run = {}
+        self.watched_files = self._get_watched_files()
+        self.cron = CronSchedule(CONFIG["DAEMON"]["SCHEDULE"])
+        self.next_cron_run = self.cron.next_after(self.started_at)
+        self.analyzer = NewsAnalyzer()
+
+        if os.environ.get("IMMEDIATE_RUN", "false") == "true":
+            self.pending_commands.add("run")
+        else:
+            # 不立即执行时，独立间隔的平台也从启动时刻开始计时
+            for platform in CONFIG["PLATFORMS"]:
+                if platform.get("interval"):
+                    self.platform_last_run[platform["id"]] = self.started_at
+
+    @staticmethod
+    def _get_watched_files() -> Dict[str, Optional[int]]:
+        """配置文件和频率词文件的修改时间"""
+        paths = [
+            os.environ.get("CONFIG_PATH", "config/config.yaml"),
+            os.environ.get("FREQUENCY_WORDS_PATH", "config/frequency_words.txt"),
+        ]
+        return {
+            path: Path(path).stat().st_mtime_ns if Path(path).exists() else None
+            for path in paths
+        }
+
+    def _install_signal_handlers(self) -> None:
+        def stop(signum, frame):
+            print(f"[常驻调度] 收到退出信号 {signum}，当前轮次结束后退出")
+            self.running = False
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, lambda *_: self.pending_commands.add("reload"))
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda *_: self.pending_commands.add("run"))
+
+    def _collect_control_commands(self) -> None:
+        """读取 manage.py 写入的控制命令文件"""
+        if not self.control_dir.exists():
+            return
+        for command_file in self.control_dir.iterdir():
+            if command_file.name in self.CONTROL_COMMANDS:
+                self.pending_commands.add(command_file.name)
+            try:
+                command_file.unlink()
+            except OSError:
+                pass
+
+    def _check_hot_reload(self) -> None:
+        """配置文件变化或收到 reload 命令时重新加载配置"""
+        watched_files = self._get_watched_files()
+        changed_files = [
+            path
+            for path, mtime in watched_files.items()
+            if self.watched_files.get(path) != mtime
+        ]
+        self.watched_files = watched_files
+        config_path = os.environ.get("CONFIG_PATH", "config/config.yaml")
+
+        if "reload" in self.pending_commands:
+            self.pending_commands.discard("reload")
+            self._reload_config("收到重新加载命令")
+        elif config_path in changed_files:
+            self._reload_config(f"配置文件已修改: {config_path}")
+        elif changed_files:
+            # 频率词每轮分析时重新读取，无需重建分析器
+            print(f"[常驻调度] 频率词文件已修改，下一轮分析生效: {changed_files}")
+
+    def _reload_config(self, reason: str) -> None:
+        print(f"[常驻调度] {reason}，重新加载配置...")
+        try:
+            new_config = load_config()
+            cron = CronSchedule(new_config["DAEMON"]["SCHEDULE"])
+        except Exception as e:
+            self.last_error = f"配置重新加载失败: {e}"
+            print(f"[常驻调度] 配置重新加载失败，继续使用原配置: {e}")
+            return
+
+        # 原地更新 CONFIG，各函数读取的都是同一个字典
+        CONFIG.clear()
+        CONFIG.update(new_config)
+        self.cron = cron
+        self.next_cron_run = cron.next_after(get_beijing_time())
+        self.analyzer = NewsAnalyzer()
+        self.config_loaded_at = get_beijing_time()
+
+        platform_ids = {platform["id"] for platform in CONFIG["PLATFORMS"]}
+        self.platform_last_run = {
+            id_value: last_run
+            for id_value, last_run in self.platform_last_run.items()
+            if id_value in platform_ids
+        }
+        print(
+            f"[常驻调度] 配置已重新加载，调度计划: {cron.expression}，"
+            f"下次执行: {self.next_cron_run.strftime(self.TIME_FORMAT)}"
+        )
+        self._write_status()
+
+    def _get_due_platforms(self, now: datetime, cron_due: bool) -> List[Dict]:
+        """到期的平台：设置了 interval 的按各自间隔（分钟），其余跟随 cron 计划或自适应轮询"""
+        planner = self.analyzer.polling_planner
+        due_platforms = []
+        for platform in CONFIG["PLATFORMS"]:
+            interval = platform.get("interval")
+            if not interval:
+                if planner:
+                    if planner.is_due(platform["id"], now.timestamp()):
+                        due_platforms.append(platform)
+                elif cron_due:
+                    due_platforms.append(platform)
+                continue
+
+            last_run = self.platform_last_run.get(platform["id"])
+            if last_run is None or now - last_run >= timedelta(minutes=interval):
+                due_platforms.append(platform)
+        return due_platforms
+
+    def _next_wakeup(self) -> datetime:
+        planner = self.analyzer.polling_planner
+        wakeups = [self.next_cron_run]
+        for platform in CONFIG["PLATFORMS"]:
+            interval = platform.get("interval")
+            last_run = self.platform_last_run.get(platform["id"])
+            if interval and last_run is not None:
+                wakeups.append(last_run + timedelta(minutes=interval))
+            elif not interval and planner:
+                next_due = planner.next_due(platform["id"])
+                if next_due is not None:
+                    wakeups.append(
+                        datetime.fromtimestamp(next_due, self.next_cron_run.tzinfo)
+                    )
+        return min(wakeups)
+
+    def _run_tick(self, platforms: List[Dict], notify: bool) -> None:
+        started_at = get_beijing_time()
+        start_clock = time.time()
+        print(
+            f"[常驻调度] 开始第 {self.run_count + 1} 轮爬取: "
+            f"{[p.get('name', p['id']) for p in platforms]}"
+        )
+
+        try:
+            self.analyzer.run(platforms=platforms, notify=notify)
+            self.pending_report = not notify
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"[常驻调度] 本轮执行出错: {e}")
+        finally:
+            for platform in platforms:
+                self.platform_last_run[platform["id"]] = started_at
+            self.run_count += 1
+            self.last_run = started_at
+            self.last_duration = round(time.time() - start_clock, 2)
+            print(f"[常驻调度] 本轮耗时 {self.last_duration} 秒")
+
+    def _flush_outbox(self) -> None:
+        """定期补发发件箱中到期的推送任务"""
+        if time.time() < self.next_outbox_check:
+            return
+        self.next_outbox_check = time.time() + self.OUTBOX_CHECK_SECONDS
+        try:
+            flush_notification_outbox(self.analyzer.proxy_url)
+        except Exception as e:
+            print(f"[常驻调度] 补发推送出错: {e}")
+
+    def _write_status(self, state: str = "running") -> None:
+        """写入运行状态，供 manage.py 查看"""
+
+        def format_time(moment: Optional[datetime]) -> Optional[str]:
+            return moment.strftime(self.TIME_FORMAT) if moment else None
+
+        status = {
+            "pid": os.getpid(),
+            "state": state,
+            "started_at": format_time(self.started_at),
+            "config_loaded_at": format_time(self.config_loaded_at),
+            "updated_at": format_time(get_beijing_time()),
+            "schedule": self.cron.expression,
+            "next_run": format_time(self.next_cron_run),
+            "report_mode": CONFIG["REPORT_MODE"],
+            "run_count": self.run_count,
+            "last_run": format_time(self.last_run),
+            "last_duration": self.last_duration,
+            "last_error": self.last_error,
+            "platforms": {
+                platform["id"]: {
+                    "name": platform.get("name", platform["id"]),
+                    "interval": platform.get("interval"),
+                    "adaptive_interval": (
+                        self.analyzer.polling_planner.get_interval(platform["id"])
+                        if self.analyzer.polling_planner and not platform.get("interval")
+                        else None
+                    ),
+                    "last_run": format_time(self.platform_last_run.get(platform["id"])),
+                }
+                for platform in CONFIG["PLATFORMS"]
+            },
+        }
+        try:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.status_file.with_suffix(".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(status, f, ensure_ascii=False, indent=2)
+            tmp_file.replace(self.status_file)
+        except Exception as e:
+            print(f"[常驻调度] 写入状态文件失败: {e}")
+
+    def run_forever(self) -> None:
+        """调度主循环，收到 SIGTERM/SIGINT 后在当前轮次结束时退出"""
+        self._install_signal_handlers()
+        print(
+            f"[常驻调度] 已启动 (PID {os.getpid()})，调度计划: {self.cron.expression}，"
+            f"下次执行: {self.next_cron_run.strftime(self.TIME_FORMAT)}"
+        )
+        interval_platforms = [
+            f"{p.get('name', p['id'])}({p['interval']}分钟)"
+            for p in CONFIG["PLATFORMS"]
+            if p.get("interval")
+        ]
+        if interval_platforms:
+            print(f"[常驻调度] 独立间隔的平台: {interval_platforms}")
+        self._write_status()
+
+        while self.running:
+            self._collect_control_commands()
+            self._check_hot_reload()
+
+            now = get_beijing_time()
+            cron_due = now >= self.next_cron_run
+            manual_run = "run" in self.pending_commands
+            self.pending_commands.discard("run")
+
+            if manual_run:
+                platforms = list(CONFIG["PLATFORMS"])
+            else:
+                platforms = self._get_due_platforms(now, cron_due)
+
+            if platforms:
+                # 只有平台独立间隔到期时，增量模式的订阅照常推送新增内容，其他订阅的推送跟随 cron 计划
+                self._run_tick(platforms, manual_run or cron_due)
+            elif cron_due and self.pending_report:
+                # 到了推送时间但没有平台到期，用之前各轮已爬取的数据补发汇总
+                try:
+                    self.analyzer.run_summary()
+                    self.pending_report = False
+                except Exception as e:
+                    self.last_error = str(e)
+                    print(f"[常驻调度] 生成汇总报告出错: {e}")
+
+            if cron_due:
+                self.next_cron_run = self.cron.next_after(get_beijing_time())
+            self._flush_outbox()
+            if platforms or cron_due:
+                self._write_status()
+
+            remaining = (self._next_wakeup() - get_beijing_time()).total_seconds()
+            if self.running and not self.pending_commands and remaining > 0:
+                time.sleep(min(max(1, CONFIG["DAEMON"]["POLL_SECONDS"]), remaining))
+
+        self._write_status(state="stopped")
+        print("[常驻调度] 已退出")
 
 
 def main():
     try:
+        if "--daemon" in sys.argv[1:]:
+            DaemonScheduler().run_forever()
+            return
+
+        if "--backfill-sqlite" in sys.argv[1:]:
+            backfill_snapshot_store(force="--force" in sys.argv[1:])
+            return
+
+        if "--archive" in sys.argv[1:]:
+            archived = archive_closed_date_folders(CONFIG["ARCHIVE"]["KEEP_DAYS"])
+            print(f"归档完成：共归档 {archived} 天")
+            return
+
         analyzer = NewsAnalyzer()
         analyzer.run()
     except FileNotFoundError as e:
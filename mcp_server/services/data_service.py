@@ -9,6 +9,9 @@ from collections import Counter
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 
+from trendradar.archive import list_archives
+from trendradar.matcher import compile_term
+
 from .cache_service import get_cache
 from .parser_service import ParserService
 from ..utils.errors import DataNotFoundError
@@ -215,8 +218,36 @@ class DataService:
         platform_distribution = Counter()
 
         # 遍历日期范围
+        self.parser.prefetch_titles_for_dates(start_date, end_date, platforms)
         current_date = start_date
         while current_date <= end_date:
+            # SQLite 存储包含该日期时，直接按日期索引查询匹配的标题
+            store = self.parser.get_snapshot_store_for_date(
+                self.parser.get_date_folder_name(current_date)
+            )
+            if store:
+                date_str = current_date.strftime("%Y-%m-%d")
+                for item in store.search_titles(keyword, date_str, date_str, platforms):
+                    ranks = item["ranks"]
+                    avg_rank = sum(ranks) / len(ranks) if ranks else 0
+
+                    results.append({
+                        "title": item["title"],
+                        "platform": item["platform"],
+                        "platform_name": item["platform_name"],
+                        "ranks": ranks,
+                        "count": len(ranks),
+                        "avg_rank": round(avg_rank, 2),
+                        "url": item["url"],
+                        "mobileUrl": item["mobileUrl"],
+                        "date": date_str
+                    })
+
+                    platform_distribution[item["platform"]] += 1
+
+                current_date += timedelta(days=1)
+                continue
+
             try:
                 all_titles, id_to_name, _ = self.parser.read_all_titles_for_date(
                     date=current_date,
@@ -293,6 +324,10 @@ class DataService:
         注意:本工具基于 config/frequency_words.txt 中的个人关注词列表进行统计,
         而不是自动从新闻中提取热点话题。用户可以自定义这个关注词列表。
 
+        每个必须词和普通词独立计数,标题包含该词即计一次(普通词区分大小写),
+        不要求整个词组匹配,也不排除过滤词;同一个词出现在多个词组中时按组分别计数。
+        整词、词首和正则写法按各自的语义判断。
+
         Args:
             top_n: 返回TOP N关注词
             mode: 模式 - daily(当日累计), current(最新一批)
@@ -319,7 +354,13 @@ class DataService:
             )
 
         # 加载关键词配置
-        word_groups = self.parser.parse_frequency_words()
+        rules = self.parser.load_frequency_rules()
+        keyword_terms = []
+        if rules is not None:
+            for group in rules.word_groups:
+                for word in group["required"] + group["normal"]:
+                    if word:
+                        keyword_terms.append((word, compile_term(word)))
 
         # 根据mode选择要处理的标题数据
         titles_to_process = {}
@@ -355,20 +396,16 @@ class DataService:
         word_frequency = Counter()
         keyword_to_news = {}
 
-        # 遍历要处理的标题
+        # 遍历要处理的标题，逐个关注词独立计数
         for platform_id, titles in titles_to_process.items():
             for title in titles.keys():
-                # 对每个关键词组进行匹配
-                for group in word_groups:
-                    all_words = group.get("required", []) + group.get("normal", [])
+                for word, pattern in keyword_terms:
+                    if word in title if pattern is None else pattern.search(title):
+                        word_frequency[word] += 1
 
-                    for word in all_words:
-                        if word and word in title:
-                            word_frequency[word] += 1
-
-                            if word not in keyword_to_news:
-                                keyword_to_news[word] = []
-                            keyword_to_news[word].append(title)
+                        if word not in keyword_to_news:
+                            keyword_to_news[word] = []
+                        keyword_to_news[word].append(title)
 
         # 获取TOP N关键词
         top_keywords = word_frequency.most_common(top_n)
@@ -429,7 +466,8 @@ class DataService:
 
         # 解析配置文件
         config_data = self.parser.parse_yaml_config()
-        word_groups = self.parser.parse_frequency_words()
+        rules = self.parser.load_frequency_rules()
+        word_groups = rules.word_groups if rules else []
 
         # 根据section返回对应配置
         if section == "all" or section == "crawler":
@@ -461,6 +499,7 @@ class DataService:
         if section == "all" or section == "keywords":
             keywords_config = {
                 "word_groups": word_groups,
+                "filter_words": rules.filter_words if rules else [],
                 "total_groups": len(word_groups)
             }
 
@@ -507,6 +546,16 @@ class DataService:
             >>> earliest, latest = service.get_available_date_range()
             >>> print(f"可用日期范围：{earliest} 至 {latest}")
         """
+        # 启用 SQLite 存储时直接查询日期范围
+        store = self.parser.get_snapshot_store()
+        if store:
+            earliest, latest = store.get_date_range()
+            if earliest and latest:
+                return (
+                    datetime.strptime(earliest, "%Y-%m-%d"),
+                    datetime.strptime(latest, "%Y-%m-%d")
+                )
+
         output_dir = self.parser.project_root / "output"
 
         if not output_dir.exists():
@@ -530,6 +579,10 @@ class DataService:
                 except Exception:
                     pass
 
+        # 已归档的日期
+        for archive in list_archives(output_dir):
+            available_dates.append(datetime.strptime(archive.date_folder, "%Y年%m月%d日"))
+
         if not available_dates:
             return (None, None)
 
@@ -579,6 +632,15 @@ class DataService:
                         if item.is_file():
                             total_storage += item.stat().st_size
 
+        # 已归档的日期（归档文件大小已计入 output/archive 目录）
+        archives = list_archives(output_dir)
+        for archive in archives:
+            archive_date = datetime.strptime(archive.date_folder, "%Y年%m月%d日")
+            if oldest_record is None or archive_date < oldest_record:
+                oldest_record = archive_date
+            if latest_record is None or archive_date > latest_record:
+                latest_record = archive_date
+
         # 读取版本信息
         version_file = self.parser.project_root / "version"
         version = "unknown"
@@ -589,16 +651,39 @@ class DataService:
             except:
                 pass
 
+        data_status = {
+            "total_storage": f"{total_storage / 1024 / 1024:.2f} MB",
+            "oldest_record": oldest_record.strftime("%Y-%m-%d") if oldest_record else None,
+            "latest_record": latest_record.strftime("%Y-%m-%d") if latest_record else None,
+        }
+
+        if archives:
+            archived_bytes = sum(archive.size for archive in archives)
+            original_bytes = sum(archive.index.get("original_bytes", 0) for archive in archives)
+            data_status["archive"] = {
+                "days": len(archives),
+                "files": sum(len(archive.index.get("files", {})) for archive in archives),
+                "size": f"{archived_bytes / 1024 / 1024:.2f} MB",
+                "original_size": f"{original_bytes / 1024 / 1024:.2f} MB"
+            }
+
+        # SQLite 快照存储统计
+        store = self.parser.get_snapshot_store()
+        if store:
+            store_stats = store.get_stats()
+            data_status["sqlite_store"] = {
+                "snapshots": store_stats["snapshots"],
+                "titles": store_stats["titles"],
+                "observations": store_stats["observations"],
+                "size": f"{store_stats['size_bytes'] / 1024 / 1024:.2f} MB"
+            }
+
         return {
             "system": {
                 "version": version,
                 "project_root": str(self.parser.project_root)
             },
-            "data": {
-                "total_storage": f"{total_storage / 1024 / 1024:.2f} MB",
-                "oldest_record": oldest_record.strftime("%Y-%m-%d") if oldest_record else None,
-                "latest_record": latest_record.strftime("%Y-%m-%d") if latest_record else None,
-            },
+            "data": data_status,
             "cache": self.cache.get_stats(),
             "health": "healthy"
         }
@@ -7,10 +7,27 @@
 import re
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import yaml
 
+from trendradar.archive import DayArchive, get_archive_path
+from trendradar.parallel import (
+    DEFAULT_MIN_FILES,
+    MERGE_RANKS,
+    SnapshotPartial,
+    parse_snapshot_groups,
+)
+from trendradar.records import TitleRecord, intern
+from trendradar.rules import CompiledRules, load_rules
+from trendradar.snapshot import (
+    get_delta_base,
+    get_repeat_base,
+    load_snapshot,
+    parse_titles,
+)
+from trendradar.storage import SnapshotStore, date_folder_to_iso
+
 from ..utils.errors import FileParseError, DataNotFoundError
 from .cache_service import get_cache
 
@@ -34,6 +51,8 @@ class ParserService:
 
         # 初始化缓存服务
         self.cache = get_cache()
+        self._snapshot_store = None
+        self._parallel_parse_config = None
 
     @staticmethod
     def clean_title(title: str) -> str:
@@ -70,79 +89,29 @@ class ParserService:
         if not file_path.exists():
             raise FileParseError(str(file_path), "文件不存在")
 
-        titles_by_id = {}
-        id_to_name = {}
-
         try:
             with open(file_path, "r", encoding="utf-8") as f:
                 content = f.read()
-                sections = content.split("\n\n")
-
-                for section in sections:
-                    if not section.strip() or "==== 以下ID请求失败 ====" in section:
-                        continue
+        except Exception as e:
+            raise FileParseError(str(file_path), str(e))
 
-                    lines = section.strip().split("\n")
-                    if len(lines) < 2:
-                        continue
+        # "与快照相同"标记文件：爬虫在结果未变化时只写入对上一份完整快照的引用
+        base_name = get_repeat_base(content)
+        if base_name and base_name != file_path.stem:
+            return self.parse_txt_file(file_path.parent / f"{base_name}.txt")
 
-                    # 解析header: id | name 或 id
-                    header_line = lines[0].strip()
-                    if " | " in header_line:
-                        parts = header_line.split(" | ", 1)
-                        source_id = parts[0].strip()
-                        name = parts[1].strip()
-                        id_to_name[source_id] = name
-                    else:
-                        source_id = header_line
-                        id_to_name[source_id] = source_id
-
-                    titles_by_id[source_id] = {}
-
-                    # 解析标题行
-                    for line in lines[1:]:
-                        if line.strip():
-                            try:
-                                title_part = line.strip()
-                                rank = None
-
-                                # 提取排名
-                                if ". " in title_part and title_part.split(". ")[0].isdigit():
-                                    rank_str, title_part = title_part.split(". ", 1)
-                                    rank = int(rank_str)
-
-                                # 提取 MOBILE URL
-                                mobile_url = ""
-                                if " [MOBILE:" in title_part:
-                                    title_part, mobile_part = title_part.rsplit(" [MOBILE:", 1)
-                                    if mobile_part.endswith("]"):
-                                        mobile_url = mobile_part[:-1]
-
-                                # 提取 URL
-                                url = ""
-                                if " [URL:" in title_part:
-                                    title_part, url_part = title_part.rsplit(" [URL:", 1)
-                                    if url_part.endswith("]"):
-                                        url = url_part[:-1]
-
-                                title = self.clean_title(title_part.strip())
-                                ranks = [rank] if rank is not None else [1]
-
-                                titles_by_id[source_id][title] = {
-                                    "ranks": ranks,
-                                    "url": url,
-                                    "mobileUrl": mobile_url,
-                                }
-
-                            except Exception as e:
-                                # 忽略单行解析错误
-                                continue
+        # 增量快照：沿基准链还原为完整快照
+        if get_delta_base(content):
+            try:
+                return load_snapshot(file_path, content).to_titles()
+            except Exception as e:
+                raise FileParseError(str(file_path), f"增量快照还原失败: {e}")
 
+        try:
+            return parse_titles(content)
         except Exception as e:
             raise FileParseError(str(file_path), str(e))
 
-        return titles_by_id, id_to_name
-
     def get_date_folder_name(self, date: datetime = None) -> str:
         """
         获取日期文件夹名称
@@ -171,54 +140,214 @@ class ParserService:
 
         Returns:
             (all_titles, id_to_name, all_timestamps) 元组
-            - all_titles: {platform_id: {title: {ranks, url, mobileUrl, ...}}}
+            - all_titles: {platform_id: {title: TitleRecord}}，记录可按 {ranks, url, mobileUrl} 字典读取
             - id_to_name: {platform_id: platform_name}
             - all_timestamps: {filename: timestamp}
 
         Raises:
             DataNotFoundError: 数据不存在
         """
-        # 生成缓存键
+        cache_key, ttl = self._titles_cache_key(date, platform_ids)
+        cached = self.cache.get(cache_key, ttl=ttl)
+        if cached:
+            return cached
+
+        # 缓存未命中，优先从 SQLite 存储按索引读取
+        date_folder = self.get_date_folder_name(date)
+        txt_dir = self.project_root / "output" / date_folder / "txt"
+
+        store = self.get_snapshot_store_for_date(date_folder)
+        if store:
+            all_titles, id_to_name, all_timestamps = store.load_day(
+                date_folder_to_iso(date_folder), platform_ids
+            )
+            if all_titles:
+                result = (all_titles, id_to_name, all_timestamps)
+                self.cache.set(cache_key, result)
+                return result
+
+        # 日期文件夹已归档时，直接流式读取归档中的快照
+        archive = None if txt_dir.exists() else self.get_day_archive(date_folder)
+        if not txt_dir.exists() and archive is None:
+            raise DataNotFoundError(
+                f"未找到 {date_folder} 的数据目录",
+                suggestion="请先运行爬虫或检查日期是否正确"
+            )
+
+        if archive:
+            all_titles, id_to_name, all_timestamps = self._read_archived_titles(
+                date_folder, archive, platform_ids
+            )
+        else:
+            txt_files = sorted(txt_dir.glob("*.txt"))
+            if not txt_files:
+                raise DataNotFoundError(
+                    f"{date_folder} 没有数据文件",
+                    suggestion="请等待爬虫任务完成"
+                )
+            partial = self.parse_txt_files({date_folder: txt_files}, platform_ids)[date_folder]
+            all_titles, id_to_name, all_timestamps = self._titles_from_partial(
+                date_folder, txt_dir, partial
+            )
+
+        if not all_titles:
+            raise DataNotFoundError(
+                f"{date_folder} 没有有效的数据",
+                suggestion="请检查数据文件格式或重新运行爬虫"
+            )
+
+        # 缓存结果
+        result = (all_titles, id_to_name, all_timestamps)
+        self.cache.set(cache_key, result)
+
+        return result
+
+    def _titles_cache_key(
+        self, date: Optional[datetime], platform_ids: Optional[List[str]]
+    ) -> Tuple[str, int]:
+        """
+        read_all_titles_for_date 的缓存键和缓存时间
+
+        Args:
+            date: 日期对象，None 表示今天
+            platform_ids: 平台ID列表
+
+        Returns:
+            (缓存键, 存活时间秒数)
+        """
         date_str = self.get_date_folder_name(date)
         platform_key = ','.join(sorted(platform_ids)) if platform_ids else 'all'
         cache_key = f"read_all_titles:{date_str}:{platform_key}"
 
-        # 尝试从缓存获取
         # 对于历史数据（非今天），使用更长的缓存时间（1小时）
         # 对于今天的数据，使用较短的缓存时间（15分钟），因为可能有新数据
         is_today = (date is None) or (date.date() == datetime.now().date())
         ttl = 900 if is_today else 3600  # 15分钟 vs 1小时
+        return cache_key, ttl
 
-        cached = self.cache.get(cache_key, ttl=ttl)
-        if cached:
-            return cached
+    def prefetch_titles_for_dates(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        platform_ids: Optional[List[str]] = None
+    ) -> int:
+        """
+        并行预读日期范围内未缓存的txt数据，之后逐日调用 read_all_titles_for_date 直接命中缓存
 
-        # 缓存未命中，读取文件
-        date_folder = self.get_date_folder_name(date)
-        txt_dir = self.project_root / "output" / date_folder / "txt"
+        按周/按月查询时把所有日期的快照文件放进同一个进程池解析，冷启动耗时随 CPU 核数下降。
+        SQLite 存储中已有的日期和已归档的日期仍由 read_all_titles_for_date 按原方式读取。
 
-        if not txt_dir.exists():
-            raise DataNotFoundError(
-                f"未找到 {date_folder} 的数据目录",
-                suggestion="请先运行爬虫或检查日期是否正确"
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期（包含）
+            platform_ids: 平台ID列表，需与之后调用 read_all_titles_for_date 时相同
+
+        Returns:
+            预读并缓存的天数
+        """
+        pending = {}
+        current_date = start_date
+        while current_date <= end_date:
+            cache_key, ttl = self._titles_cache_key(current_date, platform_ids)
+            date_folder = self.get_date_folder_name(current_date)
+            txt_dir = self.project_root / "output" / date_folder / "txt"
+            if (
+                self.cache.get(cache_key, ttl=ttl) is None
+                and txt_dir.exists()
+                and self.get_snapshot_store_for_date(date_folder) is None
+            ):
+                txt_files = sorted(txt_dir.glob("*.txt"))
+                if txt_files:
+                    pending[date_folder] = (cache_key, txt_dir, txt_files)
+            current_date += timedelta(days=1)
+
+        # 只有一天时没有跨日期并行的收益，交给 read_all_titles_for_date
+        if len(pending) < 2:
+            return 0
+
+        try:
+            partials = self.parse_txt_files(
+                {date_folder: txt_files for date_folder, (_, _, txt_files) in pending.items()},
+                platform_ids,
             )
+            count = 0
+            for date_folder, (cache_key, txt_dir, _) in pending.items():
+                result = self._titles_from_partial(date_folder, txt_dir, partials[date_folder])
+                if result[0]:
+                    self.cache.set(cache_key, result)
+                    count += 1
+        except Exception as e:
+            # 预读只是加速，失败时由 read_all_titles_for_date 逐日读取
+            print(f"Warning: 预读 {len(pending)} 天的数据失败: {e}")
+            return 0
+        return count
+
+    def parse_txt_files(
+        self,
+        files_by_date: Dict[str, List[Path]],
+        platform_ids: Optional[List[str]] = None
+    ) -> Dict[str, SnapshotPartial]:
+        """
+        按日期聚合txt快照文件，文件较多时在进程池中并行解析
+
+        Args:
+            files_by_date: {日期文件夹名: 按时间排序的txt文件}
+            platform_ids: 平台ID列表，None或空列表表示所有平台
 
+        Returns:
+            {日期文件夹名: 聚合结果}，解析失败的文件记录在结果的 errors 中
+        """
+        workers, min_files = self.get_parallel_parse_config()
+        return parse_snapshot_groups(
+            files_by_date,
+            mode=MERGE_RANKS,
+            platform_ids=platform_ids or None,
+            skip_errors=True,
+            workers=workers,
+            min_files=min_files,
+        )
+
+    def _titles_from_partial(
+        self, date_folder: str, txt_dir: Path, partial: SnapshotPartial
+    ) -> Tuple[Dict, Dict, Dict]:
+        """把聚合结果转换为 read_all_titles_for_date 的返回结构"""
+        for file_name, error in partial.errors:
+            # 忽略单个文件的解析错误，继续处理其他文件
+            print(f"Warning: 解析文件 {date_folder}/{file_name} 失败: {error}")
+
+        all_titles = {
+            intern(platform_id): {intern(title): record for title, record in records.items()}
+            for platform_id, records in partial.titles.items()
+        }
+        all_timestamps = {
+            file_name: (txt_dir / file_name).stat().st_mtime for file_name in partial.files
+        }
+        return all_titles, dict(partial.id_to_name), all_timestamps
+
+    def _read_archived_titles(
+        self,
+        date_folder: str,
+        archive: DayArchive,
+        platform_ids: Optional[List[str]]
+    ) -> Tuple[Dict, Dict, Dict]:
+        """顺序读取归档中的快照（归档是单个压缩流，无法分段并行解压）"""
         all_titles = {}
         id_to_name = {}
         all_timestamps = {}
 
-        # 读取所有txt文件
-        txt_files = sorted(txt_dir.glob("*.txt"))
-
-        if not txt_files:
+        snapshot_files = [
+            (name, snapshot.to_titles, archive.get_mtime(f"txt/{name}"))
+            for name, snapshot in archive.iter_snapshots()
+        ]
+        if not snapshot_files:
             raise DataNotFoundError(
                 f"{date_folder} 没有数据文件",
                 suggestion="请等待爬虫任务完成"
             )
 
-        for txt_file in txt_files:
+        for file_name, parse_titles, timestamp in snapshot_files:
             try:
-                titles_by_id, file_id_to_name = self.parse_txt_file(txt_file)
+                titles_by_id, file_id_to_name = parse_titles()
 
                 # 更新id_to_name
                 id_to_name.update(file_id_to_name)
@@ -229,35 +358,115 @@ class ParserService:
                     if platform_ids and platform_id not in platform_ids:
                         continue
 
-                    if platform_id not in all_titles:
-                        all_titles[platform_id] = {}
+                    platform_titles = all_titles.setdefault(intern(platform_id), {})
 
                     for title, info in titles.items():
-                        if title in all_titles[platform_id]:
+                        record = platform_titles.get(title)
+                        if record is not None:
                             # 合并排名
-                            all_titles[platform_id][title]["ranks"].extend(info["ranks"])
+                            record.extend_ranks(info["ranks"])
                         else:
-                            all_titles[platform_id][title] = info.copy()
+                            platform_titles[intern(title)] = TitleRecord.from_info(info)
 
                 # 记录文件时间戳
-                all_timestamps[txt_file.name] = txt_file.stat().st_mtime
+                all_timestamps[file_name] = timestamp
 
             except Exception as e:
                 # 忽略单个文件的解析错误，继续处理其他文件
-                print(f"Warning: 解析文件 {txt_file} 失败: {e}")
+                print(f"Warning: 解析文件 {date_folder}/{file_name} 失败: {e}")
                 continue
 
-        if not all_titles:
-            raise DataNotFoundError(
-                f"{date_folder} 没有有效的数据",
-                suggestion="请检查数据文件格式或重新运行爬虫"
+        return all_titles, id_to_name, all_timestamps
+
+    def get_day_archive(self, date_folder: str) -> Optional[DayArchive]:
+        """
+        获取已归档日期的归档
+
+        Args:
+            date_folder: 日期文件夹名称，格式: YYYY年MM月DD日
+
+        Returns:
+            output/archive/ 下存在该日期的归档时返回归档实例，否则返回 None
+        """
+        archive_path = get_archive_path(self.project_root / "output", date_folder)
+        return DayArchive(archive_path) if archive_path.exists() else None
+
+    def get_snapshot_store(self) -> Optional[SnapshotStore]:
+        """
+        获取 SQLite 快照存储
+
+        Returns:
+            config.yaml 中启用了 storage.sqlite 且数据库文件存在时返回存储实例，否则返回 None
+        """
+        if self._snapshot_store is None:
+            try:
+                config_data = self.parse_yaml_config() or {}
+            except FileParseError:
+                config_data = {}
+
+            sqlite_config = (config_data.get("storage") or {}).get("sqlite") or {}
+            if sqlite_config.get("enabled", False):
+                db_path = self.project_root / sqlite_config.get(
+                    "path", "output/trendradar.db"
+                )
+                self._snapshot_store = SnapshotStore(db_path)
+            else:
+                self._snapshot_store = False
+
+        store = self._snapshot_store
+        return store if store and store.exists() else None
+
+    def get_parallel_parse_config(self) -> Tuple[int, int]:
+        """
+        获取txt快照并行解析配置
+
+        Returns:
+            (最大进程数, 最少文件数)，来自 config.yaml 的 storage.parallel_parse，进程数 0 表示使用全部 CPU
+        """
+        if self._parallel_parse_config is None:
+            try:
+                config_data = self.parse_yaml_config() or {}
+            except FileParseError:
+                config_data = {}
+
+            parallel_config = (config_data.get("storage") or {}).get("parallel_parse") or {}
+            self._parallel_parse_config = (
+                parallel_config.get("workers", 0),
+                parallel_config.get("min_files", DEFAULT_MIN_FILES),
             )
+        return self._parallel_parse_config
 
-        # 缓存结果
-        result = (all_titles, id_to_name, all_timestamps)
-        self.cache.set(cache_key, result)
+    def get_snapshot_store_for_date(self, date_folder: str) -> Optional[SnapshotStore]:
+        """
+        获取包含指定日期完整数据的 SQLite 快照存储
 
-        return result
+        Args:
+            date_folder: 日期文件夹名称，格式: YYYY年MM月DD日
+
+        Returns:
+            存储中包含该日期全部 txt 快照（含已归档的快照）时返回存储实例，否则返回 None（调用方回退到解析 txt 文件）
+        """
+        store = self.get_snapshot_store()
+        if store is None:
+            return None
+
+        stored_times = {
+            time_name for time_name, _ in store.list_snapshots(date_folder_to_iso(date_folder))
+        }
+        if not stored_times:
+            return None
+
+        txt_dir = self.project_root / "output" / date_folder / "txt"
+        if txt_dir.exists():
+            txt_stems = {f.stem for f in txt_dir.glob("*.txt")}
+        else:
+            archive = self.get_day_archive(date_folder)
+            txt_stems = (
+                {Path(name).stem for name in archive.list_files("txt")} if archive else set()
+            )
+        if not txt_stems <= stored_times:
+            return None
+        return store
 
     def parse_yaml_config(self, config_path: str = None) -> dict:
         """
@@ -291,11 +500,29 @@ class ParserService:
         """
         解析关键词配置文件
 
+        与 main.py 共用 trendradar.rules 的解析和缓存，文件未修改时直接返回已编译的规则。
+
         Args:
             words_file: 关键词文件路径，默认为 config/frequency_words.txt
 
         Returns:
-            词组列表
+            词组列表，每组包含 required（必须词）、normal（普通词）和 group_key
+
+        Raises:
+            FileParseError: 文件解析错误
+        """
+        rules = self.load_frequency_rules(words_file)
+        return rules.word_groups if rules else []
+
+    def load_frequency_rules(self, words_file: str = None) -> Optional[CompiledRules]:
+        """
+        加载编译后的关键词规则（含过滤词和匹配器）
+
+        Args:
+            words_file: 关键词文件路径，默认为 config/frequency_words.txt
+
+        Returns:
+            编译后的规则，文件不存在时返回 None
 
         Raises:
             FileParseError: 文件解析错误
@@ -306,50 +533,9 @@ class ParserService:
             words_file = Path(words_file)
 
         if not words_file.exists():
-            return []
-
-        word_groups = []
+            return None
 
         try:
-            with open(words_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith("#"):
-                        continue
-
-                    # 使用 | 分隔符
-                    parts = [p.strip() for p in line.split("|")]
-                    if not parts:
-                        continue
-
-                    group = {
-                        "required": [],
-                        "normal": [],
-                        "filter_words": []
-                    }
-
-                    for part in parts:
-                        if not part:
-                            continue
-
-                        words = [w.strip() for w in part.split(",")]
-                        for word in words:
-                            if not word:
-                                continue
-                            if word.endswith("+"):
-                                # 必须词
-                                group["required"].append(word[:-1])
-                            elif word.endswith("!"):
-                                # 过滤词
-                                group["filter_words"].append(word[:-1])
-                            else:
-                                # 普通词
-                                group["normal"].append(word)
-
-                    if group["required"] or group["normal"]:
-                        word_groups.append(group)
-
+            return load_rules(words_file)
         except Exception as e:
             raise FileParseError(str(words_file), str(e))
-
-        return word_groups
@@ -10,6 +10,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from difflib import SequenceMatcher
 
+from trendradar.weights import WeightScorer
+
 from ..services.data_service import DataService
 from ..utils.validators import (
     validate_platforms,
@@ -20,12 +22,15 @@ from ..utils.validators import (
 )
 from ..utils.errors import MCPError, InvalidParameterError, DataNotFoundError
 
+# 默认权重配置（与 config.yaml 的 weight 默认值一致），批量排序时使用
+NEWS_WEIGHT_SCORER = WeightScorer()
+
 
 def calculate_news_weight(news_data: Dict, rank_threshold: int = 5) -> float:
     """
     计算新闻权重（用于排序）
 
-    基于 main.py 的权重算法实现，综合考虑：
+    与 main.py 共用 trendradar.weights 的权重算法，综合考虑：
     - 排名权重 (60%)：新闻在榜单中的排名
     - 频次权重 (30%)：新闻出现的次数
     - 热度权重 (10%)：高排名出现的比例
@@ -37,41 +42,9 @@ def calculate_news_weight(news_data: Dict, rank_threshold: int = 5) -> float:
     Returns:
         权重分数（0-100之间的浮点数）
     """
-    ranks = news_data.get("ranks", [])
-    if not ranks:
-        return 0.0
-
-    count = news_data.get("count", len(ranks))
-
-    # 权重配置（与 config.yaml 保持一致）
-    RANK_WEIGHT = 0.6
-    FREQUENCY_WEIGHT = 0.3
-    HOTNESS_WEIGHT = 0.1
-
-    # 1. 排名权重：Σ(11 - min(rank, 10)) / 出现次数
-    rank_scores = []
-    for rank in ranks:
-        score = 11 - min(rank, 10)
-        rank_scores.append(score)
-
-    rank_weight = sum(rank_scores) / len(ranks) if ranks else 0
-
-    # 2. 频次权重：min(出现次数, 10) × 10
-    frequency_weight = min(count, 10) * 10
-
-    # 3. 热度加成：高排名次数 / 总出现次数 × 100
-    high_rank_count = sum(1 for rank in ranks if rank <= rank_threshold)
-    hotness_ratio = high_rank_count / len(ranks) if ranks else 0
-    hotness_weight = hotness_ratio * 100
-
-    # 综合权重
-    total_weight = (
-        rank_weight * RANK_WEIGHT
-        + frequency_weight * FREQUENCY_WEIGHT
-        + hotness_weight * HOTNESS_WEIGHT
-    )
-
-    return total_weight
+    if rank_threshold == NEWS_WEIGHT_SCORER.rank_threshold:
+        return NEWS_WEIGHT_SCORER.score(news_data)
+    return WeightScorer(rank_threshold=rank_threshold).score(news_data)
 
 
 class AnalyticsTools:
@@ -308,6 +281,7 @@ class AnalyticsTools:
 
             # 收集趋势数据
             trend_data = []
+            self.data_service.parser.prefetch_titles_for_dates(start_date, end_date)
             current_date = start_date
 
             while current_date <= end_date:
@@ -449,6 +423,7 @@ class AnalyticsTools:
             })
 
             # 遍历日期范围
+            self.data_service.parser.prefetch_titles_for_dates(start_date, end_date)
             current_date = start_date
             while current_date <= end_date:
                 try:
@@ -693,6 +668,7 @@ class AnalyticsTools:
 
             # 收集新闻数据（支持多天）
             all_news_items = []
+            self.data_service.parser.prefetch_titles_for_dates(start_date, end_date, platforms)
             current_date = start_date
 
             while current_date <= end_date:
@@ -753,15 +729,13 @@ class AnalyticsTools:
 
             deduplicated_news = list(unique_news.values())
 
-            # 按权重排序（如果启用）
+            # 按权重排序（如果启用），只选出需要返回的前 limit 条
             if sort_by_weight:
-                deduplicated_news.sort(
-                    key=lambda x: calculate_news_weight(x),
-                    reverse=True
+                selected_news = NEWS_WEIGHT_SCORER.sort(
+                    deduplicated_news, top_k=limit, break_ties=False
                 )
-
-            # 限制返回数量
-            selected_news = deduplicated_news[:limit]
+            else:
+                selected_news = deduplicated_news[:limit]
 
             # 生成 AI 提示词
             ai_prompt = self._create_sentiment_analysis_prompt(
@@ -1114,18 +1088,15 @@ class AnalyticsTools:
             if entity in entity_context:
                 del entity_context[entity]
 
-            # 按权重排序（如果启用）
+            # 按权重排序（如果启用），只选出需要返回的前 limit 条
             if sort_by_weight:
-                related_news.sort(
-                    key=lambda x: calculate_news_weight(x),
-                    reverse=True
+                result_news = NEWS_WEIGHT_SCORER.sort(
+                    related_news, top_k=limit, break_ties=False
                 )
             else:
                 # 按排名排序
                 related_news.sort(key=lambda x: x["rank"])
-
-            # 限制返回数量
-            result_news = related_news[:limit]
+                result_news = related_news[:limit]
 
             return {
                 "success": True,
@@ -1207,6 +1178,7 @@ class AnalyticsTools:
             all_platforms_news = defaultdict(int)
             all_titles_list = []
 
+            self.data_service.parser.prefetch_titles_for_dates(start_date, end_date)
             current_date = start_date
             while current_date <= end_date:
                 try:
@@ -1380,6 +1352,7 @@ class AnalyticsTools:
             })
 
             # 遍历日期范围
+            self.data_service.parser.prefetch_titles_for_dates(start_date, end_date)
             current_date = start_date
             while current_date <= end_date:
                 try:
@@ -1509,6 +1482,7 @@ class AnalyticsTools:
 
             # 收集话题历史数据
             lifecycle_data = []
+            self.data_service.parser.prefetch_titles_for_dates(start_date, end_date)
             current_date = start_date
             while current_date <= end_date:
                 try:
@@ -122,6 +122,7 @@ class SearchTools:
 
             # 收集所有匹配的新闻
             all_matches = []
+            self.data_service.parser.prefetch_titles_for_dates(start_date, end_date, platforms)
             current_date = start_date
 
             while current_date <= end_date:
@@ -187,8 +188,8 @@ class SearchTools:
             if sort_by == "relevance":
                 all_matches.sort(key=lambda x: x.get("similarity_score", 1.0), reverse=True)
             elif sort_by == "weight":
-                from .analytics import calculate_news_weight
-                all_matches.sort(key=lambda x: calculate_news_weight(x), reverse=True)
+                from .analytics import NEWS_WEIGHT_SCORER
+                all_matches = NEWS_WEIGHT_SCORER.sort(all_matches, break_ties=False)
             elif sort_by == "date":
                 all_matches.sort(key=lambda x: x.get("date", ""), reverse=True)
 
@@ -574,6 +575,7 @@ class SearchTools:
 
             # 收集所有相关新闻
             all_related_news = []
+            self.data_service.parser.prefetch_titles_for_dates(search_start, search_end)
             current_date = search_start
 
             while current_date <= search_end:
@@ -0,0 +1,15 @@
+"""
+pytest 公共设置
+
+main.py 在导入时读取配置文件，这里固定使用仓库内的 config/config.yaml，
+测试从任意目录运行都能导入 main。
+"""
+
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("CONFIG_PATH", str(ROOT / "config" / "config.yaml"))
@@ -0,0 +1,185 @@
+"""日期文件夹归档测试"""
+
+from datetime import datetime
+
+import pytest
+import pytz
+
+import main
+from mcp_server.services.cache_service import get_cache
+from mcp_server.services.data_service import DataService
+from trendradar.archive import DayArchive, archive_date_folder, get_archive_path, list_archives
+from trendradar.snapshot import Snapshot, format_repeat_marker
+
+NOW = pytz.timezone("Asia/Shanghai").localize(datetime(2025, 7, 10, 12, 0))
+
+FIRST = """\
+weibo | 微博
+1. 微博标题1 [URL:https://w/1]
+2. 微博标题2
+
+zhihu | 知乎
+1. 知乎标题1 [URL:https://z/1] [MOBILE:https://m.z/1]
+
+==== 以下ID请求失败 ====
+hupu
+"""
+
+THIRD = """\
+weibo | 微博
+1. 微博标题3
+2. 微博标题1 [URL:https://w/1]
+
+zhihu | 知乎
+1. 知乎标题2
+"""
+
+
+def make_date_folder(output_dir, date_folder):
+    """完整快照、"与快照相同"标记、增量快照和 html 报告各一份"""
+    txt_dir = output_dir / date_folder / "txt"
+    txt_dir.mkdir(parents=True)
+    (txt_dir / "08时00分.txt").write_text(FIRST, encoding="utf-8")
+    (txt_dir / "08时30分.txt").write_text(format_repeat_marker("08时00分") + "\n", encoding="utf-8")
+    delta = Snapshot.parse(FIRST).encode_delta("08时00分", Snapshot.parse(THIRD))
+    assert delta is not None
+    (txt_dir / "09时00分.txt").write_text(delta, encoding="utf-8")
+
+    html_dir = output_dir / date_folder / "html"
+    html_dir.mkdir()
+    (html_dir / "当日汇总.html").write_text("<html>汇总</html>", encoding="utf-8")
+    return output_dir / date_folder
+
+
+def read_files(date_dir):
+    return {
+        path.relative_to(date_dir).as_posix(): path.read_bytes()
+        for path in date_dir.rglob("*")
+        if path.is_file()
+    }
+
+
+def as_dicts(all_titles):
+    return {
+        platform_id: {
+            title: {"ranks": list(info["ranks"]), "url": info["url"], "mobileUrl": info["mobileUrl"]}
+            for title, info in titles.items()
+        }
+        for platform_id, titles in all_titles.items()
+    }
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "get_beijing_time", lambda: NOW)
+    get_cache().clear()
+    yield tmp_path
+    get_cache().clear()
+
+
+def test_round_trip_through_archive_and_mcp(project):
+    date_dir = make_date_folder(project / "output", "2025年07月01日")
+    original_files = read_files(date_dir)
+    target_date = datetime(2025, 7, 1)
+
+    service = DataService(str(project))
+    titles_before, names_before, timestamps_before = service.parser.read_all_titles_for_date(target_date)
+    titles_before = as_dicts(titles_before)
+    news_before = service.get_news_by_date(target_date, include_url=True, limit=100)
+    assert titles_before["weibo"]["微博标题1"]["ranks"] == [1, 1, 2]
+    assert titles_before["zhihu"]["知乎标题1"]["mobileUrl"] == "https://m.z/1"
+
+    assert main.archive_closed_date_folders(keep_days=3) == 1
+    assert not date_dir.exists()
+
+    archive = DayArchive(get_archive_path(project / "output", "2025年07月01日"))
+    assert dict(archive.iter_files()) == original_files
+    assert archive.list_files("txt") == ["08时00分.txt", "08时30分.txt", "09时00分.txt"]
+    assert archive.list_files("html") == ["当日汇总.html"]
+    assert archive.index["original_bytes"] == sum(len(data) for data in original_files.values())
+    # 只读 txt 部分时在 html 之前停止
+    assert [name for name, _ in archive.iter_files("txt")] == [
+        "txt/08时00分.txt",
+        "txt/08时30分.txt",
+        "txt/09时00分.txt",
+    ]
+    restored = dict(archive.iter_snapshots())
+    assert restored["09时00分.txt"].to_titles()[0] == Snapshot.parse(THIRD).to_titles()[0]
+    assert restored["08时30分.txt"].to_titles()[0] == Snapshot.parse(FIRST).to_titles()[0]
+
+    # MCP 按日期查询时从归档读取，结果与归档前相同
+    get_cache().clear()
+    service = DataService(str(project))
+    titles_after, names_after, timestamps_after = service.parser.read_all_titles_for_date(target_date)
+    assert as_dicts(titles_after) == titles_before
+    assert names_after == names_before
+    assert timestamps_after == timestamps_before
+    assert service.get_news_by_date(target_date, include_url=True, limit=100) == news_before
+    assert service.get_available_date_range() == (target_date, target_date)
+
+
+def test_only_closed_date_folders_are_archived(project):
+    output_dir = project / "output"
+    for date_folder in [
+        "2025年07月01日",
+        "2025年07月06日",
+        "2025年07月07日",  # 保留天数内
+        "2025年07月10日",  # 今天
+        "2025年07月11日",  # 时钟回拨等原因出现的未来日期
+    ]:
+        make_date_folder(output_dir, date_folder)
+    (output_dir / ".crawler_state").mkdir()
+    (output_dir / "index.html").write_text("", encoding="utf-8")
+
+    assert main.archive_closed_date_folders(keep_days=3) == 2
+    assert [archive.date_folder for archive in list_archives(output_dir)] == [
+        "2025年07月01日",
+        "2025年07月06日",
+    ]
+    assert sorted(path.name for path in output_dir.iterdir()) == [
+        ".crawler_state",
+        "2025年07月07日",
+        "2025年07月10日",
+        "2025年07月11日",
+        "archive",
+        "index.html",
+    ]
+
+    # 保留 0 天（或负数）时也不会归档今天的文件夹
+    assert main.archive_closed_date_folders(keep_days=0) == 1
+    assert main.archive_closed_date_folders(keep_days=-1) == 0
+    assert (output_dir / "2025年07月10日").exists()
+    assert (output_dir / "2025年07月11日").exists()
+
+
+def test_existing_archive_is_not_overwritten(project):
+    output_dir = project / "output"
+    make_date_folder(output_dir, "2025年07月01日")
+    assert main.archive_closed_date_folders(keep_days=3) == 1
+    archive_bytes = get_archive_path(output_dir, "2025年07月01日").read_bytes()
+
+    # 归档后又出现同一天的文件夹（如从旧备份恢复），保留文件夹等待手动合并
+    make_date_folder(output_dir, "2025年07月01日")
+    assert main.archive_closed_date_folders(keep_days=3) == 0
+    assert (output_dir / "2025年07月01日").exists()
+    assert get_archive_path(output_dir, "2025年07月01日").read_bytes() == archive_bytes
+    with pytest.raises(FileExistsError):
+        archive_date_folder(output_dir / "2025年07月01日")
+
+
+def test_failed_verification_keeps_source(project, monkeypatch):
+    date_dir = make_date_folder(project / "output", "2025年07月01日")
+    original_files = read_files(date_dir)
+
+    def corrupted(self, subfolder=None):
+        for name, data in original_iter_files(self, subfolder):
+            yield name, data + b"x"
+
+    original_iter_files = DayArchive.iter_files
+    monkeypatch.setattr(DayArchive, "iter_files", corrupted)
+
+    with pytest.raises(ValueError):
+        archive_date_folder(date_dir)
+    assert read_files(date_dir) == original_files
+    assert list((project / "output" / "archive").iterdir()) == []
@@ -0,0 +1,600 @@
+"""消息分批测试：与改版前逐行拼接再计算字节数的分批结果一致"""
+
+import random
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pytest
+import pytz
+
+import main
+
+FORMATS = ["feishu", "dingtalk", "wework", "telegram", "ntfy"]
+NOW = pytz.timezone("Asia/Shanghai").localize(datetime(2025, 7, 10, 12, 0))
+UPDATE_INFO = {"remote_version": "9.9.9", "current_version": "1.0.0"}
+
+
+def baseline_split(
+    report_data: Dict,
+    format_type: str,
+    update_info: Optional[Dict] = None,
+    max_bytes: int = None,
+    mode: str = "daily",
+) -> List[str]:
+    """改版前 main.py 的 split_content_into_batches：每追加一行都重新拼接并编码整个批次"""
+    if max_bytes is None:
+        if format_type == "dingtalk":
+            max_bytes = main.CONFIG.get("DINGTALK_BATCH_SIZE", 20000)
+        elif format_type == "feishu":
+            max_bytes = main.CONFIG.get("FEISHU_BATCH_SIZE", 29000)
+        elif format_type == "ntfy":
+            max_bytes = 3800
+        else:
+            max_bytes = main.CONFIG.get("MESSAGE_BATCH_SIZE", 4000)
+
+    batches = []
+
+    total_titles = sum(
+        len(stat["titles"]) for stat in report_data["stats"] if stat["count"] > 0
+    )
+    now = main.get_beijing_time()
+
+    base_header = ""
+    if format_type == "wework":
+        base_header = f"**总新闻数：** {total_titles}\n\n\n\n"
+    elif format_type == "telegram":
+        base_header = f"总新闻数： {total_titles}\n\n"
+    elif format_type == "ntfy":
+        base_header = f"**总新闻数：** {total_titles}\n\n"
+    elif format_type == "feishu":
+        base_header = ""
+    elif format_type == "dingtalk":
+        base_header = f"**总新闻数：** {total_titles}\n\n"
+        base_header += f"**时间：** {now.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+        base_header += f"**类型：** 热点分析报告\n\n"
+        base_header += "---\n\n"
+
+    base_footer = ""
+    if format_type == "wework":
+        base_footer = f"\n\n\n> 更新时间：{now.strftime('%Y-%m-%d %H:%M:%S')}"
+        if update_info:
+            base_footer += f"\n> TrendRadar 发现新版本 **{update_info['remote_version']}**，当前 **{update_info['current_version']}**"
+    elif format_type == "telegram":
+        base_footer = f"\n\n更新时间：{now.strftime('%Y-%m-%d %H:%M:%S')}"
+        if update_info:
+            base_footer += f"\nTrendRadar 发现新版本 {update_info['remote_version']}，当前 {update_info['current_version']}"
+    elif format_type == "ntfy":
+        base_footer = f"\n\n> 更新时间：{now.strftime('%Y-%m-%d %H:%M:%S')}"
+        if update_info:
+            base_footer += f"\n> TrendRadar 发现新版本 **{update_info['remote_version']}**，当前 **{update_info['current_version']}**"
+    elif format_type == "feishu":
+        base_footer = f"\n\n<font color='grey'>更新时间：{now.strftime('%Y-%m-%d %H:%M:%S')}</font>"
+        if update_info:
+            base_footer += f"\n<font color='grey'>TrendRadar 发现新版本 {update_info['remote_version']}，当前 {update_info['current_version']}</font>"
+    elif format_type == "dingtalk":
+        base_footer = f"\n\n> 更新时间：{now.strftime('%Y-%m-%d %H:%M:%S')}"
+        if update_info:
+            base_footer += f"\n> TrendRadar 发现新版本 **{update_info['remote_version']}**，当前 **{update_info['current_version']}**"
+
+    stats_header = ""
+    if report_data["stats"]:
+        if format_type == "wework":
+            stats_header = f"📊 **热点词汇统计**\n\n"
+        elif format_type == "telegram":
+            stats_header = f"📊 热点词汇统计\n\n"
+        elif format_type == "ntfy":
+            stats_header = f"📊 **热点词汇统计**\n\n"
+        elif format_type == "feishu":
+            stats_header = f"📊 **热点词汇统计**\n\n"
+        elif format_type == "dingtalk":
+            stats_header = f"📊 **热点词汇统计**\n\n"
+
+    current_batch = base_header
+    current_batch_has_content = False
+
+    if (
+        not report_data["stats"]
+        and not report_data["new_titles"]
+        and not report_data["failed_ids"]
+    ):
+        if mode == "incremental":
+            mode_text = "增量模式下暂无新增匹配的热点词汇"
+        elif mode == "current":
+            mode_text = "当前榜单模式下暂无匹配的热点词汇"
+        else:
+            mode_text = "暂无匹配的热点词汇"
+        simple_content = f"📭 {mode_text}\n\n"
+        final_content = base_header + simple_content + base_footer
+        batches.append(final_content)
+        return batches
+
+    # 处理热点词汇统计
+    if report_data["stats"]:
+        total_count = len(report_data["stats"])
+
+        # 添加统计标题
+        test_content = current_batch + stats_header
+        if (
+            len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
+            < max_bytes
+        ):
+            current_batch = test_content
+            current_batch_has_content = True
+        else:
+            if current_batch_has_content:
+                batches.append(current_batch + base_footer)
+            current_batch = base_header + stats_header
+            current_batch_has_content = True
+
+        # 逐个处理词组（确保词组标题+第一条新闻的原子性）
+        for i, stat in enumerate(report_data["stats"]):
+            word = stat["word"]
+            count = stat["count"]
+            sequence_display = f"[{i + 1}/{total_count}]"
+
+            # 构建词组标题
+            word_header = ""
+            if format_type == "wework":
+                if count >= 10:
+                    word_header = (
+                        f"🔥 {sequence_display} **{word}** : **{count}** 条\n\n"
+                    )
+                elif count >= 5:
+                    word_header = (
+                        f"📈 {sequence_display} **{word}** : **{count}** 条\n\n"
+                    )
+                else:
+                    word_header = f"📌 {sequence_display} **{word}** : {count} 条\n\n"
+            elif format_type == "telegram":
+                if count >= 10:
+                    word_header = f"🔥 {sequence_display} {word} : {count} 条\n\n"
+                elif count >= 5:
+                    word_header = f"📈 {sequence_display} {word} : {count} 条\n\n"
+                else:
+                    word_header = f"📌 {sequence_display} {word} : {count} 条\n\n"
+            elif format_type == "ntfy":
+                if count >= 10:
+                    word_header = (
+                        f"🔥 {sequence_display} **{word}** : **{count}** 条\n\n"
+                    )
+                elif count >= 5:
+                    word_header = (
+                        f"📈 {sequence_display} **{word}** : **{count}** 条\n\n"
+                    )
+                else:
+                    word_header = f"📌 {sequence_display} **{word}** : {count} 条\n\n"
+            elif format_type == "feishu":
+                if count >= 10:
+                    word_header = f"🔥 <font color='grey'>{sequence_display}</font> **{word}** : <font color='red'>{count}</font> 条\n\n"
+                elif count >= 5:
+                    word_header = f"📈 <font color='grey'>{sequence_display}</font> **{word}** : <font color='orange'>{count}</font> 条\n\n"
+                else:
+                    word_header = f"📌 <font color='grey'>{sequence_display}</font> **{word}** : {count} 条\n\n"
+            elif format_type == "dingtalk":
+                if count >= 10:
+                    word_header = (
+                        f"🔥 {sequence_display} **{word}** : **{count}** 条\n\n"
+                    )
+                elif count >= 5:
+                    word_header = (
+                        f"📈 {sequence_display} **{word}** : **{count}** 条\n\n"
+                    )
+                else:
+                    word_header = f"📌 {sequence_display} **{word}** : {count} 条\n\n"
+
+            # 构建第一条新闻
+            first_news_line = ""
+            if stat["titles"]:
+                first_title_data = stat["titles"][0]
+                if format_type == "wework":
+                    formatted_title = main.format_title_for_platform(
+                        "wework", first_title_data, show_source=True
+                    )
+                elif format_type == "telegram":
+                    formatted_title = main.format_title_for_platform(
+                        "telegram", first_title_data, show_source=True
+                    )
+                elif format_type == "ntfy":
+                    formatted_title = main.format_title_for_platform(
+                        "ntfy", first_title_data, show_source=True
+                    )
+                elif format_type == "feishu":
+                    formatted_title = main.format_title_for_platform(
+                        "feishu", first_title_data, show_source=True
+                    )
+                elif format_type == "dingtalk":
+                    formatted_title = main.format_title_for_platform(
+                        "dingtalk", first_title_data, show_source=True
+                    )
+                else:
+                    formatted_title = f"{first_title_data['title']}"
+
+                first_news_line = f"  1. {formatted_title}\n"
+                if len(stat["titles"]) > 1:
+                    first_news_line += "\n"
+
+            # 原子性检查：词组标题+第一条新闻必须一起处理
+            word_with_first_news = word_header + first_news_line
+            test_content = current_batch + word_with_first_news
+
+            if (
+                len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
+                >= max_bytes
+            ):
+                # 当前批次容纳不下，开启新批次
+                if current_batch_has_content:
+                    batches.append(current_batch + base_footer)
+                current_batch = base_header + stats_header + word_with_first_news
+                current_batch_has_content = True
+                start_index = 1
+            else:
+                current_batch = test_content
+                current_batch_has_content = True
+                start_index = 1
+
+            # 处理剩余新闻条目
+            for j in range(start_index, len(stat["titles"])):
+                title_data = stat["titles"][j]
+                if format_type == "wework":
+                    formatted_title = main.format_title_for_platform(
+                        "wework", title_data, show_source=True
+                    )
+                elif format_type == "telegram":
+                    formatted_title = main.format_title_for_platform(
+                        "telegram", title_data, show_source=True
+                    )
+                elif format_type == "ntfy":
+                    formatted_title = main.format_title_for_platform(
+                        "ntfy", title_data, show_source=True
+                    )
+                elif format_type == "feishu":
+                    formatted_title = main.format_title_for_platform(
+                        "feishu", title_data, show_source=True
+                    )
+                elif format_type == "dingtalk":
+                    formatted_title = main.format_title_for_platform(
+                        "dingtalk", title_data, show_source=True
+                    )
+                else:
+                    formatted_title = f"{title_data['title']}"
+
+                news_line = f"  {j + 1}. {formatted_title}\n"
+                if j < len(stat["titles"]) - 1:
+                    news_line += "\n"
+
+                test_content = current_batch + news_line
+                if (
+                    len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
+                    >= max_bytes
+                ):
+                    if current_batch_has_content:
+                        batches.append(current_batch + base_footer)
+                    current_batch = base_header + stats_header + word_header + news_line
+                    current_batch_has_content = True
+                else:
+                    current_batch = test_content
+                    current_batch_has_content = True
+
+            # 词组间分隔符
+            if i < len(report_data["stats"]) - 1:
+                separator = ""
+                if format_type == "wework":
+                    separator = f"\n\n\n\n"
+                elif format_type == "telegram":
+                    separator = f"\n\n"
+                elif format_type == "ntfy":
+                    separator = f"\n\n"
+                elif format_type == "feishu":
+                    separator = f"\n{main.CONFIG['FEISHU_MESSAGE_SEPARATOR']}\n\n"
+                elif format_type == "dingtalk":
+                    separator = f"\n---\n\n"
+
+                test_content = current_batch + separator
+                if (
+                    len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
+                    < max_bytes
+                ):
+                    current_batch = test_content
+
+    # 处理新增新闻（同样确保来源标题+第一条新闻的原子性）
+    if report_data["new_titles"]:
+        new_header = ""
+        if format_type == "wework":
+            new_header = f"\n\n\n\n🆕 **本次新增热点新闻** (共 {report_data['total_new_count']} 条)\n\n"
+        elif format_type == "telegram":
+            new_header = (
+                f"\n\n🆕 本次新增热点新闻 (共 {report_data['total_new_count']} 条)\n\n"
+            )
+        elif format_type == "ntfy":
+            new_header = f"\n\n🆕 **本次新增热点新闻** (共 {report_data['total_new_count']} 条)\n\n"
+        elif format_type == "feishu":
+            new_header = f"\n{main.CONFIG['FEISHU_MESSAGE_SEPARATOR']}\n\n🆕 **本次新增热点新闻** (共 {report_data['total_new_count']} 条)\n\n"
+        elif format_type == "dingtalk":
+            new_header = f"\n---\n\n🆕 **本次新增热点新闻** (共 {report_data['total_new_count']} 条)\n\n"
+
+        test_content = current_batch + new_header
+        if (
+            len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
+            >= max_bytes
+        ):
+            if current_batch_has_content:
+                batches.append(current_batch + base_footer)
+            current_batch = base_header + new_header
+            current_batch_has_content = True
+        else:
+            current_batch = test_content
+            current_batch_has_content = True
+
+        # 逐个处理新增新闻来源
+        for source_data in report_data["new_titles"]:
+            source_header = ""
+            if format_type == "wework":
+                source_header = f"**{source_data['source_name']}** ({len(source_data['titles'])} 条):\n\n"
+            elif format_type == "telegram":
+                source_header = f"{source_data['source_name']} ({len(source_data['titles'])} 条):\n\n"
+            elif format_type == "ntfy":
+                source_header = f"**{source_data['source_name']}** ({len(source_data['titles'])} 条):\n\n"
+            elif format_type == "feishu":
+                source_header = f"**{source_data['source_name']}** ({len(source_data['titles'])} 条):\n\n"
+            elif format_type == "dingtalk":
+                source_header = f"**{source_data['source_name']}** ({len(source_data['titles'])} 条):\n\n"
+
+            # 构建第一条新增新闻
+            first_news_line = ""
+            if source_data["titles"]:
+                first_title_data = source_data["titles"][0]
+                title_data_copy = first_title_data.copy()
+                title_data_copy["is_new"] = False
+
+                if format_type == "wework":
+                    formatted_title = main.format_title_for_platform(
+                        "wework", title_data_copy, show_source=False
+                    )
+                elif format_type == "telegram":
+                    formatted_title = main.format_title_for_platform(
+                        "telegram", title_data_copy, show_source=False
+                    )
+                elif format_type == "feishu":
+                    formatted_title = main.format_title_for_platform(
+                        "feishu", title_data_copy, show_source=False
+                    )
+                elif format_type == "dingtalk":
+                    formatted_title = main.format_title_for_platform(
+                        "dingtalk", title_data_copy, show_source=False
+                    )
+                else:
+                    formatted_title = f"{title_data_copy['title']}"
+
+                first_news_line = f"  1. {formatted_title}\n"
+
+            # 原子性检查：来源标题+第一条新闻
+            source_with_first_news = source_header + first_news_line
+            test_content = current_batch + source_with_first_news
+
+            if (
+                len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
+                >= max_bytes
+            ):
+                if current_batch_has_content:
+                    batches.append(current_batch + base_footer)
+                current_batch = base_header + new_header + source_with_first_news
+                current_batch_has_content = True
+                start_index = 1
+            else:
+                current_batch = test_content
+                current_batch_has_content = True
+                start_index = 1
+
+            # 处理剩余新增新闻
+            for j in range(start_index, len(source_data["titles"])):
+                title_data = source_data["titles"][j]
+                title_data_copy = title_data.copy()
+                title_data_copy["is_new"] = False
+
+                if format_type == "wework":
+                    formatted_title = main.format_title_for_platform(
+                        "wework", title_data_copy, show_source=False
+                    )
+                elif format_type == "telegram":
+                    formatted_title = main.format_title_for_platform(
+                        "telegram", title_data_copy, show_source=False
+                    )
+                elif format_type == "feishu":
+                    formatted_title = main.format_title_for_platform(
+                        "feishu", title_data_copy, show_source=False
+                    )
+                elif format_type == "dingtalk":
+                    formatted_title = main.format_title_for_platform(
+                        "dingtalk", title_data_copy, show_source=False
+                    )
+                else:
+                    formatted_title = f"{title_data_copy['title']}"
+
+                news_line = f"  {j + 1}. {formatted_title}\n"
+
+                test_content = current_batch + news_line
+                if (
+                    len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
+                    >= max_bytes
+                ):
+                    if current_batch_has_content:
+                        batches.append(current_batch + base_footer)
+                    current_batch = base_header + new_header + source_header + news_line
+                    current_batch_has_content = True
+                else:
+                    current_batch = test_content
+                    current_batch_has_content = True
+
+            current_batch += "\n"
+
+    if report_data["failed_ids"]:
+        failed_header = ""
+        if format_type == "wework":
+            failed_header = f"\n\n\n\n⚠️ **数据获取失败的平台：**\n\n"
+        elif format_type == "telegram":
+            failed_header = f"\n\n⚠️ 数据获取失败的平台：\n\n"
+        elif format_type == "ntfy":
+            failed_header = f"\n\n⚠️ **数据获取失败的平台：**\n\n"
+        elif format_type == "feishu":
+            failed_header = f"\n{main.CONFIG['FEISHU_MESSAGE_SEPARATOR']}\n\n⚠️ **数据获取失败的平台：**\n\n"
+        elif format_type == "dingtalk":
+            failed_header = f"\n---\n\n⚠️ **数据获取失败的平台：**\n\n"
+
+        test_content = current_batch + failed_header
+        if (
+            len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
+            >= max_bytes
+        ):
+            if current_batch_has_content:
+                batches.append(current_batch + base_footer)
+            current_batch = base_header + failed_header
+            current_batch_has_content = True
+        else:
+            current_batch = test_content
+            current_batch_has_content = True
+
+        for i, id_value in enumerate(report_data["failed_ids"], 1):
+            if format_type == "feishu":
+                failed_line = f"  • <font color='red'>{id_value}</font>\n"
+            elif format_type == "dingtalk":
+                failed_line = f"  • **{id_value}**\n"
+            else:
+                failed_line = f"  • {id_value}\n"
+
+            test_content = current_batch + failed_line
+            if (
+                len(test_content.encode("utf-8")) + len(base_footer.encode("utf-8"))
+                >= max_bytes
+            ):
+                if current_batch_has_content:
+                    batches.append(current_batch + base_footer)
+                current_batch = base_header + failed_header + failed_line
+                current_batch_has_content = True
+            else:
+                current_batch = test_content
+                current_batch_has_content = True
+
+    # 完成最后批次
+    if current_batch_has_content:
+        batches.append(current_batch + base_footer)
+
+    return batches
+
+
+WORDS = "人工智能 芯片 新能源 汽车 发布会 市场 OpenAI GPT Apple 🚀".split()
+SOURCES = ["微博", "知乎", "百度热搜", "今日头条"]
+
+
+def make_title(rng, index, words=None):
+    first, last = sorted(rng.sample(range(8, 23), 2))
+    return {
+        "title": "".join(rng.choice(WORDS) for _ in range(words or rng.randint(1, 6))) + f" #{index}",
+        "source_name": rng.choice(SOURCES),
+        "time_display": rng.choice(["", f"[{first:02d}时00分 ~ {last:02d}时30分]"]),
+        "count": rng.randint(1, 12),
+        "ranks": sorted(rng.sample(range(1, 31), rng.randint(1, 3))),
+        "rank_threshold": 5,
+        "url": rng.choice(["", f"https://example.com/{index}"]),
+        "mobile_url": rng.choice(["", f"https://m.example.com/{index}"]),
+        "is_new": rng.random() < 0.3,
+    }
+
+
+def make_report(rng, groups=3, sources=2, failed=2):
+    """随机报告：词组、新增新闻来源和失败平台的数量都可能为 0"""
+    index = iter(range(10**6))
+    stats = []
+    for group in range(groups):
+        titles = [make_title(rng, next(index)) for _ in range(rng.randint(0, 5))]
+        count = len(titles) if titles or rng.random() < 0.5 else 1
+        stats.append({"word": f"{rng.choice(WORDS)} {group}", "count": count, "titles": titles})
+    new_titles = [
+        {
+            "source_id": f"s{i}",
+            "source_name": SOURCES[i % len(SOURCES)],
+            "titles": [make_title(rng, next(index)) for _ in range(rng.randint(0, 4))],
+        }
+        for i in range(sources)
+    ]
+    return {
+        "stats": stats,
+        "new_titles": new_titles,
+        "failed_ids": [f"platform-{i}" for i in range(failed)],
+        "total_new_count": sum(len(source["titles"]) for source in new_titles),
+    }
+
+
+@pytest.fixture(autouse=True)
+def fixed_time(monkeypatch):
+    # 批次头尾包含当前时间，固定下来以便比较；每个测试使用独立的标题渲染缓存
+    monkeypatch.setattr(main, "get_beijing_time", lambda: NOW)
+    monkeypatch.setattr(main, "REPORT_MODEL_CACHE", main.ReportModelCache())
+
+
+def assert_same_batches(report_data, format_type, max_bytes, **kwargs):
+    expected = baseline_split(report_data, format_type, max_bytes=max_bytes, **kwargs)
+    assert main.split_content_into_batches(report_data, format_type, max_bytes=max_bytes, **kwargs) == expected
+    return expected
+
+
+def single_batch_size(report_data, format_type, **kwargs):
+    (batch,) = baseline_split(report_data, format_type, max_bytes=10**9, **kwargs)
+    return len(batch.encode("utf-8"))
+
+
+@pytest.mark.parametrize("format_type", FORMATS)
+def test_every_max_bytes_matches_baseline(format_type):
+    report_data = make_report(random.Random(24), groups=3, sources=2, failed=2)
+    size = single_batch_size(report_data, format_type, update_info=UPDATE_INFO)
+
+    # 从远小于单条新闻到刚好放下整份报告，逐字节比较每个上限
+    for max_bytes in range(1, size + 3):
+        batches = assert_same_batches(report_data, format_type, max_bytes, update_info=UPDATE_INFO)
+    assert len(batches) == 1
+
+
+@pytest.mark.parametrize("format_type", FORMATS)
+def test_random_reports_near_limit_match_baseline(format_type):
+    rng = random.Random(FORMATS.index(format_type))
+    for _ in range(40):
+        report_data = make_report(rng, rng.randint(0, 5), rng.randint(0, 3), rng.randint(0, 3))
+        kwargs = {
+            "update_info": rng.choice([None, UPDATE_INFO]),
+            "mode": rng.choice(["daily", "current", "incremental"]),
+        }
+        size = single_batch_size(report_data, format_type, **kwargs)
+        limits = {size - 1, size, size + 1}
+        limits.update(rng.randint(1, size + 1) for _ in range(20))
+        for max_bytes in sorted(limits):
+            if max_bytes > 0:
+                assert_same_batches(report_data, format_type, max_bytes, **kwargs)
+
+
+@pytest.mark.parametrize("format_type", FORMATS)
+def test_title_larger_than_limit_matches_baseline(format_type):
+    rng = random.Random(7)
+    report_data = make_report(rng, groups=3, sources=2, failed=1)
+    huge = make_title(rng, 999, words=200)
+    # 超长新闻分别作为词组的第一条、中间一条，以及新增新闻，再加一个超长的失败平台 ID
+    report_data["stats"][0]["titles"].insert(0, huge)
+    report_data["stats"][1]["titles"].insert(1, dict(huge, title=huge["title"] + " 中间"))
+    report_data["new_titles"][0]["titles"].insert(0, dict(huge, title=huge["title"] + " 新增"))
+    report_data["failed_ids"].append("platform-" + "x" * 1000)
+    for stat in report_data["stats"]:
+        stat["count"] = max(stat["count"], len(stat["titles"]))
+    report_data["total_new_count"] += 1
+
+    huge_line = len(main.format_title_for_platform(format_type, huge, show_source=True).encode("utf-8"))
+    for max_bytes in (300, 500, huge_line - 1, huge_line, huge_line + 1, huge_line + 400):
+        batches = assert_same_batches(report_data, format_type, max_bytes, update_info=UPDATE_INFO)
+        # 放不下的单条新闻仍然整条发送，所在批次超过上限
+        if max_bytes <= huge_line:
+            assert any(len(batch.encode("utf-8")) >= max_bytes for batch in batches)
+
+
+@pytest.mark.parametrize("format_type", FORMATS + ["html"])
+def test_empty_report_matches_baseline(format_type):
+    report_data = {"stats": [], "new_titles": [], "failed_ids": [], "total_new_count": 0}
+    for mode in ("daily", "current", "incremental"):
+        assert_same_batches(report_data, format_type, 10, mode=mode)
+        assert_same_batches(report_data, format_type, None, mode=mode, update_info=UPDATE_INFO)
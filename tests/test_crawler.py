@@ -0,0 +1,310 @@
+"""平台抓取测试：条件请求、响应缓存、熔断与重试预算"""
+
+import json
+
+import pytest
+
+import main
+
+
+BODY = json.dumps(
+    {
+        "status": "success",
+        "items": [
+            {"title": "标题A", "url": "https://a", "mobileUrl": "https://m.a"},
+            {"title": "标题B", "url": "https://b"},
+            {"title": "标题A", "url": "https://a2"},
+        ],
+    },
+    ensure_ascii=False,
+)
+
+PARSED = {
+    "标题A": {"ranks": [1, 3], "url": "https://a", "mobileUrl": "https://m.a"},
+    "标题B": {"ranks": [2], "url": "https://b", "mobileUrl": ""},
+}
+
+
+class FakeResponse:
+    def __init__(self, status_code, text="", headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    """按顺序返回预设响应，并记录每次请求的请求头"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, proxies=None, headers=None, timeout=None):
+        self.requests.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(main.CONFIG, "HTTP_CACHE", True)
+    monkeypatch.setitem(main.CONFIG["CIRCUIT_BREAKER"], "ENABLED", False)
+    return tmp_path
+
+
+def crawl(*responses):
+    """模拟一次独立运行（新进程）：新的抓取器和缓存，只有磁盘上的状态会保留"""
+    fetcher = main.DataFetcher()
+    fetcher.session = FakeSession(*responses)
+    results, _, failed_ids = fetcher.crawl_websites(["weibo"])
+    return fetcher.session.requests, results, failed_ids
+
+
+def cache_file(workdir):
+    return workdir / "output" / ".crawler_state" / "http_cache" / "weibo.json"
+
+
+def tamper_parsed(workdir):
+    """改写磁盘上保存的解析结果，用来判断下一次运行是否直接复用了它"""
+    path = cache_file(workdir)
+    entry = json.loads(path.read_text(encoding="utf-8"))
+    entry["parsed"]["标题B"]["ranks"] = [9]
+    path.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+
+
+def test_first_run_parses_and_persists(workdir):
+    requests, results, failed_ids = crawl(
+        FakeResponse(200, BODY, {"ETag": '"v1"'})
+    )
+
+    assert "If-None-Match" not in requests[0]
+    assert results == {"weibo": PARSED}
+    assert failed_ids == []
+
+    entry = json.loads(cache_file(workdir).read_text(encoding="utf-8"))
+    assert entry["etag"] == '"v1"'
+    assert entry["body"] == BODY
+    assert entry["parsed"] == PARSED
+
+
+def test_not_modified_reuses_persisted_parse(workdir):
+    crawl(FakeResponse(200, BODY, {"ETag": '"v1"'}))
+    tamper_parsed(workdir)
+
+    requests, results, failed_ids = crawl(FakeResponse(304, "", {"ETag": '"v1"'}))
+
+    assert requests[0]["If-None-Match"] == '"v1"'
+    assert results["weibo"]["标题B"]["ranks"] == [9]
+    assert failed_ids == []
+
+
+def test_identical_body_reuses_persisted_parse(workdir):
+    crawl(FakeResponse(200, BODY, {"ETag": '"v1"'}))
+    tamper_parsed(workdir)
+
+    _, results, _ = crawl(FakeResponse(200, BODY, {"ETag": '"v2"'}))
+
+    assert results["weibo"]["标题B"]["ranks"] == [9]
+    entry = json.loads(cache_file(workdir).read_text(encoding="utf-8"))
+    assert entry["etag"] == '"v2"'
+    assert entry["parsed"]["标题B"]["ranks"] == [9]
+
+
+def test_changed_body_replaces_parse(workdir):
+    crawl(FakeResponse(200, BODY, {"ETag": '"v1"'}))
+    tamper_parsed(workdir)
+
+    changed = json.dumps(
+        {"status": "success", "items": [{"title": "标题C", "url": "https://c"}]},
+        ensure_ascii=False,
+    )
+    _, results, _ = crawl(FakeResponse(200, changed, {"ETag": '"v2"'}))
+
+    expected = {"标题C": {"ranks": [1], "url": "https://c", "mobileUrl": ""}}
+    assert results == {"weibo": expected}
+    entry = json.loads(cache_file(workdir).read_text(encoding="utf-8"))
+    assert entry["parsed"] == expected
+
+    # 再下一次运行收到 304 时复用的是新内容的解析结果
+    _, results, _ = crawl(FakeResponse(304))
+    assert results == {"weibo": expected}
+
+
+def test_reused_parse_is_a_copy(workdir):
+    crawl(FakeResponse(200, BODY, {"ETag": '"v1"'}))
+
+    fetcher = main.DataFetcher()
+    fetcher.session = FakeSession(FakeResponse(304), FakeResponse(304))
+    results, _, _ = fetcher.crawl_websites(["weibo"])
+    results["weibo"]["标题A"]["ranks"].append(99)
+
+    results, _, _ = fetcher.crawl_websites(["weibo"])
+    assert results == {"weibo": PARSED}
+
+
+class FakeTime:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(main, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def breaker(workdir, clock, monkeypatch):
+    monkeypatch.setitem(
+        main.CONFIG,
+        "CIRCUIT_BREAKER",
+        {
+            "ENABLED": True,
+            "WINDOW": 5,
+            "FAILURE_THRESHOLD": 3,
+            "FAILURE_RATE": 0.8,
+            "COOLDOWN_MINUTES": 30,
+            "MAX_COOLDOWN_MINUTES": 120,
+        },
+    )
+    monkeypatch.setitem(main.CONFIG, "CONCURRENT_CRAWL", False)
+    return clock
+
+
+def fail(manager, platform_id="weibo", times=1):
+    for _ in range(times):
+        manager.record(platform_id, False, 1.0)
+
+
+def test_breaker_opens_half_opens_and_closes(breaker):
+    manager = main.PlatformHealthManager()
+    fail(manager, times=2)
+    assert manager.check("weibo") == "closed"
+    fail(manager)
+    assert manager.check("weibo") == "open"
+
+    breaker.now += 30 * 60 - 1
+    assert manager.check("weibo") == "open"
+    breaker.now += 1
+    assert manager.check("weibo") == "half_open"
+
+    # 试探失败：重新熔断，冷却时间翻倍
+    fail(manager)
+    assert manager.check("weibo") == "open"
+    breaker.now += 60 * 60 - 1
+    assert manager.check("weibo") == "open"
+    breaker.now += 1
+    assert manager.check("weibo") == "half_open"
+
+    # 冷却时间不超过上限
+    for _ in range(3):
+        fail(manager)
+        breaker.now += 120 * 60
+        assert manager.check("weibo") == "half_open"
+
+    # 试探成功：关闭熔断，冷却时间恢复初始值
+    manager.record("weibo", True, 0.5)
+    assert manager.check("weibo") == "closed"
+    fail(manager, times=3)
+    breaker.now += 30 * 60
+    assert manager.check("weibo") == "half_open"
+
+
+def test_breaker_opens_on_failure_rate(breaker):
+    manager = main.PlatformHealthManager()
+    for success in (False, False, True, False):
+        manager.record("weibo", success, 1.0)
+    assert manager.check("weibo") == "closed"
+    # 窗口内 4/5 失败，虽然连续失败只有 2 次
+    fail(manager)
+    assert manager.check("weibo") == "open"
+    assert manager.check("zhihu") == "closed"
+
+
+def test_breaker_state_persists_across_runs(breaker):
+    fetcher = main.DataFetcher()
+    fetcher.session = FakeSession(*[FakeResponse(500)] * 6)
+    for _ in range(3):
+        fetcher.crawl_websites(["weibo"])
+    assert fetcher.health_manager.check("weibo") == "open"
+
+    # 下一次运行（新进程）直接跳过，不发请求
+    fetcher = main.DataFetcher()
+    fetcher.session = FakeSession()
+    results, _, failed_ids = fetcher.crawl_websites(["weibo"])
+    assert results == {}
+    assert failed_ids == ["weibo"]
+    assert fetcher.circuit_skipped_ids == ["weibo"]
+
+    # 冷却结束后的运行只发一次试探请求，成功后关闭熔断
+    breaker.now += 30 * 60
+    fetcher = main.DataFetcher()
+    fetcher.session = FakeSession(FakeResponse(200, BODY))
+    results, _, failed_ids = fetcher.crawl_websites(["weibo"])
+    assert results == {"weibo": PARSED}
+    assert fetcher.circuit_skipped_ids == []
+    assert main.PlatformHealthManager().check("weibo") == "closed"
+
+
+def test_failed_probe_reopens_without_retries(breaker):
+    manager = main.PlatformHealthManager()
+    fail(manager, times=3)
+    manager.save()
+    breaker.now += 30 * 60
+
+    fetcher = main.DataFetcher()
+    fetcher.session = FakeSession(FakeResponse(500))
+    fetcher.crawl_websites(["weibo"])
+    assert len(fetcher.session.requests) == 1
+    assert main.PlatformHealthManager().check("weibo") == "open"
+
+
+def test_retry_budget():
+    budget = main.RetryBudget(2)
+    assert [budget.consume() for _ in range(3)] == [True, True, False]
+    assert budget.remaining == 0
+    assert main.RetryBudget(-1).consume() is False
+
+
+def test_retry_budget_is_shared_by_platforms(workdir, clock, monkeypatch):
+    monkeypatch.setitem(main.CONFIG, "CRAWL_RETRY_BUDGET", 1)
+    monkeypatch.setitem(main.CONFIG, "CONCURRENT_CRAWL", False)
+    fetcher = main.DataFetcher()
+    fetcher.session = FakeSession(*[FakeResponse(500)] * 10)
+
+    _, _, failed_ids = fetcher.crawl_websites(["weibo", "zhihu"])
+
+    # 每个平台默认最多重试 2 次，整轮只有 1 次重试预算
+    assert failed_ids == ["weibo", "zhihu"]
+    assert len(fetcher.session.requests) == 3
+
+    # 每次运行重新分配预算
+    fetcher.session = FakeSession(*[FakeResponse(500)] * 10)
+    fetcher.crawl_websites(["weibo"])
+    assert len(fetcher.session.requests) == 2
+
+
+def test_skipped_platforms_are_labelled(breaker):
+    manager = main.PlatformHealthManager()
+    fail(manager, times=3)
+    manager.save()
+
+    fetcher = main.DataFetcher()
+    fetcher.session = FakeSession(FakeResponse(500), FakeResponse(500), FakeResponse(500))
+    _, _, failed_ids = fetcher.crawl_websites(["weibo", "zhihu"])
+    assert failed_ids == ["weibo", "zhihu"]
+
+    analyzer = main.NewsAnalyzer.__new__(main.NewsAnalyzer)
+    analyzer.data_fetcher = fetcher
+    assert analyzer._label_failed_ids(failed_ids) == ["weibo（熔断跳过）", "zhihu"]
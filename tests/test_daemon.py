@@ -0,0 +1,334 @@
+"""cron 计划与常驻调度测试"""
+
+import copy
+import random
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+
+import main
+from main import CronSchedule
+
+TZ = pytz.timezone("Asia/Shanghai")
+
+
+def at(*args):
+    return TZ.localize(datetime(*args))
+
+
+# === CronSchedule ===
+
+
+def test_parse_fields():
+    cron = CronSchedule("*/15 9-17 * * 1-5")
+    assert cron.minutes == {0, 15, 30, 45}
+    assert cron.hours == set(range(9, 18))
+    assert cron.days == set(range(1, 32))
+    assert cron.months == set(range(1, 13))
+    assert cron.weekdays == {1, 2, 3, 4, 5}
+
+    cron = CronSchedule("5,10-20/5,50/4 0,12 1,15 */3 0,7")
+    assert cron.minutes == {5, 10, 15, 20, 50, 54, 58}
+    assert cron.hours == {0, 12}
+    assert cron.days == {1, 15}
+    assert cron.months == {1, 4, 7, 10}
+    # 周日写成 0 或 7 都可以
+    assert cron.weekdays == {0}
+
+
+@pytest.mark.parametrize(
+    "expression",
+    ["* * * *", "* * * * * *", "60 * * * *", "* 24 * * *", "* * 0 * *", "5-1 * * * *", "*/0 * * * *", "a * * * *"],
+)
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_day_of_month_and_weekday_are_or_when_both_restricted():
+    # 每月 13 号或每个周五
+    cron = CronSchedule("0 0 13 * 5")
+    assert cron.matches(at(2025, 6, 13, 0, 0))  # 周五且是 13 号
+    assert cron.matches(at(2025, 7, 13, 0, 0))  # 周日
+    assert cron.matches(at(2025, 7, 4, 0, 0))  # 周五
+    assert not cron.matches(at(2025, 7, 5, 0, 0))
+
+    # 只限制其中一个时按该字段匹配
+    assert CronSchedule("0 0 13 * *").matches(at(2025, 7, 13, 0, 0))
+    assert not CronSchedule("0 0 13 * *").matches(at(2025, 7, 4, 0, 0))
+    assert CronSchedule("0 0 * * 5").matches(at(2025, 7, 4, 0, 0))
+    assert not CronSchedule("0 0 * * 5").matches(at(2025, 7, 13, 0, 0))
+
+
+@pytest.mark.parametrize(
+    "expression, moment, expected",
+    [
+        # 严格晚于给定时间，秒数舍去
+        ("*/30 * * * *", at(2025, 1, 1, 8, 0), at(2025, 1, 1, 8, 30)),
+        ("*/30 * * * *", at(2025, 1, 1, 8, 29, 59), at(2025, 1, 1, 8, 30)),
+        # 周五收盘后跳到下周一
+        ("*/15 9-17 * * 1-5", at(2025, 7, 4, 17, 50), at(2025, 7, 7, 9, 0)),
+        # 跨月、跨年
+        ("0 8 1 * *", at(2025, 1, 31, 9, 0), at(2025, 2, 1, 8, 0)),
+        ("0 0 1 1 *", at(2025, 12, 31, 23, 59), at(2026, 1, 1, 0, 0)),
+        # 闰日
+        ("0 0 29 2 *", at(2025, 3, 1, 0, 0), at(2028, 2, 29, 0, 0)),
+        ("0 0 31 * *", at(2025, 4, 1, 0, 0), at(2025, 5, 31, 0, 0)),
+    ],
+)
+def test_next_after(expression, moment, expected):
+    assert CronSchedule(expression).next_after(moment) == expected
+
+
+def test_next_after_without_any_fire_time():
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 31 2 *").next_after(at(2025, 1, 1, 0, 0))
+
+
+def random_field(rng, low, high):
+    choice = rng.random()
+    if choice < 0.3:
+        return "*"
+    if choice < 0.5:
+        return f"*/{rng.randint(2, 5)}"
+    if choice < 0.7:
+        start = rng.randint(low, high)
+        end = rng.randint(start, high)
+        step = rng.choice(["", f"/{rng.randint(1, 3)}"])
+        return f"{start}-{end}{step}"
+    return ",".join(str(rng.randint(low, high)) for _ in range(rng.randint(1, 3)))
+
+
+def test_next_after_equals_minute_by_minute_scan():
+    rng = random.Random(7)
+    for _ in range(40):
+        expression = " ".join(
+            [
+                random_field(rng, 0, 59),
+                random_field(rng, 0, 23),
+                random_field(rng, 1, 31),
+                "*",
+                random_field(rng, 0, 7),
+            ]
+        )
+        cron = CronSchedule(expression)
+        moment = at(2025, 1, 1) + timedelta(minutes=rng.randint(0, 60 * 24 * 60), seconds=rng.randint(0, 59))
+
+        expected = moment.replace(second=0) + timedelta(minutes=1)
+        while not cron.matches(expected):
+            expected += timedelta(minutes=1)
+        assert cron.next_after(moment) == expected, expression
+
+
+# === DaemonScheduler ===
+
+
+class FakeClock:
+    """北京时间与 time 模块共用的假时钟，sleep 只推进时间"""
+
+    def __init__(self, now):
+        self.now = now
+        self.on_sleep = None
+
+    def time(self):
+        return self.now.timestamp()
+
+    def sleep(self, seconds):
+        self.now += timedelta(seconds=seconds)
+        if self.on_sleep:
+            self.on_sleep()
+
+
+class FakeAnalyzer:
+    """记录每轮爬取的平台和是否推送"""
+
+    def __init__(self):
+        self.polling_planner = None
+        self.proxy_url = None
+        self.runs = []
+        self.summaries = 0
+
+    def run(self, platforms=None, notify=True):
+        self.runs.append(([p["id"] for p in platforms], notify))
+
+    def run_summary(self):
+        self.summaries += 1
+
+
+@pytest.fixture
+def daemon_env(tmp_path, monkeypatch):
+    """在临时目录中运行常驻调度，返回假时钟；测试结束后恢复全局配置"""
+    monkeypatch.chdir(tmp_path)
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text("daemon: {}\n", encoding="utf-8")
+    words_file = tmp_path / "frequency_words.txt"
+    words_file.write_text("AI\n", encoding="utf-8")
+    monkeypatch.setenv("CONFIG_PATH", str(config_file))
+    monkeypatch.setenv("FREQUENCY_WORDS_PATH", str(words_file))
+    monkeypatch.delenv("IMMEDIATE_RUN", raising=False)
+
+    saved_config = dict(main.CONFIG)
+    main.CONFIG["DAEMON"] = {"SCHEDULE": "0 * * * *", "POLL_SECONDS": 5}
+    main.CONFIG["PLATFORMS"] = [
+        {"id": "weibo", "name": "微博"},
+        {"id": "zhihu", "name": "知乎"},
+        {"id": "hupu", "name": "虎扑", "interval": 20},
+    ]
+
+    clock = FakeClock(at(2025, 7, 4, 9, 50, 30))
+    monkeypatch.setattr(main, "time", clock)
+    monkeypatch.setattr(main, "get_beijing_time", lambda: clock.now)
+    monkeypatch.setattr(main, "NewsAnalyzer", FakeAnalyzer)
+    monkeypatch.setattr(main, "flush_notification_outbox", lambda proxy_url=None: None)
+    monkeypatch.setattr(main.DaemonScheduler, "_install_signal_handlers", lambda self: None)
+    yield clock
+
+    main.CONFIG.clear()
+    main.CONFIG.update(saved_config)
+
+
+def run_until(scheduler, clock, stop_at):
+    """运行调度主循环直到假时钟走到 stop_at"""
+
+    def check():
+        if clock.now >= stop_at:
+            scheduler.running = False
+
+    clock.on_sleep = check
+    scheduler.run_forever()
+
+
+def test_cron_and_interval_ticks(daemon_env):
+    clock = daemon_env
+    scheduler = main.DaemonScheduler()
+    assert scheduler.next_cron_run == at(2025, 7, 4, 10, 0)
+
+    run_until(scheduler, clock, at(2025, 7, 4, 11, 1))
+    runs = scheduler.analyzer.runs
+    # 整点按 cron 爬取其余平台并推送；虎扑从启动时刻起每 20 分钟独立爬取且不推送
+    assert runs == [
+        (["weibo", "zhihu"], True),
+        (["hupu"], False),
+        (["hupu"], False),
+        (["hupu"], False),
+        (["weibo", "zhihu"], True),
+    ]
+    assert scheduler.platform_last_run["hupu"] == at(2025, 7, 4, 10, 50, 30)
+    assert scheduler.next_cron_run == at(2025, 7, 4, 12, 0)
+    assert scheduler.run_count == len(runs)
+
+    status = main.json.loads(scheduler.status_file.read_text(encoding="utf-8"))
+    assert status["state"] == "stopped"
+    assert status["schedule"] == "0 * * * *"
+    assert status["next_run"] == "2025-07-04 12:00:00"
+
+
+def test_interval_platform_waits_from_startup(daemon_env):
+    clock = daemon_env
+    scheduler = main.DaemonScheduler()
+    run_until(scheduler, clock, at(2025, 7, 4, 10, 5))
+
+    # 10:00 之前虎扑还没到间隔，整点只爬 cron 平台
+    assert scheduler.analyzer.runs == [(["weibo", "zhihu"], True)]
+    assert scheduler.platform_last_run["hupu"] == at(2025, 7, 4, 9, 50, 30)
+
+
+def test_immediate_run(daemon_env, monkeypatch):
+    monkeypatch.setenv("IMMEDIATE_RUN", "true")
+    clock = daemon_env
+    scheduler = main.DaemonScheduler()
+    run_until(scheduler, clock, at(2025, 7, 4, 9, 51))
+
+    assert scheduler.analyzer.runs == [(["weibo", "zhihu", "hupu"], True)]
+
+
+def test_run_command_triggers_full_tick(daemon_env):
+    clock = daemon_env
+    scheduler = main.DaemonScheduler()
+    scheduler.control_dir.mkdir(parents=True)
+    (scheduler.control_dir / "run").touch()
+    (scheduler.control_dir / "unknown").touch()
+
+    run_until(scheduler, clock, at(2025, 7, 4, 9, 55))
+
+    assert scheduler.analyzer.runs == [(["weibo", "zhihu", "hupu"], True)]
+    # 命令文件读取后删除，未知命令也会被清理
+    assert list(scheduler.control_dir.iterdir()) == []
+    assert scheduler.next_cron_run == at(2025, 7, 4, 10, 0)
+
+
+def test_summary_when_cron_fires_without_due_platforms(daemon_env):
+    clock = daemon_env
+    main.CONFIG["PLATFORMS"] = [{"id": "hupu", "name": "虎扑", "interval": 20}]
+    scheduler = main.DaemonScheduler()
+    run_until(scheduler, clock, at(2025, 7, 4, 11, 1))
+
+    # 10:00 还没有爬取过数据，不生成汇总；之后虎扑每 20 分钟只爬不推送，
+    # 11:00 没有平台到期时用已爬取的数据补发汇总
+    assert scheduler.analyzer.runs == [(["hupu"], False)] * 3
+    assert scheduler.analyzer.summaries == 1
+    assert scheduler.pending_report is False
+
+
+def reloaded_config(schedule, platforms):
+    config = copy.deepcopy(main.CONFIG)
+    config["DAEMON"]["SCHEDULE"] = schedule
+    config["PLATFORMS"] = platforms
+    return config
+
+
+def test_reload_command(daemon_env, monkeypatch):
+    clock = daemon_env
+    scheduler = main.DaemonScheduler()
+    scheduler.platform_last_run["weibo"] = clock.now
+    first_analyzer = scheduler.analyzer
+
+    new_config = reloaded_config("*/10 * * * *", [{"id": "weibo", "name": "微博"}])
+    monkeypatch.setattr(main, "load_config", lambda: copy.deepcopy(new_config))
+    scheduler.pending_commands.add("reload")
+    run_until(scheduler, clock, at(2025, 7, 4, 10, 5))
+
+    assert main.CONFIG["DAEMON"]["SCHEDULE"] == "*/10 * * * *"
+    assert scheduler.cron.expression == "*/10 * * * *"
+    assert scheduler.analyzer is not first_analyzer
+    # 已删除的平台不再保留上次运行时间
+    assert set(scheduler.platform_last_run) == {"weibo"}
+    assert scheduler.analyzer.runs == [(["weibo"], True)]
+    assert scheduler.next_cron_run == at(2025, 7, 4, 10, 10)
+
+
+def test_config_file_change_triggers_reload(daemon_env, monkeypatch):
+    clock = daemon_env
+    scheduler = main.DaemonScheduler()
+    new_config = reloaded_config("*/5 * * * *", main.CONFIG["PLATFORMS"])
+    monkeypatch.setattr(main, "load_config", lambda: copy.deepcopy(new_config))
+
+    # 频率词文件变化不重新加载配置
+    words_file = main.Path(main.os.environ["FREQUENCY_WORDS_PATH"])
+    words_file.write_text("AI\n芯片\n", encoding="utf-8")
+    main.os.utime(words_file, ns=(1, 1))
+    scheduler._check_hot_reload()
+    assert scheduler.cron.expression == "0 * * * *"
+
+    config_file = main.Path(main.os.environ["CONFIG_PATH"])
+    main.os.utime(config_file, ns=(2, 2))
+    scheduler._check_hot_reload()
+    assert scheduler.cron.expression == "*/5 * * * *"
+    assert scheduler.next_cron_run == at(2025, 7, 4, 9, 55)
+
+
+def test_failed_reload_keeps_config(daemon_env, monkeypatch):
+    scheduler = main.DaemonScheduler()
+    analyzer = scheduler.analyzer
+    monkeypatch.setattr(
+        main, "load_config", lambda: reloaded_config("bad cron", main.CONFIG["PLATFORMS"])
+    )
+    scheduler.pending_commands.add("reload")
+    scheduler._check_hot_reload()
+
+    assert "reload" not in scheduler.pending_commands
+    assert scheduler.cron.expression == "0 * * * *"
+    assert main.CONFIG["DAEMON"]["SCHEDULE"] == "0 * * * *"
+    assert scheduler.analyzer is analyzer
+    assert scheduler.last_error.startswith("配置重新加载失败")
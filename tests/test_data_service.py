@@ -0,0 +1,82 @@
+"""MCP 数据服务测试"""
+
+from datetime import datetime
+
+import pytest
+
+from mcp_server.services.cache_service import get_cache
+from mcp_server.services.data_service import DataService
+
+
+RULES = """\
+# 注释行不是关注词
+AI
+华为
+
++苹果
+发布会
+
+!广告
+
+华为
+-手机
+"""
+
+TITLES = [
+    "AI绘画新突破",
+    "ai 芯片出口",
+    "华为发布会今晚举行",
+    "华为手机广告",
+    "苹果秋季发布会",
+    "某品牌发布会",
+]
+
+
+@pytest.fixture
+def service(tmp_path):
+    (tmp_path / "config").mkdir()
+    (tmp_path / "config" / "frequency_words.txt").write_text(RULES, encoding="utf-8")
+    txt_dir = tmp_path / "output" / datetime.now().strftime("%Y年%m月%d日") / "txt"
+    txt_dir.mkdir(parents=True)
+    lines = ["weibo | 微博"] + [f"{rank}. {title}" for rank, title in enumerate(TITLES, 1)]
+    (txt_dir / "10时00分.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    get_cache().clear()
+    yield DataService(str(tmp_path))
+    get_cache().clear()
+
+
+def baseline_counts(word_groups, titles):
+    """改版前的统计方式：每个必须词和普通词逐组做子串判断"""
+    counts = {}
+    for title in titles:
+        for group in word_groups:
+            for word in group.get("required", []) + group.get("normal", []):
+                if word and word in title:
+                    counts[word] = counts.get(word, 0) + 1
+    return counts
+
+
+def test_trending_topics_count_each_word_by_substring(service):
+    result = service.get_trending_topics(top_n=10, mode="daily")
+    frequencies = {topic["keyword"]: topic["frequency"] for topic in result["topics"]}
+
+    # 区分大小写；不要求整组匹配（"某品牌发布会"没有"苹果"）；
+    # 不排除过滤词（"华为手机广告"）和本组排除词；"华为"在两个词组中各计一次
+    assert frequencies == {"华为": 4, "发布会": 3, "AI": 1, "苹果": 1}
+
+    word_groups = service.parser.parse_frequency_words()
+    assert frequencies == baseline_counts(word_groups, TITLES)
+
+    matched_news = {topic["keyword"]: topic["matched_news"] for topic in result["topics"]}
+    assert matched_news["华为"] == 2
+    assert result["total_keywords"] == 4
+
+
+def test_trending_topics_extended_terms(service, tmp_path):
+    rules = tmp_path / "config" / "frequency_words.txt"
+    rules.write_text('"AI"\n\n/芯片.?出口/\n', encoding="utf-8")
+
+    result = service.get_trending_topics(top_n=10, mode="daily")
+    frequencies = {topic["keyword"]: topic["frequency"] for topic in result["topics"]}
+    assert frequencies == {'"AI"': 2, "/芯片.?出口/": 1}
@@ -0,0 +1,227 @@
+"""当天快照聚合与运行上下文测试"""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+import main
+
+
+def write_snapshot(txt_dir, name, titles_by_id):
+    lines = []
+    for source_id, titles in titles_by_id.items():
+        lines.append(source_id)
+        lines.extend(f"{rank}. {title}" for rank, title in enumerate(titles, 1))
+        lines.append("")
+    path = txt_dir / f"{name}.txt"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def today(tmp_path, monkeypatch):
+    """在临时目录中运行，返回当天的 txt 目录"""
+    monkeypatch.chdir(tmp_path)
+    rules = tmp_path / "frequency_words.txt"
+    rules.write_text("标题\n", encoding="utf-8")
+    monkeypatch.setenv("FREQUENCY_WORDS_PATH", str(rules))
+    monkeypatch.setitem(main.CONFIG["SQLITE_STORE"], "ENABLED", False)
+    monkeypatch.setitem(main.CONFIG["SEEN_TITLES"], "ENABLED", False)
+    monkeypatch.setitem(main.CONFIG, "PARALLEL_PARSE", {"WORKERS": 1, "MIN_FILES": 10**6})
+    monkeypatch.setitem(main.CONFIG, "PLATFORMS", [{"id": "weibo"}, {"id": "zhihu"}])
+    monkeypatch.setattr(main, "_day_aggregates", {})
+    txt_dir = Path("output") / main.format_date_folder() / "txt"
+    txt_dir.mkdir(parents=True)
+    return txt_dir
+
+
+def test_context_without_results_uses_latest_snapshot_platforms(today):
+    write_snapshot(today, "08时00分", {"weibo": ["微博标题1"], "zhihu": ["知乎标题1"]})
+    write_snapshot(today, "08时30分", {"weibo": ["微博标题1"], "zhihu": ["知乎标题2"]})
+    # zhihu 在最新一份快照中请求失败，它的"知乎标题2"已在上一轮作为新增标题报告过
+    write_snapshot(today, "09时00分", {"weibo": ["微博标题2", "微博标题1"]})
+
+    context = main.DayContext.build()
+    assert {source_id: list(titles) for source_id, titles in context.new_titles.items()} == {
+        "weibo": ["微博标题2"]
+    }
+    assert main.get_day_aggregate().latest_snapshot_ids == ["weibo"]
+
+    # 带本轮结果时按本轮成功爬取的平台过滤
+    results = {"zhihu": {"知乎标题2": {"ranks": [1]}}}
+    context = main.DayContext.build(results, {"zhihu": "知乎"}, [])
+    assert list(context.new_titles) == ["zhihu"]
+
+
+def test_latest_snapshot_platforms_survive_reload(today, tmp_path):
+    write_snapshot(today, "08时00分", {"weibo": ["甲"], "zhihu": ["乙"]})
+    write_snapshot(today, "08时30分", {"zhihu": ["丙"]})
+
+    state_file = tmp_path / "state.json"
+    aggregate = main.DayAggregate(today, state_file)
+    aggregate.refresh()
+    assert aggregate.latest_snapshot_ids == ["zhihu"]
+    assert main.DayAggregate(today, state_file).latest_snapshot_ids == ["zhihu"]
+
+
+def dump(aggregate):
+    return (
+        [(source_id, list(titles)) for source_id, titles in aggregate.latest_titles.items()],
+        {
+            source_id: [(title, record.to_row()) for title, record in records.items()]
+            for source_id, records in aggregate.all_results.items()
+        },
+        aggregate.historical_titles,
+        aggregate.id_to_name,
+        sorted(aggregate.file_signatures),
+        aggregate.latest_snapshot_ids,
+    )
+
+
+def rebuilt(txt_dir, tmp_path):
+    """不使用持久化状态，从快照文件完整重建"""
+    state_file = tmp_path / "fresh" / "state.json"
+    state_file.unlink(missing_ok=True)
+    aggregate = main.DayAggregate(txt_dir, state_file)
+    aggregate.refresh()
+    return aggregate
+
+
+SNAPSHOTS = [
+    ("08时00分", {"weibo": ["甲", "乙"], "zhihu": ["丙"]}),
+    ("08时30分", {"weibo": ["乙", "丁"]}),
+    ("09时00分", {"zhihu": ["戊", "丙"], "weibo": ["丁"]}),
+    ("09时30分", {"weibo": ["己"], "zhihu": ["戊"]}),
+]
+
+
+@pytest.fixture
+def state_file(tmp_path):
+    return tmp_path / "state" / "day_aggregate.json"
+
+
+def test_new_snapshots_are_appended_to_journal(today, tmp_path, state_file):
+    for name, titles in SNAPSHOTS[:2]:
+        write_snapshot(today, name, titles)
+    aggregate = main.DayAggregate(today, state_file)
+    assert aggregate.refresh() == 2
+    state = state_file.read_bytes()
+    assert not aggregate.journal_file.exists()
+
+    # 新快照只追加日志，不重写聚合文件
+    write_snapshot(today, *SNAPSHOTS[2])
+    aggregate = main.DayAggregate(today, state_file)
+    assert aggregate.refresh() == 1
+    path = write_snapshot(today, *SNAPSHOTS[3])
+    assert aggregate.add_snapshot(
+        path, {"weibo": {"己": {"ranks": [1]}}, "zhihu": {"戊": {"ranks": [1]}}}, {}
+    )
+    aggregate.save()
+    assert state_file.read_bytes() == state
+    assert len(aggregate.journal_file.read_text(encoding="utf-8").splitlines()) == 2
+
+    reloaded = main.DayAggregate(today, state_file)
+    assert reloaded.refresh() == 0
+    assert dump(reloaded) == dump(rebuilt(today, tmp_path))
+
+
+def test_journal_is_compacted(today, tmp_path, state_file, monkeypatch):
+    monkeypatch.setattr(main.DayAggregate, "JOURNAL_COMPACT_ENTRIES", 2)
+    write_snapshot(today, *SNAPSHOTS[0])
+    main.DayAggregate(today, state_file).refresh()
+
+    journal_sizes = []
+    for name, titles in SNAPSHOTS[1:]:
+        write_snapshot(today, name, titles)
+        aggregate = main.DayAggregate(today, state_file)
+        aggregate.refresh()
+        journal_file = aggregate.journal_file
+        journal_sizes.append(
+            len(journal_file.read_text(encoding="utf-8").splitlines())
+            if journal_file.exists()
+            else 0
+        )
+    assert journal_sizes == [1, 2, 0]
+    assert dump(main.DayAggregate(today, state_file)) == dump(rebuilt(today, tmp_path))
+
+
+def test_torn_and_stale_journal_lines_are_ignored(today, tmp_path, state_file):
+    write_snapshot(today, *SNAPSHOTS[0])
+    main.DayAggregate(today, state_file).refresh()
+    write_snapshot(today, *SNAPSHOTS[1])
+    aggregate = main.DayAggregate(today, state_file)
+    aggregate.refresh()
+    journal_file = aggregate.journal_file
+
+    with open(journal_file, "a", encoding="utf-8") as f:
+        f.write('{"generation": "older", "op": "add"}\n{"generation": ')
+
+    reloaded = main.DayAggregate(today, state_file)
+    assert dump(reloaded) == dump(rebuilt(today, tmp_path))
+    # 损坏的日志在下次保存时被完整聚合文件取代
+    reloaded.refresh()
+    assert not journal_file.exists()
+    assert dump(main.DayAggregate(today, state_file)) == dump(rebuilt(today, tmp_path))
+
+
+def test_modified_or_removed_snapshot_triggers_rebuild(today, tmp_path, state_file):
+    for name, titles in SNAPSHOTS[:3]:
+        write_snapshot(today, name, titles)
+    main.DayAggregate(today, state_file).refresh()
+
+    write_snapshot(today, "08时30分", {"weibo": ["乙", "庚"]})
+    aggregate = main.DayAggregate(today, state_file)
+    assert aggregate.refresh() == 3
+    assert "庚" in aggregate.all_results["weibo"]
+    assert dump(aggregate) == dump(rebuilt(today, tmp_path))
+
+    (today / "08时00分.txt").unlink()
+    aggregate = main.DayAggregate(today, state_file)
+    assert aggregate.refresh() == 2
+    assert "甲" not in aggregate.all_results["weibo"]
+
+    # 比已处理快照更早的新文件
+    write_snapshot(today, "07时00分", {"weibo": ["辛"]})
+    aggregate = main.DayAggregate(today, state_file)
+    assert aggregate.refresh() == 3
+    assert dump(aggregate) == dump(rebuilt(today, tmp_path))
+
+
+def test_checkout_with_same_content_is_not_rebuilt(today, tmp_path, state_file):
+    for name, titles in SNAPSHOTS[:2]:
+        write_snapshot(today, name, titles)
+    main.DayAggregate(today, state_file).refresh()
+
+    # git checkout 之后修改时间变化、内容相同：按内容哈希确认，只记录新的修改时间
+    path = today / "08时00分.txt"
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    aggregate = main.DayAggregate(today, state_file)
+    assert aggregate.refresh() == 0
+    assert aggregate.file_signatures["08时00分.txt"]["mtime_ns"] == stat.st_mtime_ns + 10**9
+    reloaded = main.DayAggregate(today, state_file)
+    assert reloaded.file_signatures["08时00分.txt"]["mtime_ns"] == stat.st_mtime_ns + 10**9
+    assert reloaded.refresh() == 0
+
+    # 大小相同但内容不同
+    path.write_text(path.read_text(encoding="utf-8").replace("甲", "壬"), encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    aggregate = main.DayAggregate(today, state_file)
+    assert aggregate.refresh() == 2
+    assert "壬" in aggregate.all_results["weibo"]
+
+
+def test_other_day_or_version_is_ignored(today, tmp_path, state_file):
+    write_snapshot(today, *SNAPSHOTS[0])
+    main.DayAggregate(today, state_file).refresh()
+
+    other_day = tmp_path / "2000年01月01日" / "txt"
+    other_day.mkdir(parents=True)
+    assert main.DayAggregate(other_day, state_file).file_count == 0
+
+    data = json.loads(state_file.read_text(encoding="utf-8"))
+    data["version"] = main.DayAggregate.FORMAT_VERSION - 1
+    state_file.write_text(json.dumps(data), encoding="utf-8")
+    assert main.DayAggregate(today, state_file).file_count == 0
@@ -0,0 +1,132 @@
+"""并行推送测试：某个渠道出错不影响其他渠道的结果"""
+
+import threading
+
+import pytest
+
+import main
+
+CHANNELS = ["feishu", "dingtalk", "wework", "ntfy"]
+
+
+class FakeChannels:
+    """按渠道返回预设结果，"raise" 表示发送时抛出异常"""
+
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def send(self, channel):
+        with self.lock:
+            self.calls.append(channel)
+        outcome = self.outcomes[channel]
+        if outcome == "raise":
+            raise RuntimeError(f"{channel} 连接失败")
+        return outcome
+
+    def senders(self):
+        return [(channel, lambda channel=channel: self.send(channel)) for channel in self.outcomes]
+
+
+OUTCOMES = {"feishu": True, "dingtalk": "raise", "wework": False, "ntfy": True}
+EXPECTED = {"feishu": True, "dingtalk": False, "wework": False, "ntfy": True}
+
+
+@pytest.mark.parametrize("concurrent", [True, False])
+def test_exception_does_not_hide_other_results(concurrent):
+    fake = FakeChannels(OUTCOMES)
+    results = main.dispatch_notifications(fake.senders(), concurrent)
+
+    assert results == EXPECTED
+    assert list(results) == CHANNELS
+    assert sorted(fake.calls) == sorted(CHANNELS)
+
+
+def test_channels_run_in_parallel():
+    # 出错的渠道最先完成；其余渠道必须同时在运行才能通过屏障，顺序执行时屏障超时
+    barrier = threading.Barrier(3, timeout=5)
+
+    def wait_then(result):
+        def send():
+            barrier.wait()
+            return result
+
+        return send
+
+    def fail():
+        raise RuntimeError("连接失败")
+
+    senders = [
+        ("dingtalk", fail),
+        ("feishu", wait_then(True)),
+        ("wework", wait_then(False)),
+        ("ntfy", wait_then(True)),
+    ]
+    results = main.dispatch_notifications(senders, concurrent=True)
+    assert results == {"dingtalk": False, "feishu": True, "wework": False, "ntfy": True}
+
+
+@pytest.fixture
+def channels(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(main.CONFIG, "CONCURRENT_SEND", True)
+    monkeypatch.setitem(main.CONFIG, "OUTBOX", {**main.CONFIG["OUTBOX"], "ENABLED": False})
+    monkeypatch.setitem(
+        main.CONFIG,
+        "PUSH_WINDOW",
+        {
+            "ENABLED": True,
+            "ONCE_PER_DAY": True,
+            "TIME_RANGE": {"START": "00:00", "END": "23:59"},
+            "RECORD_RETENTION_DAYS": 7,
+        },
+    )
+    monkeypatch.setattr(main, "get_rate_limit_delay", lambda channel, channels: 0.0)
+    for key in main.CHANNEL_CONFIG_KEYS:
+        monkeypatch.setitem(main.CONFIG, key, "")
+    monkeypatch.setitem(main.CONFIG, "FEISHU_WEBHOOK_URL", "https://feishu.invalid/hook")
+    monkeypatch.setitem(main.CONFIG, "DINGTALK_WEBHOOK_URL", "https://dingtalk.invalid/hook")
+    monkeypatch.setitem(main.CONFIG, "WEWORK_WEBHOOK_URL", "https://wework.invalid/hook")
+    monkeypatch.setitem(main.CONFIG, "NTFY_SERVER_URL", "https://ntfy.invalid")
+    monkeypatch.setitem(main.CONFIG, "NTFY_TOPIC", "topic")
+
+
+def send(**kwargs):
+    return main.send_to_notifications([], [], "当日汇总", {}, {}, mode="daily", **kwargs)
+
+
+def test_send_to_notifications_isolates_channel_errors(channels, monkeypatch):
+    fake = FakeChannels(OUTCOMES)
+    monkeypatch.setattr(main, "send_to_channel", lambda channel, *args: fake.send(channel))
+
+    results = send()
+    assert results == EXPECTED
+    assert list(results) == CHANNELS
+    # 有渠道发送成功，记录今天已推送
+    assert main.PushRecordManager().has_pushed_today()
+
+
+def test_no_push_record_when_every_channel_fails(channels, monkeypatch):
+    fake = FakeChannels({"feishu": "raise", "dingtalk": False, "wework": "raise", "ntfy": False})
+    monkeypatch.setattr(main, "send_to_channel", lambda channel, *args: fake.send(channel))
+
+    assert send() == {channel: False for channel in CHANNELS}
+    assert not main.PushRecordManager().has_pushed_today()
+
+
+def test_outbox_keeps_job_of_failed_channel(channels, monkeypatch):
+    monkeypatch.setitem(main.CONFIG["OUTBOX"], "ENABLED", True)
+    fake = FakeChannels(OUTCOMES)
+    monkeypatch.setattr(
+        main, "deliver_channel_message", lambda channel, *args, **kwargs: fake.send(channel)
+    )
+
+    assert send() == EXPECTED
+
+    # 抛出异常的渠道和发送失败的渠道的任务留在发件箱，其他渠道的任务已完成
+    outbox = main.NotificationOutbox()
+    assert [channel for channel in CHANNELS if outbox._channel_jobs("", channel)] == [
+        "dingtalk",
+        "wework",
+    ]
@@ -0,0 +1,279 @@
+"""频率词规则与匹配测试"""
+
+import os
+import random
+import re
+
+import pytest
+
+from trendradar.matcher import (
+    CombinedMatcher,
+    SharedMatches,
+    WordGroupMatcher,
+    _is_latin_word_char,
+    parse_term,
+)
+from trendradar.rules import get_combined_matcher, get_matcher, load_rules, parse_rules
+
+RULES = """
+# 注释
+人工智能
+AI
++发布
+!广告
+
+"GPT*"
+/苹果.{0,4}发布会/
+-传闻
+
+足球
+@hupu,weibo
+
++特斯拉
++降价
+"""
+
+
+def naive_term_hit(term, title):
+    """按词项写法逐一检查，作为匹配计划的参照实现"""
+    text = title.lower()
+    if len(term) >= 2 and term.startswith("\\"):
+        return term[1:].lower() in text
+    if len(term) >= 3 and term.startswith("/") and term.endswith("/"):
+        return re.search(term[1:-1], text, re.IGNORECASE) is not None
+    if len(term) >= 3 and term.startswith('"') and term.endswith('"'):
+        inner = term[1:-1]
+        prefix_only = len(inner) > 1 and inner.endswith("*")
+        word = (inner[:-1] if prefix_only else inner).lower()
+        for match in re.finditer(re.escape(word), text):
+            start, end = match.start(), match.end()
+            if start > 0 and _is_latin_word_char(text[start - 1]):
+                continue
+            if not prefix_only and end < len(text) and _is_latin_word_char(text[end]):
+                continue
+            return True
+        return False
+    return term.lower() in text
+
+
+def naive_match(word_groups, filter_words, title, platform_id=None):
+    filter_hits = [word for word in filter_words if naive_term_hit(word, title)]
+    for index, group in enumerate(word_groups):
+        platforms = group.get("platforms")
+        if platforms and platform_id not in platforms:
+            continue
+        if not all(naive_term_hit(word, title) for word in group["required"]):
+            continue
+        if group["normal"] and not any(naive_term_hit(word, title) for word in group["normal"]):
+            continue
+        if any(naive_term_hit(word, title) for word in group.get("exclude", [])):
+            continue
+        return index, filter_hits
+    return None, filter_hits
+
+
+def test_parse_term():
+    assert parse_term("AI") == (0, "ai")
+    assert parse_term('"AI"') == (1, "ai")
+    assert parse_term('"GPT*"') == (2, "gpt")
+    assert parse_term("/a+b/") == (3, "a+b")
+    # 太短的引号和斜杠按普通词处理
+    assert parse_term('""') == (0, '""')
+    assert parse_term("//") == (0, "//")
+    # 反斜杠转义后一律按普通词处理
+    assert parse_term('\\"AI"') == (0, '"ai"')
+    assert parse_term("\\/a+b/") == (0, "/a+b/")
+
+
+def test_parse_rules():
+    word_groups, filter_words = parse_rules(RULES.replace("\n", "\r\n"))
+    assert filter_words == ["广告"]
+    assert word_groups[0] == {
+        "required": ["发布"],
+        "normal": ["人工智能", "AI"],
+        "group_key": "人工智能 AI",
+    }
+    assert word_groups[1]["exclude"] == ["传闻"]
+    assert word_groups[2]["platforms"] == ["hupu", "weibo"]
+    assert word_groups[3]["group_key"] == "特斯拉 降价"
+
+
+def test_parse_rules_escapes():
+    content = "\n".join(
+        [
+            "\\#话题",
+            "\\-减肥",
+            "\\@微博",
+            "\\+1",
+            '+\\"AI"',
+            "\\/r/",
+            "\\\\x",
+            "!\\!感叹",
+            "-\\-号",
+            "",
+            "# 仍是注释",
+            "#也是注释",
+        ]
+    )
+    word_groups, filter_words = parse_rules(content)
+    assert len(word_groups) == 1
+    assert word_groups[0] == {
+        # 去掉反斜杠后会被识别为整词/正则/转义写法的保留反斜杠，由匹配器按普通词处理
+        "required": ['\\"AI"'],
+        "normal": ["#话题", "-减肥", "@微博", "+1", "\\/r/", "\\\\x"],
+        "group_key": "#话题 -减肥 @微博 +1 \\/r/ \\\\x",
+        "exclude": ["-号"],
+    }
+    assert filter_words == ["!感叹"]
+
+    matcher = WordGroupMatcher(word_groups, filter_words)
+    assert matcher.match('#话题 "AI"') == (0, [])
+    assert matcher.match("#话题 AI") == (None, [])
+    assert matcher.match('"ai" 出现 /R/') == (0, [])
+    assert matcher.match('"AI" \\x') == (0, [])
+    assert matcher.match('"AI" x') == (None, [])
+    assert matcher.match('"AI" -减肥 -号') == (None, [])
+    assert matcher.match('"AI" @微博 !感叹') == (0, ["!感叹"])
+
+
+@pytest.mark.parametrize(
+    "term, title, expected",
+    [
+        ('"AI"', "AI绘画火了", True),
+        ('"AI"', "PAIN is real", False),
+        ('"AI"', "Open AI.", True),
+        ('"GPT*"', "GPTs 商店上线", True),
+        ('"GPT*"', "ChatGPT 更新", False),
+        ("/苹果.{0,4}发布会/", "苹果秋季发布会", True),
+        ("/苹果.{0,4}发布会/", "苹果今年还是不开发布会", False),
+        ("/^\\d+岁/", "98岁老人", True),
+        ("ai", "OpenAI", True),
+    ],
+)
+def test_term_syntax(term, title, expected):
+    matcher = WordGroupMatcher([{"required": [], "normal": [term], "group_key": term}], [])
+    assert (matcher.match(title)[0] == 0) is expected
+    assert naive_term_hit(term, title) is expected
+
+
+def test_group_rules():
+    word_groups, filter_words = parse_rules(RULES)
+    matcher = WordGroupMatcher(word_groups, filter_words)
+
+    assert matcher.match("AI 新模型发布") == (0, [])
+    assert matcher.match("AI 新模型") == (None, [])
+    assert matcher.match("人工智能发布广告") == (0, ["广告"])
+    assert matcher.match("苹果秋季发布会定档") == (1, [])
+    assert matcher.match("苹果秋季发布会传闻") == (None, [])
+    assert matcher.match("足球比赛", "hupu") == (2, [])
+    assert matcher.match("足球比赛", "zhihu") == (None, [])
+    assert matcher.match("特斯拉宣布降价") == (3, [])
+    assert matcher.match("特斯拉宣布涨价") == (None, [])
+
+    assert matcher.match_keywords("AI 模型 GPTs 发布") == ["发布", "AI", '"GPT*"']
+    assert matcher.match_keywords("AI 发布广告") == []
+
+
+def test_empty_group_matches_everything():
+    matcher = WordGroupMatcher([{"required": [], "normal": [], "group_key": "全部新闻"}], [])
+    assert matcher.match("任意标题") == (0, [])
+
+
+def test_invalid_regex():
+    with pytest.raises(ValueError):
+        WordGroupMatcher([{"required": [], "normal": ["/(/"], "group_key": "x"}], [])
+
+
+VOCABULARY = ["ai", "AI", "gpt", "苹果", "发布", "发布会", "降价", "特斯拉", "足球", "广告", "ab", "b"]
+TERMS = VOCABULARY + ['"ai"', '"gpt*"', '"ab"', "/苹果.?发布/", "/\\d{2}/", "/a|b/"]
+
+
+def random_rules(rng):
+    word_groups = []
+    for index in range(rng.randint(1, 6)):
+        group = {
+            "required": rng.sample(TERMS, rng.randint(0, 2)),
+            "normal": rng.sample(TERMS, rng.randint(0, 3)),
+            "group_key": f"g{index}",
+        }
+        if rng.random() < 0.3:
+            group["exclude"] = rng.sample(TERMS, 1)
+        if rng.random() < 0.3:
+            group["platforms"] = ["weibo"]
+        word_groups.append(group)
+    return word_groups, rng.sample(TERMS, rng.randint(0, 2))
+
+
+def random_title(rng):
+    parts = VOCABULARY + ["x", "Z", " ", "12", "Chat", "s", "。"]
+    return "".join(rng.choice(parts) for _ in range(rng.randint(1, 8)))
+
+
+def test_matcher_equals_naive_matching():
+    rng = random.Random(13)
+    for _ in range(200):
+        word_groups, filter_words = random_rules(rng)
+        matcher = WordGroupMatcher(word_groups, filter_words)
+        for _ in range(30):
+            title = random_title(rng)
+            platform_id = rng.choice([None, "weibo", "zhihu"])
+            group_index, filter_hits = matcher.match(title, platform_id)
+            expected_index, expected_filters = naive_match(
+                word_groups, filter_words, title, platform_id
+            )
+            assert group_index == expected_index, (word_groups, title)
+            assert sorted(filter_hits) == sorted(expected_filters)
+
+
+def test_combined_matcher_equals_separate_matchers():
+    rng = random.Random(25)
+    for _ in range(100):
+        rule_sets = [random_rules(rng) for _ in range(rng.randint(1, 4))]
+        combined = CombinedMatcher(rule_sets)
+        shared = SharedMatches(combined)
+        views = [shared.for_rule_set(index) for index in range(len(rule_sets))]
+        separate = [WordGroupMatcher(*rule_set) for rule_set in rule_sets]
+        for _ in range(20):
+            title = random_title(rng)
+            platform_id = rng.choice([None, "weibo"])
+            results = combined.match_each(title, platform_id)
+            for result, view, matcher in zip(results, views, separate):
+                group_index, filter_hits = matcher.match(title, platform_id)
+                assert result[0] == group_index
+                assert sorted(result[1]) == sorted(filter_hits)
+                assert view.match(title, platform_id)[0] == group_index
+
+
+def test_load_rules_cache(tmp_path):
+    path = tmp_path / "frequency_words.txt"
+    path.write_text(RULES, encoding="utf-8")
+    rules = load_rules(path)
+    assert load_rules(path) is rules
+    assert "特斯拉" in rules.keywords and "广告" not in rules.keywords
+    assert get_matcher(rules.word_groups, rules.filter_words) is rules.matcher
+
+    # 修改时间变化但内容相同：复用原对象
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert load_rules(path) is rules
+
+    path.write_text(RULES + "\n新词\n", encoding="utf-8")
+    reloaded = load_rules(path)
+    assert reloaded is not rules
+    assert reloaded.word_groups[-1]["normal"] == ["新词"]
+
+    with pytest.raises(FileNotFoundError):
+        load_rules(tmp_path / "missing.txt")
+
+
+def test_adhoc_and_combined_matcher_cache():
+    word_groups = [{"required": [], "normal": [], "group_key": "全部新闻"}]
+    filter_words = []
+    matcher = get_matcher(word_groups, filter_words)
+    assert get_matcher(word_groups, filter_words) is matcher
+    assert get_matcher(list(word_groups), filter_words) is not matcher
+
+    rule_sets = [(word_groups, filter_words)]
+    combined = get_combined_matcher(rule_sets)
+    assert get_combined_matcher(list(rule_sets)) is combined
+    assert get_combined_matcher([(list(word_groups), filter_words)]) is not combined
@@ -0,0 +1,215 @@
+"""通知发件箱测试：断点续发、指数退避、放弃与推送记录"""
+
+import json
+
+import pytest
+
+import main
+
+WEBHOOK = "https://open.feishu.cn/open-apis/bot/v2/hook/secret-token"
+
+
+class FakeTime:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeDelivery:
+    """按预设结果依次返回发送是否成功，记录发送过的批次"""
+
+    def __init__(self, results=()):
+        self.results = list(results)
+        self.sent = []
+
+    def __call__(self, channel, channels, message, report_type, proxy_url=None):
+        ok = self.results.pop(0) if self.results else True
+        self.sent.append((channel, message["label"], ok))
+        return ok
+
+
+def make_messages(count):
+    return [{"label": f"{i}/{count}", "payload": {"text": f"批次{i}"}} for i in range(1, count + 1)]
+
+
+@pytest.fixture
+def clock(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fake = FakeTime()
+    monkeypatch.setattr(main, "time", fake)
+    outbox_config = {
+        "ENABLED": True,
+        "BASE_DELAY": 60,
+        "MAX_DELAY": 3600,
+        "MAX_ATTEMPTS": 4,
+        "MAX_AGE_HOURS": 24,
+    }
+    monkeypatch.setitem(main.CONFIG, "OUTBOX", outbox_config)
+    monkeypatch.setitem(
+        main.CONFIG,
+        "PUSH_WINDOW",
+        {
+            "ENABLED": True,
+            "ONCE_PER_DAY": True,
+            "TIME_RANGE": {"START": "00:00", "END": "23:59"},
+            "RECORD_RETENTION_DAYS": 7,
+        },
+    )
+    monkeypatch.setattr(main, "get_rate_limit_delay", lambda channel, channels: 0.0)
+    return fake
+
+
+@pytest.fixture
+def delivery(monkeypatch):
+    fake = FakeDelivery()
+    monkeypatch.setattr(main, "deliver_channel_message", fake)
+    return fake
+
+
+def job_files(outbox):
+    return sorted(outbox.outbox_dir.glob("*.json"))
+
+
+def load_job(outbox):
+    [job_file] = job_files(outbox)
+    return json.loads(job_file.read_text(encoding="utf-8"))
+
+
+def test_resume_from_failed_batch_with_backoff(clock, delivery):
+    outbox = main.NotificationOutbox()
+    outbox.enqueue("", "feishu", "当日汇总", "daily", make_messages(3))
+
+    delivery.results = [True, False]
+    assert not outbox.flush_channel("", "feishu", {})
+    job = load_job(outbox)
+    assert (job["next_index"], job["attempts"]) == (1, 1)
+    assert job["next_attempt_at"] == clock.now + 60
+
+    # 退避期间不发送
+    assert not outbox.flush_channel("", "feishu", {})
+    assert len(delivery.sent) == 2
+
+    clock.now += 60
+    delivery.results = [False]
+    assert not outbox.flush_channel("", "feishu", {})
+    assert load_job(outbox)["next_attempt_at"] == clock.now + 120
+
+    clock.now += 120
+    assert outbox.flush_channel("", "feishu", {})
+    assert [label for _, label, ok in delivery.sent if ok] == ["1/3", "2/3", "3/3"]
+    assert job_files(outbox) == []
+
+
+def test_backoff_is_capped_and_respects_rate_limit(clock, delivery, monkeypatch):
+    monkeypatch.setitem(main.CONFIG["OUTBOX"], "MAX_DELAY", 100)
+    monkeypatch.setitem(main.CONFIG["OUTBOX"], "MAX_ATTEMPTS", 10)
+    outbox = main.NotificationOutbox()
+    outbox.enqueue("", "feishu", "当日汇总", "daily", make_messages(1))
+
+    delays = []
+    for _ in range(4):
+        delivery.results = [False]
+        outbox.flush_channel("", "feishu", {})
+        delay = load_job(outbox)["next_attempt_at"] - clock.now
+        delays.append(delay)
+        clock.now += delay
+    assert delays == [60, 100, 100, 100]
+
+    # 被限流时等到限流结束再重试
+    monkeypatch.setattr(main, "get_rate_limit_delay", lambda channel, channels: 599.5)
+    delivery.results = [False]
+    outbox.flush_channel("", "feishu", {})
+    assert load_job(outbox)["next_attempt_at"] == clock.now + 600
+
+
+def test_job_is_dropped_after_max_attempts(clock, delivery):
+    outbox = main.NotificationOutbox()
+    outbox.enqueue("", "feishu", "当日汇总", "daily", make_messages(2))
+
+    for _ in range(4):
+        delivery.results = [False]
+        outbox.flush_channel("", "feishu", {})
+        clock.now += 3600
+    assert job_files(outbox) == []
+    assert not main.PushRecordManager().has_pushed_today()
+
+
+def test_expired_jobs_are_dropped(clock, delivery):
+    outbox = main.NotificationOutbox()
+    outbox.enqueue("", "feishu", "当日汇总", "daily", make_messages(1))
+    clock.now += 25 * 3600
+    assert outbox.flush_channel("", "feishu", {})
+    assert delivery.sent == []
+    assert job_files(outbox) == []
+
+
+def test_summary_supersedes_unsent_summary(clock, delivery):
+    outbox = main.NotificationOutbox()
+    old = outbox.enqueue("", "feishu", "当日汇总", "daily", make_messages(1))
+    incremental = outbox.enqueue("", "feishu", "实时增量", "incremental", make_messages(1))
+    clock.now += 1
+    outbox.enqueue("", "feishu", "当日汇总", "daily", make_messages(2))
+
+    ids = [json.loads(f.read_text(encoding="utf-8"))["id"] for f in job_files(outbox)]
+    assert old["id"] not in ids and incremental["id"] in ids
+    assert len(ids) == 2
+
+
+def test_channels_are_independent(clock, delivery):
+    outbox = main.NotificationOutbox()
+    outbox.enqueue("", "feishu", "当日汇总", "daily", make_messages(1))
+    outbox.enqueue("", "telegram", "当日汇总", "daily", make_messages(1))
+    outbox.enqueue("vip", "feishu", "当日汇总", "daily", make_messages(1))
+
+    delivery.results = [False]
+    assert not outbox.flush_channel("", "feishu", {})
+    assert sorted(outbox.due_channels()) == [("", "telegram"), ("vip", "feishu")]
+    assert outbox.flush_channel("", "telegram", {})
+    assert outbox.flush_channel("vip", "feishu", {})
+
+
+def test_late_success_records_push(clock, delivery):
+    outbox = main.NotificationOutbox()
+    outbox.enqueue("vip", "feishu", "当日汇总", "daily", make_messages(1))
+
+    delivery.results = [False]
+    outbox.flush_channel("vip", "feishu", {})
+    assert not main.PushRecordManager("vip").has_pushed_today()
+
+    clock.now += 60
+    assert outbox.flush_channel("vip", "feishu", {})
+    assert main.PushRecordManager("vip").has_pushed_today()
+    assert not main.PushRecordManager().has_pushed_today()
+
+
+def test_send_to_notifications_keeps_secrets_out_of_jobs(clock, delivery, monkeypatch):
+    monkeypatch.setitem(main.CONFIG, "FEISHU_WEBHOOK_URL", WEBHOOK)
+    for key in (
+        "DINGTALK_WEBHOOK_URL",
+        "WEWORK_WEBHOOK_URL",
+        "TELEGRAM_BOT_TOKEN",
+        "NTFY_SERVER_URL",
+        "EMAIL_FROM",
+    ):
+        monkeypatch.setitem(main.CONFIG, key, "")
+
+    delivery.results = [False]
+    results = main.send_to_notifications([], [], "当日汇总", {}, {}, mode="daily")
+    assert results == {"feishu": False}
+    assert not main.PushRecordManager().has_pushed_today()
+
+    outbox = main.NotificationOutbox()
+    [job_file] = job_files(outbox)
+    content = job_file.read_text(encoding="utf-8")
+    assert "secret-token" not in content
+
+    # 下次运行补发成功后记录推送，同一天不再重复推送
+    clock.now += 60
+    assert main.flush_notification_outbox() == {"feishu": True}
+    assert main.PushRecordManager().has_pushed_today()
+    assert main.send_to_notifications([], [], "当日汇总", {}, {}, mode="daily") == {}
@@ -0,0 +1,241 @@
+"""快照并行解析与分段合并测试"""
+
+import random
+
+import pytest
+
+from trendradar import parallel
+from trendradar.parallel import (
+    MERGE_DAY,
+    MERGE_RANKS,
+    SnapshotPartial,
+    parse_snapshot_groups,
+    parse_snapshots,
+)
+from trendradar.snapshot import format_repeat_marker
+
+PLATFORMS = ["weibo", "zhihu", "baidu"]
+
+
+def random_snapshots(rng, count):
+    snapshots = []
+    for index in range(count):
+        titles_by_id = {}
+        # 部分快照只包含部分平台（按平台间隔轮询）
+        for source_id in rng.sample(PLATFORMS, rng.randint(0, len(PLATFORMS))):
+            titles = rng.sample([f"{source_id}标题{i}" for i in range(8)], rng.randint(1, 5))
+            titles_by_id[source_id] = {
+                title: {
+                    "ranks": [rank],
+                    "url": rng.choice(["", f"https://a/{title}/{index}"]),
+                    "mobileUrl": rng.choice(["", f"https://m/{title}"]),
+                }
+                for rank, title in enumerate(titles, 1)
+            }
+        snapshots.append((f"{index // 60:02d}时{index % 60:02d}分.txt", titles_by_id))
+    return snapshots
+
+
+def build(mode, snapshots):
+    partial = SnapshotPartial(mode)
+    for file_name, titles_by_id in snapshots:
+        id_to_name = {source_id: source_id.upper() for source_id in titles_by_id}
+        partial.add_snapshot(file_name, titles_by_id, id_to_name)
+    return partial
+
+
+def ordered_latest(latest):
+    """最新一批标题连同平台和标题的顺序（决定新增区域中平台的先后和同权重标题的顺序）"""
+    return [(source_id, list(titles)) for source_id, titles in latest.items()]
+
+
+def dump(partial):
+    return (
+        ordered_latest(partial.latest),
+        {
+            source_id: {title: record.to_row() for title, record in records.items()}
+            for source_id, records in partial.titles.items()
+        },
+        partial.id_to_name,
+        partial.files,
+        partial.latest,
+        partial.historical,
+    )
+
+
+def split_points(rng, count):
+    return sorted(rng.sample(range(1, count), rng.randint(0, min(4, count - 1))))
+
+
+@pytest.mark.parametrize("mode", [MERGE_DAY, MERGE_RANKS])
+def test_merge_matches_sequential(mode):
+    rng = random.Random(18)
+    for _ in range(200):
+        snapshots = random_snapshots(rng, rng.randint(1, 12))
+        expected = dump(build(mode, snapshots))
+
+        bounds = [0] + split_points(rng, len(snapshots)) + [len(snapshots)]
+        chunks = [snapshots[start:end] for start, end in zip(bounds, bounds[1:])]
+
+        left = SnapshotPartial(mode)
+        for chunk in chunks:
+            left.merge(build(mode, chunk))
+        assert dump(left) == expected
+
+        # 结合律：先合并后面的段再并入前面的段，结果相同
+        right = build(mode, chunks[-1])
+        for chunk in reversed(chunks[:-1]):
+            right = build(mode, chunk).merge(right)
+        assert dump(right) == expected
+
+
+def test_latest_batch_is_tracked_per_platform():
+    snapshots = [
+        ("08时00分.txt", {"weibo": {"甲": {"ranks": [1]}}, "zhihu": {"乙": {"ranks": [1]}}}),
+        ("08时10分.txt", {"weibo": {"丙": {"ranks": [1]}}}),
+    ]
+    partial = build(MERGE_DAY, snapshots)
+    assert {source_id: list(titles) for source_id, titles in partial.latest.items()} == {
+        "weibo": ["丙"],
+        "zhihu": ["乙"],
+    }
+    assert partial.historical == {"weibo": {"甲"}}
+
+    record = partial.titles["weibo"]["甲"]
+    assert (record.first_time, record.last_time, record.count) == ("08时00分", "08时00分", 1)
+
+
+def test_merge_keeps_errors_of_empty_chunks():
+    partial = SnapshotPartial()
+    empty = SnapshotPartial()
+    empty.errors.append(("08时00分.txt", "broken"))
+    partial.merge(empty)
+    assert partial.errors == [("08时00分.txt", "broken")]
+    assert partial.files == []
+
+
+def write_day(folder, snapshots):
+    folder.mkdir(parents=True)
+    files = []
+    for file_name, titles_by_id in snapshots:
+        lines = []
+        for source_id, titles in titles_by_id.items():
+            lines.append(source_id)
+            for title, info in titles.items():
+                line = f"{info['ranks'][0]}. {title}"
+                if info["url"]:
+                    line += f" [URL:{info['url']}]"
+                if info["mobileUrl"]:
+                    line += f" [MOBILE:{info['mobileUrl']}]"
+                lines.append(line)
+            lines.append("")
+        (folder / file_name).write_text("\n".join(lines) + "\n", encoding="utf-8")
+        files.append(folder / file_name)
+    return files
+
+
+@pytest.fixture
+def days(tmp_path):
+    rng = random.Random(5)
+    groups = {}
+    for day in ("2025年11月04日", "2025年11月05日"):
+        groups[day] = write_day(tmp_path / day, random_snapshots(rng, 20))
+    # "与快照相同"标记文件和无法解析的文件
+    marker = groups["2025年11月05日"][-1].parent / "23时00分.txt"
+    marker.write_text(format_repeat_marker(groups["2025年11月05日"][0].stem) + "\n", encoding="utf-8")
+    missing = marker.parent / "23时30分.txt"
+    missing.write_text(format_repeat_marker("不存在") + "\n", encoding="utf-8")
+    groups["2025年11月05日"] += [marker, missing]
+    return groups
+
+
+@pytest.mark.parametrize("mode", [MERGE_DAY, MERGE_RANKS])
+def test_pool_matches_sequential(days, mode):
+    try:
+        sequential = parse_snapshot_groups(days, mode, skip_errors=True, workers=1)
+        pooled = parse_snapshot_groups(
+            days, mode, skip_errors=True, workers=2, min_files=1
+        )
+        # 第二次解析复用同一个进程池
+        pool = parallel._pool
+        assert pool._mp_context.get_start_method() == "spawn"
+        again = parse_snapshot_groups(days, mode, skip_errors=True, workers=2, min_files=1)
+        assert parallel._pool is pool
+    finally:
+        parallel.shutdown_pool()
+
+    assert list(pooled) == list(days)
+    for day in days:
+        assert dump(pooled[day]) == dump(sequential[day])
+        assert dump(again[day]) == dump(sequential[day])
+        assert pooled[day].errors == sequential[day].errors
+    assert [name for name, _ in sequential["2025年11月05日"].errors] == ["23时30分.txt"]
+
+
+def test_platform_filter_and_errors(days):
+    files = days["2025年11月05日"]
+    partial = parse_snapshots(files, platform_ids=["weibo"], skip_errors=True, workers=1)
+    assert set(partial.titles) <= {"weibo"}
+    assert len(partial.files) == len(files) - 1
+
+    with pytest.raises(OSError):
+        parse_snapshots(files, workers=1)
+
+
+def test_small_inputs_stay_in_process(days, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("不应启动进程池")
+
+    monkeypatch.setattr(parallel, "_parse_in_pool", fail)
+    parse_snapshot_groups(days, skip_errors=True, workers=4)
+    parse_snapshot_groups(days, skip_errors=True, workers=1, min_files=1)
+
+
+def test_latest_follows_last_appearance_order():
+    snapshots = [
+        ("08时00分.txt", {"weibo": {"甲": {"ranks": [1]}}, "zhihu": {"乙": {"ranks": [1]}}}),
+        ("08时10分.txt", {"zhihu": {"丙": {"ranks": [1]}}, "weibo": {"丁": {"ranks": [1]}}}),
+    ]
+    assert list(build(MERGE_DAY, snapshots).latest) == ["zhihu", "weibo"]
+
+    merged = build(MERGE_DAY, snapshots[:1]).merge(build(MERGE_DAY, snapshots[1:]))
+    assert list(merged.latest) == ["zhihu", "weibo"]
+
+
+def test_day_aggregate_parallel_rebuild_matches_incremental(tmp_path, monkeypatch):
+    import main
+
+    monkeypatch.setitem(main.CONFIG["SQLITE_STORE"], "ENABLED", False)
+    rng = random.Random(8)
+    for seed in range(8):
+        day = tmp_path / str(seed) / "2025年11月05日"
+        files = write_day(day / "all", random_snapshots(rng, 30))
+
+        monkeypatch.setitem(
+            main.CONFIG, "PARALLEL_PARSE", {"WORKERS": 2, "MIN_FILES": 1}
+        )
+        try:
+            cold = main.DayAggregate(day / "all", tmp_path / str(seed) / "cold.json")
+            cold.refresh()
+        finally:
+            parallel.shutdown_pool()
+
+        monkeypatch.setitem(
+            main.CONFIG, "PARALLEL_PARSE", {"WORKERS": 1, "MIN_FILES": 10**6}
+        )
+        txt_dir = day / "txt"
+        txt_dir.mkdir()
+        warm = main.DayAggregate(txt_dir, tmp_path / str(seed) / "warm.json")
+        for file_path in files:
+            (txt_dir / file_path.name).write_bytes(file_path.read_bytes())
+            warm.refresh()
+
+        assert ordered_latest(cold.latest_titles) == ordered_latest(warm.latest_titles)
+        assert cold.historical_titles == warm.historical_titles
+        assert {
+            source_id: [(title, record.to_row()) for title, record in records.items()]
+            for source_id, records in cold.all_results.items()
+        } == {
+            source_id: [(title, record.to_row()) for title, record in records.items()]
+            for source_id, records in warm.all_results.items()
+        }
@@ -0,0 +1,156 @@
+"""自适应轮询间隔测试"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+import main
+
+
+class FakeTime:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(
+        main.CONFIG,
+        "ADAPTIVE_POLLING",
+        {"ENABLED": True, "MIN_INTERVAL": 5, "MAX_INTERVAL": 30, "LOW_CHURN": 0.1, "HIGH_CHURN": 0.3},
+    )
+    fake = FakeTime()
+    monkeypatch.setattr(main, "time", fake)
+    return fake
+
+
+def titles(start, count=10):
+    return [f"标题{i}" for i in range(start, start + count)]
+
+
+def observe_runs(planner, runs):
+    """依次记录每次爬取的标题，返回每次之后的间隔"""
+    intervals = []
+    for run in runs:
+        planner.observe("weibo", run)
+        intervals.append(planner.get_interval("weibo"))
+    return intervals
+
+
+def test_low_churn_widens_up_to_max(clock):
+    planner = main.AdaptivePollingPlanner()
+    assert planner.get_interval("weibo") == 5
+
+    # 第一次爬取没有可比较的标题，不调整；之后每次标题不变，间隔延长为 1.5 倍直到上限
+    assert observe_runs(planner, [titles(0)] * 7) == [5, 7.5, 11.25, 16.88, 25.32, 30, 30]
+
+    # 变化率刚好等于下限阈值时也延长
+    planner.observe("zhihu", titles(0))
+    assert planner.observe("zhihu", titles(1)) == 0.1
+    assert planner.get_interval("zhihu") == 7.5
+
+
+def test_high_churn_narrows_down_to_min(clock):
+    planner = main.AdaptivePollingPlanner()
+    observe_runs(planner, [titles(0)] * 6)
+    assert planner.get_interval("weibo") == 30
+
+    # 每次 3/10 的新标题，间隔减半直到下限
+    assert observe_runs(planner, [titles(3), titles(6), titles(9), titles(12)]) == [15, 7.5, 5, 5]
+    assert planner._states["weibo"]["churn"] == 0.3
+    assert planner._states["weibo"]["interval"] == 5
+
+
+def test_moderate_or_missing_churn_keeps_interval(clock):
+    planner = main.AdaptivePollingPlanner()
+    observe_runs(planner, [titles(0)] * 3)
+    assert planner.get_interval("weibo") == 11.25
+
+    # 变化率在两个阈值之间、本次没有标题时，间隔不变
+    assert observe_runs(planner, [titles(2), [], titles(4)]) == [11.25, 11.25, 11.25]
+    assert planner.observe("weibo", []) is None
+    assert planner.observe("weibo", titles(4)) is None
+    assert planner.observe("weibo", titles(6)) == 0.2
+
+
+def test_intervals_are_clamped_to_current_limits(clock, monkeypatch):
+    planner = main.AdaptivePollingPlanner()
+    observe_runs(planner, [titles(0)] * 6)
+    planner.save()
+    assert planner.get_interval("weibo") == 30
+
+    # 调小上限后，已保存的间隔按新上限计算，再次延长也不超过上限
+    monkeypatch.setitem(main.CONFIG["ADAPTIVE_POLLING"], "MAX_INTERVAL", 20)
+    planner = main.AdaptivePollingPlanner()
+    assert planner.get_interval("weibo") == 20
+    assert observe_runs(planner, [titles(0)]) == [20]
+    assert observe_runs(planner, [titles(5)]) == [10]
+    planner.save()
+
+    # 调大下限后，间隔不低于新下限
+    monkeypatch.setitem(main.CONFIG["ADAPTIVE_POLLING"], "MIN_INTERVAL", 12)
+    planner = main.AdaptivePollingPlanner()
+    assert planner.get_interval("weibo") == 12
+    assert observe_runs(planner, [titles(10)]) == [12]
+
+    # 上限小于下限时按下限处理
+    monkeypatch.setitem(main.CONFIG["ADAPTIVE_POLLING"], "MAX_INTERVAL", 3)
+    planner = main.AdaptivePollingPlanner()
+    assert (planner.min_interval, planner.max_interval) == (12, 12)
+    assert observe_runs(planner, [titles(10)] * 2) == [12, 12]
+
+
+def test_due_platforms(clock):
+    planner = main.AdaptivePollingPlanner()
+    platforms = [{"id": "weibo"}, {"id": "zhihu"}]
+    observe_runs(planner, [titles(0)] * 2)
+    assert planner.get_interval("weibo") == 7.5
+    assert planner.next_due("weibo") == clock.now + 7.5 * 60
+    assert planner.next_due("zhihu") is None
+
+    # 从未爬取过的平台总是到期；到期时间前 DUE_TOLERANCE 秒内也算到期
+    assert planner.select_due(platforms) == [{"id": "zhihu"}]
+    clock.now += 7.5 * 60 - planner.DUE_TOLERANCE - 1
+    assert planner.select_due(platforms) == [{"id": "zhihu"}]
+    clock.now += 1
+    assert planner.select_due(platforms) == platforms
+
+
+def test_failed_platform_retries_after_min_interval(clock):
+    planner = main.AdaptivePollingPlanner()
+    observe_runs(planner, [titles(0)] * 5)
+    assert planner.get_interval("weibo") == 25.32
+
+    clock.now += 25.32 * 60
+    planner.update({}, ["weibo"])
+    # 失败不改变间隔，但下次按下限间隔重试
+    assert planner.get_interval("weibo") == 25.32
+    assert not planner.is_due("weibo", clock.now + 5 * 60 - planner.DUE_TOLERANCE - 1)
+    assert planner.is_due("weibo", clock.now + 5 * 60 - planner.DUE_TOLERANCE)
+
+
+def test_state_persists_across_runs(clock):
+    planner = main.AdaptivePollingPlanner()
+    planner.update({"weibo": {title: {} for title in titles(0)}}, ["zhihu"])
+    clock.now += 600
+    planner = main.AdaptivePollingPlanner()
+    planner.update({"weibo": {title: {} for title in titles(0)}}, [])
+
+    state_file = Path("output") / ".crawler_state" / "polling.json"
+    state = json.loads(state_file.read_text(encoding="utf-8"))
+    assert state["weibo"] == {
+        "interval": 7.5,
+        "churn": 0.0,
+        "last_crawl": int(clock.now),
+        "titles": titles(0),
+    }
+    assert state["zhihu"]["interval"] == 5
+
+    # 状态文件损坏时从下限重新开始
+    state_file.write_text("{", encoding="utf-8")
+    assert main.AdaptivePollingPlanner().get_interval("weibo") == 5
@@ -0,0 +1,190 @@
+"""多订阅测试：每个订阅的报告和推送与只配置该订阅单独运行时相同"""
+
+import copy
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+import pytz
+
+import main
+
+START = pytz.timezone("Asia/Shanghai").localize(datetime(2025, 7, 10, 8, 0))
+
+PLATFORMS = [{"id": "weibo", "name": "微博"}, {"id": "zhihu", "name": "知乎"}]
+
+# 两轮爬取：第二轮有新增标题、排名变化，知乎第一轮请求失败
+ROUNDS = [
+    (
+        {
+            "weibo": {
+                "华为发布会定档": {"ranks": [1], "url": "https://w/1", "mobileUrl": ""},
+                "AI 芯片出口新规": {"ranks": [2], "url": "", "mobileUrl": ""},
+                "苹果广告片上线": {"ranks": [3], "url": "", "mobileUrl": ""},
+                "周末天气": {"ranks": [4], "url": "", "mobileUrl": ""},
+            },
+        },
+        ["zhihu"],
+    ),
+    (
+        {
+            "weibo": {
+                "AI 芯片出口新规": {"ranks": [1], "url": "", "mobileUrl": ""},
+                "华为发布会定档": {"ranks": [2], "url": "https://w/1", "mobileUrl": ""},
+                "国产芯片量产": {"ranks": [3], "url": "", "mobileUrl": ""},
+            },
+            "zhihu": {
+                "如何评价华为新机": {"ranks": [1], "url": "https://z/1", "mobileUrl": ""},
+                "AI 写代码靠谱吗": {"ranks": [2], "url": "", "mobileUrl": ""},
+            },
+        },
+        [],
+    ),
+]
+
+# (订阅名, 频率词, 报告模式)，第一个为默认订阅
+PROFILES = [
+    ("", "华为\n\n苹果\n!广告\n", "daily"),
+    ("tech", "AI\n芯片\n\n+华为\n新机\n", "incremental"),
+    ("everything", "", "current"),
+]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = START
+
+    def __call__(self):
+        return self.now
+
+
+crawl_round = [0]
+pushes = []
+
+
+def fake_crawl(self, ids_list, request_interval=None):
+    results, failed_ids = ROUNDS[crawl_round[0]]
+    id_to_name = {platform["id"]: platform["name"] for platform in PLATFORMS}
+    return copy.deepcopy(results), id_to_name, list(failed_ids)
+
+
+def record_push(
+    stats,
+    failed_ids=None,
+    report_type="当日汇总",
+    new_titles=None,
+    id_to_name=None,
+    update_info=None,
+    proxy_url=None,
+    mode="daily",
+    html_file_path=None,
+    profile=None,
+    report_data=None,
+):
+    """代替 send_to_notifications，记录每次推送的内容"""
+    if report_data is None:
+        report_data = main.prepare_report_data(
+            stats, failed_ids, new_titles, id_to_name, mode, matcher=profile.matcher if profile else None
+        )
+    channels = profile.channels if profile else main.CONFIG
+    pushes.append(
+        {
+            "profile": profile.name if profile else "",
+            # 渠道地址的最后一段，区分推送到了哪个订阅的渠道
+            "channel": channels["FEISHU_WEBHOOK_URL"].rsplit("/", 1)[-1],
+            "report_type": report_type,
+            "mode": mode,
+            "report_data": copy.deepcopy(report_data),
+            "html_file": Path(html_file_path).name if html_file_path else None,
+        }
+    )
+    return {}
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(main, "get_beijing_time", clock)
+    monkeypatch.setattr(main.webbrowser, "open", lambda url: None)
+    monkeypatch.setitem(main.CONFIG, "PLATFORMS", PLATFORMS)
+    monkeypatch.setitem(main.CONFIG, "ENABLE_NOTIFICATION", True)
+    monkeypatch.setitem(main.CONFIG, "SHOW_VERSION_UPDATE", False)
+    monkeypatch.setitem(main.CONFIG, "FEISHU_WEBHOOK_URL", "https://feishu.invalid/default")
+    monkeypatch.setitem(main.CONFIG["SQLITE_STORE"], "ENABLED", False)
+    monkeypatch.setitem(main.CONFIG["SEEN_TITLES"], "ENABLED", False)
+    monkeypatch.setitem(main.CONFIG["ADAPTIVE_POLLING"], "ENABLED", False)
+    monkeypatch.setitem(main.CONFIG, "PARALLEL_PARSE", {"WORKERS": 1, "MIN_FILES": 10**6})
+    monkeypatch.setattr(main.DataFetcher, "crawl_websites", fake_crawl)
+    monkeypatch.setattr(main, "send_to_notifications", record_push)
+
+    def run(workdir, profiles):
+        """在 workdir 中按给定订阅依次运行两轮，返回各订阅的推送和 HTML 报告"""
+        workdir.mkdir()
+        monkeypatch.chdir(workdir)
+        monkeypatch.setattr(main, "_day_aggregates", {})
+        monkeypatch.setattr(main, "REPORT_MODEL_CACHE", main.ReportModelCache())
+        clock.now = START
+        pushes.clear()
+
+        (name, words, mode), *extra = profiles
+        assert name == ""
+        Path("config").mkdir()
+        Path("config/frequency_words.txt").write_text(words, encoding="utf-8")
+        monkeypatch.setenv("FREQUENCY_WORDS_PATH", "config/frequency_words.txt")
+        monkeypatch.setitem(main.CONFIG, "REPORT_MODE", mode)
+        profile_data = []
+        for name, words, mode in extra:
+            if words is not None:
+                Path(f"config/frequency_words_{name}.txt").write_text(words, encoding="utf-8")
+            profile_data.append(
+                {"name": name, "report_mode": mode, "webhooks": {"feishu_url": f"https://feishu.invalid/{name}"}}
+            )
+        monkeypatch.setitem(main.CONFIG, "PROFILES", main.load_profile_configs(profile_data, "daily"))
+
+        analyzer = main.NewsAnalyzer()
+        for round_index in range(len(ROUNDS)):
+            crawl_round[0] = round_index
+            analyzer.run()
+            clock.now += timedelta(minutes=30)
+
+        html_root = Path("output") / main.format_date_folder() / "html"
+        reports = {}
+        for name, _, _ in profiles:
+            html_dir = html_root / name if name else html_root
+            reports[name] = {
+                "pushes": [push for push in pushes if push["profile"] == name],
+                "html": {
+                    path.name: path.read_text(encoding="utf-8")
+                    for path in sorted(html_dir.glob("*.html"))
+                },
+            }
+        return reports
+
+    return run
+
+
+def as_profile(single, name):
+    """单独运行时订阅作为默认订阅推送，换成多订阅运行时应有的订阅名和渠道"""
+    return [
+        dict(push, profile=name, channel=name or "default")
+        for push in single[""]["pushes"]
+    ]
+
+
+def test_profiles_match_separate_single_profile_runs(project, tmp_path):
+    combined = project(tmp_path / "combined", PROFILES)
+
+    for name, words, mode in PROFILES:
+        single = project(tmp_path / f"single-{name or 'default'}", [("", words, mode)])
+        assert combined[name]["pushes"], f"订阅 {name or '默认'} 没有推送"
+        assert combined[name]["pushes"] == as_profile(single, name)
+        assert combined[name]["html"] == single[""]["html"]
+
+
+def test_profile_with_missing_rules_does_not_affect_others(project, tmp_path):
+    combined = project(tmp_path / "combined", PROFILES)
+    # 频率词文件不存在的订阅本轮跳过，不推送也不生成报告
+    with_broken = project(tmp_path / "broken", PROFILES + [("broken", None, "daily")])
+
+    assert with_broken.pop("broken") == {"pushes": [], "html": {}}
+    assert with_broken == combined
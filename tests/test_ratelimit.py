@@ -0,0 +1,188 @@
+"""通知渠道限速测试"""
+
+from email.utils import formatdate
+
+import pytest
+
+import main
+from trendradar.ratelimit import RateLimiterRegistry, TokenBucket, parse_retry_after
+
+
+class FakeClock:
+    """单调时钟，sleep 只推进时间"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_bucket(clock, rate=1.0, capacity=3):
+    return TokenBucket(rate, capacity, clock=clock, sleep=clock.sleep)
+
+
+def test_burst_then_steady_rate(clock):
+    bucket = make_bucket(clock, rate=2.0, capacity=3)
+    assert [bucket.acquire() for _ in range(3)] == [0, 0, 0]
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert clock.now == pytest.approx(101.0)
+
+
+def test_refill_is_capped_at_capacity(clock):
+    bucket = make_bucket(clock, rate=1.0, capacity=2)
+    bucket.acquire()
+    bucket.acquire()
+    clock.now += 60
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, pytest.approx(1.0)]
+
+
+def test_reserve_queues_concurrent_senders(clock):
+    bucket = make_bucket(clock, rate=1.0, capacity=1)
+    assert [bucket.reserve() for _ in range(4)] == [0, 1, 2, 3]
+
+
+def test_delay_does_not_take_tokens(clock):
+    bucket = make_bucket(clock, rate=1.0, capacity=1)
+    assert bucket.delay() == 0
+    bucket.reserve()
+    assert bucket.delay() == pytest.approx(1.0)
+    assert bucket.delay() == pytest.approx(1.0)
+    clock.now += 0.25
+    assert bucket.delay() == pytest.approx(0.75)
+
+
+def test_pause_blocks_until_resume(clock):
+    bucket = make_bucket(clock, rate=1.0, capacity=5)
+    bucket.pause(30)
+    assert bucket.delay() == pytest.approx(30)
+    assert bucket.acquire() == pytest.approx(30)
+    # 恢复后从一个令牌开始补充
+    assert bucket.acquire() == pytest.approx(1.0)
+
+    # 较短的暂停不会提前结束较长的暂停
+    bucket.pause(60)
+    bucket.pause(5)
+    assert bucket.delay() == pytest.approx(60)
+
+
+def test_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0, 1)
+
+
+def test_registry_rebuilds_on_new_limits():
+    registry = RateLimiterRegistry()
+    bucket = registry.get(("feishu", "a"), 1.0, 3)
+    assert registry.get(("feishu", "a"), 1.0, 3) is bucket
+    assert registry.get(("feishu", "b"), 1.0, 3) is not bucket
+    assert registry.get(("feishu", "a"), 2.0, 3) is not bucket
+
+
+def test_parse_retry_after(monkeypatch):
+    assert parse_retry_after("12") == 12
+    assert parse_retry_after(" 1.5 ") == 1.5
+    assert parse_retry_after("-3") == 0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+    monkeypatch.setattr("trendradar.ratelimit.time.time", lambda: 1_700_000_000.0)
+    assert parse_retry_after(formatdate(1_700_000_090.0, usegmt=True)) == pytest.approx(90)
+    assert parse_retry_after(formatdate(1_699_999_000.0, usegmt=True)) == 0
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._body = body
+
+    def json(self):
+        if self._body is None:
+            raise ValueError("no json")
+        return self._body
+
+
+@pytest.fixture
+def limited(clock, monkeypatch):
+    """把 dingtalk 的令牌桶换成假时钟驱动的令牌桶，requests.post 按预设顺序返回响应"""
+    bucket = make_bucket(clock, rate=1.0, capacity=1)
+    monkeypatch.setattr(main, "get_channel_limiter", lambda channel, destination: bucket)
+    monkeypatch.setitem(main.CONFIG, "RATE_LIMIT_MAX_WAIT", 120)
+    monkeypatch.setitem(main.CONFIG, "RATE_LIMIT_RETRIES", 2)
+    monkeypatch.setitem(
+        main.CONFIG["RATE_LIMITS"], "dingtalk", {"RATE": 1.0, "BURST": 1, "COOLDOWN": 600}
+    )
+
+    responses = []
+    monkeypatch.setattr(main.requests, "post", lambda url, **kwargs: responses.pop(0))
+    return bucket, responses
+
+
+def test_rate_limit_wait_detection(monkeypatch):
+    monkeypatch.setitem(
+        main.CONFIG["RATE_LIMITS"], "dingtalk", {"RATE": 1.0, "BURST": 1, "COOLDOWN": 600}
+    )
+    assert main.get_rate_limit_wait("feishu", FakeResponse(429, headers={"Retry-After": "7"})) == 7
+    assert main.get_rate_limit_wait(
+        "telegram", FakeResponse(429, {"parameters": {"retry_after": 9}})
+    ) == 9
+    assert main.get_rate_limit_wait("dingtalk", FakeResponse(200, {"errcode": 130101})) == 600
+    assert main.get_rate_limit_wait("dingtalk", FakeResponse(200, {"errcode": 0})) is None
+    assert main.get_rate_limit_wait("dingtalk", FakeResponse(200)) is None
+
+
+def test_short_rate_limit_is_retried(clock, limited):
+    bucket, responses = limited
+    responses += [FakeResponse(429, headers={"Retry-After": "5"}), FakeResponse(200, {"errcode": 0})]
+
+    response = main.post_notification_request("dingtalk", "hook", "测试批次", "https://x")
+    assert response.status_code == 200
+    assert clock.now == pytest.approx(105)
+
+
+def test_long_rate_limit_pauses_bucket(clock, limited):
+    bucket, responses = limited
+    responses.append(FakeResponse(200, {"errcode": 130101}))
+
+    response = main.post_notification_request("dingtalk", "hook", "测试批次", "https://x")
+    assert response.json()["errcode"] == 130101
+    assert responses == []
+    # 不在本次发送中等待，但后续请求（包括发件箱重试）要等到限流结束
+    assert clock.slept == []
+    assert bucket.delay() == pytest.approx(600)
+
+
+def test_retries_exhausted_pause_bucket(clock, limited):
+    bucket, responses = limited
+    responses += [FakeResponse(429, headers={"Retry-After": "10"}) for _ in range(3)]
+
+    response = main.post_notification_request("dingtalk", "hook", "测试批次", "https://x")
+    assert response.status_code == 429
+    assert responses == []
+    assert bucket.delay() == pytest.approx(10)
+
+
+def test_channel_delay_uses_destination(monkeypatch):
+    seen = []
+
+    def fake_limiter(channel, destination):
+        seen.append((channel, destination))
+        return None
+
+    monkeypatch.setattr(main, "get_channel_limiter", fake_limiter)
+    channels = {"TELEGRAM_BOT_TOKEN": "token", "TELEGRAM_CHAT_ID": "42"}
+    assert main.get_rate_limit_delay("telegram", channels) == 0
+    assert main.get_rate_limit_delay("email", channels) == 0
+    assert seen == [("telegram", "token:42")]
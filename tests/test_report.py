@@ -0,0 +1,195 @@
+"""报告模型测试：标题行渲染与缓存复用"""
+
+import pytest
+
+import main
+from trendradar.matcher import CombinedMatcher, SharedMatches
+
+RICH = {
+    "title": "OpenAI  发布 <GPT-5>\n",
+    "source_name": "知乎&",
+    "time_display": "[08时00分 ~ 10时30分]",
+    "count": 3,
+    "ranks": [5, 2, 4],
+    "rank_threshold": 5,
+    "url": "https://a/1?x=1&y=2",
+    "mobile_url": "",
+    "is_new": True,
+}
+PLAIN = {
+    "title": "普通标题",
+    "source_name": "微博",
+    "time_display": "",
+    "count": 1,
+    "ranks": [12],
+    "rank_threshold": 5,
+    "url": "",
+    "mobile_url": "",
+    "is_new": False,
+}
+
+# 与重构前逐渠道拼接的 format_title_for_platform 输出相同
+EXPECTED = {
+    ("feishu", "rich"): "<font color='grey'>[知乎&]</font> 🆕 [OpenAI 发布 <GPT-5>](https://a/1?x=1&y=2) <font color='red'>**[2 - 5]**</font> <font color='grey'>- [08时00分 ~ 10时30分]</font> <font color='green'>(3次)</font>",
+    ("feishu", "plain"): "<font color='grey'>[微博]</font> 普通标题 [12]",
+    ("dingtalk", "rich"): "[知乎&] 🆕 [OpenAI 发布 <GPT-5>](https://a/1?x=1&y=2) **[2 - 5]** - [08时00分 ~ 10时30分] (3次)",
+    ("dingtalk", "plain"): "[微博] 普通标题 [12]",
+    ("wework", "rich"): "[知乎&] 🆕 [OpenAI 发布 <GPT-5>](https://a/1?x=1&y=2) **[2 - 5]** - [08时00分 ~ 10时30分] (3次)",
+    ("wework", "plain"): "[微博] 普通标题 [12]",
+    ("telegram", "rich"): '[知乎&] 🆕 <a href="https://a/1?x=1&y=2">OpenAI 发布 &lt;GPT-5&gt;</a> <b>[2 - 5]</b> <code>- [08时00分 ~ 10时30分]</code> <code>(3次)</code>',
+    ("telegram", "plain"): "[微博] 普通标题 [12]",
+    ("ntfy", "rich"): "[知乎&] 🆕 [OpenAI 发布 <GPT-5>](https://a/1?x=1&y=2) **[2 - 5]** `- [08时00分 ~ 10时30分]` `(3次)`",
+    ("ntfy", "plain"): "[微博] 普通标题 [12]",
+    ("html", "rich"): "<div class='new-title'>🆕 [知乎&amp;] <a href=\"https://a/1?x=1&amp;y=2\" target=\"_blank\" class=\"news-link\">OpenAI 发布 &lt;GPT-5&gt;</a> <font color='red'><strong>[2 - 5]</strong></font> <font color='grey'>- [08时00分 ~ 10时30分]</font> <font color='green'>(3次)</font></div>",
+    ("html", "plain"): '[微博] <span class="no-link">普通标题</span> [12]',
+}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    fresh = main.ReportModelCache()
+    monkeypatch.setattr(main, "REPORT_MODEL_CACHE", fresh)
+    return fresh
+
+
+@pytest.mark.parametrize("platform, name", sorted(EXPECTED))
+def test_title_rendering_matches_previous_output(cache, platform, name):
+    title_data = RICH if name == "rich" else PLAIN
+    assert main.format_title_for_platform(platform, title_data) == EXPECTED[(platform, name)]
+
+
+def test_hide_source():
+    assert main.format_title_for_platform("dingtalk", RICH, show_source=False) == (
+        "🆕 [OpenAI 发布 <GPT-5>](https://a/1?x=1&y=2) **[2 - 5]** - [08时00分 ~ 10时30分] (3次)"
+    )
+    # HTML 总是显示来源
+    assert main.format_title_for_platform("html", PLAIN, show_source=False) == EXPECTED[("html", "plain")]
+
+
+def test_rank_display_matches_helper():
+    for ranks in ([1], [3, 8], [6], [9, 20]):
+        item = main.ReportTitle("t", "s", "", 1, ranks, 5)
+        for format_type in ("html", "feishu", "telegram", "dingtalk", "ntfy"):
+            assert item.rank_display(format_type) == main.format_rank_display(ranks, 5, format_type)
+
+
+def test_report_title_mapping_protocol(cache):
+    item = cache.title(dict(RICH, mobile_url="https://m/1"))
+    assert dict(item) == dict(RICH, mobile_url="https://m/1")
+    assert item["ranks"] == [5, 2, 4]
+    assert item.copy() == dict(item)
+    assert item.link_url == "https://m/1"
+    assert (item.rank_range, item.rank_level) == ("2-5", "top")
+    with pytest.raises(KeyError):
+        item["cleaned_title"]
+
+
+def test_titles_and_renders_are_cached(cache):
+    first = cache.title(RICH)
+    assert cache.title(dict(RICH)) is first
+    assert cache.title(first) is first
+    assert cache.title(dict(RICH, count=4)) is not first
+
+    rendered = first.render("feishu")
+    assert first.render("feishu") is rendered
+    assert first.render("feishu", is_new=False) != rendered
+
+
+def test_cache_evicts_least_recently_used():
+    cache = main.ReportModelCache(max_titles=2)
+    a = cache.title(dict(PLAIN, title="a"))
+    cache.title(dict(PLAIN, title="b"))
+    assert cache.title(dict(PLAIN, title="a")) is a
+    cache.title(dict(PLAIN, title="c"))
+    assert cache.title(dict(PLAIN, title="a")) is a
+    assert len(cache._titles) == 2
+
+
+def make_stats():
+    return [
+        {
+            "word": "人工智能",
+            "count": 2,
+            "percentage": 10.0,
+            "titles": [
+                {
+                    "title": f"人工智能新闻{i}",
+                    "source_name": "知乎",
+                    "time_display": "[08时00分 ~ 09时00分]",
+                    "count": 2,
+                    "ranks": [i, i + 1],
+                    "rank_threshold": 5,
+                    "url": f"https://a/{i}",
+                    "mobileUrl": "",
+                    "is_new": i == 1,
+                }
+                for i in (1, 7)
+            ],
+        },
+        {"word": "空词组", "count": 0, "percentage": 0, "titles": []},
+    ]
+
+
+def test_prepare_report_data(cache):
+    new_titles = {
+        "zhihu": {
+            "人工智能突破": {"ranks": [2], "url": "https://a/n", "mobileUrl": ""},
+            "无关新闻": {"ranks": [3], "url": "", "mobileUrl": ""},
+        }
+    }
+    rule_set = ([{"required": [], "normal": ["人工智能"], "group_key": "人工智能"}], [])
+    matcher = SharedMatches(CombinedMatcher([rule_set])).for_rule_set(0)
+
+    id_to_name = {"zhihu": "知乎"}
+    data = main.prepare_report_data(make_stats(), ["baidu"], new_titles, id_to_name, "daily", matcher)
+    [group] = data["stats"]
+    assert (group["word"], group["count"], group["percentage"]) == ("人工智能", 2, 10.0)
+    assert [item["title"] for item in group["titles"]] == ["人工智能新闻1", "人工智能新闻7"]
+    assert data["failed_ids"] == ["baidu"]
+    [new_group] = data["new_titles"]
+    assert new_group["source_name"] == "知乎"
+    assert [item["title"] for item in new_group["titles"]] == ["人工智能突破"]
+    assert data["total_new_count"] == 1
+
+    # 增量模式不显示新增新闻区域
+    incremental = main.prepare_report_data(
+        make_stats(), None, new_titles, id_to_name, "incremental", matcher
+    )
+    assert incremental["new_titles"] == [] and incremental["total_new_count"] == 0
+
+    # 内容相同的分组在多次构建之间是同一对象
+    again = main.prepare_report_data(make_stats(), ["baidu"], new_titles, id_to_name, "daily", matcher)
+    assert again["stats"][0] is group
+    assert again["new_titles"][0] is new_group
+
+    changed = make_stats()
+    changed[0]["titles"][1]["count"] = 3
+    other = main.prepare_report_data(changed, None, None, None, "daily", matcher)
+    assert other["stats"][0] is not group
+    assert other["stats"][0]["titles"][0] is group["titles"][0]
+
+
+def as_plain(report_data):
+    """去掉模型对象，得到与重构前相同的普通字典"""
+    def plain_group(group):
+        return {**dict(group), "titles": [dict(item) for item in group["titles"]]}
+
+    return {
+        **report_data,
+        "stats": [plain_group(group) for group in report_data["stats"]],
+        "new_titles": [plain_group(group) for group in report_data["new_titles"]],
+    }
+
+
+@pytest.mark.parametrize("format_type", ["feishu", "dingtalk", "wework", "telegram", "ntfy"])
+def test_batches_reuse_rendered_groups(cache, format_type):
+    data = main.prepare_report_data(make_stats(), ["baidu"], None, None, "daily")
+    group = data["stats"][0]
+
+    first = main.split_content_into_batches(data, format_type, max_bytes=4000)
+    assert group.rendered
+    cached = dict(group.rendered)
+    assert main.split_content_into_batches(data, format_type, max_bytes=4000) == first
+    assert group.rendered == cached
+
+    assert main.split_content_into_batches(as_plain(data), format_type, max_bytes=4000) == first
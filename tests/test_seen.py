@@ -0,0 +1,118 @@
+"""多日标题布隆过滤器测试"""
+
+import pytest
+
+from trendradar.seen import BloomFilter, SeenTitleFilter, _title_key
+
+
+def keys(prefix, count):
+    return [f"{prefix}{i}".encode("utf-8") for i in range(count)]
+
+
+def test_bloom_has_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter.for_capacity(5000, 0.01)
+    members = keys("member", 5000)
+    for key in members:
+        bloom.add(key)
+
+    assert all(key in bloom for key in members)
+    false_positives = sum(key in bloom for key in keys("other", 20000))
+    assert false_positives / 20000 < 0.02
+
+
+def test_bloom_serialization():
+    bloom = BloomFilter.for_capacity(100, 0.001)
+    for key in keys("k", 100):
+        bloom.add(key)
+
+    restored = BloomFilter.from_bytes(bloom.to_bytes())
+    assert (restored.size, restored.hash_count, restored.bits) == (bloom.size, bloom.hash_count, bloom.bits)
+    assert all(key in restored for key in keys("k", 100))
+
+    data = bloom.to_bytes()
+    for broken in (data[:5], b"XXXX" + data[4:], data[:-1]):
+        with pytest.raises(ValueError):
+            BloomFilter.from_bytes(broken)
+
+
+@pytest.fixture
+def state_dir(tmp_path):
+    return tmp_path / "seen_titles"
+
+
+def stored_days(state_dir):
+    return sorted(path.name for path in state_dir.iterdir())
+
+
+def test_returning_titles(state_dir):
+    seen = SeenTitleFilter(state_dir, days=7)
+    seen.add_titles("2025年07月01日", {"weibo": {"旧标题": {}, "另一条": {}}, "zhihu": {"知乎旧标题": {}}})
+    seen.add_titles("2025年07月02日", {"weibo": {"今天的标题": {}}})
+
+    new_titles = {
+        "weibo": {"旧标题": {"ranks": [3]}, "今天的标题": {"ranks": [1]}, "全新标题": {"ranks": [2]}},
+        # 同一标题出现在其他平台不算回归
+        "zhihu": {"另一条": {"ranks": [1]}},
+    }
+    # 只查询之前几天的过滤器，不包括当天
+    assert seen.returning_titles("2025年07月02日", new_titles) == {"weibo": {"旧标题": {"ranks": [3]}}}
+    assert seen.seen_before("2025年07月02日", "zhihu", "知乎旧标题")
+    assert not seen.seen_before("2025年07月02日", "weibo", "今天的标题")
+    assert not seen.seen_before("2025年07月01日", "weibo", "旧标题")
+
+    assert SeenTitleFilter(state_dir / "empty").returning_titles("2025年07月02日", new_titles) == {}
+
+
+def test_filters_persist_across_runs(state_dir):
+    SeenTitleFilter(state_dir).add_titles("2025年07月01日", {"weibo": {"甲": {}}})
+    seen = SeenTitleFilter(state_dir)
+    seen.add_titles("2025年07月01日", {"weibo": {"乙": {}}})
+
+    # 同一天多次保存时累加到同一个过滤器
+    reloaded = SeenTitleFilter(state_dir)
+    assert reloaded.seen_before("2025年07月02日", "weibo", "甲")
+    assert reloaded.seen_before("2025年07月02日", "weibo", "乙")
+    assert stored_days(state_dir) == ["2025年07月01日.bloom"]
+
+
+def test_corrupted_filter_is_rebuilt(state_dir):
+    SeenTitleFilter(state_dir).add_titles("2025年07月01日", {"weibo": {"甲": {}}})
+    (state_dir / "2025年07月01日.bloom").write_bytes(b"broken")
+
+    seen = SeenTitleFilter(state_dir)
+    assert not seen.seen_before("2025年07月02日", "weibo", "甲")
+    seen.add_titles("2025年07月01日", {"weibo": {"乙": {}}})
+    assert SeenTitleFilter(state_dir).seen_before("2025年07月02日", "weibo", "乙")
+
+
+def test_rolling_window_expiry(state_dir):
+    seen = SeenTitleFilter(state_dir, days=3)
+    for day in range(1, 5):
+        seen.add_titles(f"2025年07月0{day}日", {"weibo": {f"标题{day}": {}}})
+
+    # 保留含当天在内的 3 天
+    assert stored_days(state_dir) == ["2025年07月02日.bloom", "2025年07月03日.bloom", "2025年07月04日.bloom"]
+    reloaded = SeenTitleFilter(state_dir, days=3)
+    assert not reloaded.seen_before("2025年07月04日", "weibo", "标题1")
+    assert reloaded.seen_before("2025年07月04日", "weibo", "标题2")
+    assert reloaded.seen_before("2025年07月04日", "weibo", "标题3")
+
+
+def test_window_counts_calendar_days(state_dir):
+    seen = SeenTitleFilter(state_dir, days=3)
+    seen.add_titles("2025年07月01日", {"weibo": {"旧标题": {}}})
+
+    # 中间几天没有运行：7 月 1 日已超出 7 月 10 日往前 3 天的窗口
+    assert seen.returning_titles("2025年07月10日", {"weibo": {"旧标题": {}}}) == {}
+    seen.add_titles("2025年07月10日", {"weibo": {"新标题": {}}})
+    assert stored_days(state_dir) == ["2025年07月10日.bloom"]
+
+    # 跨月时按日期计算
+    seen = SeenTitleFilter(state_dir / "month", days=3)
+    seen.add_titles("2025年06月30日", {"weibo": {"月末标题": {}}})
+    assert seen.seen_before("2025年07月02日", "weibo", "月末标题")
+    assert not seen.seen_before("2025年07月03日", "weibo", "月末标题")
+
+
+def test_title_key_separates_platforms():
+    assert _title_key("weibo", "标题") != _title_key("zhihu", "标题")
@@ -0,0 +1,348 @@
+"""快照读取与增量编码测试"""
+
+import random
+import re
+
+import pytest
+
+import main
+from mcp_server.services.parser_service import ParserService
+from trendradar.snapshot import (
+    Snapshot,
+    decode_snapshot,
+    format_repeat_marker,
+    get_delta_base,
+    get_repeat_base,
+    load_snapshot,
+    read_titles,
+)
+
+FULL = """zhihu | 知乎
+1. 标题一 [URL:https://a/1] [MOBILE:https://m/1]
+2. 标题二 [URL:https://a/2]
+3. 标题三
+
+weibo | 微博
+1. 热搜一
+2. 热搜二
+
+==== 以下ID请求失败 ====
+toutiao
+"""
+
+
+def random_snapshot(rng, pool, platforms=("zhihu", "weibo", "baidu", "douyin")):
+    entries = {}
+    names = {}
+    for source_id in rng.sample(platforms, rng.randint(0, len(platforms))):
+        titles = rng.sample(pool, rng.randint(1, 8))
+        names[source_id] = rng.choice([source_id, f"{source_id}名称"])
+        entries[source_id] = {
+            title: (rank, rng.choice(["", f"https://a/{title}"]), "")
+            for rank, title in enumerate(titles, 1)
+        }
+    return Snapshot(entries, names)
+
+
+def test_markers_round_trip():
+    marker = format_repeat_marker("08时30分")
+    assert marker == "==== 与快照相同: 08时30分 ===="
+    assert get_repeat_base(marker + "\n") == "08时30分"
+    assert get_delta_base(marker + "\n") is None
+    assert get_repeat_base(FULL) is None
+
+
+def test_parse_full_snapshot():
+    snapshot = Snapshot.parse(FULL)
+    assert list(snapshot.entries) == ["zhihu", "weibo"]
+    assert snapshot.entries["zhihu"]["标题一"] == (1, "https://a/1", "https://m/1")
+    assert snapshot.entries["zhihu"]["标题三"] == (3, "", "")
+    assert snapshot.names == {"zhihu": "知乎", "weibo": "微博"}
+    assert snapshot.depth == 0
+
+
+def test_encode_delta_operations():
+    base = Snapshot.parse(FULL)
+    target = Snapshot(
+        {
+            "zhihu": {
+                "标题一": (1, "https://a/1", "https://m/1"),
+                "新标题": (2, "", ""),
+                "标题二": (3, "https://a/2", ""),
+            },
+            "baidu": {"百度一": (1, "", "")},
+        },
+        {"zhihu": "知乎", "baidu": "百度"},
+    )
+
+    content = base.encode_delta("08时00分", target)
+    assert content.startswith("==== 增量快照: 基于 08时00分 ====")
+    assert get_delta_base(content) == "08时00分"
+    assert "weibo | 微博\n-*" in content
+    assert "-3" in content and "~2>3" in content and "+2. 新标题" in content
+
+    restored = base.apply_delta(content)
+    assert restored.same_as(target)
+    assert restored.depth == 1
+
+
+def test_unchanged_platforms_are_omitted():
+    base = Snapshot.parse(FULL)
+    content = base.encode_delta("08时00分", Snapshot.parse(FULL))
+    assert content.strip() == "==== 增量快照: 基于 08时00分 ===="
+
+
+def test_ambiguous_order_falls_back_to_keyframe():
+    base = Snapshot({"zhihu": {"甲": (1, "", ""), "乙": (1, "", "")}}, {"zhihu": "zhihu"})
+    target = Snapshot({"zhihu": {"乙": (1, "", ""), "甲": (1, "", "")}}, {"zhihu": "zhihu"})
+    assert base.encode_delta("08时00分", target) is None
+
+
+def test_random_round_trip():
+    rng = random.Random(20251105)
+    pool = [f"标题{i}" for i in range(20)]
+    encoded = 0
+    for _ in range(300):
+        base = random_snapshot(rng, pool)
+        target = random_snapshot(rng, pool)
+        content = base.encode_delta("base", target)
+        # 平台顺序变化等无法用增量表达的情况返回 None（写入关键帧）
+        if content is not None:
+            assert base.apply_delta(content).same_as(target)
+            encoded += 1
+    assert encoded > 150
+
+
+def test_same_platform_order_always_encodes():
+    rng = random.Random(11)
+    pool = [f"标题{i}" for i in range(20)]
+    for _ in range(200):
+        base = random_snapshot(rng, pool, ("zhihu",))
+        target = random_snapshot(rng, pool, ("zhihu",))
+        content = base.encode_delta("base", target)
+        assert content is not None
+        assert base.apply_delta(content).same_as(target)
+
+
+def test_unknown_delta_line_is_rejected():
+    with pytest.raises(ValueError):
+        Snapshot().apply_delta("==== 增量快照: 基于 a ====\n\nzhihu\n?1\n")
+
+
+def test_decode_snapshot_follows_bases():
+    base = Snapshot.parse(FULL)
+    target = Snapshot({"zhihu": {"新": (1, "", "")}}, {"zhihu": "知乎"})
+    delta = base.encode_delta("a", target)
+    bases = {"a": base}
+
+    assert decode_snapshot("b", delta, bases.__getitem__).same_as(target)
+    repeat = decode_snapshot("c", format_repeat_marker("a") + "\n", bases.__getitem__)
+    assert repeat.same_as(base) and repeat.depth == 1
+    assert decode_snapshot("d", FULL, bases.__getitem__).same_as(base)
+
+
+def test_load_delta_chain_from_files(tmp_path):
+    snapshots = [Snapshot.parse(FULL)]
+    (tmp_path / "08时00分.txt").write_text(FULL, encoding="utf-8")
+    names = ["08时00分"]
+    rng = random.Random(7)
+    pool = [f"标题{i}" for i in range(10)]
+    for minute in range(1, 5):
+        target = random_snapshot(rng, pool, ("zhihu",))
+        name = f"08时0{minute}分"
+        delta = snapshots[-1].encode_delta(names[-1], target)
+        (tmp_path / f"{name}.txt").write_text(delta, encoding="utf-8")
+        snapshots.append(target)
+        names.append(name)
+    (tmp_path / "09时00分.txt").write_text(format_repeat_marker(names[-1]) + "\n", encoding="utf-8")
+
+    loaded = load_snapshot(tmp_path / f"{names[-1]}.txt")
+    assert loaded.same_as(snapshots[-1])
+    assert loaded.depth == 4
+
+    assert read_titles(tmp_path / "09时00分.txt") == snapshots[-1].to_titles()
+    assert read_titles(tmp_path / "08时00分.txt") == snapshots[0].to_titles()
+
+
+def test_keyframe_interval(tmp_path, monkeypatch):
+    import main
+
+    monkeypatch.setitem(main.CONFIG["DELTA_SNAPSHOTS"], "KEYFRAME_INTERVAL", 3)
+    (tmp_path / "08时00分.txt").write_text(FULL, encoding="utf-8")
+
+    depths = []
+    for minute in range(1, 7):
+        snapshot = Snapshot.parse(FULL.replace("热搜二", f"热搜{minute}"))
+        file_path = tmp_path / f"08时0{minute}分.txt"
+        content = main.build_delta_snapshot(file_path, snapshot)
+        file_path.write_text(content or FULL, encoding="utf-8")
+        depths.append(snapshot.depth if content else 0)
+
+    assert depths == [1, 2, 0, 1, 2, 0]
+
+
+# === 与改版前的逐行解析结果一致 ===
+
+
+def old_parse_file_titles(file_path):
+    """改版前 main.py 的 parse_file_titles（完整快照部分，MCP 的 parse_txt_file 与之相同）"""
+    titles_by_id = {}
+    id_to_name = {}
+
+    with open(file_path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    base_name = get_repeat_base(content)
+    if base_name and base_name != file_path.stem:
+        return old_parse_file_titles(file_path.parent / f"{base_name}.txt")
+
+    for section in content.split("\n\n"):
+        if not section.strip() or "==== 以下ID请求失败 ====" in section:
+            continue
+
+        lines = section.strip().split("\n")
+        if len(lines) < 2:
+            continue
+
+        header_line = lines[0].strip()
+        if " | " in header_line:
+            parts = header_line.split(" | ", 1)
+            source_id = parts[0].strip()
+            id_to_name[source_id] = parts[1].strip()
+        else:
+            source_id = header_line
+            id_to_name[source_id] = source_id
+
+        titles_by_id[source_id] = {}
+
+        for line in lines[1:]:
+            if line.strip():
+                try:
+                    title_part = line.strip()
+                    rank = None
+
+                    if ". " in title_part and title_part.split(". ")[0].isdigit():
+                        rank_str, title_part = title_part.split(". ", 1)
+                        rank = int(rank_str)
+
+                    mobile_url = ""
+                    if " [MOBILE:" in title_part:
+                        title_part, mobile_part = title_part.rsplit(" [MOBILE:", 1)
+                        if mobile_part.endswith("]"):
+                            mobile_url = mobile_part[:-1]
+
+                    url = ""
+                    if " [URL:" in title_part:
+                        title_part, url_part = title_part.rsplit(" [URL:", 1)
+                        if url_part.endswith("]"):
+                            url = url_part[:-1]
+
+                    title = title_part.strip().replace("\n", " ").replace("\r", " ")
+                    title = re.sub(r"\s+", " ", title).strip()
+                    titles_by_id[source_id][title] = {
+                        "ranks": [rank] if rank is not None else [1],
+                        "url": url,
+                        "mobileUrl": mobile_url,
+                    }
+                except Exception:
+                    pass
+
+    return titles_by_id, id_to_name
+
+
+def ordered(result):
+    """比较时连同平台和标题的顺序一起比较"""
+    titles_by_id, id_to_name = result
+    return (
+        [(source_id, list(titles.items())) for source_id, titles in titles_by_id.items()],
+        list(id_to_name.items()),
+    )
+
+
+def assert_same_as_old(file_path):
+    expected = ordered(old_parse_file_titles(file_path))
+    assert ordered(read_titles(file_path)) == expected
+    assert ordered(main.parse_file_titles(file_path)) == expected
+    assert ordered(ParserService(str(file_path.parent)).parse_txt_file(file_path)) == expected
+
+
+FIXTURE = """\
+zhihu | 知乎
+1. 标题一 [URL:https://a/1] [MOBILE:https://m/1]
+2. 只有链接 [URL:https://a/2]
+3. 只有移动链接 [MOBILE:https://m/3]
+没有排名的标题
+4. 链接缺少右括号 [URL:https://a/4
+5. 标题. 带句点 [URL:https://a/5]
+6.没有空格
+  7.   前后   有\t空白\u3000的标题  
+8. 重复标题
+9. 重复标题 [URL:https://a/9]
+². 上标排名
+１. 全角排名
+10. 标题 [URL:中间] 后缀
+11. [URL:https://a/11]
+
+weibo
+1. 只有平台ID的标题头
+
+baidu | 百度 | 多个分隔符
+1. 标题
+
+header-only
+
+==== 以下ID请求失败 ====
+toutiao
+douyin
+
+wallstreetcn | 华尔街见闻
+1. 失败段之后的平台
+"""
+
+
+def test_read_titles_matches_old_parser(tmp_path):
+    file_path = tmp_path / "08时00分.txt"
+    file_path.write_text(FIXTURE, encoding="utf-8")
+    assert_same_as_old(file_path)
+
+    titles_by_id, id_to_name = read_titles(file_path)
+    assert list(titles_by_id) == ["zhihu", "weibo", "baidu", "wallstreetcn"]
+    assert id_to_name["weibo"] == "weibo"
+    assert id_to_name["baidu"] == "百度 | 多个分隔符"
+    zhihu = titles_by_id["zhihu"]
+    assert zhihu["标题一"] == {"ranks": [1], "url": "https://a/1", "mobileUrl": "https://m/1"}
+    assert zhihu["只有移动链接"] == {"ranks": [3], "url": "", "mobileUrl": "https://m/3"}
+    assert zhihu["没有排名的标题"]["ranks"] == [1]
+    assert zhihu["链接缺少右括号"]["url"] == ""
+    assert zhihu["重复标题"] == {"ranks": [9], "url": "https://a/9", "mobileUrl": ""}
+    assert zhihu["前后 有 空白 的标题"]["ranks"] == [7]
+    assert "上标排名" not in zhihu
+
+
+def test_repeat_marker_matches_old_parser(tmp_path):
+    (tmp_path / "08时00分.txt").write_text(FIXTURE, encoding="utf-8")
+    file_path = tmp_path / "08时30分.txt"
+    file_path.write_text(format_repeat_marker("08时00分") + "\n", encoding="utf-8")
+    assert_same_as_old(file_path)
+
+
+@pytest.mark.parametrize("content", ["", "\n\n\n", "zhihu | 知乎\n", "==== 以下ID请求失败 ====\nzhihu\n"])
+def test_empty_snapshots_match_old_parser(tmp_path, content):
+    file_path = tmp_path / "08时00分.txt"
+    file_path.write_text(content, encoding="utf-8")
+    assert_same_as_old(file_path)
+    assert read_titles(file_path) == ({}, {})
+
+
+def test_random_snapshots_match_old_parser(tmp_path):
+    pieces = [
+        "1. ", "23. ", "². ", "１. ", "3.", "标题", "Title", ". ", " ", "  ", "\t", "\u3000", "\x1c", "\xa0",
+        " [URL:", " [MOBILE:", "]", "https://a", "|", " | ", "\n", "\n", "\n", "\n\n", "\r\n",
+        "zhihu | 知乎\n", "weibo\n", "==== 以下ID请求失败 ====",
+    ]
+    rng = random.Random(19)
+    file_path = tmp_path / "08时00分.txt"
+    for _ in range(300):
+        content = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 60)))
+        file_path.write_text(content, encoding="utf-8", newline="")
+        assert_same_as_old(file_path)
@@ -0,0 +1,146 @@
+"""SQLite 快照存储测试"""
+
+import pytest
+
+from trendradar.storage import SnapshotStore, compute_snapshot_hash, date_folder_to_iso
+
+DATE = "2025-11-05"
+
+
+def make_titles(*titles, url_prefix="https://example.com/"):
+    return {
+        title: {"ranks": [rank], "url": f"{url_prefix}{rank}", "mobileUrl": ""}
+        for rank, title in enumerate(titles, 1)
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(tmp_path / "db" / "news.db")
+
+
+def test_date_folder_to_iso():
+    assert date_folder_to_iso("2025年11月05日") == "2025-11-05"
+    assert date_folder_to_iso("2025-11-05") is None
+
+
+def test_missing_database_reads_empty(store):
+    assert not store.exists()
+    assert store.list_snapshots(DATE) == []
+    assert not store.has_date(DATE)
+    assert list(store.iter_snapshots(DATE)) == []
+    assert store.load_day(DATE) == ({}, {}, {})
+    assert store.get_date_range() == (None, None)
+    assert not store.exists()
+
+
+def test_save_and_iterate_keeps_order(store):
+    titles = {"weibo": make_titles("乙", "甲"), "zhihu": make_titles("丙")}
+    names = {"weibo": "微博", "zhihu": "知乎"}
+    content_hash = store.save_snapshot(DATE, "08时00分", titles, names, ["toutiao"])
+
+    assert content_hash == compute_snapshot_hash(titles, ["toutiao"])
+    assert store.list_snapshots(DATE) == [("08时00分", content_hash)]
+    assert store.has_date(DATE)
+
+    [(time_name, loaded, loaded_names)] = store.iter_snapshots(DATE)
+    assert time_name == "08时00分"
+    assert loaded == titles
+    assert list(loaded) == ["weibo", "zhihu"]
+    assert list(loaded["weibo"]) == ["乙", "甲"]
+    assert loaded_names == names
+
+
+def test_save_replaces_same_time(store):
+    store.save_snapshot(DATE, "08时00分", {"weibo": make_titles("甲")}, {"weibo": "微博"})
+    store.save_snapshot(DATE, "08时00分", {"weibo": make_titles("乙")}, {"weibo": "微博"})
+
+    [(_, loaded, _)] = store.iter_snapshots(DATE)
+    assert list(loaded["weibo"]) == ["乙"]
+    assert len(store.list_snapshots(DATE)) == 1
+
+
+def test_empty_snapshot_is_kept(store):
+    store.save_snapshot(DATE, "08时00分", {}, {}, ["weibo"])
+    assert list(store.iter_snapshots(DATE)) == [("08时00分", {}, {})]
+
+
+def test_repeat_snapshot_copies_observations(store):
+    titles = {"weibo": make_titles("甲", "乙")}
+    store.save_snapshot(DATE, "08时00分", titles, {"weibo": "微博"})
+
+    assert store.save_repeat_snapshot(DATE, "08时30分", "08时00分")
+    assert not store.save_repeat_snapshot(DATE, "09时00分", "07时00分")
+
+    snapshots = list(store.iter_snapshots(DATE))
+    assert [time_name for time_name, _, _ in snapshots] == ["08时00分", "08时30分"]
+    assert snapshots[1][1] == titles
+    hashes = {content_hash for _, content_hash in store.list_snapshots(DATE)}
+    assert len(hashes) == 1
+
+
+def test_iter_snapshots_after_time(store):
+    for time_name in ("08时00分", "09时00分", "10时00分"):
+        store.save_snapshot(DATE, time_name, {"weibo": make_titles(time_name)}, {})
+    times = [time_name for time_name, _, _ in store.iter_snapshots(DATE, "08时00分")]
+    assert times == ["09时00分", "10时00分"]
+
+
+def test_load_day_appends_ranks_and_keeps_first_url(store):
+    store.save_snapshot(
+        DATE, "08时00分", {"weibo": make_titles("甲", "乙")}, {"weibo": "微博"}, crawled_at=1.0
+    )
+    store.save_snapshot(
+        DATE,
+        "09时00分",
+        {"weibo": make_titles("乙", "甲", url_prefix="https://other.com/"), "zhihu": make_titles("丙")},
+        {"weibo": "微博", "zhihu": "知乎"},
+        crawled_at=2.0,
+    )
+
+    all_titles, id_to_name, timestamps = store.load_day(DATE)
+    assert all_titles["weibo"]["甲"]["ranks"] == [1, 2]
+    assert all_titles["weibo"]["乙"]["ranks"] == [2, 1]
+    assert all_titles["weibo"]["甲"]["url"] == "https://example.com/1"
+    assert id_to_name == {"weibo": "微博", "zhihu": "知乎"}
+    assert timestamps == {"08时00分.txt": 1.0, "09时00分.txt": 2.0}
+
+    only_zhihu, _, _ = store.load_day(DATE, ["zhihu"])
+    assert list(only_zhihu) == ["zhihu"]
+
+
+def test_search_titles(store):
+    store.save_snapshot("2025-11-04", "08时00分", {"weibo": make_titles("OpenAI 发布")}, {})
+    store.save_snapshot(DATE, "08时00分", {"weibo": make_titles("openai 新闻", "100%_真")}, {})
+    store.save_snapshot(DATE, "09时00分", {"weibo": make_titles("openai 新闻")}, {})
+
+    results = store.search_titles("OpenAI", "2025-11-04", DATE)
+    assert [(r["date"], r["title"], r["ranks"]) for r in results] == [
+        ("2025-11-04", "OpenAI 发布", [1]),
+        (DATE, "openai 新闻", [1, 1]),
+    ]
+    # LIKE 通配符按字面匹配
+    assert [r["title"] for r in store.search_titles("%_", DATE, DATE)] == ["100%_真"]
+    assert store.search_titles("openai", DATE, DATE, ["zhihu"]) == []
+
+
+def test_stats_and_date_range(store):
+    store.save_snapshot("2025-11-04", "08时00分", {"weibo": make_titles("甲")}, {})
+    store.save_snapshot(DATE, "08时00分", {"weibo": make_titles("甲", "乙")}, {})
+
+    assert store.get_date_range() == ("2025-11-04", DATE)
+    stats = store.get_stats()
+    assert (stats["snapshots"], stats["titles"], stats["observations"]) == (2, 2, 3)
+    assert stats["size_bytes"] > 0
+
+
+def test_main_reuses_store_per_path(tmp_path, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "SNAPSHOT_STORES", {})
+    monkeypatch.setitem(main.CONFIG["SQLITE_STORE"], "PATH", str(tmp_path / "a.db"))
+    first = main.open_snapshot_store()
+    assert main.open_snapshot_store() is first
+
+    monkeypatch.setitem(main.CONFIG["SQLITE_STORE"], "PATH", str(tmp_path / "b.db"))
+    assert main.open_snapshot_store() is not first
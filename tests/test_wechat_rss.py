@@ -0,0 +1,48 @@
+"""wechat_rss 工具函数测试"""
+
+from wechat_rss.utils import filter_by_keywords, load_frequency_words
+
+
+RULES = """\
+# 注释
+AI
++发布
+!广告
+
+"GPT*"
+/苹果.{0,4}发布会/
+-传闻
+Sora
+
+\\-减肥
++\\"AI"
+@weibo
+"""
+
+
+def test_load_frequency_words_returns_literal_keywords(tmp_path):
+    rules = tmp_path / "frequency_words.txt"
+    rules.write_text(RULES, encoding="utf-8")
+
+    # 只返回可直接按子串匹配的文字，不含过滤词、排除词、平台限定和整词/正则写法
+    assert load_frequency_words(str(rules)) == ["发布", "AI", "Sora", '"AI"', "-减肥"]
+
+
+def test_loaded_keywords_filter_by_substring(tmp_path):
+    rules = tmp_path / "frequency_words.txt"
+    rules.write_text(RULES, encoding="utf-8")
+    keywords = load_frequency_words(str(rules))
+
+    articles = [
+        {"title": "OpenAI 发布 Sora"},
+        {"title": "GPTs 商店上线"},
+        {"title": "苹果秋季发布会"},
+        {"title": "夏季-减肥指南"},
+        {"title": "今天天气不错"},
+    ]
+    titles = [article["title"] for article in filter_by_keywords(articles, keywords)]
+    assert titles == ["OpenAI 发布 Sora", "苹果秋季发布会", "夏季-减肥指南"]
+
+
+def test_missing_file(tmp_path):
+    assert load_frequency_words(str(tmp_path / "missing.txt")) == []
@@ -0,0 +1,157 @@
+"""新闻权重计算与排序测试"""
+
+import random
+
+import pytest
+
+from trendradar import weights
+from trendradar.weights import NUMPY_MIN_ITEMS, WeightScorer
+
+requires_numpy = pytest.mark.skipif(weights.np is None, reason="需要 NumPy")
+
+WEIGHT_CONFIG = {"RANK_WEIGHT": 0.6, "FREQUENCY_WEIGHT": 0.3, "HOTNESS_WEIGHT": 0.1}
+
+
+def baseline_weight(title_data, rank_threshold, weight_config=WEIGHT_CONFIG):
+    """改版前 main.py 的 calculate_news_weight"""
+    ranks = title_data.get("ranks", [])
+    if not ranks:
+        return 0.0
+
+    count = title_data.get("count", len(ranks))
+
+    rank_scores = []
+    for rank in ranks:
+        score = 11 - min(rank, 10)
+        rank_scores.append(score)
+
+    rank_weight = sum(rank_scores) / len(ranks) if ranks else 0
+    frequency_weight = min(count, 10) * 10
+    high_rank_count = sum(1 for rank in ranks if rank <= rank_threshold)
+    hotness_ratio = high_rank_count / len(ranks) if ranks else 0
+    hotness_weight = hotness_ratio * 100
+
+    return (
+        rank_weight * weight_config["RANK_WEIGHT"]
+        + frequency_weight * weight_config["FREQUENCY_WEIGHT"]
+        + hotness_weight * weight_config["HOTNESS_WEIGHT"]
+    )
+
+
+def baseline_sort(items, rank_threshold, top_k=None):
+    """改版前报告中的排序：权重、最高排名、出现次数，取前 K 条"""
+    ordered = sorted(
+        items,
+        key=lambda x: (
+            -baseline_weight(x, rank_threshold),
+            min(x["ranks"]) if x["ranks"] else 999,
+            -x["count"],
+        ),
+    )
+    return ordered if top_k is None else ordered[:top_k]
+
+
+def random_items(rng, count):
+    # 排名和次数取值范围很小，制造大量权重相同、排名和次数也相同的新闻
+    templates = [
+        {"ranks": [rng.randint(1, 15) for _ in range(rng.randint(0, 4))], "count": rng.randint(1, 12)}
+        for _ in range(max(1, count // 4))
+    ]
+    items = []
+    for index in range(count):
+        template = rng.choice(templates) if rng.random() < 0.5 else {
+            "ranks": [rng.randint(1, 30) for _ in range(rng.randint(0, 6))],
+            "count": rng.randint(1, 15),
+        }
+        items.append({"ranks": list(template["ranks"]), "count": template["count"], "index": index})
+    return items
+
+
+def indices(items):
+    return [item["index"] for item in items]
+
+
+@pytest.fixture
+def no_numpy(monkeypatch):
+    monkeypatch.setattr(weights, "np", None)
+
+
+SIZES = [1, 10, NUMPY_MIN_ITEMS - 1, NUMPY_MIN_ITEMS, 200, 1000]
+
+
+def sort_cases():
+    rng = random.Random(17)
+    for size in SIZES:
+        for _ in range(3):
+            items = random_items(rng, size)
+            for top_k in (None, 1, 5, size // 2, size, size + 5):
+                yield items, top_k, rng.choice([3, 5, 10])
+
+
+def test_score_matches_baseline(no_numpy):
+    rng = random.Random(1)
+    for rank_threshold in (1, 5, 10):
+        scorer = WeightScorer.from_config(WEIGHT_CONFIG, rank_threshold)
+        items = random_items(rng, 300) + [{"ranks": [3, 7]}, {"ranks": []}, {}]
+        expected = [baseline_weight(item, rank_threshold) for item in items]
+        assert [scorer.score(item) for item in items] == expected
+        assert scorer.score_many(items) == expected
+
+
+def test_scalar_sort_matches_baseline(no_numpy):
+    for items, top_k, rank_threshold in sort_cases():
+        scorer = WeightScorer.from_config(WEIGHT_CONFIG, rank_threshold)
+        assert indices(scorer.sort(items, top_k)) == indices(baseline_sort(items, rank_threshold, top_k))
+
+
+@requires_numpy
+def test_numpy_scores_equal_scalar_scores():
+    rng = random.Random(2)
+    for rank_threshold in (1, 5, 10):
+        scorer = WeightScorer.from_config(WEIGHT_CONFIG, rank_threshold)
+        for size in (NUMPY_MIN_ITEMS, 500):
+            items = random_items(rng, size)
+            items[0] = {"ranks": [], "count": 1, "index": 0}
+            expected = [baseline_weight(item, rank_threshold) for item in items]
+            # 按位相等，不只是近似相等
+            assert scorer._score_array(items).tolist() == expected
+            assert scorer.score_many(items) == expected
+
+    empty = [{"ranks": [], "count": 1}] * NUMPY_MIN_ITEMS
+    assert WeightScorer().score_many(empty) == [0.0] * NUMPY_MIN_ITEMS
+
+
+@requires_numpy
+def test_numpy_sort_matches_scalar_and_baseline(monkeypatch):
+    for items, top_k, rank_threshold in sort_cases():
+        scorer = WeightScorer.from_config(WEIGHT_CONFIG, rank_threshold)
+        numpy_result = indices(scorer.sort(items, top_k))
+        with monkeypatch.context() as patch:
+            patch.setattr(weights, "np", None)
+            scalar_result = indices(scorer.sort(items, top_k))
+        assert numpy_result == scalar_result
+        assert numpy_result == indices(baseline_sort(items, rank_threshold, top_k))
+
+
+@requires_numpy
+def test_numpy_sort_without_tie_breaking_is_stable(monkeypatch):
+    rng = random.Random(3)
+    scorer = WeightScorer()
+    for size in (NUMPY_MIN_ITEMS, 300):
+        items = random_items(rng, size)
+        expected = sorted(items, key=lambda item: -baseline_weight(item, 5))
+        for top_k in (None, 1, 7, size):
+            numpy_result = indices(scorer.sort(items, top_k, break_ties=False))
+            with monkeypatch.context() as patch:
+                patch.setattr(weights, "np", None)
+                scalar_result = indices(scorer.sort(items, top_k, break_ties=False))
+            assert numpy_result == scalar_result
+            assert numpy_result == indices(expected if top_k is None else expected[:top_k])
+
+
+def test_sort_edge_cases():
+    scorer = WeightScorer()
+    items = [{"ranks": [1], "count": 1, "index": 0}]
+    assert scorer.sort([], 5) == []
+    assert scorer.sort(items, 0) == []
+    assert scorer.sort(items, -1) == []
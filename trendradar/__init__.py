@@ -0,0 +1,5 @@
+"""
+TrendRadar 公共模块
+
+main.py 爬虫和 MCP Server 共用的数据存储与解析组件。
+"""
@@ -0,0 +1,193 @@
+"""
+日期文件夹归档
+
+已结束的日期文件夹 output/YYYY年MM月DD日/ 打包为 output/archive/YYYY年MM月DD日.tar.xz，
+一天只占一个文件。归档内依次是 index.json（文件列表、大小和修改时间）、txt 快照和 html 报告，
+读取快照时流式解压到 txt 部分结束即可，不需要解压整个归档，也不会写入磁盘。
+"""
+
+import io
+import json
+import shutil
+import tarfile
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .snapshot import Snapshot, decode_snapshot
+from .storage import date_folder_to_iso
+
+ARCHIVE_DIR_NAME = "archive"
+ARCHIVE_SUFFIX = ".tar.xz"
+INDEX_MEMBER = "index.json"
+INDEX_VERSION = 1
+
+
+def get_archive_path(output_dir: Path, date_folder: str) -> Path:
+    """日期文件夹对应的归档路径"""
+    return Path(output_dir) / ARCHIVE_DIR_NAME / f"{date_folder}{ARCHIVE_SUFFIX}"
+
+
+def list_archives(output_dir: Path) -> List["DayArchive"]:
+    """列出 output 目录下的全部日期归档，按日期排序"""
+    archive_dir = Path(output_dir) / ARCHIVE_DIR_NAME
+    if not archive_dir.exists():
+        return []
+    archives = [
+        DayArchive(path)
+        for path in archive_dir.glob(f"*{ARCHIVE_SUFFIX}")
+        if date_folder_to_iso(path.name[: -len(ARCHIVE_SUFFIX)])
+    ]
+    return sorted(archives, key=lambda archive: archive.date_folder)
+
+
+def _member_order(relative_path: str) -> Tuple[int, str]:
+    # txt 快照排在 html 报告之前，读取快照时不需要解压报告
+    return (0 if relative_path.startswith("txt/") else 1, relative_path)
+
+
+def archive_date_folder(date_dir: Path, remove_source: bool = True) -> Dict:
+    """
+    把日期文件夹打包为归档
+
+    归档先写入临时文件，逐个文件比对内容后才替换为正式归档并删除原文件夹。
+
+    Args:
+        date_dir: 日期文件夹，如 output/2025年11月04日
+        remove_source: 校验通过后是否删除原文件夹
+
+    Returns:
+        归档索引
+
+    Raises:
+        FileExistsError: 该日期已有归档
+        ValueError: 归档内容校验失败
+    """
+    date_dir = Path(date_dir)
+    archive_path = get_archive_path(date_dir.parent, date_dir.name)
+    if archive_path.exists():
+        raise FileExistsError(f"{archive_path} 已存在")
+
+    files = sorted(
+        (path for path in date_dir.rglob("*") if path.is_file()),
+        key=lambda path: _member_order(path.relative_to(date_dir).as_posix()),
+    )
+    file_entries = {}
+    for path in files:
+        stat = path.stat()
+        file_entries[path.relative_to(date_dir).as_posix()] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+        }
+    index = {
+        "version": INDEX_VERSION,
+        "date_folder": date_dir.name,
+        "archived_at": time.time(),
+        "original_bytes": sum(entry["size"] for entry in file_entries.values()),
+        "files": file_entries,
+    }
+    index_bytes = json.dumps(index, ensure_ascii=False, indent=2).encode("utf-8")
+
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = archive_path.with_name(archive_path.name + ".tmp")
+    try:
+        with tarfile.open(tmp_path, "w:xz") as tar:
+            info = tarfile.TarInfo(INDEX_MEMBER)
+            info.size = len(index_bytes)
+            info.mtime = int(index["archived_at"])
+            tar.addfile(info, io.BytesIO(index_bytes))
+            for path in files:
+                tar.add(path, arcname=path.relative_to(date_dir).as_posix(), recursive=False)
+
+        archived = dict(DayArchive(tmp_path).iter_files())
+        for path in files:
+            relative_path = path.relative_to(date_dir).as_posix()
+            if archived.get(relative_path) != path.read_bytes():
+                raise ValueError(f"归档校验失败: {relative_path}")
+
+        tmp_path.replace(archive_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    if remove_source:
+        shutil.rmtree(date_dir)
+    return index
+
+
+class DayArchive:
+    """单个日期的归档，按需流式读取"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.date_folder = self.path.name[: -len(ARCHIVE_SUFFIX)]
+        self._index = None
+
+    @property
+    def index(self) -> Dict:
+        """归档索引（只解压第一个成员）"""
+        if self._index is None:
+            with tarfile.open(self.path, "r|xz") as tar:
+                member = tar.next()
+                if member is None or member.name != INDEX_MEMBER:
+                    raise ValueError(f"{self.path} 缺少 {INDEX_MEMBER}")
+                self._index = json.loads(tar.extractfile(member).read().decode("utf-8"))
+        return self._index
+
+    @property
+    def size(self) -> int:
+        return self.path.stat().st_size
+
+    def list_files(self, subfolder: str) -> List[str]:
+        """列出子目录（txt / html）下的文件名"""
+        prefix = f"{subfolder}/"
+        return sorted(
+            name[len(prefix) :] for name in self.index["files"] if name.startswith(prefix)
+        )
+
+    def get_mtime(self, relative_path: str) -> Optional[float]:
+        """归档前文件的修改时间"""
+        entry = self.index["files"].get(relative_path)
+        return entry["mtime"] if entry else None
+
+    def iter_files(self, subfolder: Optional[str] = None) -> Iterator[Tuple[str, bytes]]:
+        """
+        按归档顺序读取文件内容
+
+        Args:
+            subfolder: 只读取该子目录（txt / html），读完即停止解压
+
+        Yields:
+            (相对路径, 文件内容)
+        """
+        prefix = f"{subfolder}/" if subfolder else ""
+        started = False
+        with tarfile.open(self.path, "r|xz") as tar:
+            for member in tar:
+                if not member.isfile() or member.name == INDEX_MEMBER:
+                    continue
+                if not member.name.startswith(prefix):
+                    if started:
+                        break
+                    continue
+                started = True
+                yield member.name, tar.extractfile(member).read()
+
+    def iter_snapshots(self) -> Iterator[Tuple[str, Snapshot]]:
+        """
+        按时间顺序还原归档中的 txt 快照
+
+        Yields:
+            (文件名, 快照)，增量快照和"与快照相同"标记已还原为完整快照
+        """
+        decoded = {}
+        for relative_path, data in self.iter_files("txt"):
+            name = relative_path[len("txt/") :]
+            stem = name[: -len(".txt")]
+            try:
+                snapshot = decode_snapshot(stem, data.decode("utf-8"), decoded.__getitem__)
+            except Exception as e:
+                print(f"Warning: 还原归档快照 {self.date_folder}/{name} 失败: {e}")
+                continue
+            decoded[stem] = snapshot
+            yield name, snapshot
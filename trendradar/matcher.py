@@ -0,0 +1,445 @@
+"""
+频率词匹配
+
+把词组规则中的全部词项编译为一个匹配计划：普通词、词边界词的文字部分和正则表达式中必须出现的
+文字片段都放进同一个 Aho-Corasick 自动机，扫描一遍标题即可得到全部命中的词项，
+再只检查被命中词项触发的词组。匹配耗时只与标题长度和命中数有关，不随词组数量线性增长。
+
+词项写法（不区分大小写）：
+
+- ``词``：标题包含该词即命中，与 ``word.lower() in title.lower()`` 相同
+- ``"word"``：整词匹配，前后不能紧跟拉丁字母或数字（``"AI"`` 命中 "AI绘画"，不命中 "PAIN"）
+- ``"word*"``：词首匹配，前面不能紧跟拉丁字母或数字（``"GPT*"`` 命中 "GPTs"，不命中 "ChatGPT"）
+- ``/正则/``：正则表达式，包含固定文字片段时只在该片段出现后才执行正则
+- ``\\词``：反斜杠转义，其后的内容一律按普通词匹配（``\\"AI"`` 匹配带引号的 "AI"）
+
+``CombinedMatcher`` 把多套规则编译为一个自动机，``SharedMatches`` 缓存每个标题对各套规则的匹配结果。
+"""
+
+import re
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    from re import _parser as _sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse as _sre_parse
+
+_LITERAL = 0
+_WHOLE_WORD = 1
+_WORD_PREFIX = 2
+_REGEX_PREFILTER = 3
+
+
+def _is_latin_word_char(char: str) -> bool:
+    # ASCII 字母数字和拉丁扩展字母，中文等其他文字视为词边界
+    return (char.isascii() and (char.isalnum() or char == "_")) or "\u00c0" <= char <= "\u024f"
+
+
+def _required_literal(pattern: str) -> str:
+    """正则表达式中必定出现的最长连续文字（只分析顶层序列，找不到时返回空字符串）"""
+    try:
+        parsed = _sre_parse.parse(pattern, re.IGNORECASE)
+    except re.error:
+        return ""
+
+    best = ""
+    current = ""
+    for op, value in parsed:
+        if op == _sre_parse.LITERAL:
+            current += chr(value)
+            continue
+        if len(current) > len(best):
+            best = current
+        current = ""
+    if len(current) > len(best):
+        best = current
+    return best.lower()
+
+
+def parse_term(term: str) -> Tuple[int, str]:
+    """
+    识别词项写法
+
+    Args:
+        term: 配置文件中的词项（已去掉 + ! - 前缀）
+
+    Returns:
+        (类型, 内容)，类型为 _LITERAL / _WHOLE_WORD / _WORD_PREFIX / _REGEX_PREFILTER
+    """
+    if len(term) >= 2 and term.startswith("\\"):
+        return _LITERAL, term[1:].lower()
+    if len(term) >= 3 and term.startswith("/") and term.endswith("/"):
+        return _REGEX_PREFILTER, term[1:-1]
+    if len(term) >= 3 and term.startswith('"') and term.endswith('"'):
+        inner = term[1:-1]
+        if len(inner) > 1 and inner.endswith("*"):
+            return _WORD_PREFIX, inner[:-1].lower()
+        return _WHOLE_WORD, inner.lower()
+    return _LITERAL, term.lower()
+
+
+def compile_term(term: str) -> Optional["re.Pattern"]:
+    """
+    把单个词项编译为正则，用于逐词判断
+
+    Args:
+        term: 配置文件中的词项（已去掉 + ! - 前缀）
+
+    Returns:
+        整词、词首和正则写法返回不区分大小写的正则，转义的词项返回按原文匹配的正则，
+        普通词返回 None（由调用方直接判断子串）
+
+    Raises:
+        ValueError: 正则表达式无效
+    """
+    kind, text = parse_term(term)
+    if kind == _LITERAL:
+        return re.compile(re.escape(term[1:])) if term.startswith("\\") and len(term) >= 2 else None
+    if kind == _REGEX_PREFILTER:
+        try:
+            return re.compile(text, re.IGNORECASE)
+        except re.error as e:
+            raise ValueError(f"频率词正则表达式无效 {term}: {e}")
+
+    boundary = r"0-9A-Za-z_\u00c0-\u024f"
+    pattern = f"(?<![{boundary}]){re.escape(text)}"
+    if kind == _WHOLE_WORD:
+        pattern += f"(?![{boundary}])"
+    return re.compile(pattern, re.IGNORECASE)
+
+
+class WordGroupMatcher:
+    """词组规则编译后的匹配计划"""
+
+    def __init__(self, word_groups: List[Dict], filter_words: List[str]):
+        """
+        编译词组规则
+
+        Args:
+            word_groups: 词组列表，每组包含 required（必须词）、normal（普通词），
+                可选 exclude（本组排除词）和 platforms（本组只匹配这些平台）
+            filter_words: 全局过滤词列表
+
+        Raises:
+            ValueError: 正则表达式无效
+        """
+        self.word_groups = word_groups
+        self.filter_words = filter_words
+        self._init_plan()
+        self._add_groups(word_groups)
+        self._filters_by_term = self._add_filter_words(filter_words)
+        self._build_failure_links()
+
+    def _init_plan(self) -> None:
+        self._term_ids: Dict[Tuple[int, str], int] = {}
+        self._regexes: Dict[int, "re.Pattern"] = {}
+        # 没有固定文字片段的正则，每个标题都要执行
+        self._unfiltered_regexes: List[int] = []
+        self._always_hits: Set[int] = set()
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[Tuple[int, int, int], ...]] = [()]
+
+        self._group_required: List[Set[int]] = []
+        self._group_normal: List[Set[int]] = []
+        self._group_exclude: List[Set[int]] = []
+        self._group_platforms: List[Optional[frozenset]] = []
+        self._group_keywords: List[List[Tuple[str, int]]] = []
+        # 每个词组至少要命中其中一个词项才可能匹配：有普通词时为普通词，否则为必须词
+        self._groups_by_term: Dict[int, List[int]] = {}
+        # 没有任何词的词组（如"全部新闻"）匹配所有标题
+        self._always_groups: List[int] = []
+
+    def _add_groups(self, word_groups: List[Dict]) -> None:
+        for group in word_groups:
+            group_index = len(self._group_required)
+            required_words = group.get("required", [])
+            normal_words = group.get("normal", [])
+            required = {self._add_term(word) for word in required_words}
+            normal = {self._add_term(word) for word in normal_words}
+            self._group_required.append(required)
+            self._group_normal.append(normal)
+            self._group_exclude.append({self._add_term(word) for word in group.get("exclude", [])})
+            platforms = group.get("platforms")
+            self._group_platforms.append(frozenset(platforms) if platforms else None)
+            self._group_keywords.append(
+                [(word, self._add_term(word)) for word in required_words + normal_words]
+            )
+
+            trigger_terms = normal or required
+            if not trigger_terms:
+                self._always_groups.append(group_index)
+            for term_id in trigger_terms:
+                self._groups_by_term.setdefault(term_id, []).append(group_index)
+
+    def _add_filter_words(self, filter_words: List[str]) -> Dict[int, List[str]]:
+        filters_by_term: Dict[int, List[str]] = {}
+        for word in filter_words:
+            filters_by_term.setdefault(self._add_term(word), []).append(word)
+        return filters_by_term
+
+    def _add_term(self, term: str) -> int:
+        kind, text = parse_term(term)
+        key = (kind, text)
+        term_id = self._term_ids.get(key)
+        if term_id is not None:
+            return term_id
+
+        term_id = len(self._term_ids)
+        self._term_ids[key] = term_id
+
+        if kind == _REGEX_PREFILTER:
+            try:
+                self._regexes[term_id] = re.compile(text, re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"频率词正则表达式无效 {term}: {e}")
+            text = _required_literal(text)
+            if not text:
+                self._unfiltered_regexes.append(term_id)
+                return term_id
+        elif not text:
+            # 空字符串是任何标题的子串
+            self._always_hits.add(term_id)
+            return term_id
+
+        state = 0
+        for char in text:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state] += ((kind, term_id, len(text)),)
+        return term_id
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                # 合并后缀模式的输出，匹配时无需沿失败链回溯
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def _scan(self, text: str) -> Set[int]:
+        """扫描一遍文本，返回命中的词项"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        hits = set(self._always_hits)
+        regex_candidates = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            for kind, term_id, length in output[state]:
+                if kind == _LITERAL:
+                    hits.add(term_id)
+                elif kind == _REGEX_PREFILTER:
+                    regex_candidates.append(term_id)
+                elif term_id not in hits:
+                    start = index - length + 1
+                    if start > 0 and _is_latin_word_char(text[start - 1]):
+                        continue
+                    if (
+                        kind == _WHOLE_WORD
+                        and index + 1 < len(text)
+                        and _is_latin_word_char(text[index + 1])
+                    ):
+                        continue
+                    hits.add(term_id)
+
+        for term_id in regex_candidates + self._unfiltered_regexes:
+            if term_id not in hits and self._regexes[term_id].search(text):
+                hits.add(term_id)
+        return hits
+
+    def _group_matches(self, group_index: int, hits: Set[int], platform_id: Optional[str]) -> bool:
+        platforms = self._group_platforms[group_index]
+        if platforms is not None and platform_id not in platforms:
+            return False
+        normal = self._group_normal[group_index]
+        return (
+            self._group_required[group_index] <= hits
+            and (not normal or not normal.isdisjoint(hits))
+            and self._group_exclude[group_index].isdisjoint(hits)
+        )
+
+    def _evaluate(
+        self, title: str, platform_id: Optional[str], first_only: bool
+    ) -> Tuple[List[int], List[str], Set[int]]:
+        hits = self._scan(title.lower())
+
+        filter_hits = []
+        candidates = set(self._always_groups)
+        for term_id in hits:
+            candidates.update(self._groups_by_term.get(term_id, ()))
+            filter_hits.extend(self._filters_by_term.get(term_id, ()))
+
+        matched = []
+        for group_index in sorted(candidates):
+            if self._group_matches(group_index, hits, platform_id):
+                matched.append(group_index)
+                if first_only:
+                    break
+        return matched, filter_hits, hits
+
+    def match(
+        self, title: str, platform_id: Optional[str] = None
+    ) -> Tuple[Optional[int], List[str]]:
+        """
+        匹配标题
+
+        Args:
+            title: 标题
+            platform_id: 标题所属平台，限定了平台的词组只匹配这些平台的标题
+
+        Returns:
+            (第一个匹配的词组下标, 命中的全局过滤词)，没有匹配的词组时下标为 None
+        """
+        matched, filter_hits, _ = self._evaluate(title, platform_id, first_only=True)
+        return (matched[0] if matched else None), filter_hits
+
+    def match_keywords(self, title: str, platform_id: Optional[str] = None) -> List[str]:
+        """
+        标题命中的关键词
+
+        Args:
+            title: 标题
+            platform_id: 标题所属平台
+
+        Returns:
+            所有匹配词组中命中的必须词和普通词（按配置中的写法），命中全局过滤词时为空
+        """
+        matched, filter_hits, hits = self._evaluate(title, platform_id, first_only=False)
+        if filter_hits:
+            return []
+
+        keywords = []
+        for group_index in matched:
+            for word, term_id in self._group_keywords[group_index]:
+                if term_id in hits and word not in keywords:
+                    keywords.append(word)
+        return keywords
+
+
+class CombinedMatcher(WordGroupMatcher):
+    """多套词组规则合并编译的匹配计划
+
+    各套规则（如 main.py 的多个订阅）的词组和过滤词放进同一个自动机，扫描一遍标题即可得到
+    每套规则的匹配结果，与分别用每套规则的 WordGroupMatcher 匹配相同。
+    """
+
+    def __init__(self, rule_sets: List[Tuple[List[Dict], List[str]]]):
+        """
+        编译多套词组规则
+
+        Args:
+            rule_sets: [(词组列表, 过滤词列表)]，过滤词只作用于同一套规则
+
+        Raises:
+            ValueError: 正则表达式无效
+        """
+        self.rule_sets = rule_sets
+        self.word_groups = [group for word_groups, _ in rule_sets for group in word_groups]
+        self.filter_words = []
+        self._init_plan()
+        self._filters_by_term = {}
+
+        # 每套规则的词组在合并后的下标范围
+        self._set_ranges: List[Tuple[int, int]] = []
+        self._set_filters: List[Dict[int, List[str]]] = []
+        for word_groups, filter_words in rule_sets:
+            start = len(self._group_required)
+            self._add_groups(word_groups)
+            self._set_ranges.append((start, len(self._group_required)))
+            self._set_filters.append(self._add_filter_words(filter_words))
+        self._build_failure_links()
+
+    def match_each(
+        self, title: str, platform_id: Optional[str] = None
+    ) -> List[Tuple[Optional[int], List[str]]]:
+        """
+        用每套规则匹配标题
+
+        Args:
+            title: 标题
+            platform_id: 标题所属平台
+
+        Returns:
+            按 rule_sets 顺序的 [(第一个匹配的词组在该套规则中的下标, 命中的该套过滤词)]，
+            与 WordGroupMatcher.match 的返回值相同
+        """
+        hits = self._scan(title.lower())
+
+        candidates = set(self._always_groups)
+        for term_id in hits:
+            candidates.update(self._groups_by_term.get(term_id, ()))
+        ordered = sorted(candidates)
+
+        results = []
+        for (start, end), filters_by_term in zip(self._set_ranges, self._set_filters):
+            group_index = None
+            for index in ordered:
+                if index >= end:
+                    break
+                if index >= start and self._group_matches(index, hits, platform_id):
+                    group_index = index - start
+                    break
+
+            filter_hits = []
+            for term_id in hits:
+                filter_hits.extend(filters_by_term.get(term_id, ()))
+            results.append((group_index, filter_hits))
+        return results
+
+
+class SharedMatches:
+    """CombinedMatcher 的匹配结果缓存，同一标题在各套规则、各阶段只扫描一次
+
+    缓存随调用方（如一次运行）释放，不随匹配计划长期保留。
+    """
+
+    def __init__(self, matcher: CombinedMatcher):
+        self.matcher = matcher
+        self._results: Dict[Tuple[str, Optional[str]], List[Tuple[Optional[int], List[str]]]] = {}
+
+    def get(self, title: str, platform_id: Optional[str] = None) -> List[Tuple[Optional[int], List[str]]]:
+        key = (title, platform_id)
+        results = self._results.get(key)
+        if results is None:
+            results = self._results[key] = self.matcher.match_each(title, platform_id)
+        return results
+
+    def for_rule_set(self, index: int) -> "RuleSetMatcher":
+        """第 index 套规则的匹配器"""
+        return RuleSetMatcher(self, index)
+
+
+class RuleSetMatcher:
+    """SharedMatches 中一套规则的视图，match 与该套规则的 WordGroupMatcher.match 相同"""
+
+    __slots__ = ("shared", "index", "word_groups", "filter_words")
+
+    def __init__(self, shared: SharedMatches, index: int):
+        self.shared = shared
+        self.index = index
+        self.word_groups, self.filter_words = shared.matcher.rule_sets[index]
+
+    def match(
+        self, title: str, platform_id: Optional[str] = None
+    ) -> Tuple[Optional[int], List[str]]:
+        group_index, filter_hits = self.shared.get(title, platform_id)[self.index]
+        return group_index, list(filter_hits)
@@ -0,0 +1,325 @@
+"""
+快照文件并行解析
+
+当天第一次运行、汇总报告和 MCP 按周/按月查询时需要冷启动解析几十到上百个 txt 快照。
+``parse_snapshot_groups`` 把每组（通常是一天）按时间排序的快照文件切成连续的若干段，
+在进程池中分别解析并聚合为 ``SnapshotPartial``，再按时间顺序合并各段的结果。
+
+合并满足结合律：无论如何切分，结果都与逐个文件顺序处理相同。两种合并方式：
+
+- ``MERGE_DAY``：与 main.py 的 process_source_data 相同，排名去重，链接取第一个非空值，
+  记录首次/最后出现时间和次数，同时按平台跟踪最新一批标题和更早出现过的标题（用于检测新增标题）
+- ``MERGE_RANKS``：与 MCP Server 的 read_all_titles_for_date 相同，按出现顺序保留全部排名，
+  链接取第一次出现时的值，不记录时间
+
+文件数较少、只有一个 CPU 或无法创建进程池时，在当前进程中顺序解析。
+
+进程池使用 spawn 方式启动子进程（MCP Server 和常驻调度是多线程的，fork 可能复制被其他线程
+持有的锁），每个进程只创建一次并在之后的冷启动解析中复用，进程退出时关闭。
+"""
+
+import atexit
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Collection, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from .records import TitleRecord
+from .snapshot import read_titles
+
+MERGE_DAY = "day"
+MERGE_RANKS = "ranks"
+
+# 少于该文件数时顺序解析（spawn 启动进程和结果传回的开销大于并行收益；一天约 48 份快照，
+# 单日读取不会启动进程池）
+DEFAULT_MIN_FILES = 120
+# 每段至少包含的文件数，增量快照在段内可复用上一份的还原结果
+MIN_CHUNK_FILES = 4
+# 每个进程平均分到的段数，段数多于进程数时各进程负载更均衡
+CHUNKS_PER_WORKER = 4
+
+
+class SnapshotPartial:
+    """一段连续快照的聚合结果"""
+
+    __slots__ = (
+        "mode",
+        "titles",
+        "id_to_name",
+        "files",
+        "errors",
+        "latest",
+        "historical",
+        "last_ids",
+    )
+
+    def __init__(self, mode: str = MERGE_DAY):
+        self.mode = mode
+        # {source_id: {title: TitleRecord}}
+        self.titles: Dict[str, Dict[str, TitleRecord]] = {}
+        self.id_to_name: Dict[str, str] = {}
+        # 成功解析的文件名（按时间顺序）
+        self.files: List[str] = []
+        # 解析失败的文件 [(文件名, 错误信息)]
+        self.errors: List[Tuple[str, str]] = []
+        # MERGE_DAY：各平台最近一份包含该平台的快照 {source_id: {title: {ranks, url, mobileUrl}}}
+        # （快照可能只包含部分平台）
+        self.latest: Dict[str, Dict] = {}
+        # MERGE_DAY：各平台最新一批之前出现过的 {source_id: {title}}
+        self.historical: Dict[str, set] = {}
+        # 最后一份快照包含的平台（按文件中的顺序）
+        self.last_ids: List[str] = []
+
+    def add_snapshot(self, file_name: str, titles_by_id: Dict, id_to_name: Dict) -> None:
+        """按时间顺序并入一份快照"""
+        self.id_to_name.update(id_to_name)
+        time_info = Path(file_name).stem
+
+        if self.mode == MERGE_DAY:
+            for source_id, titles in titles_by_id.items():
+                # 先移除再写入：latest 按各平台最近一次出现的顺序排列，与逐个快照处理相同
+                previous = self.latest.pop(source_id, None)
+                if previous is not None:
+                    self.historical.setdefault(source_id, set()).update(previous)
+                self.latest[source_id] = titles
+
+        for source_id, titles in titles_by_id.items():
+            source_records = self.titles.setdefault(source_id, {})
+            for title, info in titles.items():
+                record = source_records.get(title)
+                if self.mode == MERGE_DAY:
+                    ranks = info.get("ranks", [])
+                    url = info.get("url", "")
+                    mobile_url = info.get("mobileUrl", "")
+                    if record is None:
+                        source_records[title] = TitleRecord(
+                            ranks, url, mobile_url, time_info, time_info, 1
+                        )
+                    else:
+                        record.merge(ranks, url, mobile_url, time_info)
+                elif record is None:
+                    source_records[title] = TitleRecord.from_info(info)
+                else:
+                    record.extend_ranks(info["ranks"])
+
+        self.last_ids = list(titles_by_id)
+        self.files.append(file_name)
+
+    def merge(self, later: "SnapshotPartial") -> "SnapshotPartial":
+        """
+        在当前结果之后并入紧随其后的一段（原地修改并返回自身）
+
+        Args:
+            later: 时间上紧接当前段的聚合结果，其记录可能被并入当前结果
+
+        Returns:
+            合并后的结果
+        """
+        self.errors.extend(later.errors)
+        if not later.files:
+            return self
+
+        self.id_to_name.update(later.id_to_name)
+
+        if self.mode == MERGE_DAY:
+            # 后一段包含的平台，其最新一批来自后一段，当前段的最新一批转入历史
+            for source_id, titles in later.latest.items():
+                previous = self.latest.pop(source_id, None)
+                if previous is not None:
+                    self.historical.setdefault(source_id, set()).update(previous)
+                self.latest[source_id] = titles
+            for source_id, titles in later.historical.items():
+                self.historical.setdefault(source_id, set()).update(titles)
+
+        for source_id, records in later.titles.items():
+            source_records = self.titles.setdefault(source_id, {})
+            for title, record in records.items():
+                existing = source_records.get(title)
+                if existing is None:
+                    source_records[title] = record
+                elif self.mode == MERGE_DAY:
+                    existing.absorb(record)
+                else:
+                    existing.extend_ranks(record.rank_array)
+
+        self.last_ids = later.last_ids
+        self.files.extend(later.files)
+        return self
+
+
+def _parse_chunk(
+    files: Sequence[Path],
+    mode: str,
+    platform_ids: Optional[Collection[str]],
+    skip_errors: bool,
+) -> SnapshotPartial:
+    partial = SnapshotPartial(mode)
+    for file_path in files:
+        try:
+            titles_by_id, id_to_name = read_titles(file_path)
+        except Exception as e:
+            if not skip_errors:
+                raise
+            partial.errors.append((file_path.name, str(e)))
+            continue
+
+        if platform_ids is not None:
+            titles_by_id = {
+                source_id: titles
+                for source_id, titles in titles_by_id.items()
+                if source_id in platform_ids
+            }
+        partial.add_snapshot(file_path.name, titles_by_id, id_to_name)
+    return partial
+
+
+def _split(files: Sequence[Path], chunk_size: int) -> List[Sequence[Path]]:
+    return [files[start : start + chunk_size] for start in range(0, len(files), chunk_size)]
+
+
+def resolve_workers(workers: Optional[int] = None) -> int:
+    """进程数，0 或 None 表示使用全部 CPU"""
+    if workers and workers > 0:
+        return workers
+    return os.cpu_count() or 1
+
+
+def parse_snapshot_groups(
+    groups: Dict[Hashable, Sequence[Path]],
+    mode: str = MERGE_DAY,
+    platform_ids: Optional[Collection[str]] = None,
+    skip_errors: bool = False,
+    workers: Optional[int] = None,
+    min_files: int = DEFAULT_MIN_FILES,
+) -> Dict[Hashable, SnapshotPartial]:
+    """
+    解析多组快照文件，每组单独聚合
+
+    Args:
+        groups: {组名: 按时间排序的快照文件}，如 {日期文件夹名: 当天的 txt 文件}
+        mode: 合并方式，MERGE_DAY 或 MERGE_RANKS
+        platform_ids: 只保留这些平台的标题，None 表示全部
+        skip_errors: 跳过无法解析的文件并记录在结果的 errors 中，否则抛出异常
+        workers: 最大进程数，0 或 None 表示使用全部 CPU
+        min_files: 文件总数少于该值时顺序解析
+
+    Returns:
+        {组名: 聚合结果}，顺序与 groups 相同
+    """
+    if platform_ids is not None:
+        platform_ids = frozenset(platform_ids)
+
+    total = sum(len(files) for files in groups.values())
+    workers = resolve_workers(workers)
+
+    partials = None
+    if workers > 1 and total >= min_files:
+        chunk_size = max(MIN_CHUNK_FILES, math.ceil(total / (workers * CHUNKS_PER_WORKER)))
+        tasks = [
+            (key, chunk)
+            for key, files in groups.items()
+            for chunk in _split(list(files), chunk_size)
+        ]
+        if len(tasks) > 1:
+            partials = _parse_in_pool(
+                tasks, min(workers, len(tasks)), mode, platform_ids, skip_errors
+            )
+    if partials is None:
+        tasks = [(key, list(files)) for key, files in groups.items()]
+        partials = [
+            _parse_chunk(chunk, mode, platform_ids, skip_errors) for _, chunk in tasks
+        ]
+
+    results = {key: SnapshotPartial(mode) for key in groups}
+    for (key, _), partial in zip(tasks, partials):
+        results[key].merge(partial)
+    return results
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """进程内共用的进程池，需要更多进程时重建"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers < workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """丢弃已损坏的进程池，下次解析时重新创建"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+            _pool_workers = 0
+    pool.shutdown(wait=False)
+
+
+@atexit.register
+def shutdown_pool() -> None:
+    """关闭进程池（进程退出时自动调用）"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        pool, _pool, _pool_workers = _pool, None, 0
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def _parse_in_pool(
+    tasks: List[Tuple[Hashable, Sequence[Path]]],
+    workers: int,
+    mode: str,
+    platform_ids: Optional[Collection[str]],
+    skip_errors: bool,
+) -> Optional[List[SnapshotPartial]]:
+    """在共用的进程池中解析各段，进程池不可用时返回 None（调用方改为顺序解析）"""
+    pool = None
+    try:
+        pool = _get_pool(workers)
+        futures = [
+            pool.submit(_parse_chunk, chunk, mode, platform_ids, skip_errors)
+            for _, chunk in tasks
+        ]
+        return [future.result() for future in futures]
+    except (BrokenProcessPool, NotImplementedError, OSError) as e:
+        # 解析本身的错误在顺序解析时会再次抛出
+        if pool is not None:
+            _discard_pool(pool)
+        print(f"快照并行解析不可用，改为顺序解析: {e}")
+        return None
+
+
+def parse_snapshots(
+    files: Sequence[Path],
+    mode: str = MERGE_DAY,
+    platform_ids: Optional[Collection[str]] = None,
+    skip_errors: bool = False,
+    workers: Optional[int] = None,
+    min_files: int = DEFAULT_MIN_FILES,
+) -> SnapshotPartial:
+    """
+    解析一组按时间排序的快照文件并聚合
+
+    参数与 parse_snapshot_groups 相同。
+
+    Returns:
+        聚合结果
+    """
+    return parse_snapshot_groups(
+        {None: files}, mode, platform_ids, skip_errors, workers, min_files
+    )[None]
+
@@ -0,0 +1,130 @@
+"""
+通知渠道限速
+
+每个推送目标（一个 webhook、一个 Telegram 聊天、一个 ntfy 主题）对应一个令牌桶：
+桶中最多 ``capacity`` 个令牌，每秒补充 ``rate`` 个，发送一个批次消耗一个令牌，
+令牌不足时等待到下一个令牌产生。这样批次在平台允许的范围内尽快发出，不再使用固定间隔。
+
+平台返回 429 或限流错误码时调用 ``pause``：在 Retry-After 指定的时间之前不再发出请求，
+之后从一个令牌开始重新补充。令牌桶是线程安全的，多个渠道并行发送时各自独立计时。
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Hashable, Optional
+
+
+class TokenBucket:
+    """单个推送目标的令牌桶"""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            rate: 每秒补充的令牌数，必须大于 0
+            capacity: 令牌桶容量，即空闲后可以连续发送的批次数
+            clock: 单调时钟
+            sleep: 等待函数
+        """
+        if rate <= 0:
+            raise ValueError("令牌补充速率必须大于 0")
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        # 令牌数对应的时间点；被限流暂停时位于未来
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+    def reserve(self) -> float:
+        """取走一个令牌（不足时预支），返回需要等待的秒数"""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= 1
+            wait = self._updated - now
+            if self._tokens < 0:
+                wait += -self._tokens / self.rate
+            return max(0.0, wait)
+
+    def delay(self) -> float:
+        """下一个令牌可用前还需等待的秒数（不取走令牌），被限流暂停时为距恢复的时间"""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            wait = self._updated - now
+            if self._tokens < 1:
+                wait += (1 - self._tokens) / self.rate
+            return max(0.0, wait)
+
+    def acquire(self) -> float:
+        """等待并取走一个令牌，返回实际等待的秒数"""
+        wait = self.reserve()
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """被限流：seconds 秒内不再发放令牌，之后从一个令牌开始补充"""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            resume_at = now + max(0.0, seconds)
+            if resume_at > self._updated:
+                self._updated = resume_at
+                self._tokens = 1.0
+
+
+class RateLimiterRegistry:
+    """按推送目标管理令牌桶，限速参数变化（如常驻模式重新加载配置）时重建"""
+
+    def __init__(self):
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, rate: float, capacity: float) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or (bucket.rate, bucket.capacity) != (rate, max(1.0, capacity)):
+                bucket = self._buckets[key] = TokenBucket(rate, capacity)
+            return bucket
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 响应头
+
+    Args:
+        value: 秒数或 HTTP 日期
+
+    Returns:
+        需要等待的秒数，无法解析时为 None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
@@ -0,0 +1,162 @@
+"""
+标题聚合记录
+
+一天内同一平台同一标题的聚合信息用一条 ``TitleRecord`` 保存：``__slots__`` 对象，
+排名存放在 ``array('H')`` 中，标题、平台 ID 和时间字符串通过 ``sys.intern`` 共享。
+main.py 的当天聚合（all_results 与 title_info 共用同一条记录）和 MCP Server 的按日期读取都使用它。
+
+记录实现了只读映射协议，``record["ranks"]``、``record.get("url", "")`` 等写法与原来的字典相同，
+其中 ``ranks`` 返回新的 list，可以直接放入 JSON 结果。
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, List, Optional
+
+_BASE_KEYS = ("ranks", "url", "mobileUrl")
+_TIME_KEYS = ("first_time", "last_time", "count")
+
+intern = sys.intern
+
+
+def _rank_array(ranks: Iterable[int]) -> array:
+    try:
+        return array("H", ranks)
+    except OverflowError:
+        # 排名超出 0-65535 时退回 32 位存储
+        return array("I", ranks)
+
+
+class TitleRecord(Mapping):
+    """单个标题的聚合信息"""
+
+    __slots__ = ("rank_array", "url", "mobile_url", "first_time", "last_time", "count")
+
+    def __init__(
+        self,
+        ranks: Iterable[int] = (),
+        url: str = "",
+        mobile_url: str = "",
+        first_time: Optional[str] = None,
+        last_time: Optional[str] = None,
+        count: int = 1,
+    ):
+        self.rank_array = _rank_array(ranks)
+        self.url = url or ""
+        self.mobile_url = mobile_url or ""
+        # 没有时间信息的记录（MCP 按日期读取、单份快照）只提供 ranks / url / mobileUrl
+        self.first_time = intern(first_time) if first_time is not None else None
+        self.last_time = intern(last_time) if last_time is not None else None
+        self.count = count
+
+    @classmethod
+    def from_info(cls, info: Mapping) -> "TitleRecord":
+        """从 {ranks, url, mobileUrl} 字典构建（不含时间信息）"""
+        return cls(info.get("ranks", ()), info.get("url", ""), info.get("mobileUrl", ""))
+
+    @property
+    def ranks(self) -> List[int]:
+        return list(self.rank_array)
+
+    @property
+    def has_times(self) -> bool:
+        return self.first_time is not None
+
+    def _add_distinct_ranks(self, ranks: Iterable[int]) -> None:
+        rank_array = self.rank_array
+        for rank in ranks:
+            if rank not in rank_array:
+                try:
+                    rank_array.append(rank)
+                except OverflowError:
+                    rank_array = self.rank_array = array("I", rank_array)
+                    rank_array.append(rank)
+
+    def merge(self, ranks: Iterable[int], url: str, mobile_url: str, time_info: str) -> None:
+        """合并同一标题的又一次出现：追加未出现过的排名，链接保留第一个非空值，更新最后时间和次数"""
+        self._add_distinct_ranks(ranks)
+        if not self.url:
+            self.url = url or ""
+        if not self.mobile_url:
+            self.mobile_url = mobile_url or ""
+        self.last_time = intern(time_info)
+        self.count += 1
+
+    def absorb(self, later: "TitleRecord") -> None:
+        """并入同一标题在之后一段快照中的聚合记录，结果与逐次 merge 相同"""
+        self._add_distinct_ranks(later.rank_array)
+        if not self.url:
+            self.url = later.url
+        if not self.mobile_url:
+            self.mobile_url = later.mobile_url
+        if later.last_time is not None:
+            self.last_time = later.last_time
+        self.count += later.count
+
+    def extend_ranks(self, ranks: Iterable[int]) -> None:
+        """按出现顺序追加排名（保留重复值）"""
+        try:
+            self.rank_array.extend(ranks)
+        except OverflowError:
+            self.rank_array = array("I", self.rank_array)
+            self.rank_array.extend(ranks)
+
+    def __getitem__(self, key: str):
+        if key == "ranks":
+            return list(self.rank_array)
+        if key == "url":
+            return self.url
+        if key == "mobileUrl":
+            return self.mobile_url
+        if self.first_time is not None:
+            if key == "first_time":
+                return self.first_time
+            if key == "last_time":
+                return self.last_time
+            if key == "count":
+                return self.count
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        if self.first_time is not None:
+            return iter(_BASE_KEYS + _TIME_KEYS)
+        return iter(_BASE_KEYS)
+
+    def __len__(self) -> int:
+        return len(_BASE_KEYS) + (len(_TIME_KEYS) if self.first_time is not None else 0)
+
+    def __repr__(self) -> str:
+        return f"TitleRecord({dict(self)!r})"
+
+    def to_row(self) -> list:
+        """序列化为 JSON 列表"""
+        if self.first_time is None:
+            return [list(self.rank_array), self.url, self.mobile_url]
+        return [
+            list(self.rank_array),
+            self.url,
+            self.mobile_url,
+            self.first_time,
+            self.last_time,
+            self.count,
+        ]
+
+    @classmethod
+    def from_row(cls, row: list) -> "TitleRecord":
+        """从 to_row 的结果还原"""
+        return cls(*row)
+
+    def __reduce__(self):
+        # 在进程间传递时按行序列化，还原时重新 intern 时间字符串
+        return (self.__class__, tuple(self.to_row()))
+
+
+def intern_titles(titles_by_id: Dict) -> Dict:
+    """把 {平台: {标题: {ranks, url, mobileUrl}}} 转换为记录，平台 ID 和标题共享字符串"""
+    return {
+        intern(source_id): {
+            intern(title): TitleRecord.from_info(info) for title, info in titles.items()
+        }
+        for source_id, titles in titles_by_id.items()
+    }
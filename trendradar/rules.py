@@ -0,0 +1,228 @@
+"""
+频率词规则
+
+config/frequency_words.txt 的统一解析与编译，main.py、MCP Server 和 wechat_rss 共用。
+
+文件格式：空行分隔词组，``#`` 开头为注释。每行一个词项：
+
+- 普通词：包含任意一个即匹配
+- ``+词``：必须词，必须同时包含
+- ``!词``：全局过滤词，包含则在所有词组中排除
+- ``-词``：本组排除词，包含则不归入本组（仍可匹配后面的词组）
+- ``@平台ID,平台ID``：本组只匹配这些平台的标题
+
+词项可以写成 ``"word"``（整词匹配）、``"word*"``（词首匹配）或 ``/正则/``，见 trendradar.matcher。
+
+以 ``\\`` 开头的词项按字面处理，不识别上面的前缀和写法：``\\-词``、``\\@词``、``\\#话题``
+是以 - @ # 开头的普通词，``+\\"AI"`` 是带引号的必须词。
+
+编译结果按文件路径缓存在进程内：文件大小和修改时间未变时直接复用，
+修改时间变化但内容哈希相同（如 git checkout）时只更新记录，
+内容变化时才重新解析和编译，同一份规则只加载一次。
+"""
+
+import hashlib
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+from .matcher import _LITERAL, CombinedMatcher, WordGroupMatcher, parse_term
+
+
+class CompiledRules:
+    """解析并编译后的频率词规则"""
+
+    __slots__ = ("path", "content_hash", "word_groups", "filter_words", "matcher")
+
+    def __init__(self, path: Path, content_hash: str, word_groups: List[Dict], filter_words: List[str]):
+        self.path = path
+        self.content_hash = content_hash
+        # 词组: {"required": [...], "normal": [...], "group_key": "..."}，可选 "exclude" 和 "platforms"
+        self.word_groups = word_groups
+        self.filter_words = filter_words
+        self.matcher = WordGroupMatcher(word_groups, filter_words)
+
+    @property
+    def keywords(self) -> List[str]:
+        """
+        全部必须词和普通词中可以直接按子串匹配的关键词
+
+        不含过滤词、本组排除词，以及整词、词首和正则写法；转义写法返回去掉反斜杠后的文字。
+        """
+        keywords = []
+        for group in self.word_groups:
+            for word in group["required"] + group["normal"]:
+                if parse_term(word)[0] != _LITERAL or not word:
+                    continue
+                keywords.append(word[1:] if word.startswith("\\") and len(word) >= 2 else word)
+        return keywords
+
+
+_cache: Dict[str, Tuple[int, int, CompiledRules]] = {}
+_cache_lock = threading.Lock()
+# 不是从文件加载的词组（如 main.py 的"全部新闻"虚拟词组）按列表对象缓存最近一次编译结果
+_adhoc_matchers: List[WordGroupMatcher] = []
+# 最近一次合并编译的多套规则
+_combined_matchers: List[CombinedMatcher] = []
+
+
+def _unescape(term: str) -> str:
+    """去掉词项开头的转义反斜杠；去掉后仍会被识别为整词、正则或转义写法时保留，由匹配器按普通词处理"""
+    if len(term) < 2 or not term.startswith("\\"):
+        return term
+    literal = term[1:]
+    if literal.startswith("\\") or parse_term(literal)[0] != parse_term(term)[0]:
+        return term
+    return literal
+
+
+def parse_rules(content: str) -> Tuple[List[Dict], List[str]]:
+    """
+    解析规则文件内容
+
+    Args:
+        content: frequency_words.txt 的内容
+
+    Returns:
+        (词组列表, 过滤词列表)
+    """
+    content = content.replace("\r\n", "\n")
+    groups = [group.strip() for group in content.split("\n\n") if group.strip()]
+
+    word_groups = []
+    filter_words = []
+
+    for group in groups:
+        words = [
+            word.strip()
+            for word in group.split("\n")
+            if word.strip() and not word.strip().startswith("#")
+        ]
+
+        group_required_words = []
+        group_normal_words = []
+        group_exclude_words = []
+        group_platforms = []
+
+        for word in words:
+            if word.startswith("!"):
+                filter_words.append(_unescape(word[1:]))
+            elif word.startswith("+"):
+                group_required_words.append(_unescape(word[1:]))
+            elif word.startswith("-") and len(word) > 1:
+                group_exclude_words.append(_unescape(word[1:].strip()))
+            elif word.startswith("@") and len(word) > 1:
+                group_platforms.extend(
+                    platform_id for platform_id in re.split(r"[,，\s]+", word[1:]) if platform_id
+                )
+            else:
+                group_normal_words.append(_unescape(word))
+
+        if group_required_words or group_normal_words:
+            if group_normal_words:
+                group_key = " ".join(group_normal_words)
+            else:
+                group_key = " ".join(group_required_words)
+
+            group_data = {
+                "required": group_required_words,
+                "normal": group_normal_words,
+                "group_key": group_key,
+            }
+            if group_exclude_words:
+                group_data["exclude"] = group_exclude_words
+            if group_platforms:
+                group_data["platforms"] = group_platforms
+            word_groups.append(group_data)
+
+    return word_groups, filter_words
+
+
+def load_rules(path: Union[str, Path]) -> CompiledRules:
+    """
+    加载并编译规则文件（带缓存）
+
+    Args:
+        path: 规则文件路径
+
+    Returns:
+        编译后的规则，文件未变化时返回缓存的同一个对象
+
+    Raises:
+        FileNotFoundError: 规则文件不存在
+    """
+    path = Path(path)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"频率词文件 {path} 不存在")
+
+    key = str(path.resolve())
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        data = path.read_bytes()
+        content_hash = hashlib.sha1(data).hexdigest()
+        if cached and cached[2].content_hash == content_hash:
+            rules = cached[2]
+        else:
+            word_groups, filter_words = parse_rules(data.decode("utf-8"))
+            rules = CompiledRules(path, content_hash, word_groups, filter_words)
+
+        _cache[key] = (stat.st_mtime_ns, stat.st_size, rules)
+        return rules
+
+
+def get_matcher(word_groups: List[Dict], filter_words: List[str]) -> WordGroupMatcher:
+    """
+    获取词组规则对应的匹配器
+
+    Args:
+        word_groups: 词组列表
+        filter_words: 过滤词列表
+
+    Returns:
+        来自 load_rules 的规则直接返回已编译的匹配器，其他词组只在列表对象变化时重新编译
+    """
+    with _cache_lock:
+        for _, _, rules in _cache.values():
+            if rules.word_groups is word_groups and rules.filter_words is filter_words:
+                return rules.matcher
+
+        if _adhoc_matchers:
+            matcher = _adhoc_matchers[0]
+            if matcher.word_groups is word_groups and matcher.filter_words is filter_words:
+                return matcher
+
+        matcher = WordGroupMatcher(word_groups, filter_words)
+        _adhoc_matchers[:] = [matcher]
+        return matcher
+
+
+def get_combined_matcher(rule_sets: List[Tuple[List[Dict], List[str]]]) -> CombinedMatcher:
+    """
+    获取多套词组规则合并编译后的匹配器
+
+    Args:
+        rule_sets: [(词组列表, 过滤词列表)]
+
+    Returns:
+        各套规则的列表对象都与上次相同时返回上次的编译结果，否则重新编译
+    """
+    with _cache_lock:
+        if _combined_matchers:
+            matcher = _combined_matchers[0]
+            if len(matcher.rule_sets) == len(rule_sets) and all(
+                cached_groups is word_groups and cached_filters is filter_words
+                for (cached_groups, cached_filters), (word_groups, filter_words) in zip(
+                    matcher.rule_sets, rule_sets
+                )
+            ):
+                return matcher
+
+        matcher = CombinedMatcher(list(rule_sets))
+        _combined_matchers[:] = [matcher]
+        return matcher
@@ -0,0 +1,211 @@
+"""
+多日标题布隆过滤器
+
+每天一个布隆过滤器文件 output/.crawler_state/seen_titles/YYYY年MM月DD日.bloom，
+保存快照时把标题（按平台区分）加入当天的过滤器，只保留最近若干天（按日历天数计算，
+中间有几天没有运行时，更早的过滤器同样过期）。
+判断新增标题是"首次出现"还是"前几天出现过、今天重新上榜"时，
+只需查询前几天的过滤器，不需要读取旧的日期文件夹。
+
+布隆过滤器没有漏判，可能误判（默认约 0.1%）：极少数真正的新标题会被当作回归标题。
+"""
+
+import hashlib
+import math
+import struct
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .storage import date_folder_to_iso
+
+BLOOM_SUFFIX = ".bloom"
+_HEADER = struct.Struct("<4sBIB")
+_MAGIC = b"TRBF"
+_VERSION = 1
+
+
+def _title_key(source_id: str, title: str) -> bytes:
+    return f"{source_id}\t{title}".encode("utf-8")
+
+
+class BloomFilter:
+    """定长布隆过滤器，使用双重哈希生成 k 个位置"""
+
+    __slots__ = ("size", "hash_count", "bits")
+
+    def __init__(self, size: int, hash_count: int, bits: Optional[bytearray] = None):
+        self.size = size
+        self.hash_count = hash_count
+        self.bits = bits if bits is not None else bytearray((size + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> "BloomFilter":
+        """按预计元素数和误判率计算位数与哈希次数"""
+        size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        hash_count = max(1, int(round(size / capacity * math.log(2))))
+        return cls(size, hash_count)
+
+    def _positions(self, key: bytes) -> Iterable[int]:
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: bytes) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+    def to_bytes(self) -> bytes:
+        return _HEADER.pack(_MAGIC, _VERSION, self.size, self.hash_count) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        """
+        从文件内容还原
+
+        Raises:
+            ValueError: 文件格式不正确
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError("布隆过滤器文件不完整")
+        magic, version, size, hash_count = _HEADER.unpack_from(data)
+        bits = bytearray(data[_HEADER.size :])
+        if magic != _MAGIC or version != _VERSION or len(bits) != (size + 7) // 8:
+            raise ValueError("布隆过滤器文件格式不正确")
+        return cls(size, hash_count, bits)
+
+
+class SeenTitleFilter:
+    """最近若干天出现过的标题（每天一个布隆过滤器）"""
+
+    def __init__(
+        self,
+        state_dir: Path,
+        days: int = 7,
+        capacity: int = 20000,
+        error_rate: float = 0.001,
+    ):
+        """
+        Args:
+            state_dir: 过滤器文件目录
+            days: 保留的日历天数（含当天）
+            capacity: 单日预计标题数，超出后误判率上升
+            error_rate: 单日过滤器的目标误判率
+        """
+        self.state_dir = Path(state_dir)
+        self.days = days
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filters: Dict[str, BloomFilter] = {}
+
+    def _path(self, date_folder: str) -> Path:
+        return self.state_dir / f"{date_folder}{BLOOM_SUFFIX}"
+
+    def _date_folders(self) -> List[str]:
+        if not self.state_dir.exists():
+            return []
+        return sorted(
+            (
+                path.name[: -len(BLOOM_SUFFIX)]
+                for path in self.state_dir.glob(f"*{BLOOM_SUFFIX}")
+                if date_folder_to_iso(path.name[: -len(BLOOM_SUFFIX)])
+            ),
+            key=date_folder_to_iso,
+        )
+
+    def _load(self, date_folder: str, create: bool = False) -> Optional[BloomFilter]:
+        bloom = self._filters.get(date_folder)
+        if bloom is not None:
+            return bloom
+
+        path = self._path(date_folder)
+        if path.exists():
+            try:
+                bloom = BloomFilter.from_bytes(path.read_bytes())
+            except (OSError, ValueError) as e:
+                print(f"读取标题过滤器 {path.name} 失败，将重新建立: {e}")
+        if bloom is None:
+            if not create:
+                return None
+            bloom = BloomFilter.for_capacity(self.capacity, self.error_rate)
+        self._filters[date_folder] = bloom
+        return bloom
+
+    def add_titles(self, date_folder: str, titles_by_id: Dict) -> None:
+        """把快照中的标题加入当天的过滤器并保存，同时清理超出保留天数的过滤器"""
+        bloom = self._load(date_folder, create=True)
+        for source_id, titles in titles_by_id.items():
+            for title in titles:
+                bloom.add(_title_key(source_id, title))
+
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(date_folder)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(bloom.to_bytes())
+        tmp_path.replace(path)
+        self.prune(date_folder)
+
+    def _window_start(self, date_folder: str) -> str:
+        """以 date_folder 为最后一天的保留窗口中最早的日期（ISO 格式）"""
+        date = datetime.strptime(date_folder_to_iso(date_folder), "%Y-%m-%d")
+        return (date - timedelta(days=self.days - 1)).strftime("%Y-%m-%d")
+
+    def prune(self, date_folder: str) -> None:
+        """删除 date_folder 往前超出保留天数的过滤器"""
+        window_start = self._window_start(date_folder)
+        for folder in self._date_folders():
+            if date_folder_to_iso(folder) >= window_start:
+                continue
+            self._filters.pop(folder, None)
+            self._path(folder).unlink(missing_ok=True)
+
+    def _earlier_filters(self, date_folder: str) -> List[BloomFilter]:
+        date = date_folder_to_iso(date_folder)
+        window_start = self._window_start(date_folder)
+        filters = []
+        for folder in self._date_folders():
+            if not window_start <= date_folder_to_iso(folder) < date:
+                continue
+            bloom = self._load(folder)
+            if bloom is not None:
+                filters.append(bloom)
+        return filters
+
+    def seen_before(self, date_folder: str, source_id: str, title: str) -> bool:
+        """标题是否在 date_folder 之前、保留天数内的几天中出现过"""
+        key = _title_key(source_id, title)
+        return any(key in bloom for bloom in self._earlier_filters(date_folder))
+
+    def returning_titles(self, date_folder: str, new_titles: Dict) -> Dict:
+        """
+        从当天的新增标题中找出前几天出现过的回归标题
+
+        Args:
+            date_folder: 当天的日期文件夹名
+            new_titles: {source_id: {title: title_data}}
+
+        Returns:
+            结构相同的回归标题
+        """
+        filters = self._earlier_filters(date_folder)
+        if not filters:
+            return {}
+
+        returning = {}
+        for source_id, titles in new_titles.items():
+            source_returning = {
+                title: title_data
+                for title, title_data in titles.items()
+                if any(_title_key(source_id, title) in bloom for bloom in filters)
+            }
+            if source_returning:
+                returning[source_id] = source_returning
+        return returning
@@ -0,0 +1,480 @@
+"""
+快照文件读取与增量编码
+
+txt 快照有三种形式，读取时统一还原为完整快照：
+
+- 完整快照：每个平台一段，``id | name`` 后跟 ``排名. 标题 [URL:...] [MOBILE:...]``
+- "与快照相同"标记：``==== 与快照相同: HH时MM分 ====``，内容等同于被引用的快照
+- 增量快照：只记录相对上一份快照的变化，格式如下::
+
+    ==== 增量快照: 基于 14时30分 ====
+
+    zhihu | 知乎
+    +3. 新标题 [URL:...] [MOBILE:...]
+    -5
+    ~7>4
+
+    weibo | 微博
+    -*
+
+    ==== 以下ID请求失败 ====
+    toutiao
+
+  ``+`` 行为新增标题，格式与完整快照相同；``-N`` 移除基准快照中该平台第 N 条标题，
+  ``-*`` 移除整个平台；``~N>R`` 表示第 N 条标题的排名变为 R。
+  未出现的平台和标题与基准快照相同。
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+FAILED_SECTION_MARKER = "==== 以下ID请求失败 ===="
+REPEAT_PREFIX = "==== 与快照相同: "
+DELTA_PREFIX = "==== 增量快照: 基于 "
+MARKER_SUFFIX = "===="
+
+# 最近还原的快照，按顺序读取一天的增量快照时每个文件只需读取一次
+_CACHE_SIZE = 4
+_snapshot_cache: "OrderedDict[str, Tuple[Tuple[int, int], Snapshot]]" = OrderedDict()
+
+
+def clean_title(title: str) -> str:
+    """清理标题中的空白字符（连续空白合并为一个空格，去掉首尾空白）"""
+    # str.split() 与正则 \s 使用相同的 Unicode 空白定义，结果与 re.sub(r"\s+", " ", title).strip() 相同
+    return " ".join(title.split())
+
+
+def parse_title_line(line: str) -> Tuple[str, int, str, str]:
+    """
+    解析标题行
+
+    Args:
+        line: ``排名. 标题 [URL:...] [MOBILE:...]``，排名和链接都可省略
+
+    Returns:
+        (标题, 排名, url, mobileUrl)，没有排名时为 1
+
+    Raises:
+        ValueError: 排名由非 ASCII 数字字符组成且无法转换为整数
+    """
+    title_part = line.strip()
+    rank = 1
+
+    rank_str, separator, rest = title_part.partition(". ")
+    if separator and rank_str.isdigit():
+        rank = int(rank_str)
+        title_part = rest
+
+    mobile_url = ""
+    if " [MOBILE:" in title_part:
+        title_part, _, mobile_part = title_part.rpartition(" [MOBILE:")
+        if mobile_part.endswith("]"):
+            mobile_url = mobile_part[:-1]
+
+    url = ""
+    cut = title_part.rfind(" [URL:")
+    if cut >= 0:
+        if title_part[-1] == "]":
+            url = title_part[cut + len(" [URL:") : -1]
+        title_part = title_part[:cut]
+
+    return clean_title(title_part), rank, url, mobile_url
+
+
+def parse_titles(
+    content: str, on_error: Optional[Callable[[str, Exception], None]] = None
+) -> Tuple[Dict, Dict]:
+    """
+    解析完整快照内容
+
+    main.py 的 parse_file_titles、MCP Server 的 parse_txt_file 和并行解析共用。
+    每个平台段只扫描一遍；标题行用 partition / rfind 定位排名和链接后直接切片，
+    不再为每行生成 split / rsplit 的中间列表，也不再用正则替换清理空白。
+
+    Args:
+        content: 完整快照内容
+        on_error: 标题行无法解析时的回调 (原始行, 异常)，该行被跳过
+
+    Returns:
+        (titles_by_id, id_to_name)
+        - titles_by_id: {source_id: {title: {ranks: [排名], url, mobileUrl}}}
+        - id_to_name: {source_id: 平台名称}
+    """
+    titles_by_id = {}
+    id_to_name = {}
+
+    for section in content.split("\n\n"):
+        if FAILED_SECTION_MARKER in section:
+            continue
+        lines = section.strip().split("\n")
+        if len(lines) < 2:
+            continue
+
+        source_id, name = _parse_header(lines[0])
+        id_to_name[source_id] = name
+        titles = titles_by_id[source_id] = {}
+
+        for raw_line in lines[1:]:
+            # 与 parse_title_line 相同的规则，在循环内展开以省去函数调用
+            line = raw_line.strip()
+            if not line:
+                continue
+
+            rank_str, separator, rest = line.partition(". ")
+            if separator and rank_str.isdigit():
+                try:
+                    rank = int(rank_str)
+                except ValueError as e:
+                    if on_error is not None:
+                        on_error(raw_line, e)
+                    continue
+                line = rest
+            else:
+                rank = 1
+
+            mobile_url = ""
+            if " [MOBILE:" in line:
+                line, _, mobile_part = line.rpartition(" [MOBILE:")
+                if mobile_part.endswith("]"):
+                    mobile_url = mobile_part[:-1]
+
+            url = ""
+            cut = line.rfind(" [URL:")
+            if cut >= 0:
+                if line[-1] == "]":
+                    url = line[cut + 6 : -1]
+                line = line[:cut]
+
+            titles[" ".join(line.split())] = {
+                "ranks": [rank],
+                "url": url,
+                "mobileUrl": mobile_url,
+            }
+
+    return titles_by_id, id_to_name
+
+
+def format_title_line(title: str, rank: int, url: str, mobile_url: str) -> str:
+    """生成与完整快照相同格式的标题行"""
+    line = f"{rank}. {title}"
+    if url:
+        line += f" [URL:{url}]"
+    if mobile_url:
+        line += f" [MOBILE:{mobile_url}]"
+    return line
+
+
+def _parse_header(header_line: str) -> Tuple[str, str]:
+    header_line = header_line.strip()
+    if " | " in header_line:
+        source_id, name = header_line.split(" | ", 1)
+        return source_id.strip(), name.strip()
+    return header_line, header_line
+
+
+def _format_header(source_id: str, name: str) -> str:
+    return f"{source_id} | {name}" if name and name != source_id else source_id
+
+
+def _format_marker(prefix: str, base_name: str) -> str:
+    return f"{prefix}{base_name} {MARKER_SUFFIX}"
+
+
+def _get_marker_base(content: str, prefix: str) -> Optional[str]:
+    if not content.startswith(prefix):
+        return None
+    first_line = content.split("\n", 1)[0].strip()
+    if not first_line.endswith(MARKER_SUFFIX):
+        return None
+    return first_line[len(prefix) : -len(MARKER_SUFFIX)].strip()
+
+
+def format_repeat_marker(base_name: str) -> str:
+    """生成"与快照相同"标记行（不含换行符）"""
+    return _format_marker(REPEAT_PREFIX, base_name)
+
+
+def get_repeat_base(content: str) -> Optional[str]:
+    """识别"与快照相同"标记，返回被引用的快照文件名（不含扩展名）"""
+    return _get_marker_base(content, REPEAT_PREFIX)
+
+
+def get_delta_base(content: str) -> Optional[str]:
+    """识别增量快照，返回基准快照文件名（不含扩展名）"""
+    return _get_marker_base(content, DELTA_PREFIX)
+
+
+class Snapshot:
+    """还原后的完整快照：平台 -> {标题: (排名, url, mobileUrl)}，保持文件中的顺序"""
+
+    __slots__ = ("entries", "names", "depth")
+
+    def __init__(
+        self,
+        entries: Optional[Dict[str, Dict[str, Tuple[int, str, str]]]] = None,
+        names: Optional[Dict[str, str]] = None,
+        depth: int = 0,
+    ):
+        self.entries = entries if entries is not None else {}
+        self.names = names if names is not None else {}
+        # 还原该快照需要沿基准链读取的文件数（完整快照为 0）
+        self.depth = depth
+
+    @classmethod
+    def parse(cls, content: str) -> "Snapshot":
+        """解析完整快照内容"""
+        snapshot = cls()
+        for section in content.split("\n\n"):
+            if not section.strip() or FAILED_SECTION_MARKER in section:
+                continue
+
+            lines = section.strip().split("\n")
+            if len(lines) < 2:
+                continue
+
+            source_id, name = _parse_header(lines[0])
+            snapshot.names[source_id] = name
+            titles = snapshot.entries[source_id] = {}
+
+            for line in lines[1:]:
+                if line.strip():
+                    title, rank, url, mobile_url = parse_title_line(line)
+                    titles[title] = (rank, url, mobile_url)
+        return snapshot
+
+    def to_titles(self) -> Tuple[Dict, Dict]:
+        """转换为 (titles_by_id, id_to_name)，与 txt 解析结果结构相同"""
+        titles_by_id = {
+            source_id: {
+                title: {"ranks": [rank], "url": url, "mobileUrl": mobile_url}
+                for title, (rank, url, mobile_url) in titles.items()
+            }
+            for source_id, titles in self.entries.items()
+        }
+        return titles_by_id, dict(self.names)
+
+    def _layout(self) -> List:
+        return [
+            (source_id, self.names.get(source_id), list(titles.items()))
+            for source_id, titles in self.entries.items()
+        ]
+
+    def same_as(self, other: "Snapshot") -> bool:
+        """内容和顺序都相同"""
+        return self._layout() == other._layout()
+
+    def apply_delta(self, content: str) -> "Snapshot":
+        """以当前快照为基准应用增量内容，返回新的快照"""
+        removed_platforms = set()
+        changes = {}
+        new_names = {}
+
+        for section in content.split("\n\n"):
+            section = section.strip()
+            if (
+                not section
+                or section.startswith(DELTA_PREFIX)
+                or FAILED_SECTION_MARKER in section
+            ):
+                continue
+
+            lines = section.split("\n")
+            source_id, name = _parse_header(lines[0])
+            new_names[source_id] = name
+            removed, reranked, added = changes.setdefault(source_id, (set(), {}, []))
+
+            for line in lines[1:]:
+                line = line.strip()
+                if not line:
+                    continue
+                op, value = line[0], line[1:]
+                if op == "+":
+                    title, rank, url, mobile_url = parse_title_line(value)
+                    added.append((title, (rank, url, mobile_url)))
+                elif op == "-":
+                    if value == "*":
+                        removed_platforms.add(source_id)
+                    else:
+                        removed.add(int(value))
+                elif op == "~":
+                    position, rank = value.split(">", 1)
+                    reranked[int(position)] = int(rank)
+                else:
+                    raise ValueError(f"无法识别的增量快照行: {line}")
+
+        entries = {}
+        names = {}
+        platform_order = list(self.entries) + [
+            source_id for source_id in changes if source_id not in self.entries
+        ]
+        for source_id in platform_order:
+            if source_id in removed_platforms:
+                continue
+            names[source_id] = new_names.get(source_id, self.names.get(source_id, source_id))
+            if source_id not in changes:
+                entries[source_id] = self.entries[source_id]
+                continue
+
+            removed, reranked, added = changes[source_id]
+            kept = [
+                (title, (reranked.get(position, info[0]), info[1], info[2]))
+                for position, (title, info) in enumerate(
+                    self.entries.get(source_id, {}).items(), 1
+                )
+                if position not in removed
+            ]
+            merged = sorted(kept + added, key=lambda item: item[1][0])
+            entries[source_id] = dict(merged)
+
+        return Snapshot(entries, names, self.depth + 1)
+
+    def encode_delta(self, base_name: str, target: "Snapshot") -> Optional[str]:
+        """
+        生成从当前快照到目标快照的增量内容
+
+        Args:
+            base_name: 当前快照的文件名（不含扩展名）
+            target: 目标快照
+
+        Returns:
+            增量内容（不含请求失败段），无法准确还原目标快照时返回 None
+        """
+        sections = [_format_marker(DELTA_PREFIX, base_name)]
+
+        for source_id in self.entries:
+            if source_id not in target.entries:
+                sections.append(
+                    f"{_format_header(source_id, self.names.get(source_id, source_id))}\n-*"
+                )
+
+        for source_id, titles in target.entries.items():
+            name = target.names.get(source_id, source_id)
+            base_titles = self.entries.get(source_id)
+            if base_titles == titles and self.names.get(source_id) == name:
+                continue
+
+            lines = [_format_header(source_id, name)]
+            base_positions = {}
+            for position, (title, info) in enumerate((base_titles or {}).items(), 1):
+                base_positions[title] = (position, info)
+                if title not in titles or titles[title][1:] != info[1:]:
+                    lines.append(f"-{position}")
+
+            for title, (rank, url, mobile_url) in titles.items():
+                base = base_positions.get(title)
+                if base is None or base[1][1:] != (url, mobile_url):
+                    lines.append("+" + format_title_line(title, rank, url, mobile_url))
+                elif base[1][0] != rank:
+                    lines.append(f"~{base[0]}>{rank}")
+            sections.append("\n".join(lines))
+
+        content = "\n\n".join(sections) + "\n\n"
+        # 同排名标题的先后顺序等无法用增量表达时，改为写入完整快照
+        if not self.apply_delta(content).same_as(target):
+            return None
+        return content
+
+
+def decode_snapshot(
+    name: str, content: str, load_base: Callable[[str], Snapshot]
+) -> Snapshot:
+    """
+    把快照内容还原为完整快照
+
+    Args:
+        name: 快照文件名（不含扩展名）
+        content: 快照文件内容
+        load_base: 按文件名（不含扩展名）加载基准快照的函数
+
+    Returns:
+        还原后的快照
+    """
+    repeat_base = get_repeat_base(content)
+    if repeat_base and repeat_base != name:
+        base = load_base(repeat_base)
+        return Snapshot(base.entries, base.names, base.depth + 1)
+
+    delta_base = get_delta_base(content)
+    if delta_base and delta_base != name:
+        return load_base(delta_base).apply_delta(content)
+
+    return Snapshot.parse(content)
+
+
+def _file_signature(file_path: Path) -> Tuple[int, int]:
+    stat = file_path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def remember_snapshot(file_path: Path, snapshot: Snapshot) -> None:
+    """缓存刚写入的快照，下一份增量快照以它为基准时无需重新读取"""
+    key = str(file_path)
+    _snapshot_cache[key] = (_file_signature(file_path), snapshot)
+    _snapshot_cache.move_to_end(key)
+    while len(_snapshot_cache) > _CACHE_SIZE:
+        _snapshot_cache.popitem(last=False)
+
+
+def load_snapshot(file_path: Path, content: Optional[str] = None) -> Snapshot:
+    """
+    读取快照文件并还原为完整快照，透明处理"与快照相同"标记和增量快照
+
+    Args:
+        file_path: txt 快照路径
+        content: 已读取的文件内容，省略时从文件读取
+
+    Returns:
+        还原后的快照
+
+    Raises:
+        OSError: 快照文件或其基准快照不存在
+    """
+    file_path = Path(file_path)
+    key = str(file_path)
+    cached = _snapshot_cache.get(key)
+    if cached and cached[0] == _file_signature(file_path):
+        _snapshot_cache.move_to_end(key)
+        return cached[1]
+
+    if content is None:
+        with open(file_path, "r", encoding="utf-8") as f:
+            content = f.read()
+
+    snapshot = decode_snapshot(
+        file_path.stem,
+        content,
+        lambda base_name: load_snapshot(file_path.parent / f"{base_name}.txt"),
+    )
+    remember_snapshot(file_path, snapshot)
+    return snapshot
+
+
+def read_titles(
+    file_path: Path, on_error: Optional[Callable[[str, Exception], None]] = None
+) -> Tuple[Dict, Dict]:
+    """
+    读取快照文件为 (titles_by_id, id_to_name)，透明处理"与快照相同"标记和增量快照
+
+    Args:
+        file_path: txt 快照路径
+        on_error: 完整快照中标题行无法解析时的回调，见 parse_titles
+
+    Returns:
+        与 parse_titles 相同
+
+    Raises:
+        OSError: 快照文件或其基准快照不存在
+    """
+    file_path = Path(file_path)
+    with open(file_path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    repeat_base = get_repeat_base(content)
+    if repeat_base and repeat_base != file_path.stem:
+        return read_titles(file_path.parent / f"{repeat_base}.txt", on_error)
+
+    if get_delta_base(content):
+        return load_snapshot(file_path, content).to_titles()
+
+    return parse_titles(content, on_error)
@@ -0,0 +1,525 @@
+"""
+SQLite 快照存储
+
+与 txt 快照并行写入的嵌入式存储，按日期、平台和标题建立索引，
+供 main.py 加载当天数据和 MCP 数据查询使用，避免每次扫描并解析 txt 文件。
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .records import TitleRecord, intern
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS platforms (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL,
+    crawled_at REAL NOT NULL,
+    content_hash TEXT NOT NULL,
+    failed_ids TEXT NOT NULL DEFAULT '[]',
+    UNIQUE (date, time)
+);
+
+CREATE TABLE IF NOT EXISTS titles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    platform_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL DEFAULT '',
+    mobile_url TEXT NOT NULL DEFAULT '',
+    UNIQUE (platform_id, title)
+);
+
+CREATE TABLE IF NOT EXISTS rank_observations (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id) ON DELETE CASCADE,
+    title_id INTEGER NOT NULL REFERENCES titles (id),
+    platform_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    PRIMARY KEY (snapshot_id, title_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_snapshots_date ON snapshots (date, time);
+CREATE INDEX IF NOT EXISTS idx_titles_title ON titles (title);
+CREATE INDEX IF NOT EXISTS idx_observations_title ON rank_observations (title_id);
+CREATE INDEX IF NOT EXISTS idx_observations_platform
+    ON rank_observations (platform_id, snapshot_id);
+"""
+
+DATE_FOLDER_PATTERN = re.compile(r"(\d{4})年(\d{2})月(\d{2})日")
+
+
+def date_folder_to_iso(date_folder: str) -> Optional[str]:
+    """
+    日期文件夹名转换为 YYYY-MM-DD
+
+    Args:
+        date_folder: 文件夹名，格式: YYYY年MM月DD日
+
+    Returns:
+        ISO 日期字符串，格式不匹配时返回 None
+    """
+    match = DATE_FOLDER_PATTERN.fullmatch(date_folder)
+    if not match:
+        return None
+    return f"{match.group(1)}-{match.group(2)}-{match.group(3)}"
+
+
+def compute_snapshot_hash(titles_by_id: Dict, failed_ids: Sequence[str]) -> str:
+    """
+    计算快照内容指纹
+
+    Args:
+        titles_by_id: {platform_id: {title: {ranks, url, mobileUrl}}}
+        failed_ids: 请求失败的平台ID列表
+
+    Returns:
+        sha1 十六进制字符串
+    """
+    content = json.dumps([titles_by_id, list(failed_ids)], ensure_ascii=False)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class SnapshotStore:
+    """SQLite 快照存储"""
+
+    def __init__(self, db_path):
+        """
+        初始化快照存储
+
+        Args:
+            db_path: 数据库文件路径，不存在时在首次写入时创建
+        """
+        self.db_path = Path(db_path)
+        self._schema_ready = False
+
+    def exists(self) -> bool:
+        """数据库文件是否存在"""
+        return self.db_path.exists()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        conn.execute("PRAGMA foreign_keys = ON")
+        if not self._schema_ready:
+            # WAL 模式下爬虫写入时 MCP 仍可并发读取
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    # === 写入 ===
+
+    def save_snapshot(
+        self,
+        date: str,
+        time_name: str,
+        titles_by_id: Dict,
+        id_to_name: Dict,
+        failed_ids: Sequence[str] = (),
+        crawled_at: Optional[float] = None,
+    ) -> str:
+        """
+        写入一次快照，同一日期和时间的快照已存在时整体替换
+
+        Args:
+            date: 日期，格式: YYYY-MM-DD
+            time_name: 快照时间（与 txt 文件名一致，如 "08时30分"）
+            titles_by_id: {platform_id: {title: {ranks, url, mobileUrl}}}，与 txt 解析结果结构相同
+            id_to_name: {platform_id: platform_name}
+            failed_ids: 请求失败的平台ID列表
+            crawled_at: 爬取时间戳，默认为当前时间
+
+        Returns:
+            快照内容指纹
+        """
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        content_hash = compute_snapshot_hash(titles_by_id, failed_ids)
+
+        with closing(self._connect()) as conn, conn:
+            snapshot_id = self._replace_snapshot(
+                conn, date, time_name, crawled_at, content_hash, failed_ids
+            )
+
+            conn.executemany(
+                "INSERT INTO platforms (id, name) VALUES (?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET name = excluded.name",
+                [
+                    (platform_id, id_to_name.get(platform_id) or platform_id)
+                    for platform_id in titles_by_id
+                ],
+            )
+
+            # position 为快照内的全局顺序，读取时可还原平台和标题的原始顺序
+            observations = []
+            position = 0
+            for platform_id, titles in titles_by_id.items():
+                for title, info in titles.items():
+                    title_id = self._get_title_id(
+                        conn,
+                        platform_id,
+                        title,
+                        info.get("url", ""),
+                        info.get("mobileUrl", ""),
+                    )
+                    ranks = info.get("ranks") or [1]
+                    observations.append(
+                        (snapshot_id, title_id, platform_id, position, ranks[0])
+                    )
+                    position += 1
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO rank_observations "
+                "(snapshot_id, title_id, platform_id, position, rank) "
+                "VALUES (?, ?, ?, ?, ?)",
+                observations,
+            )
+
+        return content_hash
+
+    def save_repeat_snapshot(
+        self, date: str, time_name: str, base_time: str, crawled_at: Optional[float] = None
+    ) -> bool:
+        """
+        写入与已有快照内容相同的快照（复制排名记录）
+
+        Args:
+            date: 日期，格式: YYYY-MM-DD
+            time_name: 快照时间
+            base_time: 被引用的快照时间
+            crawled_at: 爬取时间戳，默认为当前时间
+
+        Returns:
+            被引用的快照不存在时返回 False
+        """
+        if time_name == base_time:
+            return True
+
+        with closing(self._connect()) as conn, conn:
+            base = conn.execute(
+                "SELECT id, content_hash, failed_ids FROM snapshots "
+                "WHERE date = ? AND time = ?",
+                (date, base_time),
+            ).fetchone()
+            if base is None:
+                return False
+
+            base_id, content_hash, failed_ids = base
+            snapshot_id = self._replace_snapshot(
+                conn, date, time_name, crawled_at, content_hash, json.loads(failed_ids)
+            )
+            conn.execute(
+                "INSERT INTO rank_observations "
+                "(snapshot_id, title_id, platform_id, position, rank) "
+                "SELECT ?, title_id, platform_id, position, rank "
+                "FROM rank_observations WHERE snapshot_id = ?",
+                (snapshot_id, base_id),
+            )
+        return True
+
+    @staticmethod
+    def _replace_snapshot(
+        conn: sqlite3.Connection,
+        date: str,
+        time_name: str,
+        crawled_at: Optional[float],
+        content_hash: str,
+        failed_ids: Sequence[str],
+    ) -> int:
+        conn.execute(
+            "DELETE FROM snapshots WHERE date = ? AND time = ?", (date, time_name)
+        )
+        cursor = conn.execute(
+            "INSERT INTO snapshots (date, time, crawled_at, content_hash, failed_ids) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                date,
+                time_name,
+                crawled_at if crawled_at is not None else time.time(),
+                content_hash,
+                json.dumps(list(failed_ids), ensure_ascii=False),
+            ),
+        )
+        return cursor.lastrowid
+
+    @staticmethod
+    def _get_title_id(
+        conn: sqlite3.Connection, platform_id: str, title: str, url: str, mobile_url: str
+    ) -> int:
+        conn.execute(
+            "INSERT OR IGNORE INTO titles (platform_id, title, url, mobile_url) "
+            "VALUES (?, ?, ?, ?)",
+            (platform_id, title, url, mobile_url),
+        )
+        title_id, stored_url, stored_mobile_url = conn.execute(
+            "SELECT id, url, mobile_url FROM titles WHERE platform_id = ? AND title = ?",
+            (platform_id, title),
+        ).fetchone()
+
+        # 与 txt 合并逻辑一致：保留最先出现的非空链接
+        if (not stored_url and url) or (not stored_mobile_url and mobile_url):
+            conn.execute(
+                "UPDATE titles SET url = ?, mobile_url = ? WHERE id = ?",
+                (stored_url or url, stored_mobile_url or mobile_url, title_id),
+            )
+        return title_id
+
+    # === 查询 ===
+
+    def list_snapshots(self, date: str) -> List[Tuple[str, str]]:
+        """
+        列出指定日期的快照
+
+        Args:
+            date: 日期，格式: YYYY-MM-DD
+
+        Returns:
+            [(快照时间, 内容指纹)]，按时间排序
+        """
+        if not self.exists():
+            return []
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT time, content_hash FROM snapshots WHERE date = ? ORDER BY time",
+                (date,),
+            ).fetchall()
+
+    def has_date(self, date: str) -> bool:
+        """指定日期是否有快照"""
+        if not self.exists():
+            return False
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM snapshots WHERE date = ? LIMIT 1", (date,)
+            ).fetchone()
+        return row is not None
+
+    def iter_snapshots(
+        self, date: str, after_time: Optional[str] = None
+    ) -> Iterator[Tuple[str, Dict, Dict]]:
+        """
+        按时间顺序逐个读取快照，结构与 txt 解析结果相同
+
+        Args:
+            date: 日期，格式: YYYY-MM-DD
+            after_time: 只读取该时间之后的快照
+
+        Yields:
+            (快照时间, titles_by_id, id_to_name)
+        """
+        if not self.exists():
+            return
+
+        # LEFT JOIN 保留全部平台都失败的空快照
+        query = (
+            "SELECT s.time, o.platform_id, p.name, t.title, o.rank, t.url, t.mobile_url "
+            "FROM snapshots s "
+            "LEFT JOIN rank_observations o ON o.snapshot_id = s.id "
+            "LEFT JOIN titles t ON t.id = o.title_id "
+            "LEFT JOIN platforms p ON p.id = o.platform_id "
+            "WHERE s.date = ?"
+        )
+        params = [date]
+        if after_time is not None:
+            query += " AND s.time > ?"
+            params.append(after_time)
+        query += " ORDER BY s.time, o.position"
+
+        with closing(self._connect()) as conn:
+            current_time = None
+            titles_by_id = {}
+            id_to_name = {}
+            for time_name, platform_id, name, title, rank, url, mobile_url in conn.execute(
+                query, params
+            ):
+                if time_name != current_time:
+                    if current_time is not None:
+                        yield current_time, titles_by_id, id_to_name
+                    current_time = time_name
+                    titles_by_id = {}
+                    id_to_name = {}
+
+                if platform_id is None:
+                    continue
+                id_to_name[platform_id] = name or platform_id
+                titles_by_id.setdefault(platform_id, {})[title] = {
+                    "ranks": [rank],
+                    "url": url,
+                    "mobileUrl": mobile_url,
+                }
+
+            if current_time is not None:
+                yield current_time, titles_by_id, id_to_name
+
+    def load_day(
+        self, date: str, platform_ids: Optional[List[str]] = None
+    ) -> Tuple[Dict, Dict, Dict]:
+        """
+        读取指定日期的全部标题，排名按快照顺序依次追加
+
+        Args:
+            date: 日期，格式: YYYY-MM-DD
+            platform_ids: 平台ID列表，None表示所有平台
+
+        Returns:
+            (all_titles, id_to_name, timestamps) 元组
+            - all_titles: {platform_id: {title: TitleRecord}}，记录可按 {ranks, url, mobileUrl} 字典读取
+            - id_to_name: {platform_id: platform_name}
+            - timestamps: {快照文件名: 爬取时间戳}
+        """
+        all_titles = {}
+        id_to_name = {}
+        timestamps = {}
+        if not self.exists():
+            return all_titles, id_to_name, timestamps
+
+        query = (
+            "SELECT s.time, s.crawled_at, o.platform_id, p.name, t.title, o.rank, "
+            "t.url, t.mobile_url "
+            "FROM snapshots s "
+            "LEFT JOIN rank_observations o ON o.snapshot_id = s.id "
+            "LEFT JOIN titles t ON t.id = o.title_id "
+            "LEFT JOIN platforms p ON p.id = o.platform_id "
+            "WHERE s.date = ? "
+            "ORDER BY s.time, o.position"
+        )
+
+        with closing(self._connect()) as conn:
+            for (
+                time_name,
+                crawled_at,
+                platform_id,
+                name,
+                title,
+                rank,
+                url,
+                mobile_url,
+            ) in conn.execute(query, (date,)):
+                timestamps[f"{time_name}.txt"] = crawled_at
+                if platform_id is None:
+                    continue
+                id_to_name[platform_id] = name or platform_id
+                if platform_ids and platform_id not in platform_ids:
+                    continue
+
+                platform_titles = all_titles.setdefault(intern(platform_id), {})
+                record = platform_titles.get(title)
+                if record is not None:
+                    record.extend_ranks((rank,))
+                else:
+                    platform_titles[intern(title)] = TitleRecord((rank,), url, mobile_url)
+
+        return all_titles, id_to_name, timestamps
+
+    def search_titles(
+        self,
+        keyword: str,
+        start_date: str,
+        end_date: str,
+        platform_ids: Optional[List[str]] = None,
+    ) -> List[Dict]:
+        """
+        在日期范围内按关键词搜索标题（不区分大小写的子串匹配）
+
+        Args:
+            keyword: 搜索关键词
+            start_date: 开始日期，格式: YYYY-MM-DD
+            end_date: 结束日期，格式: YYYY-MM-DD
+            platform_ids: 平台ID列表，None表示所有平台
+
+        Returns:
+            [{date, platform, platform_name, title, ranks, url, mobileUrl}]，
+            同一天同一平台的同一标题合并为一条
+        """
+        if not self.exists():
+            return []
+
+        escaped = (
+            keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+        query = (
+            "SELECT s.date, o.platform_id, p.name, t.title, o.rank, t.url, t.mobile_url "
+            "FROM snapshots s "
+            "JOIN rank_observations o ON o.snapshot_id = s.id "
+            "JOIN titles t ON t.id = o.title_id "
+            "LEFT JOIN platforms p ON p.id = o.platform_id "
+            "WHERE s.date BETWEEN ? AND ? AND t.title LIKE ? ESCAPE '\\'"
+        )
+        params = [start_date, end_date, f"%{escaped}%"]
+        if platform_ids:
+            query += f" AND o.platform_id IN ({','.join('?' * len(platform_ids))})"
+            params.extend(platform_ids)
+        query += " ORDER BY s.date, s.time, o.position"
+
+        matches = {}
+        with closing(self._connect()) as conn:
+            for date, platform_id, name, title, rank, url, mobile_url in conn.execute(
+                query, params
+            ):
+                # LIKE 只对 ASCII 字母忽略大小写，这里按 Python 语义再校验一次
+                if keyword.lower() not in title.lower():
+                    continue
+                key = (date, platform_id, title)
+                if key in matches:
+                    matches[key]["ranks"].append(rank)
+                else:
+                    matches[key] = {
+                        "date": date,
+                        "platform": platform_id,
+                        "platform_name": name or platform_id,
+                        "title": title,
+                        "ranks": [rank],
+                        "url": url,
+                        "mobileUrl": mobile_url,
+                    }
+        return list(matches.values())
+
+    def get_date_range(self) -> Tuple[Optional[str], Optional[str]]:
+        """
+        已存储的日期范围
+
+        Returns:
+            (最早日期, 最新日期)，格式: YYYY-MM-DD，没有数据时为 (None, None)
+        """
+        if not self.exists():
+            return None, None
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT MIN(date), MAX(date) FROM snapshots").fetchone()
+
+    def get_stats(self) -> Dict:
+        """
+        存储统计信息
+
+        Returns:
+            {snapshots, titles, observations, size_bytes}
+        """
+        if not self.exists():
+            return {"snapshots": 0, "titles": 0, "observations": 0, "size_bytes": 0}
+        with closing(self._connect()) as conn:
+            snapshots = conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+            titles = conn.execute("SELECT COUNT(*) FROM titles").fetchone()[0]
+            observations = conn.execute(
+                "SELECT COUNT(*) FROM rank_observations"
+            ).fetchone()[0]
+        size_bytes = sum(
+            path.stat().st_size
+            for path in self.db_path.parent.glob(f"{self.db_path.name}*")
+            if path.is_file()
+        )
+        return {
+            "snapshots": snapshots,
+            "titles": titles,
+            "observations": observations,
+            "size_bytes": size_bytes,
+        }
@@ -0,0 +1,202 @@
+"""
+新闻权重计算
+
+main.py 报告排序和 MCP Server 分析工具共用的权重公式：
+
+- 排名权重：Σ(11 - min(rank, 10)) / 出现次数
+- 频次权重：min(出现次数, 10) × 10
+- 热度权重：排名不低于阈值的次数 / 出现次数 × 100
+
+``WeightScorer`` 一次计算一批新闻的权重。安装了 NumPy 且数量较多时把全部排名展开为一个数组批量计算，
+否则逐条计算；两种方式的浮点运算顺序相同，结果完全一致。
+排序支持只取前 K 条：先按权重分区选出候选，再只对候选排序。
+"""
+
+import heapq
+from typing import Dict, List, Mapping, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# 少于该数量时逐条计算比构建数组更快
+NUMPY_MIN_ITEMS = 64
+
+
+class WeightScorer:
+    """按固定的权重配置计算新闻权重"""
+
+    __slots__ = ("rank_weight", "frequency_weight", "hotness_weight", "rank_threshold")
+
+    def __init__(
+        self,
+        rank_weight: float = 0.6,
+        frequency_weight: float = 0.3,
+        hotness_weight: float = 0.1,
+        rank_threshold: int = 5,
+    ):
+        self.rank_weight = rank_weight
+        self.frequency_weight = frequency_weight
+        self.hotness_weight = hotness_weight
+        self.rank_threshold = rank_threshold
+
+    @classmethod
+    def from_config(cls, weight_config: Dict, rank_threshold: int) -> "WeightScorer":
+        """从 main.py 的 CONFIG["WEIGHT_CONFIG"] 构建"""
+        return cls(
+            weight_config["RANK_WEIGHT"],
+            weight_config["FREQUENCY_WEIGHT"],
+            weight_config["HOTNESS_WEIGHT"],
+            rank_threshold,
+        )
+
+    def score(self, news_data: Mapping) -> float:
+        """
+        计算单条新闻的权重
+
+        Args:
+            news_data: 包含 ranks 和可选 count 字段的新闻数据
+
+        Returns:
+            权重分数，没有排名时为 0
+        """
+        ranks = news_data.get("ranks", [])
+        if not ranks:
+            return 0.0
+
+        length = len(ranks)
+        count = news_data.get("count", length)
+        rank_threshold = self.rank_threshold
+        # Σ(11 - min(rank, 10)) = 11n - Σmin(rank, 10)
+        rank_sum = 11 * length - sum([rank if rank < 10 else 10 for rank in ranks])
+        high_rank_count = len([rank for rank in ranks if rank <= rank_threshold])
+
+        return (
+            rank_sum / length * self.rank_weight
+            + min(count, 10) * 10 * self.frequency_weight
+            + high_rank_count / length * 100 * self.hotness_weight
+        )
+
+    def score_many(self, items: Sequence[Mapping]) -> List[float]:
+        """批量计算权重，结果与逐条调用 score 相同"""
+        if np is None or len(items) < NUMPY_MIN_ITEMS:
+            return [self.score(item) for item in items]
+        return self._score_array(items).tolist()
+
+    def _score_array(self, items: Sequence[Mapping]):
+        rank_lists = [item.get("ranks", []) for item in items]
+        lengths = np.fromiter((len(ranks) for ranks in rank_lists), dtype=np.int64, count=len(items))
+        counts = np.fromiter(
+            (
+                item.get("count", length)
+                for item, length in zip(items, lengths.tolist())
+            ),
+            dtype=np.int64,
+            count=len(items),
+        )
+        scores = np.zeros(len(items), dtype=np.float64)
+        has_ranks = lengths > 0
+        if not has_ranks.any():
+            return scores
+
+        flat_ranks = np.fromiter(
+            (rank for ranks in rank_lists for rank in ranks),
+            dtype=np.int64,
+            count=int(lengths.sum()),
+        )
+        # 每条新闻的排名在展开数组中的起始位置（只取有排名的新闻，避免空区间）
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))[has_ranks]
+        valid_lengths = lengths[has_ranks]
+
+        rank_sums = np.add.reduceat(11 - np.minimum(flat_ranks, 10), offsets)
+        high_rank_counts = np.add.reduceat(
+            (flat_ranks <= self.rank_threshold).astype(np.int64), offsets
+        )
+
+        # 与 score 相同的运算顺序，保证浮点结果一致
+        scores[has_ranks] = (
+            rank_sums / valid_lengths * self.rank_weight
+            + np.minimum(counts[has_ranks], 10) * 10 * self.frequency_weight
+            + high_rank_counts / valid_lengths * 100 * self.hotness_weight
+        )
+        return scores
+
+    def sort(
+        self,
+        items: Sequence[Mapping],
+        top_k: Optional[int] = None,
+        break_ties: bool = True,
+    ) -> List:
+        """
+        按权重从高到低排序
+
+        Args:
+            items: 新闻数据列表
+            top_k: 只返回前 K 条，None 表示全部
+            break_ties: 权重相同时按最高排名、出现次数排序（main.py 报告的规则），
+                否则保持原有顺序
+
+        Returns:
+            排序后的新闻列表，与对全部结果稳定排序后取前 K 条相同
+        """
+        if top_k is not None and top_k <= 0:
+            return []
+        if not items:
+            return []
+
+        if np is not None and len(items) >= NUMPY_MIN_ITEMS:
+            return self._sort_array(items, top_k, break_ties)
+
+        weights = [self.score(item) for item in items]
+        keys = [
+            self._sort_key(item, weight, break_ties)
+            for item, weight in zip(items, weights)
+        ]
+        order = range(len(items))
+        if top_k is not None and top_k < len(items):
+            # nsmallest 与 sorted(...)[:k] 结果相同（含相等元素的先后顺序）
+            selected = heapq.nsmallest(top_k, order, key=keys.__getitem__)
+        else:
+            selected = sorted(order, key=keys.__getitem__)
+        return [items[index] for index in selected]
+
+    @staticmethod
+    def _sort_key(item: Mapping, weight: float, break_ties: bool) -> tuple:
+        if not break_ties:
+            return (-weight,)
+        ranks = item["ranks"]
+        return (-weight, min(ranks) if ranks else 999, -item["count"])
+
+    def _sort_array(self, items: Sequence[Mapping], top_k: Optional[int], break_ties: bool) -> List:
+        weights = self._score_array(items)
+        candidates = np.arange(len(items))
+        if top_k is not None and top_k < len(items):
+            # 第 K 大的权重之上（含相等）的新闻才可能进入前 K 条
+            kth_weight = np.partition(weights, len(items) - top_k)[len(items) - top_k]
+            candidates = np.flatnonzero(weights >= kth_weight)
+
+        candidate_weights = weights[candidates]
+        if break_ties:
+            min_ranks = np.fromiter(
+                (
+                    min(items[index]["ranks"]) if items[index]["ranks"] else 999
+                    for index in candidates.tolist()
+                ),
+                dtype=np.int64,
+                count=len(candidates),
+            )
+            counts = np.fromiter(
+                (items[index]["count"] for index in candidates.tolist()),
+                dtype=np.int64,
+                count=len(candidates),
+            )
+            # lexsort 以最后一个键为主键，且为稳定排序
+            order = np.lexsort((-counts, min_ranks, -candidate_weights))
+        else:
+            order = np.argsort(-candidate_weights, kind="stable")
+
+        selected = candidates[order]
+        if top_k is not None:
+            selected = selected[:top_k]
+        return [items[index] for index in selected.tolist()]
@@ -123,40 +123,32 @@ def truncate_text(text: str, max_length: int = 100, suffix: str = "...") -> str:
 
 def load_frequency_words(file_path: str = "config/frequency_words.txt") -> List[str]:
     """
-    加载关键词文件（复用现有的 frequency_words.txt）
+    加载关键词文件（复用现有的 frequency_words.txt，与 main.py 共用 trendradar 的解析和缓存）
+    
+    需要能导入项目根目录下的 trendradar 包：从项目根目录运行（如 run_wechat_rss.py），
+    或先执行 pip install -e . 安装。
     
     Args:
         file_path: 关键词文件路径
     
     Returns:
-        关键词列表
+        关键词列表（必须词和普通词中可直接做子串匹配的文字，供 filter_by_keywords 使用；
+        不含过滤词、本组排除词，以及整词、词首和正则写法）
     """
     try:
-        # 支持相对路径和绝对路径
-        if not os.path.isabs(file_path):
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            project_root = os.path.dirname(current_dir)
-            file_path = os.path.join(project_root, file_path)
-        
-        keywords = []
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                # 跳过空行和注释
-                if not line or line.startswith('#'):
-                    continue
-                # 跳过过滤词（!开头）
-                if line.startswith('!'):
-                    continue
-                # 移除必须词标记（+开头）
-                if line.startswith('+'):
-                    line = line[1:]
-                
-                keywords.append(line)
-        
-        return keywords
-        
+        from trendradar.rules import load_rules
+    except ImportError:
+        print("⚠️  无法导入 trendradar，请从项目根目录运行或执行 pip install -e .")
+        return []
+
+    # 支持相对路径和绝对路径
+    if not os.path.isabs(file_path):
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        project_root = os.path.dirname(current_dir)
+        file_path = os.path.join(project_root, file_path)
+
+    try:
+        return load_rules(file_path).keywords
     except FileNotFoundError:
         print(f"⚠️  关键词文件不存在: {file_path}")
         return []